@@ -0,0 +1,137 @@
+"""Benchmark of the splitting of intersecting segments in 2d fracture networks.
+
+The benchmark generates random sets of segments in the unit square, and times
+:func:`~porepy.geometry.intersections.split_intersecting_segments_2d`, which is used by
+:class:`~porepy.fracs.fracture_network_2d.FractureNetwork2d` to split fractures at
+their intersections before meshing. The length of the segments is scaled with the
+number of segments, such that the average number of intersections per segment is
+roughly independent of the size of the network. An ideal implementation therefore
+scales linearly with the number of segments.
+
+The implementation can be compared to the one of another git revision, e.g., the one
+before a change of the implementation. The results are checked to be identical.
+
+Usage:
+
+    python benchmarks/fracture_intersections_2d.py --num-segments 1000 10000 100000
+
+    python benchmarks/fracture_intersections_2d.py --num-segments 1000 --baseline HEAD~1
+
+"""
+from __future__ import annotations
+
+import argparse
+import subprocess
+import time
+import types
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+import porepy as pp
+
+
+def random_segments(
+    num_segments: int, intersections_per_segment: float, seed: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Create a set of randomly placed and oriented segments.
+
+    Parameters:
+        num_segments: Number of segments.
+        intersections_per_segment: Approximate average number of intersections of a
+            segment.
+        seed: Seed of the random number generator.
+
+    Returns:
+        Coordinates of the start and endpoints of the segments, and the connections
+        between them, with the index of the segment as a tag in the third row.
+
+    """
+    rng = np.random.default_rng(seed)
+    # For randomly oriented segments of length h, the expected number of intersections
+    # per segment is roughly 2 * num_segments * h**2 / pi.
+    h = np.sqrt(intersections_per_segment * np.pi / (2 * num_segments))
+
+    centers = rng.random((2, num_segments))
+    angles = rng.random(num_segments) * np.pi
+    half = 0.5 * h * np.vstack((np.cos(angles), np.sin(angles)))
+    pts = np.hstack((centers - half, centers + half))
+    edges = np.vstack(
+        (
+            np.arange(num_segments),
+            num_segments + np.arange(num_segments),
+            np.arange(num_segments),
+        )
+    )
+    return pts, edges
+
+
+def baseline_implementation(revision: str) -> Callable:
+    """Load the implementation of the splitting at another git revision.
+
+    Parameters:
+        revision: The git revision.
+
+    Returns:
+        The function ``split_intersecting_segments_2d`` of the revision.
+
+    """
+    root = Path(__file__).resolve().parents[1]
+    source = subprocess.run(
+        ["git", "show", f"{revision}:src/porepy/geometry/intersections.py"],
+        cwd=root,
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    module = types.ModuleType(f"intersections_{revision}")
+    exec(compile(source, module.__name__, "exec"), module.__dict__)
+    return module.split_intersecting_segments_2d
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--num-segments", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--intersections-per-segment", type=float, default=4.0)
+    parser.add_argument("--baseline", type=str, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    split = pp.intersections.split_intersecting_segments_2d
+    baseline = None
+    if args.baseline is not None:
+        baseline = baseline_implementation(args.baseline)
+
+    for num_segments in args.num_segments:
+        pts, edges = random_segments(
+            num_segments, args.intersections_per_segment, args.seed
+        )
+
+        tic = time.perf_counter()
+        result = split(pts, edges, return_argsort=True)
+        split_time = time.perf_counter() - tic
+
+        message = (
+            f"Segments: {num_segments:7d}, split segments: {result[1].shape[1]:7d}, "
+            f"split: {split_time:8.3f} s"
+        )
+        if baseline is not None:
+            tic = time.perf_counter()
+            known = baseline(pts, edges, return_argsort=True)
+            baseline_time = time.perf_counter() - tic
+            identical = all(
+                np.array_equal(a, b)
+                for a, b in zip(
+                    (*known[:2], *known[2], known[3]),
+                    (*result[:2], *result[2], result[3]),
+                )
+            )
+            message += (
+                f", baseline: {baseline_time:8.3f} s, identical results: {identical}"
+            )
+        print(message, flush=True)
+
+
+if __name__ == "__main__":
+    main()
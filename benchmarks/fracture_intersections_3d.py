@@ -0,0 +1,97 @@
+"""Benchmark of intersection detection and splitting in 3d fracture networks.
+
+The benchmark generates random networks of square fractures in the unit cube, and times
+:meth:`~porepy.fracs.fracture_network_3d.FractureNetwork3d.find_intersections` and
+:meth:`~porepy.fracs.fracture_network_3d.FractureNetwork3d.split_intersections`. The
+side length of the fractures is scaled with the number of fractures, such that the
+average number of intersections per fracture is roughly independent of the size of the
+network. An ideal implementation therefore scales linearly with the number of
+fractures.
+
+Usage:
+
+    python benchmarks/fracture_intersections_3d.py --num-fractures 100 1000 10000
+
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+import porepy as pp
+from porepy.fracs.fracture_network_3d import FractureNetwork3d
+
+
+def random_network(
+    num_fractures: int, intersections_per_fracture: float, seed: int
+) -> FractureNetwork3d:
+    """Create a network of randomly placed and oriented square fractures.
+
+    Parameters:
+        num_fractures: Number of fractures.
+        intersections_per_fracture: Approximate average number of intersections of a
+            fracture.
+        seed: Seed of the random number generator.
+
+    Returns:
+        The fracture network.
+
+    """
+    rng = np.random.default_rng(seed)
+    # For randomly oriented squares of side length h, the expected number of
+    # intersections per fracture is roughly 2 * num_fractures * h**3.
+    h = (intersections_per_fracture / (2 * num_fractures)) ** (1 / 3)
+
+    centers = rng.random((num_fractures, 3))
+    normals = rng.normal(size=(num_fractures, 3))
+    normals /= np.linalg.norm(normals, axis=1)[:, None]
+    # Two orthonormal vectors in the plane of each fracture.
+    helper = np.where(
+        np.abs(normals[:, :1]) < 0.9, [[1.0, 0, 0]], [[0, 1.0, 0]]
+    ) * np.ones((num_fractures, 1))
+    t1 = np.cross(normals, helper)
+    t1 /= np.linalg.norm(t1, axis=1)[:, None]
+    t2 = np.cross(normals, t1)
+
+    corners = np.array([[-1, -1], [1, -1], [1, 1], [-1, 1]]) * (h / 2)
+    fractures = []
+    for c, a, b in zip(centers, t1, t2):
+        pts = c[:, None] + np.outer(a, corners[:, 0]) + np.outer(b, corners[:, 1])
+        fractures.append(pp.PlaneFracture(pts, sort_points=False))
+    return FractureNetwork3d(fractures)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--num-fractures", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--intersections-per-fracture", type=float, default=2.0)
+    parser.add_argument("--skip-split", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for num_fractures in args.num_fractures:
+        network = random_network(
+            num_fractures, args.intersections_per_fracture, args.seed
+        )
+
+        tic = time.perf_counter()
+        network.find_intersections()
+        find_time = time.perf_counter() - tic
+        num_intersections = network.intersections["start"].shape[1]
+
+        message = (
+            f"Fractures: {num_fractures:6d}, intersections: {num_intersections:6d}, "
+            f"find_intersections: {find_time:8.3f} s"
+        )
+        if not args.skip_split:
+            tic = time.perf_counter()
+            network.split_intersections()
+            split_time = time.perf_counter() - tic
+            message += f", split_intersections: {split_time:8.3f} s"
+        print(message, flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark of serial versus thread-parallel assembly of the linear system.
+
+The benchmark sets up a poromechanics model in a unit cube with three orthogonal,
+intersecting fractures, and times :meth:`~porepy.numerics.ad.equation_system.
+EquationSystem.assemble` with different values of the model parameter
+``max_assembly_workers``. The assembled systems are checked to coincide with the
+serial one.
+
+Usage:
+
+    python benchmarks/parallel_assembly.py --cell-size 0.1 --workers 1 2 4 8
+
+Note that the speedup depends on the size of the model and the number of available
+cores: For small models, evaluation of the equations is dominated by Python overhead,
+which holds the global interpreter lock, and the thread-parallel assembly is no faster
+than the serial one.
+
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+import porepy as pp
+from porepy.applications.md_grids.model_geometries import (
+    CubeDomainOrthogonalFractures,
+)
+
+
+class FracturedPoromechanics(
+    CubeDomainOrthogonalFractures, pp.poromechanics.Poromechanics
+):
+    """Poromechanics in a cube with up to three orthogonal fractures."""
+
+
+def setup_model(cell_size: float, max_assembly_workers: int) -> FracturedPoromechanics:
+    """Create and prepare a model for simulation.
+
+    Parameters:
+        cell_size: Target cell size of the Cartesian grid.
+        max_assembly_workers: Number of threads used for assembly.
+
+    Returns:
+        A model ready for assembly of the linear system.
+
+    """
+    params = {
+        "fracture_indices": [0, 1, 2],
+        "meshing_arguments": {"cell_size": cell_size},
+        "max_assembly_workers": max_assembly_workers,
+    }
+    model = FracturedPoromechanics(params)
+    model.prepare_simulation()
+    return model
+
+
+def time_assembly(model: FracturedPoromechanics, repeats: int) -> float:
+    """Return the minimum wall time of a number of assemblies of the full system."""
+    # The first assembly compiles the evaluation plan, this is not part of the timing.
+    model.equation_system.assemble()
+    timings = []
+    for _ in range(repeats):
+        tic = time.perf_counter()
+        model.equation_system.assemble()
+        timings.append(time.perf_counter() - tic)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--cell-size", type=float, default=0.125)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    model = setup_model(args.cell_size, 1)
+    A_ref, b_ref = model.equation_system.assemble()
+    print(
+        f"Cells: {model.mdg.num_subdomain_cells()}, dofs: {A_ref.shape[0]}, "
+        f"Jacobian nonzeros: {A_ref.nnz}"
+    )
+
+    serial_time = None
+    for workers in args.workers:
+        model.equation_system.max_assembly_workers = workers
+        A, b = model.equation_system.assemble()
+        assert np.allclose((A - A_ref).data, 0)
+        assert np.allclose(b, b_ref)
+
+        elapsed = time_assembly(model, args.repeats)
+        if serial_time is None:
+            serial_time = elapsed
+        print(
+            f"Workers: {workers:3d}, assembly time: {elapsed:.4f} s, "
+            f"speedup: {serial_time / elapsed:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark of serial versus process-parallel discretization with Mpfa, Mpsa and Biot.
+
+The benchmark discretizes a Cartesian grid in the unit cube with different values of
+the parameter ``max_discretization_workers``, which distributes the subproblems of
+the discretization on a pool of processes. The discretization matrices are checked to
+coincide with the serial ones.
+
+Usage:
+
+    python benchmarks/parallel_discretization.py --cells 30 --workers 1 2 4
+
+Note that the worker processes are started anew for each discretization. For small
+grids, the startup of the processes (import of PorePy and compilation of numba
+functions) dominates the discretization time.
+
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+import porepy as pp
+
+
+def discretize(
+    sd: pp.Grid, method: str, num_workers: int
+) -> tuple[float, dict[str, dict]]:
+    """Discretize a grid and return the wall time and the discretization matrices.
+
+    Parameters:
+        sd: Grid to be discretized.
+        method: One of "mpfa", "mpsa" and "biot".
+        num_workers: Number of processes used for the discretization.
+
+    Returns:
+        The wall time of the discretization, and the discretization matrices, stored
+        by keyword.
+
+    """
+    params = {"max_discretization_workers": num_workers}
+    if method == "mpfa":
+        keywords = ["flow"]
+        discr = pp.Mpfa("flow")
+    elif method == "mpsa":
+        keywords = ["mechanics"]
+        discr = pp.Mpsa("mechanics")
+    else:
+        keywords = ["mechanics", "flow"]
+        discr = pp.Biot()
+        params["biot_alpha"] = 1.0
+    data = pp.initialize_default_data(sd, {}, keywords[0], params)
+    if method == "biot":
+        pp.initialize_default_data(sd, data, "flow", {"biot_alpha": 1.0})
+
+    tic = time.perf_counter()
+    discr.discretize(sd, data)
+    elapsed = time.perf_counter() - tic
+    return elapsed, {key: data[pp.DISCRETIZATION_MATRICES][key] for key in keywords}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--cells", type=int, default=20)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument(
+        "--methods", nargs="+", default=["mpfa", "mpsa", "biot"], type=str
+    )
+    args = parser.parse_args()
+
+    sd = pp.CartGrid(np.array([args.cells] * 3), physdims=np.ones(3))
+    sd.compute_geometry()
+    print(f"Cells: {sd.num_cells}")
+
+    for method in args.methods:
+        serial_time, known = None, None
+        for workers in args.workers:
+            elapsed, matrices = discretize(sd, method, workers)
+            if known is None:
+                serial_time, known = elapsed, matrices
+            else:
+                for keyword, mats in known.items():
+                    for key, mat in mats.items():
+                        assert np.allclose((mat - matrices[keyword][key]).data, 0)
+            print(
+                f"{method}: workers: {workers:3d}, time: {elapsed:.2f} s, "
+                f"speedup: {serial_time / elapsed:.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -53,6 +53,7 @@ from porepy.utils.interpolation_tables import (
 )
 from porepy.utils import array_operations
 from porepy.numerics.linalg import matrix_operations
+from porepy.numerics.linalg import linear_solver_backends
 
 # Geometry
 from porepy.geometry import (
@@ -92,6 +93,7 @@ from porepy.grids.simplex import TriangleGrid, TetrahedralGrid
 from porepy.grids.simplex import StructuredTriangleGrid, StructuredTetrahedralGrid
 from porepy.grids.point_grid import PointGrid
 from porepy.grids.boundary_grid import BoundaryGrid
+from porepy.grids.shared_grid import SharedGrid, SharedGridHandle
 from porepy.grids import match_grids
 from porepy.grids.standard_grids import md_grids_2d, md_grids_3d
 from porepy.grids import grid_extrusion
@@ -163,6 +165,10 @@ from porepy.numerics.interface_laws.hyperbolic_interface_laws import UpwindCoupl
 from porepy.numerics.fv.mass_matrix import MassMatrix
 from porepy.numerics.fv.mass_matrix import InvMassMatrix
 
+# Caching of discretization matrices
+from porepy.numerics.discretization_cache import DiscretizationCache
+from porepy.numerics import out_of_core
+
 # Contact mechanics
 from porepy.numerics.fracture_deformation import propagate_fracture
 from porepy.numerics.fracture_deformation.conforming_propagation import (
@@ -170,7 +176,7 @@ from porepy.numerics.fracture_deformation.conforming_propagation import (
 )
 
 # Related to models and solvers
-from porepy.numerics.nonlinear.nonlinear_solvers import NewtonSolver
+from porepy.numerics.nonlinear.nonlinear_solvers import NewtonKrylovSolver, NewtonSolver
 from porepy.numerics.linear_solvers import LinearSolver
 from porepy.models.run_models import (
     run_stationary_model,
@@ -219,6 +225,7 @@ from porepy.models import (
 
 # Visualization
 from porepy.viz.exporter import Exporter
+from porepy.viz.time_series import TimeSeriesReader, TimeSeriesWriter
 from porepy.viz.plot_grid import plot_grid, save_img
 from porepy.viz.fracture_visualization import plot_fractures, plot_wells
 
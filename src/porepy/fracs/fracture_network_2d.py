@@ -1343,7 +1343,7 @@ class FractureNetwork2d:
         to_keep[np.setdiff1d(all_pts_id, pts_id, assume_unique=True)] = False
 
         # create the map between the old and new
-        new_pts_id = -np.ones(all_pts_id.size, dtype=np.int8)
+        new_pts_id = -np.ones(all_pts_id.size, dtype=int)
         new_pts_id[to_keep] = np.arange(pts_id.size)
 
         # update the edges numeration
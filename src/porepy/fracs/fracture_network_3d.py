@@ -14,7 +14,7 @@ from typing import Optional, Union
 import meshio
 import networkx as nx
 import numpy as np
-from scipy.spatial import ConvexHull
+from scipy.spatial import ConvexHull, KDTree
 
 import porepy as pp
 from porepy.fracs.gmsh_interface import GmshData3d, GmshWriter
@@ -740,9 +740,15 @@ class FractureNetwork3d(object):
             polys, include_point_contact=False
         )
 
-        # Loop over all pairs of intersection pairs, add the intersections to the
-        # internal list.
-        for pair in frac_pairs:
+        # Loop over all pairs of intersection pairs, collect the intersections and add
+        # them to the internal list at once.
+        first = np.empty(len(frac_pairs), dtype=object)
+        second = np.empty(len(frac_pairs), dtype=object)
+        start = np.zeros((3, len(frac_pairs)))
+        end = np.zeros((3, len(frac_pairs)))
+        bound_first = np.zeros(len(frac_pairs), dtype=bool)
+        bound_second = np.zeros(len(frac_pairs), dtype=bool)
+        for pi, pair in enumerate(frac_pairs):
             # Indices of the relevant pairs.
             ind_0, ind_1 = pair
             # Find the common indices of intersection points (referring to isect)
@@ -769,15 +775,22 @@ class FractureNetwork3d(object):
             on_bound_0 = bound_info[ind_0][np.floor(i0[0] / 2).astype(int)]
             on_bound_1 = bound_info[ind_1][np.floor(i1[0] / 2).astype(int)]
 
-            # Add the intersection to the internal storage
-            self._add_intersection(
-                self.fractures[ind_0],
-                self.fractures[ind_1],
-                isect[:, point_ind[ind_1][common_ind[0]]],
-                isect[:, point_ind[ind_1][common_ind[1]]],
-                bound_first=on_bound_0,
-                bound_second=on_bound_1,
-            )
+            first[pi] = self.fractures[ind_0]
+            second[pi] = self.fractures[ind_1]
+            start[:, pi] = isect[:, point_ind[ind_1][common_ind[0]]]
+            end[:, pi] = isect[:, point_ind[ind_1][common_ind[1]]]
+            bound_first[pi] = on_bound_0
+            bound_second[pi] = on_bound_1
+
+        # Add the intersections to the internal storage
+        self._add_intersection(
+            first,
+            second,
+            start,
+            end,
+            bound_first=bound_first,
+            bound_second=bound_second,
+        )
         logger.info(
             "Found %i intersections. Elapsed time: %.5f",
             len(self.intersections),
@@ -817,26 +830,34 @@ class FractureNetwork3d(object):
             "is_bound": is_boundary_edge,
             "edges_2_frac": edges_2_frac,
         }
+        # Find the edges of each fracture, sorted into boundary and internal edges. All
+        # edge-fracture relations are treated at once, ordered by fracture and edge.
+        num_frac_of_edge = np.array([e.size for e in edges_2_frac], dtype=int)
+        # Check that the boundary information matches the fractures
+        assert np.array_equal(
+            num_frac_of_edge, np.array([e.size for e in is_boundary_edge], dtype=int)
+        )
+        edge_ind = np.repeat(np.arange(len(edges_2_frac)), num_frac_of_edge)
+        frac_ind = np.hstack([np.empty(0, dtype=int)] + edges_2_frac).astype(int)
+        on_boundary = np.hstack([np.empty(0, dtype=bool)] + is_boundary_edge).astype(
+            bool
+        )
+        order = np.lexsort((edge_ind, frac_ind))
+        edge_ind, frac_ind, on_boundary = (
+            edge_ind[order],
+            frac_ind[order],
+            on_boundary[order],
+        )
+        if np.any((np.diff(frac_ind) == 0) & (np.diff(edge_ind) == 0)):
+            raise ValueError("Non-unique fracture edge relation")
+        frac_start = np.searchsorted(frac_ind, np.arange(len(self.fractures) + 1))
+
         polygons = []
         line_in_frac = []
         for fi, _ in enumerate(self.fractures):
-            ei = []
-            ei_bound = []
-            # Find the edges of this fracture, add to either internal or external
-            # fracture list
-            for i, e in enumerate(zip(edges_2_frac, is_boundary_edge)):
-                # Check that the boundary information matches the fractures
-                assert e[0].size == e[1].size
-                hit = np.where(e[0] == fi)[0]
-                if hit.size == 1:
-                    if e[1][hit]:
-                        ei_bound.append(i)
-                    else:
-                        ei.append(i)
-                elif hit.size > 1:
-                    raise ValueError("Non-unique fracture edge relation")
-                else:
-                    continue
+            loc = slice(frac_start[fi], frac_start[fi + 1])
+            ei_bound = edge_ind[loc][on_boundary[loc]]
+            ei = edge_ind[loc][np.logical_not(on_boundary[loc])].tolist()
 
             poly, _ = sort_points.sort_point_pairs(edges[:2, ei_bound])
             polygons.append(poly)
@@ -886,10 +907,11 @@ class FractureNetwork3d(object):
         logger.info("Compile list of points and edges")
         start_time = time.time()
 
-        # Field for all points in the fracture description
-        all_p = np.empty((3, 0))
-        # All edges, either as fracture boundary, or fracture intersection
-        edges = np.empty((2, 0))
+        # Points in the fracture description, and edges, either as fracture boundary
+        # or fracture intersection. The arrays are collected in lists and stacked
+        # below.
+        all_p_list: list[np.ndarray] = [np.empty((3, 0))]
+        edges_list: list[np.ndarray] = [np.empty((2, 0))]
         # For each edge, a list of all fractures pointing to the edge.
         edges_2_frac = []
 
@@ -899,19 +921,23 @@ class FractureNetwork3d(object):
 
         # First loop over all fractures. All edges are assumed to be new; we will
         # deal with coinciding points later.
+        num_p = 0
         for fi, frac in enumerate(self.fractures):
-            num_p = all_p.shape[1]
             num_p_loc = frac.pts.shape[1]
-            all_p = np.hstack((all_p, frac.pts))
+            all_p_list.append(frac.pts)
 
             loc_e = num_p + np.vstack(
                 (np.arange(num_p_loc), (np.arange(num_p_loc) + 1) % num_p_loc)
             )
-            edges = np.hstack((edges, loc_e))
+            edges_list.append(loc_e)
+            num_p += num_p_loc
             for i in range(num_p_loc):
                 edges_2_frac.append([fi])
                 is_boundary_edge.append([True])
 
+        all_p = np.hstack(all_p_list)
+        edges = np.hstack(edges_list)
+
         # Next, add points relating to the intersections between fractures. Since the
         # intersections are already defined as numpy arrays, this is relatively
         # straightforward.
@@ -1145,6 +1171,30 @@ class FractureNetwork3d(object):
         logger.info("Remove edge intersections")
         start_time = time.time()
 
+        # Edges are not deleted while looping over the fractures, as this would change
+        # the indices of the remaining edges. Instead, replaced edges are marked as
+        # inactive, and new edges and points are added at the end of arrays which are
+        # grown in chunks. Together with a map from fractures to their edges, this
+        # avoids operations on the full edge and point arrays for each fracture.
+        edges = edges.astype(int)
+        num_edges = edges.shape[1]
+        num_p = all_p.shape[1]
+        is_active_edge = np.ones(num_edges, dtype=bool)
+
+        # For each fracture, the edges pointing to the fracture, with repetitions if
+        # the fracture occurs several times for an edge. Inactive edges are removed
+        # when the fracture is processed.
+        frac_2_edges: list[list[int]] = [[] for _ in self.fractures]
+        for ei, e2f in enumerate(edges_2_frac):
+            for fi in e2f:
+                frac_2_edges[fi].append(ei)
+
+        # Search tree for the points, used to identify coinciding points. Points added
+        # after the construction of the tree are searched separately, the tree is
+        # rebuilt when these become numerous.
+        point_tree = KDTree(all_p.T)
+        num_p_in_tree = num_p
+
         # The algorithm loops over all fractures, pulls out edges associated with the
         # fracture, project to the local 2D plane, and look for intersections there (
         # direct search in 3D may also work, but this was a simple option). When
@@ -1152,19 +1202,9 @@ class FractureNetwork3d(object):
         for fi in range(len(self.fractures)):
             logger.debug("Remove intersections from fracture %i", fi)
 
-            # Identify the edges associated with this fracture It would have been
-            # more convenient to use an inverse relationship frac_2_edge here,
-            # but that would have made the update for new edges (towards the end of
-            # this loop) more cumbersome.
-
-            # frac_2_edge is a list of arrays of varying size; we need to find
-            # occurrences of fi within those lists. Looping is slow, so we expand to
-            # a standard list (hstack below), and use rldecode to make a mapping from
-            # the expanded list back to the original nested list.
-            frac_ind_expanded = pp.matrix_operations.rldecode(
-                np.arange(len(edges_2_frac)), np.array([e.size for e in edges_2_frac])
-            )
-            edges_loc_ind = frac_ind_expanded[np.hstack(edges_2_frac) == fi]
+            # Identify the edges associated with this fracture, sorted by their index.
+            frac_2_edges[fi] = [ei for ei in frac_2_edges[fi] if is_active_edge[ei]]
+            edges_loc_ind = np.sort(np.array(frac_2_edges[fi], dtype=int))
             edges_loc = np.vstack((edges[:, edges_loc_ind], edges_loc_ind))
 
             p_ind_loc = np.unique(edges_loc[:2])
@@ -1202,28 +1242,47 @@ class FractureNetwork3d(object):
             # not, we would need to renumber all global edges).
 
             # Global index of added points
-            ind_p_add = all_p.shape[1] + np.arange(num_p_add)
+            ind_p_add = num_p + np.arange(num_p_add)
             # Global index of local points (new and added)
             p_ind_exp = np.hstack((p_ind_loc, ind_p_add))
 
             # Add the new points towards the end of the list.
-            all_p = np.hstack((all_p, p_add_3d))
-
-            new_all_p, _, ia = setmembership.uniquify_point_set(all_p, self.tol)
+            all_p = _append_columns(all_p, num_p, p_add_3d)
+            num_p += num_p_add
 
             # Handle case where the new point is already represented in the global
             # list of points.
-            if new_all_p.shape[1] < all_p.shape[1]:
-                all_p = new_all_p
-                p_ind_exp = ia[p_ind_exp]
+            if num_p_add > 0:
+                kept, old_2_new = self._uniquify_added_points(
+                    all_p[:, :num_p], ind_p_add, point_tree, num_p_in_tree
+                )
+                tree_is_valid = True
+                if kept.size < num_p:
+                    # Points in the search tree are only removed in rare cases. The
+                    # tree is then no longer valid.
+                    tree_is_valid = np.array_equal(
+                        kept[:num_p_in_tree], np.arange(num_p_in_tree)
+                    )
+                    all_p = all_p[:, kept]
+                    num_p = kept.size
+                    p_ind_exp = old_2_new[p_ind_exp]
+                # Rebuild the search tree if many points were added since it was built.
+                if not tree_is_valid or num_p - num_p_in_tree > max(
+                    num_p_in_tree, 1000
+                ):
+                    point_tree = KDTree(all_p[:, :num_p].T)
+                    num_p_in_tree = num_p
 
             # The ordering of the global edge list bears no significance. We
-            # therefore plan to delete all edges (new and old), and add new ones.
+            # therefore plan to deactivate all edges (new and old), and add new ones.
 
             # First add new edges.
             # All local edges in terms of global point indices
             edges_new_glob = p_ind_exp[edges_new[:2]]
-            edges = np.hstack((edges, edges_new_glob))
+            edges = _append_columns(edges, num_edges, edges_new_glob)
+            is_active_edge = _append_columns(
+                is_active_edge, num_edges, np.ones(edges_new.shape[1], dtype=bool)
+            )
 
             # Global indices of the local edges
             edges_loc_ind = np.unique(edges_loc_ind)
@@ -1266,18 +1325,22 @@ class FractureNetwork3d(object):
                 # and edges.
                 edges_2_frac.append(e2f)
                 is_boundary_edge.append(ib)
+                for fj in e2f:
+                    frac_2_edges[fj].append(num_edges + ei)
 
-            # Finally, purge the old edges
-            edges = np.delete(edges, edges_loc_ind, axis=1)
+            num_edges += edges_new.shape[1]
 
-            # We cannot delete more than one list element at a time. Delete by index
-            # in decreasing order, so that we do not disturb the index map.
-            edges_loc_ind.sort()
-            for ei in edges_loc_ind[::-1]:
-                del edges_2_frac[ei]
-                del is_boundary_edge[ei]
+            # Finally, deactivate the old edges
+            is_active_edge[edges_loc_ind] = False
             # And we are done with this fracture. On to the next one.
 
+        # Purge the inactive edges.
+        active_edges = np.flatnonzero(is_active_edge[:num_edges])
+        all_p = all_p[:, :num_p]
+        edges = edges[:, active_edges]
+        edges_2_frac = [edges_2_frac[ei] for ei in active_edges]
+        is_boundary_edge = [is_boundary_edge[ei] for ei in active_edges]
+
         logger.info(
             "Done with intersection removal. Elapsed time %.5f",
             time.time() - start_time,
@@ -1289,6 +1352,67 @@ class FractureNetwork3d(object):
             all_p, edges, edges_2_frac, is_boundary_edge
         )
 
+    def _uniquify_added_points(
+        self,
+        all_p: np.ndarray,
+        ind_p_add: np.ndarray,
+        point_tree: KDTree,
+        num_p_in_tree: int,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Uniquify a point set, where only recently added points may coincide with
+        other points.
+
+        The result is the same as from
+        :func:`~porepy.utils.setmembership.uniquify_point_set` applied to all points,
+        but only the added points and the points close to them are processed.
+
+        Parameters:
+            all_p: ``shape=(3, num_points)``
+
+                Coordinates of all points. The points which are not added are unique.
+            ind_p_add: Indices of the added points.
+            point_tree: Search tree for the first points of ``all_p``.
+            num_p_in_tree: Number of points in the search tree.
+
+        Returns:
+            Tuple with 2 elements.
+
+            :obj:`numpy.ndarray`:
+
+                Indices of the points which are preserved.
+
+            :obj:`numpy.ndarray`:
+
+                Index of the representation of all points in the reduced point set.
+
+        """
+        num_p = all_p.shape[1]
+        p_add = all_p[:, ind_p_add]
+
+        # Points which may coincide with an added point: Close points in the search
+        # tree, and close points among those added after the tree was built.
+        close = point_tree.query_ball_point(p_add.T, 2 * self.tol)
+        candidates = [np.empty(0, dtype=int), ind_p_add]
+        candidates += [np.asarray(c, dtype=int) for c in close]
+        recent = np.setdiff1d(np.arange(num_p_in_tree, num_p), ind_p_add)
+        if recent.size > 0:
+            dist = np.linalg.norm(
+                all_p[:, recent, np.newaxis] - p_add[:, np.newaxis], axis=0
+            )
+            candidates.append(recent[np.any(dist <= 2 * self.tol, axis=1)])
+        candidates_ind = np.unique(np.hstack(candidates))
+
+        # Uniquify the candidate points. Since the indices are sorted, the
+        # representatives are chosen as for the full point set.
+        _, ia, ib = setmembership.uniquify_point_set(all_p[:, candidates_ind], self.tol)
+        removed = np.setdiff1d(candidates_ind, candidates_ind[ia])
+        kept = np.setdiff1d(np.arange(num_p), removed)
+
+        old_2_new = np.full(num_p, -1, dtype=int)
+        old_2_new[kept] = np.arange(kept.size)
+        old_2_new[candidates_ind] = old_2_new[candidates_ind[ia[ib]]]
+        return kept, old_2_new
+
     def fractures_of_points(self, pts: np.ndarray) -> list[np.ndarray]:
         """For a given point, find all fractures that refer to it.
 
@@ -2670,7 +2794,9 @@ class FractureNetwork3d(object):
             (self.intersections["second"], second)  # type: ignore
         )
 
-        if start.size < 4:
+        # A single intersection may be given as 1d arrays. Arrays with no columns are
+        # left as they are, to preserve the shape (3, 0) if there are no intersections.
+        if start.ndim == 1:
             start = start.reshape((-1, 1))
             end = end.reshape((-1, 1))
 
@@ -2928,3 +3054,27 @@ class FractureNetwork3d(object):
                 ip = np.append(ip, tmp_p[:2], axis=1)
 
         return p_2d, ip, other_frac, rot, cp
+
+
+def _append_columns(array: np.ndarray, num_columns: int, new: np.ndarray) -> np.ndarray:
+    """Add columns after the first columns of an array, which is grown in chunks.
+
+    Parameters:
+        array: Array, of which the first ``num_columns`` columns (entries, for a 1d
+            array) are in use.
+        num_columns: Number of columns in use.
+        new: Columns to be added.
+
+    Returns:
+        An array with the new columns placed after the used ones. This is the input
+        array if it had room for the new columns.
+
+    """
+    num_new = new.shape[-1]
+    if num_columns + num_new > array.shape[-1]:
+        capacity = max(num_columns + num_new, 2 * num_columns)
+        grown = np.empty(array.shape[:-1] + (capacity,), dtype=array.dtype)
+        grown[..., :num_columns] = array[..., :num_columns]
+        array = grown
+    array[..., num_columns : num_columns + num_new] = new
+    return array
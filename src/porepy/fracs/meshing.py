@@ -53,40 +53,59 @@ def subdomains_to_mdg(
 
     """
 
+    # Wall-clock time of each stage of the construction, logged at the end.
+    stage_times: dict[str, float] = {}
+
     # Tag tip faces
+    logger.info("Tag faces")
+    tm = time.time()
     check_highest_dim = kwargs.get("check_highest_dim", False)
     _tag_faces(subdomains, check_highest_dim)
-    logger.info("Assemble mdg")
-    tm_mdg = time.time()
+    stage_times["tag faces"] = time.time() - tm
+    logger.info("Done. Elapsed time " + str(stage_times["tag faces"]))
 
+    logger.info("Assemble mdg")
+    tm = time.time()
     # Assemble the list of subdomain grids into a mixed-dimensional grid. This will
     # also identify pairs of neighboring grids (one dimension apart).
     mdg, sd_pair_to_face_cell_map = _assemble_mdg(subdomains)
-    logger.info("Done. Elapsed time " + str(time.time() - tm_mdg))
+    stage_times["assemble mdg"] = time.time() - tm
+    logger.info("Done. Elapsed time " + str(stage_times["assemble mdg"]))
 
     logger.info("Compute geometry")
-    tm_geom = time.time()
+    tm = time.time()
     mdg.compute_geometry()
+    stage_times["compute geometry"] = time.time() - tm
+    logger.info("Done. Elapsed time " + str(stage_times["compute geometry"]))
 
-    logger.info("Done. Elapsed time " + str(time.time() - tm_geom))
     logger.info("Split fractures")
-    tm_split = time.time()
-
+    tm = time.time()
     # Split faces and nodes in the grids of various dimensions
     mdg, node_pairs = split_grid.split_fractures(
         mdg, sd_pair_to_face_cell_map, **kwargs
     )
-    logger.info("Done. Elapsed time " + str(time.time() - tm_split))
+    stage_times["split fractures"] = time.time() - tm
+    logger.info("Done. Elapsed time " + str(stage_times["split fractures"]))
 
     # Now that neighboring subdomains are identified, faces and nodes are split,
     # we are ready to create mortar grids on the interface between subdomains. These
     # will be added to the mixed-dimensional grid.
+    logger.info("Create interfaces")
+    tm = time.time()
     create_interfaces(mdg, node_pairs)
+    stage_times["create interfaces"] = time.time() - tm
+    logger.info("Done. Elapsed time " + str(stage_times["create interfaces"]))
 
     # Set projections to the boundary grids (this must be done after having
     # split the fracture faces, or else the projections will have the wrong dimension).
+    tm = time.time()
     mdg.set_boundary_grid_projections()
+    stage_times["boundary projections"] = time.time() - tm
 
+    logger.info(
+        "Time per stage of the mixed-dimensional grid construction: "
+        + ", ".join(f"{stage} {t:.3g} s" for stage, t in stage_times.items())
+    )
     if time_tot is not None:
         logger.info(
             "Mesh construction completed. Total time " + str(time.time() - time_tot)
@@ -433,6 +452,7 @@ def _assemble_mdg(
         # faces of the higher-dimensional grid. If this face-cell intersection is
         # non-empty, there is a coupling will be made between the higher and
         # lower-dimensional grid, and the face-to-cell relation will be saved.
+        point_nodes: Optional[np.ndarray] = None
         for hsd in subdomains[dim]:
             # We have to specify the number of nodes per face to generate a matrix of
             # the nodes of each face.
@@ -475,13 +495,15 @@ def _assemble_mdg(
                 cell_node_offsets = np.cumsum(num_cn)
             else:
                 # 0d grid is much easier, although getting hold of the single point
-                # index is a bit technical
-                cn_all = np.array(
-                    [
-                        np.atleast_1d(lg.global_point_ind)[0]
-                        for lg in subdomains[dim + 1]
-                    ]
-                )
+                # index is a bit technical. The points are the same for all hsd.
+                if point_nodes is None:
+                    point_nodes = np.array(
+                        [
+                            np.atleast_1d(lg.global_point_ind)[0]
+                            for lg in subdomains[dim + 1]
+                        ]
+                    )
+                cn_all = point_nodes
                 cell_node_offsets = np.arange(cn_all.size + 1)
                 # Ensure that face-node relation is 1d in this case
                 fn = fn.ravel()
@@ -509,16 +531,20 @@ def _assemble_mdg(
                 tmp[is_mem] = cell_2_face
                 cell_2_face = tmp
 
-            # Loop over all lower-dimensional grids; find the cells that had matching
-            # faces in hg (should be either none or all the cells).
-            for counter, lsd in enumerate(subdomains[dim + 1]):
+            # Number of matching cells for each lower-dimensional grid. Computed for
+            # all grids at once, since there may be many lower-dimensional grids
+            # without any match (e.g., intersection points of other fractures).
+            num_mem = np.cumsum(np.hstack((0, is_mem)))
+            num_mem = num_mem[cell_node_offsets[1:]] - num_mem[cell_node_offsets[:-1]]
+
+            # Loop over all lower-dimensional grids with matches; find the cells that
+            # had matching faces in hg (should be either none or all the cells).
+            for counter in np.flatnonzero(num_mem):
+                lsd = subdomains[dim + 1][counter]
                 # Indices of this grid in is_mem and cell_2_face (thanks to the above
                 # expansion, involving tmp)
                 ind = slice(cell_node_offsets[counter], cell_node_offsets[counter + 1])
                 loc_mem = is_mem[ind]
-                # If no match, continue
-                if np.sum(loc_mem) == 0:
-                    continue
                 # If some match, all should be matches. If this goes wrong, there is
                 # likely something wrong with the mesh.
                 assert np.all(loc_mem)
@@ -116,7 +116,7 @@ def create_2d_grids(
         tri_tags = cell_info["triangle"]
 
         # Loop over all gmsh tags associated with triangle grids
-        for pn_ind in np.unique(tri_tags):
+        for pn_ind, loc_cells in zip(*_cells_per_tag(tri_tags)):
             # Split the physical name into a category and a number - which will
             # become the fracture number
             pn = phys_names[pn_ind]
@@ -130,7 +130,6 @@ def create_2d_grids(
                 continue
 
             # Cells of this surface
-            loc_cells = np.where(tri_tags == pn_ind)[0]
             loc_tri_cells = tri_cells[loc_cells, :].astype(int)
 
             # Find unique points, and a mapping from local to global points
@@ -197,11 +196,11 @@ def create_2d_grids(
         # and after we change for the correct faces. The new tag name become the
         # lower version of what gmsh gives in the cell_info["line"]. The map
         # phys_names recover the literal name.
-        for tag in np.unique(cell_info["line"]):
+        for tag, tag_cells in zip(*_cells_per_tag(cell_info["line"])):
             tag_name = phys_names[tag].lower() + "_faces"
             g_2d.tags[tag_name] = np.zeros(g_2d.num_faces, dtype=bool)
             # Add correct tag
-            faces = line2face[cell_info["line"] == tag]
+            faces = line2face[tag_cells]
             g_2d.tags[tag_name][faces] = True
 
         # Create mapping to global numbering (will be a unit mapping, but is crucial
@@ -297,12 +296,11 @@ def create_1d_grids(
     gmsh_tip_num = []
     tip_pts = np.empty(0)
 
-    for i, pn_ind in enumerate(np.unique(line_tags)):
+    for i, (pn_ind, loc_line_cell_num) in enumerate(zip(*_cells_per_tag(line_tags))):
         # Index of the final underscore in the physical name. Chars before this will
         # identify the line type, the one after will give index
         pn = phys_names[pn_ind]
         offset_index = pn.rfind("_")
-        loc_line_cell_num = np.where(line_tags == pn_ind)[0]
         loc_line_pts = line_cells[loc_line_cell_num, :]
 
         assert loc_line_pts.size > 1
@@ -465,3 +463,27 @@ def create_embedded_line_grid(
     # Add mapping to global point numbers
     g.global_point_ind = glob_id[sort_ind]
     return g
+
+
+def _cells_per_tag(cell_tags: np.ndarray) -> tuple[np.ndarray, list[np.ndarray]]:
+    """Group the cells of a gmsh tesselation according to their physical tags.
+
+    Parameters:
+        cell_tags: Physical tag of each cell.
+
+    Returns:
+        A tuple with two elements.
+
+            :obj:`~numpy.ndarray`:
+                The unique tags, sorted.
+
+            :obj:`list`:
+                For each unique tag, the indices of the cells with this tag, in
+                increasing order. This is equivalent to
+                ``np.where(cell_tags == tag)[0]``, but avoids a pass over all cells
+                per tag.
+
+    """
+    order = np.argsort(cell_tags, kind="stable")
+    unique_tags, start = np.unique(cell_tags[order], return_index=True)
+    return unique_tags, np.split(order, start[1:])
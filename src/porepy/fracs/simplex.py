@@ -326,7 +326,9 @@ def _read_gmsh_file(
             ``*.geo``-file.
 
     """
+    tm = time.time()
     mesh = meshio.read(file_name)
+    logger.info("Read gmsh file. Elapsed time " + str(time.time() - tm))
 
     pts = mesh.points
     cells = mesh.cells
@@ -3,9 +3,9 @@ from __future__ import annotations
 
 from typing import Optional
 
-import networkx as nx
 import numpy as np
 from scipy import sparse as sps
+from scipy.sparse import csgraph
 
 import porepy as pp
 from porepy.utils import setmembership, tags
@@ -89,13 +89,15 @@ def split_fractures(
         # cells. At a X-intersection we split the node into four, while at the
         # fracture boundary it is not split.
 
-        gl_2_gh_nodes = []
-        for g in low_dim_neigh:
-            # Enforce 64 bit to comply with ismember_rows. Was np.int32
-            source = np.atleast_2d(g.global_point_ind).astype(np.int64)
-            target = np.atleast_2d(gh.global_point_ind).astype(np.int64)
-            _, mapping = setmembership.ismember_rows(source, target)
-            gl_2_gh_nodes.append(mapping)
+        # The nodes of all lower-dim grids are mapped in one go, to avoid sorting the
+        # nodes of the higher-dim grid once per lower-dim grid.
+        # Enforce 64 bit to comply with ismember_rows. Was np.int32
+        source_list = [np.atleast_1d(g.global_point_ind) for g in low_dim_neigh]
+        source = np.atleast_2d(np.concatenate(source_list)).astype(np.int64)
+        target = np.atleast_2d(gh.global_point_ind).astype(np.int64)
+        _, mapping = setmembership.ismember_rows(source, target)
+        num_nodes = [s.size for s in source_list]
+        gl_2_gh_nodes = np.split(mapping, np.cumsum(num_nodes)[:-1])
 
         split_nodes(gh, low_dim_neigh, gl_2_gh_nodes, offset)
 
@@ -134,30 +136,164 @@ def split_faces(gh: pp.Grid, face_cells: list[sps.spmatrix]) -> list[sps.spmatri
 
     """
     gh.frac_pairs = np.zeros((2, 0), dtype=int)
-    for i in range(len(face_cells)):
-        # We first duplicate faces along tagged faces. The duplicate faces will share
-        # the same nodes as the original faces, however, the new faces are not yet
-        # added to the cell_faces map (to save computation).
-        face_id = duplicate_faces(gh, face_cells[i])
-        face_cells = _update_face_cells(face_cells, face_id, i)
+
+    # The fractures are treated one by one, with the same result as if the faces were
+    # duplicated and the cell-face relation updated for each fracture in turn (see
+    # split_specific_faces). However, the loop only identifies the faces to be split
+    # and the cells on the two sides of each fracture. The face arrays of the grid,
+    # the cell-face relation and the face-cell relations are extended once afterwards,
+    # since extending them for each fracture has a cost which is quadratic in the
+    # number of fractures.
+    cell_faces = gh.cell_faces.tocsr()
+    is_tagged = tags.all_face_tags(gh.tags)
+    num_faces = gh.num_faces
+
+    # Index of the fracture and faces to be duplicated, for all fractures with such
+    # faces. This includes fractures on the domain boundary, which are not split.
+    duplicated: list[tuple[int, np.ndarray]] = []
+    # Indices (in duplicated) of the fractures which are split.
+    split_ind: list[int] = []
+    # The cell-face relation of the duplicated faces, which are attached to the cells
+    # on the left side of the fractures, and of the original faces, which are
+    # attached to the cells on the right side.
+    left: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+    right: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+    # Whether the last fracture with faces to be duplicated is on the domain boundary.
+    on_boundary = False
+
+    for i, f_c in enumerate(face_cells):
+        frac_id = np.unique(f_c.nonzero()[1])
+        # Faces already tagged as fracture, tip or domain boundary are tagged as
+        # fracture faces, but they are not split.
+        rem = is_tagged[frac_id]
+        gh.tags["fracture_faces"][frac_id] = True
+        gh.tags["tip_faces"][frac_id] = False
+        is_tagged[frac_id] = True
+
+        face_id = frac_id[~rem]
         if face_id.size == 0:
             continue
+        duplicated.append((i, face_id))
+
+        # Find the cells attached to the faces. These are divided into the cells on
+        # the right and left side of the fracture. We assume that all fractures are
+        # flat surfaces and pick the normal of the first face as a normal for the
+        # whole fracture.
+        start = cell_faces.indptr[face_id]
+        end = cell_faces.indptr[face_id + 1]
+        ind = mcolon(start, end)
+        row = np.repeat(np.arange(face_id.size), end - start)
+        col = cell_faces.indices[ind]
+        data = cell_faces.data[ind]
+        nonzero = data != 0
+        row, col, data = row[nonzero], col[nonzero], data[nonzero]
 
-        # We now set the cell_faces map based on which side of the fractures the
-        # cells lie. We assume that all fractures are flat surfaces and pick the
-        # normal of the first face as a normal for the whole fracture.
         n = np.reshape(gh.face_normals[:, face_id[0]], (3, 1))
         n = n / np.linalg.norm(n)
         x0 = np.reshape(gh.face_centers[:, face_id[0]], (3, 1))
-        flag = update_cell_connectivity(gh, face_id, n, x0)
+        left_cell = pp.half_space.point_inside_half_space_intersection(
+            n, x0, gh.cell_centers[:, col]
+        )
 
-        if flag == 0:
-            # if flag== 0 we added left and right faces (if it is -1, no faces was
-            # added, so we don't have left and right face pairs). We now add the new
-            # faces to the frac_pair array.
-            left = face_id
-            right = np.arange(gh.num_faces - face_id.size, gh.num_faces)
-            gh.frac_pairs = np.hstack((gh.frac_pairs, np.vstack((left, right))))
+        if np.all(left_cell) or not np.any(left_cell):
+            # Fracture is on boundary of domain. The faces are not split.
+            on_boundary = True
+            continue
+        on_boundary = False
+
+        # Assume that fracture is either on boundary (above case) or completely inside
+        # domain. Check that each face added two cells:
+        if sum(left_cell) * 2 != left_cell.size:
+            raise ValueError(
+                "Fractures must either be" "on boundary or completely inside domain"
+            )
+
+        # The duplicates are added to the end of the face arrays, and attached to the
+        # cells on the left side. The original faces keep the cells on the right
+        # side. We do not change the sign of the cell-face relation since we did not
+        # flip the normals.
+        new_face_id = np.arange(num_faces, num_faces + face_id.size)
+        left.append((new_face_id[row[left_cell]], col[left_cell], data[left_cell]))
+        right.append((face_id[row[~left_cell]], col[~left_cell], data[~left_cell]))
+        gh.frac_pairs = np.hstack((gh.frac_pairs, np.vstack((face_id, new_face_id))))
+        split_ind.append(len(duplicated) - 1)
+        num_faces += face_id.size
+
+    if len(duplicated) == 0:
+        return face_cells
+
+    # Add the duplicated faces, with the same nodes and geometry as the original
+    # faces. The face tags are inherited from the original faces. For fractures on
+    # the boundary, the duplicates are removed again, with the exception of the
+    # non-standard face tags.
+    all_face_id = np.concatenate([face_id for _, face_id in duplicated])
+    split_face_id = np.concatenate(
+        [np.zeros(0, dtype=int)] + [duplicated[k][1] for k in split_ind]
+    )
+    if split_face_id.size > 0:
+        _append_duplicate_faces(gh, split_face_id)
+    for key in gh.tags:
+        if key in tags.standard_face_tags():
+            if split_face_id.size > 0:
+                gh.tags[key] = np.append(gh.tags[key], gh.tags[key][split_face_id])
+        elif key.endswith("_faces"):
+            gh.tags[key] = np.append(gh.tags[key], gh.tags[key][all_face_id])
+        else:
+            gh.tags[key] = np.append(gh.tags[key], [])
+
+    # Update the cell-face relation. The rows of the split faces are replaced by the
+    # cells on the right side of the fractures, and the rows of the duplicates are
+    # added to the end of the matrix.
+    if len(split_ind) > 0:
+        row = np.repeat(np.arange(cell_faces.shape[0]), np.diff(cell_faces.indptr))
+        keep = np.ones(cell_faces.shape[0], dtype=bool)
+        keep[split_face_id] = False
+        keep = keep[row]
+        rows, cols, data = zip(
+            (row[keep], cell_faces.indices[keep], cell_faces.data[keep]), *right, *left
+        )
+        gh.cell_faces = sps.csc_matrix(
+            (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(num_faces, cell_faces.shape[1]),
+        )
+        if on_boundary:
+            gh.cell_faces = gh.cell_faces.tocsr()
+    else:
+        gh.cell_faces = cell_faces
+
+    # The duplications of faces associated with lower-dim grid i should also be
+    # associated with grid i. For the other lower-dim grids we just add empty columns
+    # to conserve the right matrix dimensions. Note that columns are also added for
+    # fractures on the boundary.
+    num_duplicated = np.cumsum([0] + [face_id.size for _, face_id in duplicated])
+    for k, (i, face_id) in enumerate(duplicated):
+        f_c = face_cells[i]
+        assert f_c.getformat() == "csc"
+        f_c_sliced = pp.matrix_operations.slice_mat(f_c, face_id)
+        last = f_c.indptr[-1]
+        f_c.indptr = np.concatenate(
+            (
+                f_c.indptr,
+                np.full(num_duplicated[k], last, dtype=f_c.indptr.dtype),
+                f_c_sliced.indptr[1:] + last,
+                np.full(
+                    num_duplicated[-1] - num_duplicated[k + 1],
+                    last + f_c_sliced.indptr[-1],
+                    dtype=f_c.indptr.dtype,
+                ),
+            )
+        )
+        f_c.indices = np.append(f_c.indices, f_c_sliced.indices)
+        f_c.data = np.append(f_c.data, f_c_sliced.data)
+    targets = {i for i, _ in duplicated}
+    for j, f_c in enumerate(face_cells):
+        assert f_c.getformat() == "csc"
+        if j not in targets:
+            f_c.indptr = np.append(
+                f_c.indptr,
+                np.full(num_duplicated[-1], f_c.indptr[-1], dtype=f_c.indptr.dtype),
+            )
+        f_c._shape = (f_c._shape[0], f_c._shape[1] + num_duplicated[-1])
 
     return face_cells
 
@@ -293,10 +429,9 @@ def split_nodes(
 
     """
     # We find the higher-dim node indices of all lower-dim nodes
-    nodes = np.array([], dtype=int)
-    for i in range(len(sd_secondary)):
-        nodes = np.append(nodes, primary_to_secondary_nodes[i])
-    nodes = np.unique(nodes)
+    nodes = np.unique(
+        np.concatenate([np.array([], dtype=int)] + list(primary_to_secondary_nodes))
+    )
 
     # Each of these nodes are duplicated depending on the cell- topology of the
     # higher-dim around each node. For an X-intersection we get four duplications,
@@ -361,6 +496,33 @@ def _duplicate_specific_faces(sd_primary: pp.Grid, frac_id: np.ndarray) -> np.nd
     if frac_id.size == 0:
         return frac_id
 
+    _append_duplicate_faces(sd_primary, frac_id)
+
+    # Not sure if this still does the correct thing. Might have to send in a logical
+    # array instead of frac_id.
+    sd_primary.tags["fracture_faces"][frac_id] = True
+    sd_primary.tags["tip_faces"][frac_id] = False
+    update_fields = sd_primary.tags.keys()
+    update_values: list[list[np.ndarray]] = [[]] * len(update_fields)
+    for i, key in enumerate(update_fields):
+        # faces related tags are doubled and the value is inherit from the original
+        if key.endswith("_faces"):
+            update_values[i] = sd_primary.tags[key][frac_id]
+    tags.append_tags(sd_primary.tags, update_fields, update_values)
+
+    return frac_id
+
+
+def _append_duplicate_faces(sd_primary: pp.Grid, frac_id: np.ndarray) -> None:
+    """Append copies of faces to the face-node relation and the face geometry.
+
+    The tags and the cell-face relation of the grid are not updated.
+
+    Parameters:
+        sd_primary: The grid containing the faces.
+        frac_id: Indices of the faces to be duplicated.
+
+    """
     # Expand the face-node relation to include duplicated nodes Do this by directly
     # manipulating the CSC-format of the matrix Nodes of the target faces
     node_start = sd_primary.face_nodes.indptr[frac_id]
@@ -402,20 +564,6 @@ def _duplicate_specific_faces(sd_primary: pp.Grid, frac_id: np.ndarray) -> np.nd
         (sd_primary.face_centers, sd_primary.face_centers[:, frac_id])
     )
 
-    # Not sure if this still does the correct thing. Might have to send in a logical
-    # array instead of frac_id.
-    sd_primary.tags["fracture_faces"][frac_id] = True
-    sd_primary.tags["tip_faces"][frac_id] = False
-    update_fields = sd_primary.tags.keys()
-    update_values: list[list[np.ndarray]] = [[]] * len(update_fields)
-    for i, key in enumerate(update_fields):
-        # faces related tags are doubled and the value is inherit from the original
-        if key.endswith("_faces"):
-            update_values[i] = sd_primary.tags[key][frac_id]
-    tags.append_tags(sd_primary.tags, update_fields, update_values)
-
-    return frac_id
-
 
 def _update_face_cells(
     face_cells: list[sps.spmatrix],
@@ -783,24 +931,18 @@ def duplicate_nodes(g: pp.Grid, nodes: np.ndarray, offset: float) -> int:
     # Now the connection matrix only contains connection between cells that share a
     # node to be duplicated. These can again be split into subclusters, that have
     # lost their connections due to the previous splitting of faces. Identify these
-    # subclusters by the use of networkx
-    graph = nx.Graph(c2c_loc)
-    subclusters = [sorted(list(c)) for c in nx.connected_components(graph)]
-
-    # For each subcluster, find its associated node (to be split)
-    node_of_subcluster = []
-    search_start = 0
-    for comp in subclusters:
-        # Find the first element with index one too much, then subtract one. See the
-        # above loop (col_group_end) for further comments. Also note we could have
-        # used any element in comp.
-        ind = search_start + np.argmax(block_start[search_start:] > comp[0]) - 1
-        # Store this node index
-        node_of_subcluster.append(ind)
-        # Start of next search interval.
-        search_start = ind  # type: ignore[assignment]
-
-    node_of_component = np.array(node_of_subcluster)
+    # subclusters as the connected components of the connection graph. The
+    # components are numbered in the order of their first cell, and the cells of
+    # each subcluster are sorted.
+    _, component = csgraph.connected_components(c2c_loc, directed=False)
+    subclusters = np.split(
+        np.argsort(component, kind="stable"), np.cumsum(np.bincount(component))[:-1]
+    )
+
+    # For each subcluster, find its associated node (to be split), that is, the
+    # block containing the first cell of the subcluster.
+    first_cell = np.array([comp[0] for comp in subclusters])
+    node_of_component = np.searchsorted(block_start, first_cell, side="right") - 1
 
     # Step 3
     # Modify the face-node relation by adjusting the node indices (field indices in
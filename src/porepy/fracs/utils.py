@@ -5,6 +5,7 @@ from __future__ import annotations
 import logging
 
 import numpy as np
+from scipy.spatial import KDTree
 
 import porepy as pp
 
@@ -92,7 +93,7 @@ def linefractures_to_pts_edges(
     """Convert a list of line fractures into arrays of the corresponding points and
     edges.
 
-    The function loops over the points of the individual fractures and checks if the
+    The points of the individual fractures are checked, in order, for whether the
     point is the start/end point (up to the given tolerance) of a previously checked
     fracture. If yes, the edge index links to the existing point. If no, the point is
     added to the points array.
@@ -128,45 +129,56 @@ def linefractures_to_pts_edges(
         When an empty list of fractures is passed, both arrays have shape ``(2, 0)``.
 
     """
-    pts_list: list[np.ndarray] = []
-    edges_list: list[np.ndarray] = []
-
-    # Iterate through the fractures and list all start-/endpoints and the corresponding
-    # edge indices.
-    for frac in fractures:
-        pt_indices: list[int] = []
-        for point in frac.points():
-            # Check if the point is already start-/endpoint of another fracture.
-            compare_points = [
-                np.allclose(point.squeeze(), x, atol=tol) for x in pts_list
-            ]
-            if not any(compare_points):
-                pts_list.append(point.squeeze())
-                pt_indices.append(len(pts_list) - 1)
-            else:
-                pt_indices.append(compare_points.index(True))
-        # Sanity check that two points indices were added.
-        assert len(pt_indices) == 2
-        # Combine with tags of the fracture and store the full edge in a list.
-        edges_list.append(np.concatenate([np.array(pt_indices), frac.tags]))
-
-    # Transform the lists to two ``np.ndarrays`` (``pts`` and ``edges``).
-    if pts_list:
-        # ``np.stack`` requires a nonempty list.
-        pts = np.stack(pts_list, axis=-1)
+    # Sanity check that all fractures have two points.
+    assert all(frac.pts.shape[1] == 2 for frac in fractures)
+
+    # Gather the start-/endpoints of all fractures.
+    if len(fractures) > 0:
+        all_pts = np.hstack([frac.pts for frac in fractures])
     else:
-        pts = np.zeros([2, 0])
+        all_pts = np.zeros([2, 0])
+    num_pts = all_pts.shape[1]
+
+    # For each point, the index of the first point that it is equal to, up to the
+    # tolerance. Points equal to no previous point are added to the points array.
+    first_equal = np.arange(num_pts)
+
+    # Candidates for equal points are found by a search in a KDTree. Equality is
+    # decided by np.allclose, which also has a relative tolerance: Two points can be
+    # equal if their distance in the max norm is less than the absolute tolerance plus
+    # the relative tolerance times the size of the coordinates.
+    if num_pts > 1:
+        radius = 2 * (tol + 1e-5 * np.max(np.abs(all_pts)))
+        pairs = KDTree(all_pts.T).query_pairs(radius, p=np.inf, output_type="ndarray")
+        pairs = pairs[np.lexsort((pairs[:, 0], pairs[:, 1]))]
+        # Loop over the candidate pairs, ordered by the last point of the pair. Thus,
+        # for each point, we know if the previous points are added to the points
+        # array, and the point is linked to the first of these it is equal to.
+        for i, j in pairs:
+            if (
+                first_equal[j] == j
+                and first_equal[i] == i
+                and np.allclose(all_pts[:, j], all_pts[:, i], atol=tol)
+            ):
+                first_equal[j] = i
+
+    is_added = first_equal == np.arange(num_pts)
+    pts = all_pts[:, is_added]
+    # Index of the points in the points array.
+    pt_indices = np.cumsum(is_added)[first_equal] - 1
+
     # Before creating the ``edges`` array, determine the maximum number of tags.
     # -> This determines the shape of the ``edges`` array.
-    max_edge_dim = max((np.shape(edge)[0] for edge in edges_list), default=2)
+    max_edge_dim = max((2 + frac.tags.size for frac in fractures), default=2)
     # Initialize the ``edges`` array with ``-1``. This value indicates that each edge
     # has no tags. Fill in the first two rows with the fracture start-/endpoints and
     # the rest of the rows with tags where they exist. All other tags keep their
     # initial value of ``-1``, which is equal to the tag not existing. This seemingly
     # complicated procedure is done to ensure that the ``edges`` array is not ragged.
-    edges = np.full((max_edge_dim, len(fractures)), -1, dtype=np.int8)
-    for row_index, edge in enumerate(edges_list):
-        edges[: edge.shape[0], row_index] = edge
+    edges = np.full((max_edge_dim, len(fractures)), -1, dtype=int)
+    edges[:2] = pt_indices.reshape((2, -1), order="F")
+    for row_index, frac in enumerate(fractures):
+        edges[2 : 2 + frac.tags.size, row_index] = frac.tags
 
     return pts, edges
 
@@ -593,6 +593,7 @@ def compute_well_rock_matrix_intersections(
     # Construct an ADTree for fast computation.
     tree = pp.adtree.ADTree(2 * sd_max.dim, sd_max.dim)
     tree.from_grid(sd_max, cells)
+    tree_keys = np.asarray(tree.keys, dtype=int)
 
     # Extract the grids of the wells of co-dimension 2.
     well_subdomains: list[pp.Grid] = [
@@ -629,14 +630,18 @@ def compute_well_rock_matrix_intersections(
         # Lists for the cell_cell_map.
         primary_secondary_I, primary_secondary_J, primary_secondary_data = [], [], []
 
+        # Create the boxes for the segments by ordering their start and end, and search
+        # the ad nodes that might intersect them.
+        boxes = np.hstack((np.minimum(start, end).T, np.maximum(start, end).T))
+        seg_adnodes = tree.search_many(boxes)
+
         # Operate on the segments.
         for seg_id, (seg_start, seg_end) in enumerate(zip(start.T, end.T)):
-            # Create the box for the segment by ordering its start and end.
-            box = np.sort(np.vstack((seg_start, seg_end)), axis=0).ravel()
-            # Extract the id of the ad nodes.
-            seg_adnodes = tree.search(pp.adtree.ADTNode("dummy_node", box))
             # Extract the key of the ad nodes which is the cell id.
-            seg_cells = [tree.nodes[n].key for n in seg_adnodes]
+            loc_adnodes = slice(
+                seg_adnodes.indptr[seg_id], seg_adnodes.indptr[seg_id + 1]
+            )
+            seg_cells = tree_keys[seg_adnodes.indices[loc_adnodes]]
             # Loop on all the higher dimensional cells.
             for c in seg_cells:
                 # For the current cell retrieve its faces.
@@ -649,10 +649,19 @@ def snap_points_to_segments(
         else:
             p_start = p_edges[:, edges[0, ei]].reshape((-1, 1))
             p_end = p_edges[:, edges[1, ei]].reshape((-1, 1))
-        d_segment, cp = pp.distances.points_segments(pn, p_start, p_end)
-        hit = np.argwhere(d_segment[:, 0] < tol)
-        for i in hit:
+        # Only points inside the bounding box of the segment, extended by the
+        # tolerance, can be closer to the segment than the tolerance.
+        candidates = np.where(
+            np.all(
+                (pn >= np.minimum(p_start, p_end) - tol)
+                & (pn <= np.maximum(p_start, p_end) + tol),
+                axis=0,
+            )
+        )[0]
+        d_segment, cp = pp.distances.points_segments(pn[:, candidates], p_start, p_end)
+        for ci in np.where(d_segment[:, 0] < tol)[0]:
+            i = candidates[ci]
             if mod_edges and (i == edges[0, ei] or i == edges[1, ei]):
                 continue
-            pn[:, i] = cp[i, 0, :].reshape((-1, 1))
+            pn[:, i] = cp[ci, 0, :]
     return pn
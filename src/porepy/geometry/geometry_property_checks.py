@@ -303,30 +303,17 @@ def point_in_polyhedron(
     if test_points.size < 4:
         test_points = test_points.reshape((-1, 1))
 
+    # Winding number (wn) is a real number. Its absolute value is:
+    # wn = 0 for points outside
+    # wn = 1 for points inside non-convex polyhedron
+    # wn > 1 for points inside overlapping polyhedron
+    # If the given point is on the triangulated surface it is considered outside. To
+    # achieve robustness, checks on the given point are performed for overlapping
+    # vertex, collinearity, and coplanarity, and such points are also considered
+    # outside.
+    wn, degenerate = test_object.winding_numbers(test_points.T)
     is_inside = np.zeros(test_points.shape[1], dtype=bool)
-
-    # Loop over all points being tested, check if they are inside.
-    for pi in range(test_points.shape[1]):
-        try:
-            # Winding number (wn) is a real number. Its absolute value is:
-            # wn = 0 for points outside
-            # wn = 1 for points inside non-convex polyhedron
-            # wn > 1 for points inside overlapping polyhedron
-            is_inside[pi] = np.abs(test_object.winding_number(test_points[:, pi])) > tol
-
-            # If the given point is on the triangulated surface it is considered outside
-            # To achieve robustness, checks on the given point are performed for
-            # overlapping vertex, collinearity, and coplanarity.
-        except ValueError as err:
-            if str(err) in [
-                "Origin point coincides with a vertex",
-                "Origin point is collinear with the vertices",
-                "Origin point is coplanar with the vertices",
-            ]:
-                is_inside[pi] = False
-            else:
-                # If the error is about something else, raise it again.
-                raise err
+    is_inside[~degenerate] = np.abs(wn[~degenerate]) > tol
 
     return is_inside
 
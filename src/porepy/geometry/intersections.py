@@ -477,12 +477,17 @@ def polygons_3d(
 
     # Identify overlapping bounding boxes: First, use a fast method to find overlapping
     # rectangles in the xy-plane.
-    pairs_xy = _identify_overlapping_rectangles(x_min, x_max, y_min, y_max)
-    # Next, find overlapping intervals in the z-directien
-    pairs_z = _identify_overlapping_intervals(z_min, z_max)
-
-    # Finally, do the intersection
-    pairs = _intersect_pairs(pairs_xy, pairs_z)
+    pairs_xy = _identify_overlapping_rectangles(x_min, x_max, y_min, y_max).astype(int)
+    # Next, keep the pairs which also overlap in the z-direction. This is equivalent to
+    # intersecting with all pairs of overlapping intervals in the z-direction, which
+    # are far more numerous.
+    overlap_z = np.logical_and(
+        z_min[pairs_xy[1]] <= z_max[pairs_xy[0]],
+        z_min[pairs_xy[0]] <= z_max[pairs_xy[1]],
+    )
+    pairs = pairs_xy[:, overlap_z]
+    # Sort the columns so that the first row is non-decreasing
+    pairs = pairs[:, np.argsort(pairs[0])]
 
     # Various utility functions
     def center(p):
@@ -557,6 +562,16 @@ def polygons_3d(
     new_pt = []
     new_pt_ind = 0
 
+    # Pre-compute polygon normals to save computational time
+    polygon_normals = [
+        pp.map_geometry.compute_normal(poly, tol=tol).reshape((-1, 1)) for poly in polys
+    ]
+
+    # Discard the pairs where one polygon lies on one side of the plane of the other.
+    # This is also checked in the loop below, but is much faster for all pairs at once.
+    if pairs.size > 0:
+        pairs = pairs[:, _polygons_cross_planes(polys, polygon_normals, pairs)]
+
     # Index of the main fractures, to which the other ones will be compared. Filter out
     # all that are not among the targets.
     start_inds = np.intersect1d(target_poly, pairs)
@@ -564,11 +579,6 @@ def polygons_3d(
     # Store index of pairs of intersecting polygons
     polygon_pairs = []
 
-    # Pre-compute polygon normals to save computational time
-    polygon_normals = [
-        pp.map_geometry.compute_normal(poly, tol=tol).reshape((-1, 1)) for poly in polys
-    ]
-
     # Loop over all fracture pairs (taking more than one simultaneously if an index
     # occurs several times in pairs[0]), and look for intersections
     for di, line_ind in enumerate(start_inds):
@@ -580,9 +590,11 @@ def polygons_3d(
         # The main fracture, from the first row in pairs
         main = line_ind
 
-        # Find the other fracture of all pairs starting with the main one
-        hit = np.where(pairs[0] == main)
-        other = pairs[1, hit][0]
+        # Find the other fracture of all pairs starting with the main one. The pairs
+        # are sorted according to the first row.
+        first_pair = np.searchsorted(pairs[0], main, side="left")
+        last_pair = np.searchsorted(pairs[0], main, side="right")
+        other = pairs[1, first_pair:last_pair]
 
         # Center point and normal vector of the main fracture
         main_center = center(polys[main])
@@ -2195,141 +2207,107 @@ def split_intersecting_segments_2d(
         cmax[hit] += 0.5 * tol
 
     # Identify fractures with overlapping bounding boxes
-    pairs = _identify_overlapping_rectangles(x_min, x_max, y_min, y_max)
-
-    # Identify all fractures that are the first (by index) of a potentially crossing
-    # pair. A better way to group the fractures may be feasible, but this has not been
-    # investigated.
-    start_inds = np.unique(pairs[0])
+    pairs = _identify_overlapping_rectangles(x_min, x_max, y_min, y_max).astype(int)
+    # Process the pairs by the first (by index) fracture of the pair, and for each of
+    # these, by the second fracture.
+    pairs = pairs[:, np.lexsort((pairs[1], pairs[0]))]
+    main, other = pairs
 
     num_lines = e.shape[1]
 
-    # Data structure for storage of intersection points. For each fracture,
-    # we have an array that will contain the index of the intersections.
-    isect_pt = np.empty(num_lines, dtype=object)
-    for i in range(isect_pt.size):
-        isect_pt[i] = np.empty(0, dtype=int)
-
-    # Array of new points, found in the intersection of old ones.
-    new_pts = []
-    # The new points will be appended to the old ones, thus their index
-    # must be adjusted.
-    new_ind = p.shape[1]
-
-    # Loop through all candidate pairs of intersecting fractures, check if they do
-    # intersect. If so, store the point, and for each crossing fracture take note of the
-    # index of the cross point.
-    for _, line_ind in enumerate(start_inds):
-        # First fracture in the candidate pair
-        main = line_ind
-        # Find all other fractures that is in a pair with the main as the first one.
-        hit = np.where(pairs[0] == main)
-        # Sort the other points; this makes debugging simpler if nothing else.
-        other = np.sort(pairs[1, hit][0])
-
-        # We will first do a coarse sorting, to rule out fractures that are clearly
-        # not intersecting, and then do a finer search for an intersection below.
-
-        # Utility function to pull out one or several points from an array based on
-        # index
-        def pt(p: np.ndarray, ind: np.ndarray) -> np.ndarray:
-            a = p[:, ind]
-            if ind.size == 1:
-                return a.reshape((-1, 1))
-            else:
-                return a
-
-        # Obtain start and endpoint of the main and other fractures
-        start_main = pt(p, e[0, main])
-        end_main = pt(p, e[1, main])
-        start_other = pt(p, e[0, other])
-        end_other = pt(p, e[1, other])
-
-        # Utility function to normalize the fracture length
-        def normalize(v):
-            nrm = np.sqrt(np.sum(v**2, axis=0))
-
-            # If the norm of the vector is essentially zero, do not normalize the vector
-            hit = nrm < tol
-            nrm[hit] = 1
-            return v / nrm
-
-        def dist(a, b):
-            return np.sqrt(np.sum((a - b) ** 2))
-
-        # Vectors along the main fracture, and from the start of the main to the start
-        # and end of the other fractures. All normalized. If the other edges share start
-        # or endpoint with the main one, normalization of the distance vector will make
-        # the vector nans. In this case, we use another point along the other line, this
-        # works equally well for the coarse identification (based on cross products). If
-        # the segments are overlapping, there will still be issues with nans, but these
-        # are dealt with below.
-        main_vec = normalize(end_main - start_main)
-        if dist(start_other, start_main) > tol:
-            main_other_start = normalize(start_other - start_main)
-        else:
-            main_other_start = normalize(0.5 * (start_other + end_other) - start_main)
-        if dist(end_other, start_main) > tol:
-            main_other_end = normalize(end_other - start_main)
-        else:
-            # Values 0.3 and 0.7 are quite random here.
-            main_other_end = normalize(0.3 * start_other + 0.7 * end_other - start_main)
+    # Start and endpoints of the fractures in the candidate pairs.
+    start_main = p[:, e[0, main]]
+    end_main = p[:, e[1, main]]
+    start_other = p[:, e[0, other]]
+    end_other = p[:, e[1, other]]
 
-        # Modified signum function: The value is 0 if it is very close to zero.
-        def mod_sign(v, tol):
-            sgn = np.sign(v)
-            sgn[np.abs(v) < tol] = 0
-            return sgn
+    # We will first do a coarse sorting, to rule out fractures that are clearly not
+    # intersecting, and then do a finer search for an intersection below.
+
+    # Utility function to normalize the fracture length
+    def normalize(v):
+        nrm = np.sqrt(np.sum(v**2, axis=0))
+
+        # If the norm of the vector is essentially zero, do not normalize the vector
+        hit = nrm < tol
+        nrm[hit] = 1
+        return v / nrm
 
-        # Take the cross product between the vector along the main line, and the
-        # vectors to the start and end of the other lines, respectively.
-        start_cross = mod_sign(
-            main_vec[0] * main_other_start[1] - main_vec[1] * main_other_start[0], tol
+    # Index of the main fracture of each pair among all main fractures.
+    _, main_ind = np.unique(main, return_inverse=True)
+
+    def far_from_start_main(v):
+        # Check if the points v are, taken together for each main fracture, further
+        # than the tolerance away from the start of the main fracture.
+        dist = np.sqrt(np.bincount(main_ind, weights=np.sum((v - start_main) ** 2, 0)))
+        return dist[main_ind] > tol
+
+    # Vectors along the main fracture, and from the start of the main to the start and
+    # end of the other fractures. All normalized. If the other edges share start or
+    # endpoint with the main one, normalization of the distance vector will make the
+    # vector nans. In this case, we use another point along the other line, this works
+    # equally well for the coarse identification (based on cross products). If the
+    # segments are overlapping, there will still be issues with nans, but these are
+    # dealt with below.
+    main_vec = normalize(end_main - start_main)
+    main_other_start = normalize(
+        np.where(
+            far_from_start_main(start_other),
+            start_other,
+            0.5 * (start_other + end_other),
         )
-        end_cross = mod_sign(
-            main_vec[0] * main_other_end[1] - main_vec[1] * main_other_end[0], tol
+        - start_main
+    )
+    # Values 0.3 and 0.7 are quite random here.
+    main_other_end = normalize(
+        np.where(
+            far_from_start_main(end_other),
+            end_other,
+            0.3 * start_other + 0.7 * end_other,
         )
+        - start_main
+    )
 
-        # If the start and endpoint of the other fracture are clearly on the same side
-        # of the main one, these are not crossing. For completely ovrelapping edges, the
-        # normalization will leave the vectors nan. There may be better ways of dealing
-        # with this, but we simply run the intersection finder in this case.
-        relevant = np.where(
-            np.logical_or(
-                (start_cross * end_cross < 1),
-                np.any(np.isnan(main_other_start + main_other_end), axis=0),
-            )
-        )[0]
+    # Modified signum function: The value is 0 if it is very close to zero.
+    def mod_sign(v, tol):
+        sgn = np.sign(v)
+        sgn[np.abs(v) < tol] = 0
+        return sgn
 
-        # Loop over all relevant (possibly crossing) fractures, look closer for an
-        # intersection.
-        for ri in relevant:
-            ipt = segments_2d(
-                start_main, end_main, pt(start_other, ri), pt(end_other, ri), tol
-            )
-            # Add the intersection point, if any. If two intersection points are found,
-            # that is the edges are overlapping both points are added.
-            if ipt is not None:
-                num_isect = ipt.shape[1]
-                # Add indices of the new points to the main and other edge
-                isect_pt[main] = np.append(
-                    isect_pt[main], new_ind + np.arange(num_isect)
-                )
-                isect_pt[other[ri]] = np.append(
-                    isect_pt[other[ri]], new_ind + np.arange(num_isect)
-                )
-                new_ind += num_isect
+    # Take the cross product between the vector along the main line, and the vectors to
+    # the start and end of the other lines, respectively.
+    start_cross = mod_sign(
+        main_vec[0] * main_other_start[1] - main_vec[1] * main_other_start[0], tol
+    )
+    end_cross = mod_sign(
+        main_vec[0] * main_other_end[1] - main_vec[1] * main_other_end[0], tol
+    )
 
-                # Add the one or two intertion points
-                if num_isect == 1:
-                    new_pts.append(ipt.squeeze())
-                else:
-                    # It turned out the transport was needed to get the code to work
-                    new_pts.append(ipt.squeeze().T)
+    # If the start and endpoint of the other fracture are clearly on the same side of
+    # the main one, these are not crossing. For completely ovrelapping edges, the
+    # normalization will leave the vectors nan. There may be better ways of dealing
+    # with this, but we simply run the intersection finder in this case.
+    relevant = np.where(
+        np.logical_or(
+            (start_cross * end_cross < 1),
+            np.any(np.isnan(main_other_start + main_other_end), axis=0),
+        )
+    )[0]
+
+    # Look closer for intersections of all relevant (possibly crossing) fractures. If
+    # two intersection points are found, that is the edges are overlapping, both points
+    # are added.
+    new_pts, num_isect = _segment_pairs_intersections_2d(
+        start_main[:, relevant],
+        end_main[:, relevant],
+        start_other[:, relevant],
+        end_other[:, relevant],
+        tol,
+    )
 
     # If we have found no intersection points, we can safely return the incoming
     # points and edges.
-    if len(new_pts) == 0:
+    if new_pts.shape[1] == 0:
         # Tag information is trivial in this case
         tags = e[2:].copy()
         mapping = np.arange(e.shape[1])
@@ -2341,65 +2319,168 @@ def split_intersecting_segments_2d(
 
     # If intersection points are found, the intersecting lines must be split into
     # shorter segments.
+
+    # The full set of points, both original and newly found intersection points. The
+    # new points will be appended to the old ones, thus their index must be adjusted.
+    all_pt = np.hstack((p, new_pts))
+    new_ind = p.shape[1] + np.arange(new_pts.shape[1])
+    # Remove duplicates in the point set.
+    # NOTE: The tolerance used here is a bit sensitive, if set too loose, this may
+    # merge non-intersecting fractures.
+    unique_all_pt, _, ib = pp.utils.setmembership.uniquify_point_set(all_pt, tol)
+
+    # For each line, find the indices of all points involved, that is the start and
+    # endpoints and the intersection points with the other lines. Map them to the
+    # unique point set, and uniquify.
+    isect_pair = np.repeat(relevant, num_isect)
+    line_ind = np.hstack(
+        (np.arange(num_lines), np.arange(num_lines), pairs[:, isect_pair].ravel())
+    )
+    point_ind = ib[np.hstack((e[0], e[1], new_ind, new_ind))]
+    line_ind, point_ind = np.unique(np.vstack((line_ind, point_ind)), axis=1)
+    # Specifically get the start point of each line: Pick one of the points of the
+    # original edge, e[0], which is known to be at an end of the edge. Measure the
+    # distance of the points from the start, and sort the points along the lines.
+    loc_start = unique_all_pt[:, ib[e[0, line_ind]]]
+    dist = np.sum((unique_all_pt[:, point_ind] - loc_start) ** 2, axis=0)
+    order = np.lexsort((dist, line_ind))
+    line_ind = line_ind[order]
+    point_ind = point_ind[order]
+
+    # Define the new segments, in terms of the unique points, between consecutive
+    # points along each line. All new segments share the tags of the old one.
+    is_segment = line_ind[:-1] == line_ind[1:]
+    argsort = line_ind[:-1][is_segment]
+    new_edge = np.vstack(
+        (point_ind[:-1][is_segment], point_ind[1:][is_segment], e[2:, argsort])
+    )
+
+    # Finally, uniquify edges. This operation is necessary for overlapping edges.
+    # Operate on sorted point indices per edge
+    new_edge[:2] = np.sort(new_edge[:2], axis=0)
+
+    # Keep the old tags before uniquifying
+    tags = new_edge[2:].copy().ravel()
+    # Uniquify.
+    _, edge_map, all_2_unique = pp.utils.setmembership.unique_columns_tol(
+        new_edge[:2].astype(int), tol
+    )
+    tag_info = (tags, all_2_unique)
+
+    new_edge = new_edge[:, edge_map]
+    argsort = argsort[edge_map]
+
+    if return_argsort:
+        return unique_all_pt, new_edge.astype(int), tag_info, argsort
     else:
-        # The full set of points, both original and newly found intersection points
-        all_pt = np.hstack((p, np.vstack([i for i in new_pts]).T))
-        # Remove duplicates in the point set.
-        # NOTE: The tolerance used here is a bit sensitive, if set too loose, this
-        # may merge non-intersecting fractures.
-
-        unique_all_pt, ia, ib = pp.utils.setmembership.uniquify_point_set(all_pt, tol)
-
-        # Data structure for storing the split edges.
-        new_edge = np.empty((e.shape[0], 0), dtype=int)
-        argsort: np.ndarray = np.empty(0, dtype=int)
-
-        # Loop over all lines, split it into non-overlapping segments.
-        for ei in range(num_lines):
-            # Find indices of all points involved in this fracture. Map them to the
-            # unique point set, and uniquify
-            inds = np.unique(ib[np.hstack((e[:2, ei], isect_pt[ei]))])
-            num_branches = inds.size - 1
-            # Get the coordinates themselves.
-            loc_pts = pt(unique_all_pt, inds)
-            # Specifically get the start point: Pick one of the points of the original
-            # edge, e[0, ei], which is known to be at an end of the edge. map to the
-            # unique indices
-            loc_start = pt(unique_all_pt, ib[e[0, ei]])
-            # Measure the distance of the points from the start. This can be used to
-            # sort the points along the line
-            dist = np.sum((loc_pts - loc_start) ** 2, axis=0)
-            assert isinstance(dist, np.ndarray)  # Needed to appease mypy
-            order = np.argsort(dist)
-            new_inds = inds[order]
-            # All new segments share the tags of the old one.
-            loc_tags = e[2:, ei].reshape((-1, 1)) * np.ones(num_branches, dtype=int)
-            # Define the new segments, in terms of the unique points
-            loc_edge = np.vstack((new_inds[:-1], new_inds[1:], loc_tags))
-
-            # Add to the global list of segments
-            new_edge = np.hstack((new_edge, loc_edge))
-            argsort = np.hstack((argsort, [ei] * loc_edge.shape[1]))
-
-        # Finally, uniquify edges. This operation is necessary for overlapping edges.
-        # Operate on sorted point indices per edge
-        new_edge[:2] = np.sort(new_edge[:2], axis=0)
-
-        # Keep the old tags before uniquifying
-        tags = new_edge[2:].copy().ravel()
-        # Uniquify.
-        _, edge_map, all_2_unique = pp.utils.setmembership.unique_columns_tol(
-            new_edge[:2].astype(int), tol
-        )
-        tag_info = (tags, all_2_unique)
+        return unique_all_pt, new_edge.astype(int), tag_info
 
-        new_edge = new_edge[:, edge_map]
-        argsort = argsort[edge_map]
 
-        if return_argsort:
-            return unique_all_pt, new_edge.astype(int), tag_info, argsort
-        else:
-            return unique_all_pt, new_edge.astype(int), tag_info
+def _segment_pairs_intersections_2d(
+    start_1: np.ndarray,
+    end_1: np.ndarray,
+    start_2: np.ndarray,
+    end_2: np.ndarray,
+    tol: float = 1e-8,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized version of :func:`segments_2d` for pairs of line segments.
+
+    Pairs of segments which are not (almost) parallel are treated simultaneously,
+    using the same arithmetic as :func:`segments_2d`. Parallel segments, which are
+    rare in practice, are passed to :func:`segments_2d` one by one.
+
+    Parameters:
+        start_1: ``shape=(2, num_pairs)``
+
+            Coordinates of start points of the first segments of the pairs.
+        end_1: ``shape=(2, num_pairs)``
+
+            Coordinates of end points of the first segments of the pairs.
+        start_2: ``shape=(2, num_pairs)``
+
+            Coordinates of start points of the second segments of the pairs.
+        end_2: ``shape=(2, num_pairs)``
+
+            Coordinates of end points of the second segments of the pairs.
+        tol: ``default=1e-8``
+
+            Tolerance for detecting parallel lines.
+
+    Returns:
+        A tuple with two entries.
+
+        :obj:`~numpy.ndarray`: ``shape=(2, num_points)``
+
+            Intersection points of all pairs, ordered as the pairs. The intersection of
+            a pair consists of one point, or of the two endpoints of the intersection
+            segment for overlapping segments, see :func:`segments_2d`.
+        :obj:`~numpy.ndarray`: ``shape=(num_pairs,)``
+
+            Number of intersection points of each pair, that is, 0, 1 or 2.
+
+    """
+    start_1 = start_1.astype(float)
+    end_1 = end_1.astype(float)
+    start_2 = start_2.astype(float)
+    end_2 = end_2.astype(float)
+
+    # Vectors along first and second lines, and between the start points.
+    d_1 = end_1 - start_1
+    d_2 = end_2 - start_2
+    d_s = start_2 - start_1
+
+    length_1 = np.sqrt(d_1[0] * d_1[0] + d_1[1] * d_1[1])
+    length_2 = np.sqrt(d_2[0] * d_2[0] + d_2[1] * d_2[1])
+
+    # Determinant of the system for the parameters of the intersection point along the
+    # lines, see segments_2d.
+    discr = d_1[0] * (-d_2[1]) - d_1[1] * (-d_2[0])
+    parallel = np.abs(discr) < tol * length_1 * length_2
+
+    # Solve linear system of non-parallel lines using Cramer's rule
+    crossing = np.logical_not(parallel)
+    discr = discr[crossing]
+    t_1 = (
+        d_s[0, crossing] * (-d_2[1, crossing]) - d_s[1, crossing] * (-d_2[0, crossing])
+    ) / discr
+    t_2 = (
+        d_1[0, crossing] * d_s[1, crossing] - d_1[1, crossing] * d_s[0, crossing]
+    ) / discr
+    isect = start_1[:, crossing] + t_1 * d_1[:, crossing]
+
+    # The intersection lies on both segments if both t_1 and t_2 are on the unit
+    # interval. Use tol to allow some approximations
+    num_isect = np.zeros(start_1.shape[1], dtype=int)
+    num_isect[crossing] = (
+        (t_1 >= -tol) & (t_1 <= (1 + tol)) & (t_2 >= -tol) & (t_2 <= (1 + tol))
+    )
+
+    # Parallel segments may be colinear, and then intersect in a segment.
+    parallel_points = []
+    for pi in np.where(parallel)[0]:
+        ipt = segments_2d(
+            start_1[:, pi], end_1[:, pi], start_2[:, pi], end_2[:, pi], tol
+        )
+        if ipt is not None:
+            num_isect[pi] = ipt.shape[1]
+            parallel_points.append(ipt)
+
+    # Collect the intersection points in the order of the pairs.
+    first_point = np.cumsum(num_isect) - num_isect
+    points = np.empty((2, num_isect.sum()))
+    points[:, first_point[crossing][num_isect[crossing] > 0]] = isect[
+        :, num_isect[crossing] > 0
+    ]
+    if len(parallel_points) > 0:
+        has_isect = parallel & (num_isect > 0)
+        points[
+            :,
+            pp.utils.mcolon.mcolon(
+                first_point[has_isect], first_point[has_isect] + num_isect[has_isect]
+            ),
+        ] = np.hstack(parallel_points)
+
+    return points, num_isect
 
 
 def _axis_aligned_bounding_box_2d(
@@ -2487,24 +2568,24 @@ def _axis_aligned_bounding_box_3d(
 
     polys = list(polys)
 
-    num_poly = len(polys)
+    if len(polys) == 0:
+        return tuple(np.empty(0) for _ in range(6))  # type: ignore[return-value]
 
-    x_min = np.empty(num_poly)
-    x_max = np.empty_like(x_min)
-    y_min = np.empty_like(x_min)
-    y_max = np.empty_like(x_min)
-    z_min = np.empty_like(x_min)
-    z_max = np.empty_like(x_min)
+    # Treat all polygons at once, by reductions over the vertices of each polygon.
+    num_vertices = np.array([p.shape[1] for p in polys])
+    first_vertex = np.cumsum(num_vertices) - num_vertices
+    vertices = np.hstack([p[:3] for p in polys]).astype(float)
+    coord_min = np.minimum.reduceat(vertices, first_vertex, axis=1)
+    coord_max = np.maximum.reduceat(vertices, first_vertex, axis=1)
 
-    for ind, p in enumerate(polys):
-        x_min[ind] = np.min(p[0])
-        x_max[ind] = np.max(p[0])
-        y_min[ind] = np.min(p[1])
-        y_max[ind] = np.max(p[1])
-        z_min[ind] = np.min(p[2])
-        z_max[ind] = np.max(p[2])
-
-    return x_min, x_max, y_min, y_max, z_min, z_max
+    return (
+        coord_min[0],
+        coord_max[0],
+        coord_min[1],
+        coord_max[1],
+        coord_min[2],
+        coord_max[2],
+    )
 
 
 def _identify_overlapping_intervals(left: np.ndarray, right: np.ndarray) -> np.ndarray:
@@ -2601,8 +2682,12 @@ def _identify_overlapping_rectangles(
         is allowed. Analogously for the y-components.
 
     Note:
-        The algorithm was found in 'A fast method for fracture intersection detection in
-        discrete fracture networks' by Dong et al, Computers and Geotechniques 2018.
+        The pairs are returned in the order of the sweep algorithm in 'A fast method for
+        fracture intersection detection in discrete fracture networks' by Dong et al,
+        Computers and Geotechniques 2018. They are however found by sorting the
+        rectangles into a uniform grid, see
+        :func:`_overlapping_rectangles_uniform_grid`, which scales better with the
+        number of rectangles.
 
     Parameters:
         xmin: ``shape=(num_rectangles,)``
@@ -2632,65 +2717,214 @@ def _identify_overlapping_rectangles(
     if xmin.size < 2:
         return np.empty((2, 0))
 
-    # Sort the coordinates
+    pairs = _overlapping_rectangles_uniform_grid(xmin, xmax, ymin, ymax)
+    if pairs.shape[1] == 0:
+        return np.empty((2, 0))
+
+    # Order the pairs as found by a pass along the x-axis: The rectangles are visited
+    # in the order of their minimum x-coordinate, and each rectangle is paired with
+    # the previously visited ones it overlaps, in the order these were visited.
     sort_ind_min = np.argsort(xmin)
-    sort_ind_max = np.argsort(xmax)
+    visit_order = np.empty(xmin.size, dtype=int)
+    visit_order[sort_ind_min] = np.arange(xmin.size)
+    swap = visit_order[pairs[0]] > visit_order[pairs[1]]
+    pairs[:, swap] = pairs[::-1, swap]
+    final_pairs = pairs[
+        :, np.lexsort((visit_order[pairs[0]], visit_order[pairs[1]]))
+    ].astype(sort_ind_min.dtype)
+
+    # First sort the pairs themselves
+    final_pairs.sort(axis=0)
+    # Next, sort the columns so that the first row is non-decreasing
+    sort_ind = np.argsort(final_pairs[0])
+    final_pairs = final_pairs[:, sort_ind]
+    return final_pairs
+
+
+def _overlapping_rectangles_uniform_grid(
+    xmin: np.ndarray,
+    xmax: np.ndarray,
+    ymin: np.ndarray,
+    ymax: np.ndarray,
+    max_candidates: int = 2**22,
+) -> np.ndarray:
+    """Identify pairs of overlapping rectangles by sorting them into a uniform grid.
 
-    # pointers to the next start and end point of an interval
-    next_min = 0
-    next_max = 0
+    The grid cells are of the size of a typical rectangle. Rectangles covering the same
+    cell are candidates for overlap, and each overlapping pair is only reported for the
+    cell containing the minimum corner of the intersection of the rectangles. Thus,
+    the cost is proportional to the number of rectangles, as long as these are of
+    similar size and not too clustered.
 
-    # List of pairs we have found
-    pairs = []
-    # List of intervals we are currently in. All intervals will join and leave this
-    # set.
-    active: list = []
+    Note:
+        Rectangles which touch are considered overlapping.
 
-    num_lines = xmax.size
+    Parameters:
+        xmin: ``shape=(num_rectangles,)``
 
-    # Pass along the x-axis, identify the start and end of rectangles as we go. The idea
-    # is then for each new interval to check which of the active intervals also have
-    # overlap along the y-axis. These will be identified as pairs.
-    while True:
-        # Check if the next start (xmin) point is before the next endpoint, but only if
-        # there are more left points available. Less or equal is critical here, or else
-        # cases where a point interval is combined with the start of another interval
-        # may not be discovered.
-        if (
-            next_min < num_lines
-            and xmin[sort_ind_min[next_min]] <= xmax[sort_ind_max[next_max]]
-        ):
-            # Find active rectangles where the y-interval is also overlapping
-            between = np.where(
-                np.logical_and(
-                    ymax[sort_ind_min[next_min]] >= ymin[active],
-                    ymin[sort_ind_min[next_min]] <= ymax[active],
-                )
-            )[0]
-            # For all identified overlaps, add the new pairs
-            for a in between:
-                pairs.append([active[a], sort_ind_min[next_min]])
-            # Add this to the active rectangles, and increase the index
-            active.append(sort_ind_min[next_min])
-            next_min += 1
-        else:
-            # We are leaving a rectangle.
-            active.remove(sort_ind_max[next_max])
-            next_max += 1
-            # Check if we have come to the end
-            if next_max == num_lines:
-                break
+            Minimum coordinates of the rectangle on the first axis.
+        xmax: ``shape=(num_rectangles,)``
 
-    if len(pairs) == 0:
-        return np.empty((2, 0))
-    else:
-        final_pairs = np.asarray(pairs).T
-        # First sort the pairs themselves
-        final_pairs.sort(axis=0)
-        # Next, sort the columns so that the first row is non-decreasing
-        sort_ind = np.argsort(final_pairs[0])
-        final_pairs = final_pairs[:, sort_ind]
-        return final_pairs
+            Maximum coordinates of the rectangle on the first axis.
+        ymin: ``shape=(num_rectangles,)``
+
+            Minimum coordinates of the rectangle on the second axis.
+        ymax: ``shape=(num_rectangles,)``
+
+            Maximum coordinates of the rectangle on the second axis.
+        max_candidates: ``default=2**22``
+
+            Maximum number of candidate pairs checked at once, to limit the memory
+            consumption.
+
+    Returns:
+        Integer array with shape ``(2, num_overlaps)`` with each column containing a
+        pair of overlapping rectangles, with the lowest index in the first row. The
+        columns are not sorted.
+
+    """
+    num_rect = xmin.size
+    coord_min = np.vstack((xmin, ymin)).astype(float)
+    coord_max = np.vstack((xmax, ymax)).astype(float)
+
+    # The cell size is the median extension of the rectangles, but the grid should not
+    # have many more cells than there are rectangles.
+    origin = coord_min.min(axis=1).reshape((-1, 1))
+    domain_size = np.max(coord_max.max(axis=1) - origin.ravel())
+    cell_size = max(
+        np.median(np.max(coord_max - coord_min, axis=0)),
+        domain_size / np.sqrt(num_rect),
+    )
+    if cell_size <= 0:
+        # All rectangles are the same point
+        cell_size = 1.0
+
+    def cell_index(coord: np.ndarray) -> np.ndarray:
+        return np.floor((coord - origin) / cell_size).astype(int)
+
+    first_cell = cell_index(coord_min)
+    last_cell = cell_index(coord_max)
+    num_cells_y = last_cell[1].max() + 1
+
+    def cell_number(cell: np.ndarray) -> np.ndarray:
+        return cell[0] * num_cells_y + cell[1]
+
+    # Expand the rectangles to the cells they cover, and sort by cell.
+    num_x, num_y = last_cell - first_cell + 1
+    num_covered = num_x * num_y
+    rect = np.repeat(np.arange(num_rect), num_covered)
+    local = np.arange(rect.size) - np.repeat(
+        np.cumsum(num_covered) - num_covered, num_covered
+    )
+    cells = cell_number(
+        first_cell[:, rect] + np.vstack((local // num_y[rect], local % num_y[rect]))
+    )
+    order = np.argsort(cells, kind="stable")
+    cells, rect = cells[order], rect[order]
+
+    # Candidates are all pairs of rectangles in the same cell.
+    group_end = np.searchsorted(cells, cells, side="right")
+    num_candidates = group_end - np.arange(1, cells.size + 1)
+    cumulative = np.cumsum(num_candidates)
+    breaks = np.searchsorted(
+        cumulative, np.arange(max_candidates, cumulative[-1], max_candidates)
+    )
+    chunks = np.unique(np.hstack((0, breaks + 1, cells.size)))
+
+    pairs = [np.empty((2, 0), dtype=int)]
+    for lo, hi in zip(chunks[:-1], chunks[1:]):
+        first = np.repeat(np.arange(lo, hi), num_candidates[lo:hi])
+        second = pp.utils.mcolon.mcolon(np.arange(lo + 1, hi + 1), group_end[lo:hi])
+        a, b = rect[first], rect[second]
+        corner = np.maximum(coord_min[:, a], coord_min[:, b])
+        keep = np.logical_and(
+            np.all(corner <= np.minimum(coord_max[:, a], coord_max[:, b]), axis=0),
+            cell_number(cell_index(corner)) == cells[first],
+        )
+        pairs.append(np.vstack((a[keep], b[keep])))
+
+    return np.sort(np.hstack(pairs), axis=0)
+
+
+def _polygons_cross_planes(
+    polys: list[np.ndarray],
+    normals: list[np.ndarray],
+    pairs: np.ndarray,
+    tol: float = 1e-8,
+) -> np.ndarray:
+    """For pairs of polygons, check whether each polygon may cross the plane of the
+    other polygon.
+
+    The check is a vectorized version of the coarse filtering in
+    :func:`polygons_3d`, where a pair is discarded if all vertices of one polygon lie on
+    one side of the plane of the other, with angles to the plane above ``tol``. The
+    check here is conservative: Pairs for which this is not clear are kept.
+
+    Parameters:
+        polys: List of polygons, each described by its vertices in a
+            ``(3, num_points)`` array.
+        normals: Normal vectors of the polygons, each with ``shape=(3, 1)``.
+        pairs: ``shape=(2, num_pairs)``
+
+            Indices of polygon pairs.
+        tol: ``default=1e-8``
+
+            Tolerance of the filtering in :func:`polygons_3d`.
+
+    Returns:
+        Boolean array with ``shape=(num_pairs,)``, True if the polygons of the pair may
+        cross the plane of each other.
+
+    """
+    num_vertices = np.array([p.shape[1] for p in polys])
+    first_vertex = np.cumsum(num_vertices) - num_vertices
+    vertices = np.hstack(polys)
+    normal = np.hstack(normals)
+    normal_length = np.linalg.norm(normal, axis=0)
+    center = np.add.reduceat(vertices, first_vertex, axis=1) / num_vertices
+
+    # Deviation of the polygon vertices from the plane given by the center and normal.
+    polygon_index = np.repeat(np.arange(len(polys)), num_vertices)
+    deviation = np.maximum.reduceat(
+        np.abs(
+            np.sum(
+                normal[:, polygon_index] * (vertices - center[:, polygon_index]), axis=0
+            )
+        ),
+        first_vertex,
+    )
+
+    # Upper bound of the distance between the vertices of the polygons in a pair.
+    coord_min = np.minimum.reduceat(vertices, first_vertex, axis=1)
+    coord_max = np.maximum.reduceat(vertices, first_vertex, axis=1)
+    diameter = np.linalg.norm(
+        np.maximum(coord_max[:, pairs[0]], coord_max[:, pairs[1]])
+        - np.minimum(coord_min[:, pairs[0]], coord_min[:, pairs[1]]),
+        axis=0,
+    )
+
+    crosses = np.ones(pairs.shape[1], dtype=bool)
+    for main, other in (pairs, pairs[::-1]):
+        # Signed distances from the plane of the main polygon, scaled with the length
+        # of the normal vector, of the vertices of the other polygon.
+        vertex_ind = pp.utils.mcolon.mcolon(
+            first_vertex[other], first_vertex[other] + num_vertices[other]
+        )
+        pair_ind = np.repeat(np.arange(pairs.shape[1]), num_vertices[other])
+        signed_distance = np.sum(
+            normal[:, main[pair_ind]]
+            * (vertices[:, vertex_ind] - center[:, main[pair_ind]]),
+            axis=0,
+        )
+        first = np.cumsum(num_vertices[other]) - num_vertices[other]
+        dist_min = np.minimum.reduceat(signed_distance, first)
+        dist_max = np.maximum.reduceat(signed_distance, first)
+        # With this margin, the vertices are on the same side of the plane also when
+        # measured from a vertex of the main polygon, and relative to the distance.
+        margin = 2 * (deviation[main] + tol * diameter * normal_length[main])
+        crosses &= np.logical_not((dist_min > margin) | (dist_max < -margin))
+
+    return crosses
 
 
 def _intersect_pairs(p1: np.ndarray, p2: np.ndarray) -> np.ndarray:
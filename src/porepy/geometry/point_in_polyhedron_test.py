@@ -108,6 +108,143 @@ class PointInPolyhedronTest:
         angle = 2.0 * np.arctan2(nv, dv)
         return angle
 
+    def winding_numbers(
+        self,
+        points: np.ndarray[Any, np.dtype[np.float64]],
+        use_bounding_box: bool = True,
+        max_chunk_entries: int = 2**15,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Computes the winding numbers of the closed triangulated surface at a set of
+        points.
+
+        The solid angles of all pairs of points and triangles are computed in one
+        vectorized operation, for chunks of points.
+
+        Degenerate configurations, as detected by :meth:`solid_angle`, are reported by
+        a mask rather than by raising an error.
+
+        Parameters:
+            points: ``shape=(num_points, 3)``
+
+                The points being tested.
+            use_bounding_box: ``default=True``
+
+                If True, points outside the bounding box of the surface, enlarged by
+                the tolerance, are assigned the winding number 0 without computing the
+                solid angles. Since the surface is closed, this is exact.
+            max_chunk_entries: ``default=2**15``
+
+                Maximum number of point-triangle pairs treated at once. Limits the
+                memory consumption; moderate chunks also make good use of the cache.
+
+        Returns:
+            A tuple with two arrays of ``shape=(num_points,)``:
+
+            :obj:`~numpy.ndarray`:
+                The winding numbers, see :meth:`winding_number`. The value is ``nan``
+                for degenerate points.
+
+            :obj:`~numpy.ndarray`:
+                Boolean mask of degenerate points, which coincide with a vertex, are
+                collinear with two vertices, or are coplanar with the vertices of a
+                triangle. Points outside the bounding box are not checked.
+
+        """
+        points = np.atleast_2d(points)
+        num_points = points.shape[0]
+        wn = np.zeros(num_points)
+        degenerate = np.zeros(num_points, dtype=bool)
+
+        active = np.arange(num_points)
+        if use_bounding_box:
+            lower = self.vertices.min(axis=0) - self.tol
+            upper = self.vertices.max(axis=0) + self.tol
+            active = active[np.all((points >= lower) & (points <= upper), axis=1)]
+
+        # Vertices of the triangles, ``shape=(num_triangles, 3)`` each, and the normal
+        # vectors used in the coplanarity check.
+        A, B, C = (self.vertices[self.connectivity[:, i]] for i in range(3))
+        normals = np.cross(A - B, C - B)
+
+        chunk_size = max(1, max_chunk_entries // max(1, self.connectivity.shape[0]))
+        for start in range(0, active.size, chunk_size):
+            chunk = active[start : start + chunk_size]
+            angles, chunk_degenerate = self._solid_angles(
+                points[chunk], A, B, C, normals
+            )
+            wn[chunk] = np.sum(angles, axis=1) / (4.0 * np.pi)
+            degenerate[chunk] = chunk_degenerate
+
+        wn[degenerate] = np.nan
+        return wn, degenerate
+
+    def _solid_angles(
+        self,
+        points: np.ndarray,
+        A: np.ndarray,
+        B: np.ndarray,
+        C: np.ndarray,
+        normals: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Vectorized version of :meth:`solid_angle` for all pairs of points and
+        triangles.
+
+        Parameters:
+            points: ``shape=(num_points, 3)``
+
+                Points at which the solid angles are computed.
+            A, B, C: ``shape=(num_triangles, 3)``
+
+                Vertices of the triangles.
+            normals: ``shape=(num_triangles, 3)``
+
+                Cross products ``(A - B) x (C - B)``.
+
+        Returns:
+            Solid angles with ``shape=(num_points, num_triangles)``, and a boolean
+            mask of degenerate points with ``shape=(num_points,)``.
+
+        """
+        # Components of the triangle vertices translated by the points, each with
+        # ``shape=(num_points, num_triangles)``. Working on components avoids the
+        # overhead of operations along a short last axis.
+        a = [A[:, k] - points[:, k, np.newaxis] for k in range(3)]
+        b = [B[:, k] - points[:, k, np.newaxis] for k in range(3)]
+        c = [C[:, k] - points[:, k, np.newaxis] for k in range(3)]
+
+        def dot(u: list[np.ndarray], v: list[np.ndarray]) -> np.ndarray:
+            return u[0] * v[0] + u[1] * v[1] + u[2] * v[2]
+
+        def cross(u: list[np.ndarray], v: list[np.ndarray]) -> list[np.ndarray]:
+            return [
+                u[1] * v[2] - u[2] * v[1],
+                u[2] * v[0] - u[0] * v[2],
+                u[0] * v[1] - u[1] * v[0],
+            ]
+
+        ra = np.sqrt(dot(a, a))
+        rb = np.sqrt(dot(b, b))
+        rc = np.sqrt(dot(c, c))
+
+        cross_ab = cross(a, b)
+        cross_bc = cross(b, c)
+        cross_ca = cross(c, a)
+
+        # The same checks as in solid_angle: Coinciding vertices, collinearity and
+        # coplanarity. The checks are done on squared quantities.
+        tol2 = self.tol**2
+        degenerate = (
+            (np.minimum(np.minimum(ra, rb), rc) < self.tol)
+            | (dot(cross_ab, cross_ab) < 4 * tol2)
+            | (dot(cross_bc, cross_bc) < 4 * tol2)
+            | (dot(cross_ca, cross_ca) < 4 * tol2)
+            | (np.abs(dot(b, [normals[:, k] for k in range(3)])) < self.tol)
+        )
+
+        nv = dot(a, cross_bc)
+        dv = ra * rb * rc + dot(a, b) * rc + dot(a, c) * rb + dot(b, c) * ra
+        return 2.0 * np.arctan2(nv, dv), np.any(degenerate, axis=1)
+
     def winding_number(self, point: np.ndarray[Any, np.dtype[np.float64]]) -> float:
         """Computes the winding number of a closed triangulated surface at given point.
 
@@ -14,10 +14,9 @@ See documentation of class :class:`Grid` for further details.
 from __future__ import annotations
 
 import copy
-import itertools
 import warnings
 from itertools import count
-from typing import Any, Optional, Union
+from typing import Any, Callable, Optional, Union
 
 import numpy as np
 from scipy import sparse as sps
@@ -196,6 +195,14 @@ class Grid:
 
         """
 
+        self._topology_cache: dict[str, Any] = {}
+        """Memoized quantities derived from the topology and node coordinates, such as
+        :meth:`cell_nodes` and :meth:`cell_diameters`. See :meth:`_cached`.
+
+        """
+        self._topology_cache_sources: tuple = ()
+        """Arrays defining the grid when :attr:`_topology_cache` was filled."""
+
         # Add tag for the boundary faces
         self.tags: dict[str, Any]
         """Tags allow to mark subdomains of interest.
@@ -350,9 +357,13 @@ class Grid:
 
         Computes the face areas, face centers, face normals and cell volumes.
 
+        Memoized quantities derived from the topology, e.g. :meth:`cell_nodes`, are
+        reset, thus the method should be called after the grid is modified in place.
+
         """
 
         self.history.append("Compute geometry")
+        self._topology_cache.clear()
 
         if self.dim == 0:
             self._compute_geometry_0d()
@@ -557,15 +568,20 @@ class Grid:
             (np.ones(num_face_nodes), (np.arange(num_face_nodes), face_node_ind))
         ).tocsc()
 
+        # Coordinates of the start and end nodes of all edges. These are used
+        # repeatedly below, thus fetch them once.
+        start_nodes = self.nodes[:, face_nodes]
+        end_nodes = self.nodes[:, face_nodes[next_node]]
+
         # Define temporary face center as the mean of the face nodes
-        tmp_face_center = self.nodes[:, face_nodes] * edge_2_face / num_nodes_per_face
+        tmp_face_center = start_nodes * edge_2_face / num_nodes_per_face
         # Associate this value with all the edge of this face
         tmp_face_center = edge_2_face * tmp_face_center.transpose()
 
         # Vector along each edge
-        along_edge = self.nodes[:, face_nodes[next_node]] - self.nodes[:, face_nodes]
+        along_edge = end_nodes - start_nodes
         # Vector from face center to start node of each edge
-        face_2_node = tmp_face_center.transpose() - self.nodes[:, face_nodes]
+        face_2_node = tmp_face_center.transpose() - start_nodes
 
         # Assign a normal vector with this edge, by taking the cross product between
         # along_edge and face_2_node. Divide by two to ensure that the normal vector has
@@ -590,11 +606,7 @@ class Grid:
 
         # Centers of sub-faces are given by the centroid coordinates, e.g. the mean
         # coordinate of the edge endpoints and the temporary face center
-        sub_centroids = (
-            self.nodes[:, face_nodes]
-            + self.nodes[:, face_nodes[next_node]]
-            + tmp_face_center.transpose()
-        ) / 3
+        sub_centroids = (start_nodes + end_nodes + tmp_face_center.transpose()) / 3
 
         # Face normals are given as the sum of the sub-components
         face_normals = sub_normals * edge_2_face
@@ -632,7 +644,10 @@ class Grid:
         # elements are signed (contains the divergence). Note that edge_2_cell will
         # contain more elements than edge_2_face, since the former will count internal
         # faces twice (one for each adjacent cell)
-        edge_2_cell = edge_2_face * np.abs(self.cell_faces)
+        # The signed version of the mapping has the same sparsity pattern, since each
+        # edge belongs to a single face, and its elements are the orientation of the
+        # face seen from the cell.
+        edge_2_cell = edge_2_face * self.cell_faces
         # Sort indices to avoid messing up the mappings later
         edge_2_cell.sort_indices()
 
@@ -680,9 +695,9 @@ class Grid:
             sub_centroids[:, edge_numbers] - tmp_cell_centers[:, cell_numbers]
         )
 
-        # Get sign of normal vectors, seen from all faces. Make sure we get a numpy
-        # ndarray, and not a matrix (.A), and that the array is 1D (squeeze)
-        orientation = np.squeeze(self.cell_faces[face_numbers, cell_numbers].A)
+        # Get sign of normal vectors, seen from all faces. These are the elements of
+        # the signed edge-cell mapping.
+        orientation = edge_2_cell.data
 
         # Get outwards pointing sub-normals for all sub-faces: We need to account for
         # both the orientation of the face, and the orientation of sub-faces relative to
@@ -716,9 +731,60 @@ class Grid:
         self.cell_centers = cell_centers
         self.cell_volumes = cell_volumes
 
+    def _cached(self, name: str, compute: Callable[[], Any]) -> Any:
+        """Memoize a quantity derived from the topology and node coordinates.
+
+        The memoized quantities are recomputed if any of :attr:`nodes`,
+        :attr:`face_nodes` and :attr:`cell_faces` (or the arrays of the sparse
+        matrices) is replaced, or if the number of non-zeros of the sparse matrices
+        changes. Modifications of the values in place are not detected, but reset the
+        memoized quantities if followed by a call to :meth:`compute_geometry`.
+
+        Arrays are returned as read-only, and sparse matrices should not be modified
+        in place.
+
+        Parameters:
+            name: Name of the quantity.
+            compute: Function computing the quantity.
+
+        Returns:
+            The memoized quantity.
+
+        """
+        face_nodes, cell_faces = self.face_nodes, self.cell_faces
+        sources = (
+            self.nodes,
+            face_nodes,
+            face_nodes.indices,
+            face_nodes.indptr,
+            face_nodes.nnz,
+            cell_faces,
+            cell_faces.indices,
+            cell_faces.indptr,
+            cell_faces.data,
+            cell_faces.nnz,
+        )
+        # Compare by identity, the arrays themselves are kept alive by the cache to
+        # avoid reuse of their ids.
+        if len(sources) != len(self._topology_cache_sources) or any(
+            a is not b and not (isinstance(a, int) and a == b)
+            for a, b in zip(sources, self._topology_cache_sources)
+        ):
+            self._topology_cache.clear()
+            self._topology_cache_sources = sources
+
+        if name not in self._topology_cache:
+            value = compute()
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+            self._topology_cache[name] = value
+        return self._topology_cache[name]
+
     def cell_nodes(self) -> sps.csc_matrix:
         """Obtain mapping between cells and nodes.
 
+        The mapping is memoized, see :meth:`_cached`, and should not be modified.
+
         Returns:
             An array with ``shape=(num_nodes, num_cells)`` representing the mapping from
             cells to nodes spanning respective cell.
@@ -726,17 +792,18 @@ class Grid:
             The value 1 indicates a connection between a cell and node column-wise.
 
         """
-        mat = (self.face_nodes * np.abs(self.cell_faces)) > 0
-        return mat
+        return self._cached(
+            "cell_nodes", lambda: (self.face_nodes * np.abs(self.cell_faces)) > 0
+        )
 
     def num_cell_nodes(self) -> np.ndarray:
         """
         Returns:
-            An array with ``shape=(num_cells,)`` containing the number of nodes per
-            cell.
+            A read-only array with ``shape=(num_cells,)`` containing the number of
+            nodes per cell.
 
         """
-        return self.cell_nodes().sum(axis=0).A.ravel("F")
+        return self._cached("num_cell_nodes", lambda: np.diff(self.cell_nodes().indptr))
 
     def get_internal_nodes(self) -> np.ndarray:
         """
@@ -862,6 +929,8 @@ class Grid:
     def cell_diameters(self, cn: Optional[sps.spmatrix] = None) -> np.ndarray:
         """Computes the cell diameters.
 
+        The diameters are memoized if ``cn`` is not given, see :meth:`_cached`.
+
         Parameters:
             cn: ``default=None``
                 Cell-to-nodes map, already computed previously.
@@ -876,25 +945,45 @@ class Grid:
         if self.dim == 0:
             return np.zeros(1)
 
-        def comb(n):
-            return np.fromiter(
-                itertools.chain.from_iterable(itertools.combinations(n, 2)), n.dtype
-            ).reshape((2, -1), order="F")
-
-        def diam(n):
-            return np.amax(
-                np.linalg.norm(self.nodes[:, n[0, :]] - self.nodes[:, n[1, :]], axis=0)
+        if cn is None:
+            return self._cached(
+                "cell_diameters",
+                lambda: self._compute_cell_diameters(self.cell_nodes()),
             )
+        return self._compute_cell_diameters(sps.csc_matrix(cn))
 
-        if cn is None:
-            cn = self.cell_nodes()
-        return np.array(
-            [
-                diam(comb(cn.indices[cn.indptr[c] : cn.indptr[c + 1]]))
-                for c in np.arange(self.num_cells)
-            ]
+    def _compute_cell_diameters(self, cn: sps.csc_matrix) -> np.ndarray:
+        """Compute the cell diameters as the maximum distance between pairs of nodes
+        of each cell.
+
+        Parameters:
+            cn: Cell-to-nodes map.
+
+        Returns:
+            Values of the cell diameter for each cell, ``(shape=(num_cells))``.
+
+        """
+        # Pair each entry in the cell-node map with all later entries of the same cell.
+        # For entry i of a cell, the partners are entries i+1, ..., end of cell.
+        num_nodes_of_cell = np.diff(cn.indptr)
+        entry_end = np.repeat(cn.indptr[1:], num_nodes_of_cell)
+        entries = np.arange(cn.indptr[-1])
+        first = np.repeat(entries, entry_end - entries - 1)
+        second = mcolon.mcolon(entries + 1, entry_end)
+
+        dist = np.linalg.norm(
+            self.nodes[:, cn.indices[first]] - self.nodes[:, cn.indices[second]], axis=0
         )
 
+        # The pairs are sorted by cells. Take the maximum over the pairs of each cell.
+        num_pairs = num_nodes_of_cell * (num_nodes_of_cell - 1) // 2
+        diameters = np.zeros(self.num_cells)
+        has_pairs = num_pairs > 0
+        if np.any(has_pairs):
+            pair_ptr = np.cumsum(num_pairs) - num_pairs
+            diameters[has_pairs] = np.maximum.reduceat(dist, pair_ptr[has_pairs])
+        return diameters
+
     def cell_face_as_dense(self) -> np.ndarray:
         """Obtain the cell-face relation in the form of two rows, rather than a
         sparse matrix.
@@ -930,6 +1019,8 @@ class Grid:
         """Get a matrix representation of cell-cell connections, as defined by
         two cells sharing a face.
 
+        The map is memoized, see :meth:`_cached`, and should not be modified.
+
         Returns:
             A sparse matrix with ``(shape=(num_cells, num_cells), dtype=bool)``.
 
@@ -938,6 +1029,10 @@ class Grid:
 
         """
 
+        return self._cached("cell_connection_map", self._compute_cell_connection_map)
+
+    def _compute_cell_connection_map(self) -> sps.csr_matrix:
+        """Compute the cell-cell connections, see :meth:`cell_connection_map`."""
         # Create a copy of the cell-face relation, so that we can modify it at
         # will
         cell_faces = self.cell_faces.copy()
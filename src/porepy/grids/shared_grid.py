@@ -0,0 +1,161 @@
+"""Zero-copy sharing of grids with worker processes.
+
+Passing a grid to a worker process, e.g., by :mod:`multiprocessing` or
+:mod:`concurrent.futures`, normally pickles all arrays of the grid, including the
+node coordinates, the sparse matrices ``face_nodes`` and ``cell_faces`` and the
+geometry. For large grids and many tasks, this dominates the cost of process-parallel
+work such as parameter sweeps.
+
+:class:`SharedGrid` instead writes the arrays of a grid, a mortar grid or a
+mixed-dimensional grid once to a memory-mapped file, by default in the shared memory
+file system ``/dev/shm`` where available. Only a small :class:`SharedGridHandle`,
+containing the file path and the structure of the grid objects, is passed to the
+workers. :meth:`SharedGridHandle.attach` reconstructs the grid objects, whose arrays,
+including the data, indices and index pointers of sparse matrices, are read-only views
+of the mapped file. Reconstructed grids have the same :attr:`~porepy.grids.grid.Grid.id`
+as the original ones.
+
+Example:
+
+    >>> with pp.SharedGrid(mdg) as shared:
+    ...     with multiprocessing.Pool() as pool:
+    ...         results = pool.map(run_case, [(shared.handle, p) for p in params])
+
+where ``run_case`` calls ``handle.attach()`` to obtain the mixed-dimensional grid.
+
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import pickle
+import tempfile
+import weakref
+from pathlib import Path
+from typing import Any, NamedTuple, Optional, Union
+
+import porepy as pp
+
+__all__ = ["SharedGrid", "SharedGridHandle"]
+
+_ALIGNMENT = 64
+"""Alignment in bytes of the arrays in the mapped file."""
+
+
+class SharedGridHandle(NamedTuple):
+    """Picklable reference to a grid placed in a memory-mapped file by
+    :class:`SharedGrid`."""
+
+    path: str
+    """Path of the memory-mapped file."""
+
+    payload: bytes
+    """Pickled grid objects, with the arrays stored out-of-band in the file."""
+
+    offsets: tuple[int, ...]
+    """Offset of each array in the file."""
+
+    sizes: tuple[int, ...]
+    """Size of each array in bytes."""
+
+    def attach(self) -> Any:
+        """Reconstruct the grid objects from the memory-mapped file.
+
+        The arrays of the returned objects are read-only views of the file, which
+        stays mapped as long as any of the arrays is in use.
+
+        Returns:
+            A grid, mortar grid or mixed-dimensional grid, as passed to
+            :class:`SharedGrid`.
+
+        """
+        if sum(self.sizes) == 0:
+            buffers: list = [b""] * len(self.sizes)
+        else:
+            with open(self.path, "rb") as f:
+                view = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            buffers = [
+                view[offset : offset + size]
+                for offset, size in zip(self.offsets, self.sizes)
+            ]
+        return pickle.loads(self.payload, buffers=buffers)
+
+
+class SharedGrid:
+    """Place a grid in a memory-mapped file, to be shared with worker processes.
+
+    The arrays of the grid objects are copied to the file once. The object may be
+    modified afterwards without affecting the shared version.
+
+    The file is deleted by :meth:`close`, when leaving a ``with`` block, or when this
+    object is garbage collected. Workers which have attached the grid can continue to
+    use it.
+
+    Parameters:
+        grid: Grid, mortar grid or mixed-dimensional grid to be shared. Data
+            dictionaries of a mixed-dimensional grid are included.
+        directory: Directory of the memory-mapped file. Defaults to ``/dev/shm`` if
+            available, otherwise to the directory for temporary files.
+
+    """
+
+    def __init__(
+        self,
+        grid: Union[pp.Grid, pp.MortarGrid, pp.MixedDimensionalGrid],
+        directory: Optional[Union[str, Path]] = None,
+    ) -> None:
+        # Pickle with protocol 5, which hands the (contiguous) numpy arrays out of
+        # band, such that they can be placed in the file. The grid is pickled before
+        # the file is created, such that no file is left behind if pickling fails.
+        buffers: list[pickle.PickleBuffer] = []
+        payload = pickle.dumps(grid, protocol=5, buffer_callback=buffers.append)
+
+        if directory is None:
+            directory = "/dev/shm" if os.access("/dev/shm", os.W_OK) else None
+        fd, path = tempfile.mkstemp(prefix="porepy_grid_", dir=directory)
+
+        offsets, sizes = [], []
+        position = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for buffer in buffers:
+                    raw = buffer.raw()
+                    padding = -position % _ALIGNMENT
+                    f.write(b"\0" * padding)
+                    position += padding
+                    offsets.append(position)
+                    sizes.append(raw.nbytes)
+                    f.write(raw)
+                    position += raw.nbytes
+        except BaseException:
+            # E.g., the file system is full.
+            _remove_file(path)
+            raise
+
+        self.handle: SharedGridHandle = SharedGridHandle(
+            path, payload, tuple(offsets), tuple(sizes)
+        )
+        """Handle to be passed to worker processes."""
+
+        self.nbytes: int = position
+        """Size of the memory-mapped file in bytes."""
+
+        self._finalizer = weakref.finalize(self, _remove_file, path)
+
+    def __repr__(self) -> str:
+        return f"Shared grid in {self.handle.path}, {self.nbytes} bytes."
+
+    def __enter__(self) -> SharedGrid:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Delete the memory-mapped file."""
+        self._finalizer()
+
+
+def _remove_file(path: str) -> None:
+    """Remove a file if it exists."""
+    Path(path).unlink(missing_ok=True)
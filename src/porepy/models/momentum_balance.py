@@ -762,6 +762,47 @@ class SolutionStrategyMomentumBalance(pp.SolutionStrategy):
                     },
                 )
 
+    def linear_solver_blocks(self) -> list[np.ndarray]:
+        """Grouping of the degrees of freedom, used by block preconditioners.
+
+        The first block contains the displacements in the matrix and on the
+        interfaces, the second block the contact tractions, and the third block all
+        other degrees of freedom, e.g., pressures and fluxes if the model is coupled to
+        flow. The contact conditions are not suited for multigrid, thus the contact
+        tractions are kept separate from the displacements. The second block is empty
+        if there are no fractures, the third block is empty for pure mechanics.
+
+        Returns:
+            Indices of the degrees of freedom in each block.
+
+        """
+        displacements = np.sort(
+            self.equation_system.dofs_of(
+                [self.displacement_variable, self.interface_displacement_variable]
+            )
+        )
+        tractions = np.sort(
+            self.equation_system.dofs_of([self.contact_traction_variable])
+        )
+        other = np.setdiff1d(
+            np.arange(self.equation_system.num_dofs()),
+            np.concatenate([displacements, tractions]),
+        )
+        return [displacements, tractions, other]
+
+    def linear_solver_block_solvers(self) -> Optional[list[str]]:
+        """Suggested solvers for the blocks of :meth:`linear_solver_blocks`.
+
+        The displacements are approximated by multigrid, the (small) contact traction
+        block is solved directly, and other degrees of freedom are approximated by an
+        incomplete LU factorization.
+
+        Returns:
+            The name of a solver for each block.
+
+        """
+        return ["amg", "direct", "ilu"]
+
     def contact_mechanics_numerical_constant(
         self, subdomains: list[pp.Grid]
     ) -> pp.ad.Scalar:
@@ -37,6 +37,9 @@ def run_stationary_model(model, params: dict) -> None:
         pip install tqdm
         ```
 
+        If the ``"matrix_free"`` key in ``params`` is set to ``True``, nonlinear
+        problems are solved by the matrix-free :class:`~porepy.NewtonKrylovSolver`.
+
     Parameters:
         model: Model class containing all information on parameters, variables,
             discretization, geometry. Various methods such as those relating to solving
@@ -48,7 +51,9 @@ def run_stationary_model(model, params: dict) -> None:
     model.prepare_simulation()
 
     solver: Union[pp.LinearSolver, pp.NewtonSolver]
-    if model._is_nonlinear_problem():
+    if model._is_nonlinear_problem() and params.get("matrix_free", False):
+        solver = pp.NewtonKrylovSolver(params)
+    elif model._is_nonlinear_problem():
         solver = pp.NewtonSolver(params)
     else:
         solver = pp.LinearSolver(params)
@@ -70,6 +75,9 @@ def run_time_dependent_model(model, params: dict) -> None:
         pip install tqdm
         ```
 
+        If the ``"matrix_free"`` key in ``params`` is set to ``True``, nonlinear
+        problems are solved by the matrix-free :class:`~porepy.NewtonKrylovSolver`.
+
     Parameters:
         model: Model class containing all information on parameters, variables,
             discretization, geometry. Various methods such as those relating to solving
@@ -93,7 +101,9 @@ def run_time_dependent_model(model, params: dict) -> None:
     # Assign a solver
     solver: Union[pp.LinearSolver, pp.NewtonSolver]
 
-    if model._is_nonlinear_problem():
+    if model._is_nonlinear_problem() and params.get("matrix_free", False):
+        solver = pp.NewtonKrylovSolver(params)
+    elif model._is_nonlinear_problem():
         solver = pp.NewtonSolver(params)
     else:
         solver = pp.LinearSolver(params)
@@ -165,6 +175,9 @@ def _run_iterative_model(model, params: dict) -> None:
         pip install tqdm
         ```
 
+        If the ``"matrix_free"`` key in ``params`` is set to ``True``, nonlinear
+        problems are solved by the matrix-free :class:`~porepy.NewtonKrylovSolver`.
+
     Parameters:
         model: Model class containing all information on parameters, variables,
             discretization, geometry. Various methods such as those relating to solving
@@ -187,7 +200,9 @@ def _run_iterative_model(model, params: dict) -> None:
     # Assign a solver
     solver: Union[pp.LinearSolver, pp.NewtonSolver]
 
-    if model._is_nonlinear_problem():
+    if model._is_nonlinear_problem() and params.get("matrix_free", False):
+        solver = pp.NewtonKrylovSolver(params)
+    elif model._is_nonlinear_problem():
         solver = pp.NewtonSolver(params)
     else:
         solver = pp.LinearSolver(params)
@@ -9,7 +9,6 @@ from __future__ import annotations
 import abc
 import logging
 import time
-import warnings
 from pathlib import Path
 from typing import Any, Callable, Optional
 
@@ -46,6 +45,11 @@ class SolutionStrategy(abc.ABC):
     """Save data at a time step. Normally provided by a mixin instance of
     :class:`~porepy.viz.data_saving_model_mixin.DataSavingMixin`.
 
+    """
+    finalize_data_saving: Callable[[], None]
+    """Finalize data saving. Normally provided by a mixin instance of
+    :class:`~porepy.viz.data_saving_model_mixin.DataSavingMixin`.
+
     """
     create_variables: Callable[[], None]
     """Create variables. Normally provided by a mixin instance of a Variable class
@@ -120,6 +124,15 @@ class SolutionStrategy(abc.ABC):
 
         """
         self._nonlinear_discretizations: list[pp.ad._ad_utils.MergedOperator] = []
+        self.linear_solver: str | pp.linear_solver_backends.LinearSolverBackend
+        """Backend of the linear solver. Will be set by
+        :meth:`_initialize_linear_solver`.
+
+        Overrides of :meth:`_initialize_linear_solver` may also set the name of a
+        registered backend. The name is then replaced by the backend the first time
+        :meth:`solve_linear_system` is called.
+
+        """
         self.exporter: pp.Exporter
         """Exporter for visualization."""
 
@@ -209,9 +222,46 @@ class SolutionStrategy(abc.ABC):
         self.save_data_time_step()
 
     def set_equation_system_manager(self) -> None:
-        """Create an equation_system manager on the mixed-dimensional grid."""
+        """Create an equation_system manager on the mixed-dimensional grid.
+
+        The number of threads used for assembly of the linear system is controlled by
+        the model parameter ``max_assembly_workers`` (default 1, i.e., serial
+        assembly). If the model parameter ``reuse_jacobian_pattern`` is True (default
+        False), the sparsity pattern of the Jacobian is recorded, and later assemblies
+        only update its values. If the model parameter ``incremental_assembly`` is True
+        (default False), equations whose inputs did not change are not reevaluated. See
+        :class:`~porepy.numerics.ad.equation_system.EquationSystem`.
+
+        Discretization matrices are stored in a persistent on-disk cache if the model
+        parameter ``discretization_cache`` is given, either as a directory or as a
+        :class:`~porepy.numerics.discretization_cache.DiscretizationCache`. For a
+        directory, the maximum size of the cache in bytes is set by the model parameter
+        ``discretization_cache_max_size``. The cache is used by :meth:`discretize`, but
+        not by :meth:`rediscretize`, since nonlinear discretizations change in every
+        iteration.
+
+        """
+        cache_param = self.params.get("discretization_cache", None)
+        cache: Optional[pp.DiscretizationCache]
+        if cache_param is None or isinstance(cache_param, pp.DiscretizationCache):
+            cache = cache_param
+        else:
+            cache = pp.DiscretizationCache(
+                cache_param,
+                max_size=int(self.params.get("discretization_cache_max_size", 2**30)),
+            )
         if not hasattr(self, "equation_system"):
-            self.equation_system = pp.ad.EquationSystem(self.mdg)
+            self.equation_system = pp.ad.EquationSystem(
+                self.mdg,
+                max_assembly_workers=int(self.params.get("max_assembly_workers", 1)),
+                reuse_jacobian_pattern=bool(
+                    self.params.get("reuse_jacobian_pattern", False)
+                ),
+                discretization_cache=cache,
+                incremental_assembly=bool(
+                    self.params.get("incremental_assembly", False)
+                ),
+            )
 
     def set_discretization_parameters(self) -> None:
         """Set parameters for the discretization.
@@ -330,18 +380,79 @@ class SolutionStrategy(abc.ABC):
         # iteration).
         self.equation_system.discretize()
         logger.info("Discretized in {} seconds".format(time.time() - tic))
+        self.store_discretization_matrices()
 
     def rediscretize(self) -> None:
-        """Discretize nonlinear terms."""
+        """Discretize nonlinear terms.
+
+        If the model parameter ``partial_rediscretization`` is True (default False),
+        Mpfa and Mpsa discretizations only recompute the stencils affected by changes
+        in the permeability or stiffness since the last rediscretization, see
+        :func:`~porepy.numerics.fv.fvutils.rediscretize_modified_cells`. The first
+        rediscretization is always a full one.
+
+        """
         tic = time.time()
         # Uniquify to save computational time, then discretize.
         unique_discr = pp.ad._ad_utils.uniquify_discretization_list(
             self.nonlinear_discretizations
         )
+        self._set_partial_rediscretization(unique_discr)
         pp.ad._ad_utils.discretize_from_list(unique_discr, self.mdg)
         logger.info(
             "Re-discretized nonlinear terms in {} seconds".format(time.time() - tic)
         )
+        self.store_discretization_matrices()
+
+    def _set_partial_rediscretization(self, discretizations: dict) -> None:
+        """Enable partial rediscretization of nonlinear discretizations, if requested
+        by the model parameter ``partial_rediscretization``.
+
+        Parameters:
+            discretizations: Mapping from discretizations to the grids on which they
+                are applied, see
+                :func:`~porepy.numerics.ad._ad_utils.uniquify_discretization_list`.
+
+        """
+        if not self.params.get("partial_rediscretization", False):
+            return
+        for discr, grids in discretizations.items():
+            for sd in grids:
+                if isinstance(sd, pp.MortarGrid):
+                    continue
+                parameters = self.mdg.subdomain_data(sd)[pp.PARAMETERS]
+                if discr.keyword in parameters:
+                    parameters[discr.keyword]["partial_rediscretization"] = True
+
+    def store_discretization_matrices(self) -> None:
+        """Reduce the memory held by discretization matrices.
+
+        Called after :meth:`discretize` and :meth:`rediscretize`. Two measures are
+        controlled by model parameters, see :mod:`~porepy.numerics.out_of_core`:
+
+        - ``drop_unreferenced_discretization_matrices``: If True (default False),
+          matrices which are not referenced by any equation of the equation system are
+          deleted. Matrices used outside the equations, e.g., for postprocessing, must
+          then be rediscretized by the user.
+        - ``memory_map_discretization_matrices``: If True or a directory (default
+          False), large matrices are moved to memory-mapped files, either in a
+          temporary directory or in the given one.
+
+        """
+        if self.params.get("drop_unreferenced_discretization_matrices", False):
+            freed = pp.out_of_core.drop_unreferenced_matrices(
+                self.mdg, self.equation_system.referenced_discretization_matrices()
+            )
+            logger.info(f"Dropped {freed} bytes of unreferenced matrices.")
+
+        directory = self.params.get("memory_map_discretization_matrices", False)
+        if directory is False or directory is None:
+            return
+        if not hasattr(self, "_matrix_storage"):
+            self._matrix_storage = pp.out_of_core.MemoryMappedMatrixStorage(
+                None if directory is True else directory
+            )
+        self._matrix_storage.store_discretization_matrices(self.mdg)
 
     @property
     def nonlinear_discretizations(self) -> list[pp.ad._ad_utils.MergedOperator]:
@@ -383,6 +494,11 @@ class SolutionStrategy(abc.ABC):
         """
         # Reset counter for nonlinear iterations.
         self._nonlinear_iteration = 0
+        # Factorizations of the Jacobian are not reused across time steps.
+        if isinstance(
+            self.linear_solver, pp.linear_solver_backends.LinearSolverBackend
+        ):
+            self.linear_solver.reset_factorization()
         # Update time step size.
         self.ad_time_step.set_value(self.time_manager.dt)
 
@@ -455,7 +571,8 @@ class SolutionStrategy(abc.ABC):
 
     def after_simulation(self) -> None:
         """Run at the end of simulation. Can be used for cleanup etc."""
-        pass
+        # Make sure all data is written to file, also with asynchronous export.
+        self.finalize_data_saving()
 
     def check_convergence(
         self,
@@ -515,23 +632,85 @@ class SolutionStrategy(abc.ABC):
     def _initialize_linear_solver(self) -> None:
         """Initialize linear solver.
 
-        The default linear solver is Pardiso; this can be overridden by user choices.
-        If Pardiso is not available, backup solvers will automatically be invoked in
-        :meth:`solve_linear_system`.
+        The linear solver is given by the model parameter ``linear_solver``, either as
+        the name of a registered backend (see
+        :mod:`~porepy.numerics.linalg.linear_solver_backends`), or as a backend object.
+        The default linear solver is Pardiso; if Pardiso is not available, the SciPy
+        backend is used instead.
+
+        The model parameter ``linear_solver_factorization_reuse`` (default 0) sets the
+        number of Newton iterations for which the numerical factorization of the
+        Jacobian is reused (chord Newton), see
+        :class:`~porepy.numerics.linalg.linear_solver_backends.LinearSolverBackend`.
+        The factorization is always recomputed at the start of a time step. Further
+        options for the backend, e.g., tolerances of Krylov solvers, can be passed as a
+        dictionary in the model parameter ``linear_solver_options``.
+
+        Backends with block preconditioners are informed about the block structure of
+        the system, as defined by :meth:`linear_solver_blocks` and
+        :meth:`linear_solver_block_solvers`.
 
-        To use a custom solver in a model, override this method (and possibly
-        :meth:`solve_linear_system`).
+        To use a custom solver in a model, register a new backend, or override this
+        method (and possibly :meth:`solve_linear_system`).
 
         Raises:
-            ValueError if the chosen solver is not among the three currently supported,
-            see linear_solve.
+            ValueError if the chosen solver is not among the registered backends.
 
         """
-        solver = self.params["linear_solver"]
-        self.linear_solver = solver
+        self.linear_solver = self._linear_solver_backend(self.params["linear_solver"])
 
-        if solver not in ["scipy_sparse", "pypardiso", "umfpack"]:
-            raise ValueError(f"Unknown linear solver {solver}")
+    def _linear_solver_backend(
+        self, solver: str | pp.linear_solver_backends.LinearSolverBackend
+    ) -> pp.linear_solver_backends.LinearSolverBackend:
+        """Create the backend of a linear solver given by name, and inform it about
+        the block structure of the system.
+
+        Parameters:
+            solver: Name of a registered backend, or a backend object.
+
+        Returns:
+            The backend.
+
+        """
+        if not isinstance(solver, pp.linear_solver_backends.LinearSolverBackend):
+            options: Any = self.params.get("linear_solver_options", {})
+            assert isinstance(options, dict)
+            solver = pp.linear_solver_backends.create_linear_solver_backend(
+                solver,
+                factorization_reuse=int(
+                    self.params.get("linear_solver_factorization_reuse", 0)
+                ),
+                **options,
+            )
+        solver.set_block_structure(
+            self.linear_solver_blocks(), self.linear_solver_block_solvers()
+        )
+        return solver
+
+    def linear_solver_blocks(self) -> list[np.ndarray]:
+        """Grouping of the degrees of freedom, used by block preconditioners.
+
+        The default is a single block containing all degrees of freedom. Models with
+        several coupled subproblems should override this method.
+
+        Returns:
+            Indices of the degrees of freedom in each block.
+
+        """
+        return [np.arange(self.equation_system.num_dofs())]
+
+    def linear_solver_block_solvers(self) -> Optional[list[str]]:
+        """Suggested solvers for the blocks of :meth:`linear_solver_blocks`.
+
+        See :class:`~porepy.numerics.linalg.linear_solver_backends.GmresBackend` for
+        the available solvers.
+
+        Returns:
+            The name of a solver for each block, or None to leave the choice to the
+            backend.
+
+        """
+        return None
 
     def assemble_linear_system(self) -> None:
         """Assemble the linearized system and store it in :attr:`linear_system`.
@@ -547,9 +726,15 @@ class SolutionStrategy(abc.ABC):
         """Solve linear system.
 
         Default method is a direct solver. The linear solver is chosen in the
-        initialize_linear_solver of this model. Implemented options are
-            - scipy.sparse.spsolve with and without call to umfpack
-            - pypardiso.spsolve
+        initialize_linear_solver of this model. Implemented options are the registered
+        backends of :mod:`~porepy.numerics.linalg.linear_solver_backends`, currently
+            - scipy.sparse.linalg.splu
+            - pypardiso
+            - umfpack
+
+        The backend reuses the symbolic analysis of the matrix as long as the sparsity
+        pattern is unchanged. The time spent in the different phases of the solver is
+        available in ``self.linear_solver.timings``.
 
         See also:
             :meth:`initialize_linear_solver`
@@ -560,37 +745,18 @@ class SolutionStrategy(abc.ABC):
         """
         A, b = self.linear_system
         t_0 = time.time()
-        logger.debug(f"Max element in A {np.max(np.abs(A)):.2e}")
-        logger.debug(
-            f"""Max {np.max(np.sum(np.abs(A), axis=1)):.2e} and min
-            {np.min(np.sum(np.abs(A), axis=1)):.2e} A sum."""
-        )
-
-        solver = self.linear_solver
-        if solver == "pypardiso":
-            # This is the default option which is invoked unless explicitly overridden
-            # by the user. We need to check if the pypardiso package is available.
-            try:
-                from pypardiso import spsolve as sparse_solver  # type: ignore
-            except ImportError:
-                # Fall back on the standard scipy sparse solver.
-                sparse_solver = sps.linalg.spsolve
-                warnings.warn(
-                    """PyPardiso could not be imported,
-                    falling back on scipy.sparse.linalg.spsolve"""
-                )
-            x = sparse_solver(A, b)
-        elif solver == "umfpack":
-            # Following may be needed:
-            # A.indices = A.indices.astype(np.int64)
-            # A.indptr = A.indptr.astype(np.int64)
-            x = sps.linalg.spsolve(A, b, use_umfpack=True)
-        elif solver == "scipy_sparse":
-            x = sps.linalg.spsolve(A, b)
-        else:
-            raise ValueError(
-                f"AbstractModel does not know how to apply the linear solver {solver}"
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Max element in A {np.max(np.abs(A)):.2e}")
+            logger.debug(
+                f"""Max {np.max(np.sum(np.abs(A), axis=1)):.2e} and min
+                {np.min(np.sum(np.abs(A), axis=1)):.2e} A sum."""
             )
+
+        if isinstance(self.linear_solver, str):
+            # The solver was given by name, by an override of
+            # _initialize_linear_solver.
+            self.linear_solver = self._linear_solver_backend(self.linear_solver)
+        x = self.linear_solver.solve(A, b)
         logger.info(f"Solved linear system in {time.time()-t_0:.2e} seconds.")
 
         return np.atleast_1d(x)
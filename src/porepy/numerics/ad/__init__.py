@@ -12,9 +12,11 @@ from . import (
     discretizations,
     equation_manager,
     equation_system,
+    evaluation_plan,
     forward_mode,
     functions,
     grid_operators,
+    jacobian_pattern,
     operator_functions,
     operators,
     time_derivatives,
@@ -22,9 +24,11 @@ from . import (
 from .discretizations import *
 from .equation_manager import *
 from .equation_system import *
+from .evaluation_plan import *
 from .forward_mode import *
 from .functions import *
 from .grid_operators import *
+from .jacobian_pattern import *
 from .operator_functions import *
 from .operators import *
 from .time_derivatives import *
@@ -37,4 +41,6 @@ __all__.extend(forward_mode.__all__)
 __all__.extend(grid_operators.__all__)
 __all__.extend(equation_manager.__all__)
 __all__.extend(equation_system.__all__)
+__all__.extend(evaluation_plan.__all__)
+__all__.extend(jacobian_pattern.__all__)
 __all__.extend(time_derivatives.__all__)
@@ -149,9 +149,18 @@ def uniquify_discretization_list(
 def discretize_from_list(
     discretizations: dict,
     mdg: pp.MixedDimensionalGrid,
+    cache: Optional[pp.DiscretizationCache] = None,
 ) -> None:
     """For a list of (ideally uniquified) discretizations, perform the actual
     discretization.
+
+    Parameters:
+        discretizations: Mapping from discretizations to the grids on which they
+            should be applied, see :func:`uniquify_discretization_list`.
+        mdg: Mixed-dimensional grid.
+        cache: If given, discretizations on subdomains are loaded from, or stored in,
+            the cache.
+
     """
     for discr in discretizations:
         # discr is a discretization (on node or interface in the MixedDimensionalGrid sense)
@@ -169,7 +178,10 @@ def discretize_from_list(
             else:
                 data = mdg.subdomain_data(g)
                 try:
-                    discr.discretize(g, data)
+                    if cache is None:
+                        discr.discretize(g, data)
+                    else:
+                        cache.discretize(discr, g, data)
                 except NotImplementedError:
                     # This will likely be GradP and other Biot discretizations
                     pass
@@ -250,16 +262,22 @@ class MergedOperator(operators.Operator):
             sps.spmatrix: The merged discretization matrices for the associated matrix.
 
         """
+        return self.merge_matrices(self.discretization_matrices(mdg))
+
+    def discretization_matrices(self, mdg: pp.MixedDimensionalGrid) -> list:
+        """Get the discretization matrices of this operator on the individual grids.
+
+        Parameters:
+            mdg: Mixed-dimensional grid.
+
+        Returns:
+            The discretization matrix for each item in ``mat_dict_grids``, as stored
+            in the data dictionaries.
 
+        """
         # Data structure for matrices
         mat = []
 
-        if len(self.mat_dict_grids) == 0:
-            # The underlying discretization is constructed on an empty grid list, quite
-            # likely on a mixed-dimensional grid containing no mortar subdomains.
-            # We can return an empty matrix.
-            return sps.csc_matrix((0, 0))
-
         # Loop over all grid-discretization combinations, get hold of the discretization
         # matrix for this grid quantity
         for g in self.mat_dict_grids:
@@ -278,6 +296,25 @@ class MergedOperator(operators.Operator):
             mat_key = getattr(self.discr, key + "_matrix_key")
             mat.append(mat_dict[mat_key])
 
+        return mat
+
+    def merge_matrices(self, mat: list):
+        """Merge discretization matrices of individual grids.
+
+        Parameters:
+            mat: Discretization matrices as returned by
+                :meth:`discretization_matrices`.
+
+        Returns:
+            sps.spmatrix: The merged discretization matrices for the associated matrix.
+
+        """
+        if len(self.mat_dict_grids) == 0:
+            # The underlying discretization is constructed on an empty grid list, quite
+            # likely on a mixed-dimensional grid containing no mortar subdomains.
+            # We can return an empty matrix.
+            return sps.csc_matrix((0, 0))
+
         if all([isinstance(m, np.ndarray) for m in mat]):
             if all([m.ndim == 1 for m in mat]):
                 # This is a vector (may happen e.g. for right-hand side terms that are
@@ -297,5 +334,13 @@ class MergedOperator(operators.Operator):
                 # raise an error, and rethink if we ever get here.
                 raise NotImplementedError("")
         else:
+            if (
+                len(mat) == 1
+                and mat[0].format == "csr"
+                and pp.out_of_core.is_memory_mapped(mat[0])
+            ):
+                # A memory-mapped matrix is read-only, thus it can be used without a
+                # copy. This avoids keeping the matrix in memory.
+                return mat[0]
             # This is a standard term; wrap it in a diagonal sparse matrix
             return sps.block_diag(mat, format="csr")
@@ -4,6 +4,7 @@ using the AD framework.
 """
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Callable, Literal, Optional, Sequence, Union
 
 import numpy as np
@@ -13,6 +14,8 @@ from typing_extensions import TypeAlias
 import porepy as pp
 
 from . import _ad_utils
+from .evaluation_plan import EvaluationPlan
+from .jacobian_pattern import JacobianPattern
 from .operators import MixedDimensionalVariable, Operator, Variable
 
 __all__ = ["EquationSystem"]
@@ -122,11 +125,61 @@ class EquationSystem:
 
     """
 
-    def __init__(self, mdg: pp.MixedDimensionalGrid) -> None:
+    def __init__(
+        self,
+        mdg: pp.MixedDimensionalGrid,
+        max_assembly_workers: int = 1,
+        reuse_jacobian_pattern: bool = False,
+        discretization_cache: Optional[pp.DiscretizationCache] = None,
+        incremental_assembly: bool = False,
+    ) -> None:
         ### PUBLIC
         self.mdg: pp.MixedDimensionalGrid = mdg
         """Mixed-dimensional domain passed at instantiation."""
 
+        self.max_assembly_workers: int = max_assembly_workers
+        """Maximum number of threads used to assemble the system.
+
+        If larger than 1, independent operations in the equations, as well as the
+        restriction of the equations to the requested grids, are evaluated
+        concurrently in a thread pool. The assembled system is the same as for serial
+        assembly, which is the default.
+
+        """
+
+        self.reuse_jacobian_pattern: bool = reuse_jacobian_pattern
+        """If True, the sparsity pattern of assembled Jacobians is recorded, and later
+        assemblies of the same (sub)system write the values into the matrix returned by
+        the previous assembly, see
+        :class:`~porepy.numerics.ad.jacobian_pattern.JacobianPattern`.
+
+        Note that the returned matrix is then modified by subsequent assemblies of the
+        same (sub)system. Defaults to False.
+
+        """
+
+        self.incremental_assembly: bool = incremental_assembly
+        """If True, the assembly methods reuse the Jacobian blocks and residuals of
+        equations whose inputs did not change since the last assembly, and update the
+        residuals of equations which are affine in the variables by a sparse
+        matrix-vector product, see
+        :meth:`~porepy.numerics.ad.evaluation_plan.EvaluationPlan.evaluate_incremental`.
+
+        This pays off for systems with linear equations, or equations which depend
+        only on some of the variables, at the cost of storing the Jacobian blocks of
+        all equations. Defaults to False.
+
+        """
+
+        self.discretization_cache: Optional[
+            pp.DiscretizationCache
+        ] = discretization_cache
+        """If given, discretization matrices are loaded from this on-disk cache in
+        :meth:`discretize` when possible, and stored in it otherwise. See
+        :class:`~porepy.numerics.discretization_cache.DiscretizationCache`.
+
+        """
+
         self.assembled_equation_indices: dict[str, np.ndarray] = dict()
         """Contains the row indices in the last assembled (sub-) system for a given
         equation name (key).
@@ -199,6 +252,32 @@ class EquationSystem:
 
         """
 
+        self._dof_numbering_version: int = 0
+        """Counter which is increased every time the numbering of DOFs changes.
+
+        Used to invalidate cached information which depends on the DOF numbering, such
+        as the evaluation plans of operators (see :meth:`Operator.compile`).
+
+        """
+
+        self._evaluation_plans: dict[tuple[str, ...], EvaluationPlan] = dict()
+        """Evaluation plans for sets of equations (identified by their names), as
+        compiled by :meth:`compile`.
+
+        The plans are reset whenever the set of equations changes.
+
+        """
+
+        self._jacobian_patterns: dict[tuple, JacobianPattern] = dict()
+        """Sparsity patterns of assembled (sub)systems, used if
+        :attr:`reuse_jacobian_pattern` is True.
+
+        The keys identify the equations, their row restrictions, the column subspace
+        and the numbering of the degrees of freedom. The patterns are reset whenever
+        the set of equations changes.
+
+        """
+
     def SubSystem(
         self,
         equation_names: Optional[EquationList] = None,
@@ -240,7 +319,13 @@ class EquationSystem:
             raise ValueError(f"Unknown variable(s) {unknown_variables}.")
 
         # Create the new subsystem.
-        new_equation_system = EquationSystem(self.mdg)
+        new_equation_system = EquationSystem(
+            self.mdg,
+            self.max_assembly_workers,
+            self.reuse_jacobian_pattern,
+            self.discretization_cache,
+            self.incremental_assembly,
+        )
 
         # IMPLEMENTATION NOTE: This method imitates the variable creation and equation
         # setting procedures by calling private methods and accessing private
@@ -904,6 +989,7 @@ class EquationSystem:
         # Replace old block order
         self._variable_num_dofs = np.array(new_block_dofs, dtype=int)
         self._variable_numbers = new_variable_numbers
+        self._dof_numbering_version += 1
 
     def _parse_variable_type(self, variables: Optional[VariableList]) -> list[Variable]:
         """Parse the input argument for the variable type.
@@ -1156,6 +1242,8 @@ class EquationSystem:
             self._equation_image_size_info.update({name: equations_per_grid_entity})
             # Store the equation itself.
             self._equations.update({name: equation})
+            self._evaluation_plans.clear()
+            self._jacobian_patterns.clear()
             return
 
         # We require that equations are defined either on a set of subdomains, or a set
@@ -1223,6 +1311,10 @@ class EquationSystem:
         self._equation_image_size_info.update({name: equations_per_grid_entity})
         # Store the equation itself.
         self._equations.update({name: equation})
+        # Evaluation plans and Jacobian patterns may refer to an equation previously
+        # stored under this name.
+        self._evaluation_plans.clear()
+        self._jacobian_patterns.clear()
 
     def remove_equation(self, name: str) -> Operator | None:
         """Removes a previously set equation and all related information.
@@ -1242,12 +1334,40 @@ class EquationSystem:
             # Note that there is no need to modify the numbering of the other equations,
             # since this is a local (to the equation) numbering.
             del self._equation_image_space_composition[name]
+            self._evaluation_plans.clear()
+            self._jacobian_patterns.clear()
             return equ
         else:
             raise ValueError(f"Cannot remove unknown equation {name}")
 
     ### System assembly and discretization ----------------------------------------------------
 
+    def referenced_discretization_matrices(
+        self, equations: Optional[EquationList | EquationRestriction] = None
+    ) -> dict[pp.GridLike, set[tuple[str, str]]]:
+        """Find the discretization matrices which are used by the equations.
+
+        Parameters:
+            equations (optional): A subset of equations. If not provided (None), all
+                known equations are searched.
+
+        Returns:
+            For each subdomain and interface, the keyword of the matrix dictionary and
+            the key of every matrix used by the equations.
+
+        """
+        referenced: dict[pp.GridLike, set[tuple[str, str]]] = {}
+        for name in self._parse_equations(equations):
+            for op in self._recursive_discretization_search(
+                self._equations[name], list()
+            ):
+                matrix_key = getattr(op.discr, op.key + "_matrix_key")
+                for grid in op.mat_dict_grids:
+                    referenced.setdefault(grid, set()).add(
+                        (op.mat_dict_key, matrix_key)
+                    )
+        return referenced
+
     @staticmethod
     def _recursive_discretization_search(operator: Operator, discr: list) -> list:
         """Recursive search in the tree of this operator to identify all discretizations
@@ -1464,6 +1584,40 @@ class EquationSystem:
                 complement.update({name: None})
         return complement
 
+    def compile(
+        self, equations: Optional[EquationList | EquationRestriction] = None
+    ) -> EvaluationPlan:
+        """Compile a set of equations into a joint evaluation plan.
+
+        Subexpressions which are shared between the equations, or occur several times
+        within an equation, are identified structurally, and are evaluated only once
+        when the plan is evaluated. This is relevant since model equations are
+        typically composed of the same constitutive laws and projections, constructed
+        anew for every equation.
+
+        The plan is cached, and reused until the set of equations or the numbering of
+        degrees of freedom changes.
+
+        Parameters:
+            equations (optional): A subset of equations. If not provided (None), all
+                known equations are compiled. Restrictions to grids are ignored, since
+                the equations are evaluated on all their grids.
+
+        Returns:
+            Evaluation plan, with one root per equation, in the order of
+            ``self._equations``. The number of deduplicated operator nodes is available
+            as ``num_deduplicated_nodes``.
+
+        """
+        names = tuple(self._parse_equations(equations).keys())
+        plan = self._evaluation_plans.get(names)
+        if plan is None or not plan.is_valid_for(self):
+            plan = EvaluationPlan(
+                [self._equations[name] for name in names], self, deduplicate=True
+            )
+            self._evaluation_plans[names] = plan
+        return plan
+
     def discretize(
         self, equations: Optional[EquationList | EquationRestriction] = None
     ) -> None:
@@ -1472,7 +1626,8 @@ class EquationSystem:
 
         This is more efficient than discretizing on the Operator level, since
         discretizations which occur more than once in a set of equations will be
-        identified and only discretized once.
+        identified and only discretized once. If :attr:`discretization_cache` is set,
+        the discretization matrices are loaded from the cache when possible.
 
         Parameters:
             equations (optional): A subset of equations. If not provided (None), all
@@ -1494,7 +1649,9 @@ class EquationSystem:
 
         # Uniquify to save computational time, then discretize.
         unique_discr = _ad_utils.uniquify_discretization_list(discr)
-        _ad_utils.discretize_from_list(unique_discr, self.mdg)
+        _ad_utils.discretize_from_list(
+            unique_discr, self.mdg, self.discretization_cache
+        )
 
     def assemble(
         self,
@@ -1586,25 +1743,41 @@ class EquationSystem:
         ind_start = 0
         self.assembled_equation_indices = dict()
 
+        # Evaluate all equations in one go, using a joint evaluation plan. This way,
+        # subexpressions shared by the equations are evaluated only once.
+        plan = self.compile(list(equ_blocks.keys()))
+
+        def restrict(
+            ad: pp.ad.AdArray, rows: Optional[np.ndarray]
+        ) -> tuple[sps.spmatrix, np.ndarray]:
+            # If restriction to grid-related row blocks was made, perform row slicing
+            # based on information we have obtained from parsing. Else, use the whole
+            # thing.
+            if rows is not None:
+                return ad.jac.tocsr()[rows], ad.val[rows]
+            return ad.jac, ad.val
+
+        evaluate = (
+            plan.evaluate_incremental if self.incremental_assembly else plan.evaluate
+        )
+        if self.max_assembly_workers > 1:
+            with ThreadPoolExecutor(max_workers=self.max_assembly_workers) as pool:
+                ad_list = evaluate(state, executor=pool)
+                # Map preserves the order of the equations.
+                blocks = list(pool.map(restrict, ad_list, equ_blocks.values()))
+        else:
+            ad_list = evaluate(state)
+            blocks = [
+                restrict(ad, rows) for ad, rows in zip(ad_list, equ_blocks.values())
+            ]
+
         # Iterate over equations, assemble.
         # Also keep track of the row indices of each equation, and store it in
         # assembled_equation_indices.
-        for equ_name, rows in equ_blocks.items():
-            # This will raise a key error if the equation name is unknown.
-            eq = self._equations[equ_name]
-            ad = eq.evaluate(self, state)
-
-            # If restriction to grid-related row blocks was made,
-            # perform row slicing based on information we have obtained from parsing.
-            if rows is not None:
-                mat.append(ad.jac.tocsr()[rows])
-                rhs.append(ad.val[rows])
-                block_length = len(rhs[-1])
-            # If no grid-related row restriction was made, append the whole thing.
-            else:
-                mat.append(ad.jac)
-                rhs.append(ad.val)
-                block_length = len(ad.val)
+        for equ_name, (jac, val) in zip(equ_blocks, blocks):
+            mat.append(jac)
+            rhs.append(val)
+            block_length = len(val)
 
             # Create indices range and shift to correct position.
             block_indices = np.arange(block_length) + ind_start
@@ -1615,22 +1788,175 @@ class EquationSystem:
 
             if block_length > 0:
                 ind_start = block_indices[-1] + 1
+        # Slice out the columns belonging to the requested subsets of variables and
+        # grid-related column blocks by using the transposed projection to respective
+        # subspace.
+        column_projection = self.projection_to(variables).transpose()
+        rhs_cat = np.concatenate(rhs) if len(rhs) > 0 else np.empty(0)
+
+        if self.reuse_jacobian_pattern:
+            # Project the blocks individually, and write their values into the matrix
+            # of the recorded pattern.
+            blocks = [jac @ column_projection for jac in mat]
+            # The key is formed from the arguments, rather than from the row indices
+            # and the projection they are parsed into. For a fixed numbering of the
+            # degrees of freedom, the columns are determined by the set of variables.
+            if isinstance(equations, dict):
+                restrictions = tuple(
+                    (name, tuple(id(g) for g in equations[name]))
+                    for name in equ_blocks
+                    if name in equations
+                )
+            else:
+                restrictions = tuple()
+            key = (
+                tuple(equ_blocks),
+                restrictions,
+                frozenset(var.id for var in self._parse_variable_type(variables)),
+                self._dof_numbering_version,
+            )
+            pattern = self._jacobian_patterns.get(key)
+            if pattern is None or not pattern.matches(blocks):
+                pattern = JacobianPattern(blocks, column_projection.shape[1])
+                self._jacobian_patterns[key] = pattern
+                # Multiply rhs by -1 to move to the rhs.
+                return pattern.matrix, -rhs_cat
+            return pattern.refresh(blocks), -rhs_cat
+
         # Concatenate results equation-wise.
         if len(mat) > 0:
             A = sps.vstack(mat, format="csr")
-            rhs_cat = np.concatenate(rhs)
         else:
             # Special case if the restriction produced an empty system.
             A = sps.csr_matrix((0, self.num_dofs()))
-            rhs_cat = np.empty(0)
 
-        # Slice out the columns belonging to the requested subsets of variables and
-        # grid-related column blocks by using the transposed projection to respective
-        # subspace.
         # Multiply rhs by -1 to move to the rhs.
-        column_projection = self.projection_to(variables).transpose()
         return A * column_projection, -rhs_cat
 
+    def assemble_rhs(
+        self,
+        equations: Optional[EquationList | EquationRestriction] = None,
+        state: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Assemble the residual vector of a subset of equations, without forming the
+        Jacobian matrix.
+
+        Parameters:
+            equations (optional): See :meth:`assemble_subsystem`.
+            state (optional): See :meth:`assemble_subsystem`.
+
+        Returns:
+            The residual vector corresponding to the targeted state, scaled by -1
+            (moved to rhs). The ordering is the same as in the vector returned by
+            :meth:`assemble_subsystem`.
+
+        """
+        equ_blocks = self._parse_equations(equations)
+        values = self.compile(list(equ_blocks.keys())).evaluate_values(state)
+        return -self._concatenate_rows(values, equ_blocks)
+
+    def jacobian_vector_product(
+        self,
+        vector: np.ndarray,
+        equations: Optional[EquationList | EquationRestriction] = None,
+        variables: Optional[VariableList] = None,
+        state: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Compute the product of the Jacobian matrix of a subsystem with a vector,
+        without forming the Jacobian matrix.
+
+        The product is computed by forward propagation of the vector through the
+        evaluation plan of the equations, see
+        :meth:`~porepy.numerics.ad.evaluation_plan.EvaluationPlan.jvp`. Together with
+        :meth:`assemble_rhs`, this allows for matrix-free solvers, e.g.,
+        :class:`~porepy.numerics.nonlinear.nonlinear_solvers.NewtonKrylovSolver`.
+
+        Parameters:
+            vector: Vector in the column space of the subsystem, i.e., of the size of
+                the degrees of freedom of ``variables``.
+            equations (optional): See :meth:`assemble_subsystem`.
+            variables (optional): See :meth:`assemble_subsystem`.
+            state (optional): See :meth:`assemble_subsystem`.
+
+        Returns:
+            The product ``A @ vector``, with ``A`` being the Jacobian matrix returned by
+            :meth:`assemble_subsystem` for the same arguments.
+
+        """
+        if variables is None:
+            variables = self._variables
+        equ_blocks = self._parse_equations(equations)
+        tangent = self.projection_to(variables).transpose() @ vector
+        _, products = self.compile(list(equ_blocks.keys())).jvp(tangent, state)
+        return self._concatenate_rows(products, equ_blocks)
+
+    def vector_jacobian_product(
+        self,
+        vector: np.ndarray,
+        equations: Optional[EquationList | EquationRestriction] = None,
+        variables: Optional[VariableList] = None,
+        state: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Compute the product of a vector with the Jacobian matrix of a subsystem,
+        without forming the Jacobian matrix.
+
+        The product is computed by a reverse sweep over the evaluation plan of the
+        equations, see
+        :meth:`~porepy.numerics.ad.evaluation_plan.EvaluationPlan.vjp`.
+
+        Parameters:
+            vector: Vector in the row space of the subsystem, i.e., of the size of the
+                residual vector returned by :meth:`assemble_subsystem`.
+            equations (optional): See :meth:`assemble_subsystem`.
+            variables (optional): See :meth:`assemble_subsystem`.
+            state (optional): See :meth:`assemble_subsystem`.
+
+        Raises:
+            ValueError: If the size of the vector does not match the number of rows of
+                the subsystem.
+
+        Returns:
+            The product ``vector @ A``, with ``A`` being the Jacobian matrix returned by
+            :meth:`assemble_subsystem` for the same arguments.
+
+        """
+        if variables is None:
+            variables = self._variables
+        equ_blocks = self._parse_equations(equations)
+        values, pullback = self.compile(list(equ_blocks.keys())).vjp(state)
+
+        # Distribute the vector on the equations. Rows which are not part of the
+        # subsystem do not contribute.
+        cotangents: list[np.ndarray] = []
+        ind_start = 0
+        for value, rows in zip(values, equ_blocks.values()):
+            cotangent = np.zeros(np.size(value))
+            num_rows = cotangent.size if rows is None else rows.size
+            if rows is None:
+                cotangent[:] = vector[ind_start : ind_start + num_rows]
+            else:
+                cotangent[rows] = vector[ind_start : ind_start + num_rows]
+            cotangents.append(cotangent)
+            ind_start += num_rows
+        if ind_start != vector.size:
+            raise ValueError(
+                f"Vector of size {vector.size} does not match the {ind_start} rows of "
+                "the subsystem."
+            )
+        return self.projection_to(variables) @ pullback(cotangents)
+
+    @staticmethod
+    def _concatenate_rows(
+        blocks: list[Any], equ_blocks: dict[str, None | np.ndarray]
+    ) -> np.ndarray:
+        """Restrict the rows of equation-wise blocks as parsed by
+        :meth:`_parse_equations`, and concatenate the results."""
+        restricted = [
+            np.atleast_1d(block) if rows is None else np.atleast_1d(block)[rows]
+            for block, rows in zip(blocks, equ_blocks.values())
+        ]
+        return np.concatenate(restricted) if len(restricted) > 0 else np.empty(0)
+
     def assemble_schur_complement_system(
         self,
         primary_equations: EquationList | EquationRestriction,
@@ -0,0 +1,1350 @@
+"""Compiled evaluation plans for Ad operator trees.
+
+Evaluation of an :class:`~porepy.numerics.ad.operators.Operator` amounts to a forward
+traversal of its tree representation. Done naively, every evaluation (thus every
+Newton iteration) has to identify the variables present in the tree, map these to
+degrees of freedom, walk the tree recursively with type-based dispatch, and recompute
+products of constant matrices (projections, divergences, discretization matrices).
+
+The :class:`EvaluationPlan` instead translates one or more operator trees into a flat,
+topologically ordered list of evaluation steps. The translation is done once, together
+with the identification of variables and the construction of the restriction matrices
+that map the global state to the individual variables. Subtrees which only contain
+constant matrices (:class:`~porepy.numerics.ad.operators.SparseArray`,
+:class:`~porepy.numerics.ad.grid_operators.Divergence`) and discretization matrices
+are evaluated once and cached; the cached value is recomputed only when one of the
+discretization matrices it depends on has been replaced in the data dictionaries,
+e.g., by a rediscretization. Only the values of maximal constant subtrees, that is,
+those which are arguments of non-constant operations, are cached; intermediate
+products inside such a subtree are released once the subtree is evaluated.
+
+Optionally, the plan can deduplicate structurally identical subtrees (hash-consing).
+Models typically construct the same quantity (say, a fluid density or a mortar
+projection) several times, in different equations, as distinct operator objects.
+With deduplication, each node is assigned a structural key composed of its operation
+and the steps of its children, while leaves are identified by what they represent
+(the variable, discretization matrix, or the values of a wrapped array), so that all
+copies are evaluated once per call to :meth:`EvaluationPlan.evaluate`.
+
+Since the steps form a directed acyclic graph, steps which do not depend on each other
+can be evaluated concurrently. :meth:`EvaluationPlan.evaluate` can distribute the
+operations level by level to an executor (see :meth:`EvaluationPlan.levels`).
+
+Besides the evaluation of values and Jacobian matrices, the plan supports matrix-free
+evaluation, where no sparse Jacobian is formed: :meth:`EvaluationPlan.evaluate_values`
+computes values only, :meth:`EvaluationPlan.jvp` computes Jacobian-vector products
+``J @ v`` by forward propagation of tangents, and :meth:`EvaluationPlan.vjp` computes
+vector-Jacobian products ``v @ J`` by a reverse sweep over the steps.
+
+Finally, :meth:`EvaluationPlan.evaluate_incremental` keeps the result of every compiled
+operator, and evaluates an operator anew only if its inputs changed since the last
+evaluation. The inputs of an operator are the variables, arrays (e.g., time dependent
+arrays and scalars) and discretization matrices in its tree. Operators which are
+affine in the current variables are not evaluated when only the variables changed;
+instead, their value is updated by a sparse matrix-vector product with the cached
+Jacobian.
+
+Plans are normally not created directly, but through :meth:`Operator.compile` or
+:meth:`EquationSystem.compile`, which also take care of caching and invalidation.
+
+"""
+from __future__ import annotations
+
+import hashlib
+from concurrent.futures import Executor
+from typing import Any, Callable, Hashable, Optional, Sequence, Union
+
+import numpy as np
+import scipy.sparse as sps
+
+import porepy as pp
+
+from .forward_mode import AdArray
+
+__all__ = ["EvaluationPlan"]
+
+
+# Identifiers for the different kinds of evaluation steps.
+_VARIABLE = 0
+"""The step represents a variable, its value is taken from the state."""
+_AD_ARRAY = 1
+"""The step is an already evaluated AdArray (happens for nested functions)."""
+_LEAF = 2
+"""The step is a leaf which is parsed anew for every evaluation."""
+_STATIC_LEAF = 3
+"""The step is a leaf which is constant between evaluations."""
+_DISCRETIZATION = 4
+"""The step is a discretization matrix, which is constant until rediscretization."""
+_OPERATION = 5
+"""The step combines the results of other steps."""
+_STATIC_OPERATION = 6
+"""The step combines the results of static steps only."""
+
+_STATIC_KINDS = (_STATIC_LEAF, _DISCRETIZATION, _STATIC_OPERATION)
+_OPERATION_KINDS = (_OPERATION, _STATIC_OPERATION)
+
+
+class EvaluationPlan:
+    """Flat, topologically ordered representation of a set of operator trees.
+
+    Operators which appear several times in the trees are represented by a single
+    step, and are thus evaluated only once per call to :meth:`evaluate`. By default,
+    operators are identified by their identity; if ``deduplicate`` is True, also
+    structurally identical operators are identified.
+
+    The plan assumes that the operator trees are not modified after the plan was
+    created, and that discretization matrices stored in the data dictionaries are
+    replaced rather than modified in place when the problem is rediscretized. This
+    is the behavior of all discretization classes in PorePy. Similarly, the arrays
+    wrapped by :class:`~porepy.numerics.ad.operators.DenseArray` are assumed not to be
+    modified in place.
+
+    Parameters:
+        operators: Operators (roots of the trees) to be compiled.
+        system_manager: Used to identify the degrees of freedom of the variables
+            present in the trees.
+        deduplicate: If True, structurally identical subtrees are represented by a
+            single step. Defaults to False.
+
+    """
+
+    def __init__(
+        self,
+        operators: Sequence[pp.ad.Operator],
+        system_manager: pp.ad.EquationSystem | pp.DofManager,
+        deduplicate: bool = False,
+    ) -> None:
+        ### PUBLIC
+
+        self.system_manager: pp.ad.EquationSystem | pp.DofManager = system_manager
+        """System manager for which the plan was compiled."""
+
+        self.dof_numbering_version: Optional[int] = None
+        """Version of the dof numbering of the system manager at compile time.
+
+        Only available for :class:`~porepy.numerics.ad.equation_system.EquationSystem`.
+        For other system managers, the value is None, and the plan cannot be reused.
+
+        """
+        if isinstance(system_manager, pp.ad.EquationSystem):
+            self.dof_numbering_version = system_manager._dof_numbering_version
+
+        self.num_deduplicated_nodes: int = 0
+        """Number of operator nodes encountered during compilation which were mapped to
+        an already existing step, either since the same operator object occurs several
+        times, or, if ``deduplicate`` is True, since the node is structurally identical
+        to another node.
+
+        Note that when an operator object is encountered a second time, its subtree is
+        not traversed again, thus the nodes below it are not counted.
+
+        """
+
+        self.incremental_counts: dict[str, int] = {
+            "evaluated": 0,
+            "updated": 0,
+            "reused": 0,
+        }
+        """Number of compiled operators which were evaluated, updated by a
+        matrix-vector product, and reused without changes by
+        :meth:`evaluate_incremental`."""
+
+        ### PRIVATE
+
+        self._operators: list[Union[pp.ad.Operator, AdArray]] = []
+        """The operator represented by each step."""
+
+        self._kinds: list[int] = []
+        """The kind of each step, see the module level identifiers."""
+
+        self._children: list[tuple[int, ...]] = []
+        """Indices of the steps providing the arguments of each step."""
+
+        self._owners: list[pp.ad.Operator] = []
+        """For each step, the root operator which first referred to it. Used to
+        compose error messages."""
+
+        self._num_consumers: list[int] = []
+        """Number of steps (and roots) consuming the result of each step. Used to
+        release intermediate results as soon as they are no longer needed."""
+
+        self._static_values: dict[int, Any] = {}
+        """Cached values of maximal static steps, see :meth:`_identify_static_roots`."""
+
+        self._static_matrices: dict[int, list[list]] = {}
+        """For each cached static step, the matrices of the discretization steps in its
+        subtree at the time the cached value was computed. Keeping references to the
+        matrices also ensures that their ids are not reused by other objects."""
+
+        self._deduplicate: bool = deduplicate
+
+        self._levels: Optional[list[list[int]]] = None
+        """Steps grouped by their depth in the operator graph, see :meth:`levels`."""
+
+        self._structural_index: dict[Hashable, int] = {}
+        """Mapping from structural keys to steps, used for deduplication."""
+
+        self._aliases: dict[
+            int, list[tuple[Union[pp.ad.Scalar, pp.ad.DenseArray], Any]]
+        ] = {}
+        """Scalars and arrays which were identified with a step based on their values
+        at compile time, together with the operator of the step. Each operator is
+        stored with the value it wraps, as last checked by :meth:`is_valid_for`."""
+
+        step_index: dict[int, int] = {}
+        self.root_indices: list[int] = [
+            self._add_subtree(op, op, step_index) for op in operators
+        ]
+        """Step index of each of the compiled operators."""
+        for ind in self.root_indices:
+            self._num_consumers[ind] += 1
+
+        self._identify_variables()
+        self._identify_static_roots()
+
+    @property
+    def num_steps(self) -> int:
+        """Number of evaluation steps in the plan."""
+        return len(self._kinds)
+
+    @property
+    def num_static_steps(self) -> int:
+        """Number of steps whose values are constant between discretizations."""
+        return sum(1 for kind in self._kinds if kind in _STATIC_KINDS)
+
+    def is_valid_for(
+        self, system_manager: pp.ad.EquationSystem | pp.DofManager
+    ) -> bool:
+        """Check if the plan can be used for evaluation with a system manager.
+
+        Parameters:
+            system_manager: The system manager to be used for evaluation.
+
+        Returns:
+            True if the plan was compiled for this system manager, and the numbering of
+            degrees of freedom has not changed since.
+
+        """
+        if system_manager is not self.system_manager:
+            return False
+        if self.dof_numbering_version is None:
+            return False
+        if self.dof_numbering_version != getattr(
+            system_manager, "_dof_numbering_version", None
+        ):
+            return False
+        # Scalars and arrays identified based on their values must still coincide.
+        # The values are compared only if one of them was replaced since the last
+        # check, e.g., by Scalar.set_value.
+        for aliases in self._aliases.values():
+            if all(_wrapped_value(op) is value for op, value in aliases):
+                continue
+            values = [_wrapped_value(op) for op, _ in aliases]
+            if not all(np.array_equal(values[0], value) for value in values[1:]):
+                return False
+            aliases[:] = [(op, value) for (op, _), value in zip(aliases, values)]
+        return True
+
+    def _add_subtree(
+        self,
+        op: Union[pp.ad.Operator, AdArray],
+        root: pp.ad.Operator,
+        step_index: dict[int, int],
+    ) -> int:
+        """Add the steps needed to evaluate an operator, children first.
+
+        Parameters:
+            op: Operator to be added.
+            root: The root of the tree currently being compiled.
+            step_index: Mapping from the identity of already added operators to their
+                step index.
+
+        Returns:
+            The index of the step representing the operator.
+
+        """
+        if id(op) in step_index:
+            self.num_deduplicated_nodes += 1
+            return step_index[id(op)]
+
+        children: tuple[int, ...] = tuple()
+        # Variables take their values from the state, AdArrays are terms that are
+        # already evaluated (nested functions), other leaves are parsed by themselves.
+        if isinstance(op, pp.ad.Variable):
+            kind = _VARIABLE
+        elif isinstance(op, AdArray):
+            kind = _AD_ARRAY
+        elif op.is_leaf():
+            if isinstance(op, pp.ad._ad_utils.MergedOperator):
+                kind = _DISCRETIZATION
+            elif isinstance(op, (pp.ad.SparseArray, pp.ad.Divergence)):
+                kind = _STATIC_LEAF
+            else:
+                # Scalars may be reset, arrays may be time dependent etc. These are
+                # cheap to parse, so we do not try to be clever.
+                kind = _LEAF
+        else:
+            children = tuple(
+                self._add_subtree(child, root, step_index) for child in op.tree.children
+            )
+            static_operations = (
+                pp.ad.Operator.Operations.add,
+                pp.ad.Operator.Operations.sub,
+                pp.ad.Operator.Operations.mul,
+                pp.ad.Operator.Operations.div,
+                pp.ad.Operator.Operations.matmul,
+            )
+            if op.tree.op in static_operations and all(
+                self._kinds[c] in _STATIC_KINDS for c in children
+            ):
+                kind = _STATIC_OPERATION
+            else:
+                kind = _OPERATION
+
+        if self._deduplicate:
+            key = self._structural_key(op, children)
+            if key is not None and key in self._structural_index:
+                ind = self._structural_index[key]
+                if isinstance(op, (pp.ad.Scalar, pp.ad.DenseArray)) and not isinstance(
+                    op, pp.ad.TimeDependentDenseArray
+                ):
+                    if ind not in self._aliases:
+                        step_op = self._operators[ind]
+                        assert isinstance(step_op, (pp.ad.Scalar, pp.ad.DenseArray))
+                        self._aliases[ind] = [(step_op, _wrapped_value(step_op))]
+                    self._aliases[ind].append((op, _wrapped_value(op)))
+                self.num_deduplicated_nodes += 1
+                step_index[id(op)] = ind
+                return ind
+            elif key is not None:
+                self._structural_index[key] = len(self._kinds)
+
+        for c in children:
+            self._num_consumers[c] += 1
+
+        self._operators.append(op)
+        self._kinds.append(kind)
+        self._children.append(children)
+        self._owners.append(root)
+        self._num_consumers.append(0)
+
+        ind = len(self._kinds) - 1
+        step_index[id(op)] = ind
+        return ind
+
+    @staticmethod
+    def _structural_key(
+        op: Union[pp.ad.Operator, AdArray], children: tuple[int, ...]
+    ) -> Optional[Hashable]:
+        """Compute a key which identifies the operator up to structural equivalence.
+
+        Parameters:
+            op: The operator.
+            children: Steps representing the children of the operator.
+
+        Returns:
+            A hashable key. Operators with equal keys evaluate to the same values. None
+            is returned for operators which should only be identified by identity.
+
+        """
+
+        def _digest(*arrays: np.ndarray) -> str:
+            # Digest of array contents. Only used at compile time.
+            sha = hashlib.sha1()
+            for arr in arrays:
+                sha.update(np.ascontiguousarray(arr).data)
+            return sha.hexdigest()
+
+        if isinstance(op, AdArray):
+            # AdArrays are only identified by identity.
+            return None
+        elif len(children) > 0:
+            return ("operation", op.tree.op, children)
+
+        if isinstance(op, pp.ad.MixedDimensionalVariable):
+            # The sub variables of mixed-dimensional variables are created by the
+            # EquationSystem, while the mixed-dimensional variables themselves are
+            # typically created anew for every equation.
+            sub_keys = tuple(
+                EvaluationPlan._structural_key(var, ()) for var in op.sub_vars
+            )
+            return ("md_variable", sub_keys, op.prev_time, op.prev_iter)
+        elif isinstance(op, pp.ad.Variable):
+            # Variables at previous time steps and iterates are copies, identify them
+            # by the variable known to the EquationSystem.
+            if op.prev_time or op.prev_iter:
+                var_id = op.original_variable.id
+            else:
+                var_id = op.id
+            return ("variable", var_id, op.prev_time, op.prev_iter)
+        elif isinstance(op, pp.ad._ad_utils.MergedOperator):
+            mat_key = getattr(op.discr, op.key + "_matrix_key")
+            grids = tuple(id(g) for g in op.mat_dict_grids)
+            return ("discretization", type(op.discr), op.mat_dict_key, mat_key, grids)
+        elif isinstance(op, pp.ad.TimeDependentDenseArray):
+            grids = tuple(id(g) for g in op._grids)
+            return ("time_dependent_array", op.name, grids, op.prev_time)
+        elif isinstance(op, pp.ad.DenseArray):
+            values = op._values
+            return ("array", values.dtype.str, values.shape, _digest(values))
+        elif isinstance(op, pp.ad.Scalar):
+            return ("scalar", op._value)
+        elif isinstance(op, pp.ad.SparseArray):
+            mat = op._mat
+            if mat.format in ("csr", "csc"):
+                digest = _digest(mat.data, mat.indices, mat.indptr)
+            else:
+                csr = mat.tocsr()
+                digest = _digest(csr.data, csr.indices, csr.indptr)
+            return ("sparse_array", mat.format, mat.shape, digest)
+        elif isinstance(op, pp.ad.Divergence):
+            return ("divergence", op.dim, tuple(id(sd) for sd in op.subdomains))
+        elif type(op) is pp.ad.Function:
+            # Functions wrapping the same callable are identical.
+            return ("function", id(op.func))
+        # Other leaves are only identified by identity.
+        return None
+
+    def _identify_static_roots(self) -> None:
+        """Identify the maximal static steps, which are the static steps that are
+        roots, or arguments of non-static steps. Only the values of these are cached
+        between evaluations."""
+        static = [kind in _STATIC_KINDS for kind in self._kinds]
+        is_static_root = [False] * self.num_steps
+        for ind in self.root_indices:
+            is_static_root[ind] = static[ind]
+        for i, children in enumerate(self._children):
+            if not static[i]:
+                for c in children:
+                    is_static_root[c] = is_static_root[c] or static[c]
+
+        # The discretization steps in the subtree of each static step.
+        discretizations: list[tuple[int, ...]] = []
+        for i, kind in enumerate(self._kinds):
+            if kind == _DISCRETIZATION:
+                discretizations.append((i,))
+            elif static[i] and self._children[i]:
+                steps = {d for c in self._children[i] for d in discretizations[c]}
+                discretizations.append(tuple(sorted(steps)))
+            else:
+                discretizations.append(tuple())
+
+        self._static_discretizations: dict[int, tuple[int, ...]] = {
+            i: discretizations[i] for i in range(self.num_steps) if is_static_root[i]
+        }
+        """For each maximal static step, the discretization steps in its subtree."""
+
+    def _identify_variables(self) -> None:
+        """Identify the degrees of freedom of all variables present in the plan."""
+        variables = [op for op in self._operators if isinstance(op, pp.ad.Variable)]
+        (
+            variable_dofs,
+            variable_ids,
+            is_prev_time,
+            is_prev_iter,
+        ) = pp.ad.operators._variable_dof_indices(variables, self.system_manager)
+
+        # Split variable dof indices and ids into groups of current variables (those
+        # of the current iteration step), and those from the previous time steps and
+        # iterations.
+        self._current_dofs: dict[int, np.ndarray] = {}
+        self._prev_time_dofs: dict[int, np.ndarray] = {}
+        self._prev_iter_dofs: dict[int, np.ndarray] = {}
+        for ind, var_id, is_prev, is_prev_it in zip(
+            variable_dofs, variable_ids, is_prev_time, is_prev_iter
+        ):
+            if is_prev:
+                self._prev_time_dofs[var_id] = ind
+            elif is_prev_it:
+                self._prev_iter_dofs[var_id] = ind
+            else:
+                self._current_dofs[var_id] = ind
+
+        # Restriction matrices from the full state to the current variables. These
+        # are also the Jacobians of the variables, and are constructed at the first
+        # evaluation, when the size of the state is known.
+        self._restrictions: dict[int, sps.spmatrix] = {}
+        self._restriction_num_cols: int = -1
+        # Whether the steps depend on the current variables, computed on demand.
+        self._active: Optional[list[bool]] = None
+
+        # Information on the compiled operators used by evaluate_incremental, see
+        # _analyze_roots. Computed on demand.
+        self._root_steps: list[np.ndarray] = []
+        self._root_inputs: Optional[list[list[int]]] = None
+        self._root_dofs: list[np.ndarray] = []
+        self._root_affine: list[bool] = []
+        self._root_cacheable: list[bool] = []
+        # For each compiled operator, the last result, the state and the values of
+        # the inputs at which it was computed.
+        self._root_cache: list[Optional[tuple[Any, np.ndarray, dict[int, Any]]]] = []
+
+    def _variable_values(
+        self,
+        state: Optional[np.ndarray],
+        tangent: Optional[np.ndarray] = None,
+        differentiate: bool = True,
+    ) -> tuple[
+        dict[int, AdArray | np.ndarray], dict[int, np.ndarray], dict[int, np.ndarray]
+    ]:
+        """Represent the variables of the plan at a given state.
+
+        Parameters:
+            state: Global state vector. If None, the values at the current iterate are
+                used.
+            tangent (optional): Tangent vector(s) in the global state space, as an
+                array of shape ``(num_dofs,)`` or ``(num_dofs, num_vectors)``. If
+                given, the Jacobians of the current variables are the restrictions of
+                the tangent, rather than the restriction matrices.
+            differentiate: If False, the current variables are represented by their
+                values only. Defaults to True.
+
+        Returns:
+            Dictionaries mapping variable ids to AdArrays (for current variables,
+            numpy arrays if ``differentiate`` is False) and to numpy arrays (for
+            variables at the previous iteration and previous time step).
+
+        """
+        if state is None:
+            state = self.system_manager.get_variable_values(iterate_index=0)
+
+        # The size of the Jacobian matrix will always be set according to the
+        # variables found by the system manager in the MixedDimensionalGrid. This
+        # implies that to derive a subsystem from the Jacobian matrix of the
+        # operators will require restricting the columns of this matrix.
+        if state.size != self._restriction_num_cols:
+            self._restrictions = {}
+            for var_id, dof in self._current_dofs.items():
+                nrow = np.unique(dof).size
+                self._restrictions[var_id] = sps.coo_matrix(
+                    (np.ones(nrow), (np.arange(nrow), dof)), shape=(nrow, state.size)
+                ).tocsr()
+            self._restriction_num_cols = state.size
+
+        ad: dict[int, AdArray | np.ndarray]
+        if not differentiate:
+            ad = {var_id: R @ state for var_id, R in self._restrictions.items()}
+        elif tangent is not None:
+            # The derivative of the variable in the direction of the tangent is the
+            # restriction of the tangent, represented as a matrix with one column per
+            # tangent vector.
+            tangent = tangent.reshape((state.size, -1))
+            ad = {
+                var_id: AdArray(R @ state, sps.csr_matrix(R @ tangent))
+                for var_id, R in self._restrictions.items()
+            }
+        else:
+            # The restriction matrix is also the Jacobian of the variable with respect
+            # to the full state. Note that the AdArray makes its own copy of the
+            # Jacobian, thus the cached restriction is not exposed to modifications.
+            ad = {
+                var_id: AdArray(R @ state, R)
+                for var_id, R in self._restrictions.items()
+            }
+
+        prev_iter_vals = {
+            var_id: state[ind] for var_id, ind in self._prev_iter_dofs.items()
+        }
+
+        prev_vals: dict[int, np.ndarray] = {}
+        if len(self._prev_time_dofs) > 0:
+            prev_state = self.system_manager.get_variable_values(time_step_index=0)
+            prev_vals = {
+                var_id: prev_state[ind] for var_id, ind in self._prev_time_dofs.items()
+            }
+        return ad, prev_iter_vals, prev_vals
+
+    def evaluate(
+        self, state: Optional[np.ndarray] = None, executor: Optional[Executor] = None
+    ) -> list[Any]:
+        """Evaluate the compiled operators.
+
+        Parameters:
+            state (optional): Solution vector for which the operators should be
+                evaluated. If not provided, the solution will be pulled from the
+                current iterate.
+            executor (optional): If provided, operations which do not depend on each
+                other are evaluated concurrently by the executor, see
+                :meth:`levels`. This pays off if the operations are dominated by
+                sparse matrix products, which release the global interpreter lock,
+                thus the executor should normally be a
+                :class:`~concurrent.futures.ThreadPoolExecutor`. The results do not
+                depend on whether an executor is used.
+
+        Returns:
+            The values of the compiled operators, in the order they were passed at
+            instantiation. Operators depending on variables are represented as
+            AdArrays.
+
+        """
+        variables = self._variable_values(state)
+        values = self._evaluate_steps(variables, executor=executor)
+        return [values[i] for i in self.root_indices]
+
+    def evaluate_incremental(
+        self, state: Optional[np.ndarray] = None, executor: Optional[Executor] = None
+    ) -> list[Any]:
+        """Evaluate the compiled operators, reusing the results of the last call for
+        operators whose inputs did not change.
+
+        For each compiled operator, the values of its inputs (arrays, scalars,
+        variables at the previous iteration and time step, and the current variables)
+        are compared to those at the last evaluation, while discretization matrices
+        are compared by identity. Then, the operator is
+
+        - not evaluated if no input changed, in which case the cached result is
+          returned,
+        - not evaluated if only the current variables changed, and the operator is
+          affine in the current variables. Its value is then updated by the product of
+          the cached Jacobian with the change of the state.
+        - evaluated otherwise. Operators which need to be evaluated are evaluated
+          jointly, thus shared subexpressions are still evaluated once.
+
+        The numbers of the three cases are counted in :attr:`incremental_counts`.
+
+        Note:
+            The returned AdArrays share their Jacobian matrices with the cache, and
+            must not be modified in place.
+
+        Parameters:
+            state (optional): Solution vector for which the operators should be
+                evaluated. If not provided, the solution will be pulled from the
+                current iterate.
+            executor (optional): See :meth:`evaluate`.
+
+        Returns:
+            The values of the compiled operators, in the order they were passed at
+            instantiation.
+
+        """
+        if state is None:
+            state = self.system_manager.get_variable_values(iterate_index=0)
+        if self._root_inputs is None:
+            self._analyze_roots()
+        assert self._root_inputs is not None
+        variables = self._variable_values(state)
+        inputs = self._input_values(variables)
+
+        results: list[Any] = [None] * len(self.root_indices)
+        # The state is copied, since the caller may modify it in place.
+        state_copy = state.copy()
+        to_evaluate: list[int] = []
+        for k in range(len(self.root_indices)):
+            cached = self._root_cache[k]
+            if (
+                cached is None
+                or not self._root_cacheable[k]
+                or cached[1].size != state.size
+                or not all(
+                    _same_value(inputs[i], cached[2][i]) for i in self._root_inputs[k]
+                )
+            ):
+                to_evaluate.append(k)
+                continue
+            value, cached_state, _ = cached
+            dofs = self._root_dofs[k]
+            if np.array_equal(state[dofs], cached_state[dofs]):
+                self.incremental_counts["reused"] += 1
+                results[k] = value
+            elif self._root_affine[k] and isinstance(value, AdArray):
+                jac = value.jac
+                updated = AdArray(
+                    value.val + jac @ (state - cached_state),
+                    sps.csr_matrix((value.val.size, 0)),
+                )
+                # Share the Jacobian with the cache, rather than copying it.
+                updated.jac = jac
+                self._root_cache[k] = (updated, state_copy, cached[2])
+                self.incremental_counts["updated"] += 1
+                results[k] = updated
+            else:
+                to_evaluate.append(k)
+
+        if len(to_evaluate) > 0:
+            needed = np.zeros(self.num_steps, dtype=bool)
+            for k in to_evaluate:
+                needed[self._root_steps[k]] = True
+            values = self._evaluate_steps(variables, executor=executor, needed=needed)
+            for k in to_evaluate:
+                results[k] = values[self.root_indices[k]]
+                root_inputs = {i: _copy_value(inputs[i]) for i in self._root_inputs[k]}
+                self._root_cache[k] = (results[k], state_copy, root_inputs)
+            self.incremental_counts["evaluated"] += len(to_evaluate)
+        return results
+
+    def _analyze_roots(self) -> None:
+        """Identify the steps, inputs and degrees of freedom of each compiled operator,
+        and whether it is affine in the current variables."""
+        # Polynomial degree of each step in the current variables, with 2 representing
+        # any nonlinear dependency.
+        operations = pp.ad.Operator.Operations
+        active = self._active_steps()
+        degree: list[int] = []
+        for i, kind in enumerate(self._kinds):
+            children = self._children[i]
+            if not active[i]:
+                degree.append(0)
+            elif kind == _VARIABLE:
+                degree.append(1)
+            elif kind == _AD_ARRAY:
+                degree.append(2)
+            else:
+                op = self._tree(i).op
+                child_degrees = [degree[c] for c in children]
+                if op in (operations.add, operations.sub):
+                    degree.append(max(child_degrees))
+                elif op in (operations.mul, operations.matmul):
+                    degree.append(2 if min(child_degrees) > 0 else max(child_degrees))
+                elif op == operations.div and child_degrees[1] == 0:
+                    degree.append(child_degrees[0])
+                else:
+                    degree.append(2)
+
+        self._root_steps = []
+        self._root_inputs = []
+        self._root_dofs = []
+        self._root_affine = []
+        self._root_cacheable = []
+        for root in self.root_indices:
+            # Collect the steps of the subtree of the root.
+            in_tree = np.zeros(self.num_steps, dtype=bool)
+            in_tree[root] = True
+            for i in range(root, -1, -1):
+                if in_tree[i]:
+                    in_tree[list(self._children[i])] = True
+            steps = np.flatnonzero(in_tree)
+            self._root_steps.append(steps)
+            self._root_inputs.append(
+                [
+                    i
+                    for i in steps
+                    if self._kinds[i] in (_LEAF, _DISCRETIZATION)
+                    or (self._kinds[i] == _VARIABLE and not active[i])
+                ]
+            )
+            dofs = []
+            for i in steps:
+                op = self._operators[i]
+                if isinstance(op, pp.ad.Variable) and active[i]:
+                    dofs.append(self._current_dofs[op.id])
+            self._root_dofs.append(
+                np.unique(np.concatenate(dofs)) if dofs else np.zeros(0, dtype=int)
+            )
+            self._root_affine.append(degree[root] < 2)
+            # Already evaluated AdArrays in the tree are not tracked.
+            self._root_cacheable.append(
+                not any(self._kinds[i] == _AD_ARRAY for i in steps)
+            )
+        self._root_cache = [None] * len(self.root_indices)
+
+    def _input_values(self, variables: tuple[dict, dict, dict]) -> dict[int, Any]:
+        """Values of the inputs of the compiled operators, see
+        :meth:`evaluate_incremental`. Discretization steps are represented by the list
+        of their matrices."""
+        ad, prev_iter_vals, prev_vals = variables
+        mdg = self.system_manager.mdg
+        inputs: dict[int, Any] = {}
+        assert self._root_inputs is not None
+        for k in range(len(self.root_indices)):
+            for i in self._root_inputs[k]:
+                if i in inputs:
+                    continue
+                op = self._operators[i]
+                # The inputs are leaves, thus operators.
+                assert isinstance(op, pp.ad.Operator)
+                if isinstance(op, pp.ad.Variable):
+                    inputs[i] = self._variable_value(op, ad, prev_iter_vals, prev_vals)
+                elif isinstance(op, pp.ad._ad_utils.MergedOperator):
+                    inputs[i] = op.discretization_matrices(mdg)
+                else:
+                    inputs[i] = op.parse(mdg)
+        return inputs
+
+    def evaluate_values(self, state: Optional[np.ndarray] = None) -> list[Any]:
+        """Evaluate the values of the compiled operators, without derivatives.
+
+        Parameters:
+            state (optional): Solution vector for which the operators should be
+                evaluated. If not provided, the solution will be pulled from the
+                current iterate.
+
+        Returns:
+            The values of the compiled operators, in the order they were passed at
+            instantiation.
+
+        """
+        variables = self._variable_values(state, differentiate=False)
+        values = self._evaluate_steps(variables, differentiate=False)
+        return [values[i] for i in self.root_indices]
+
+    def jvp(
+        self, tangent: np.ndarray, state: Optional[np.ndarray] = None
+    ) -> tuple[list[Any], list[np.ndarray]]:
+        """Evaluate the compiled operators and their Jacobian-vector products.
+
+        The products are computed by forward propagation of the tangent through the
+        steps of the plan, thus the Jacobian matrices of the operators are not formed.
+
+        Parameters:
+            tangent: Vector in the global state space, of shape ``(num_dofs,)``, or
+                several vectors stored as the columns of an array of shape
+                ``(num_dofs, num_vectors)``.
+            state (optional): Solution vector for which the operators should be
+                evaluated. If not provided, the solution will be pulled from the
+                current iterate.
+
+        Returns:
+            The values of the compiled operators, and the products of their Jacobian
+            matrices with the tangent, of the same shape as the tangent in the second
+            dimension. For operators which do not depend on the current variables,
+            the product is zero.
+
+        """
+        variables = self._variable_values(state, tangent=tangent)
+        values = self._evaluate_steps(variables, tangent=tangent)
+        num_vectors = tangent.reshape((tangent.shape[0], -1)).shape[1]
+        roots: list[Any] = []
+        products: list[np.ndarray] = []
+        for i in self.root_indices:
+            value = values[i]
+            if isinstance(value, AdArray):
+                roots.append(value.val)
+                product = value.jac.toarray()
+            else:
+                roots.append(value)
+                product = np.zeros((np.size(value), num_vectors))
+            products.append(product.ravel() if tangent.ndim == 1 else product)
+        return roots, products
+
+    def vjp(
+        self, state: Optional[np.ndarray] = None
+    ) -> tuple[list[Any], Callable[[Sequence[np.ndarray]], np.ndarray]]:
+        """Evaluate the compiled operators, and provide their vector-Jacobian products.
+
+        The values of all steps are computed without derivatives and kept. The
+        returned function computes products ``v @ J`` by a reverse sweep over the
+        steps, where the derivatives of operations are applied to the propagated
+        vectors (adjoints), thus the Jacobian matrices of the operators are not formed.
+        Functions are differentiated locally: The function is evaluated on AdArrays
+        whose Jacobians are identities with respect to the function arguments, which
+        is cheap for elementwise functions.
+
+        Parameters:
+            state (optional): Solution vector for which the operators should be
+                evaluated. If not provided, the solution will be pulled from the
+                current iterate.
+
+        Returns:
+            The values of the compiled operators, and a function which, given one
+            vector per compiled operator (of the size of its value), returns the sum of
+            the vector-Jacobian products, as a vector in the global state space.
+
+        """
+        variables = self._variable_values(state, differentiate=False)
+        values = self._evaluate_steps(variables, differentiate=False, keep_values=True)
+        roots = [values[i] for i in self.root_indices]
+        num_dofs = self._restriction_num_cols
+        active = self._active_steps()
+
+        def pullback(cotangents: Sequence[np.ndarray]) -> np.ndarray:
+            if len(cotangents) != len(self.root_indices):
+                raise ValueError(
+                    f"Expected {len(self.root_indices)} vectors, got {len(cotangents)}."
+                )
+            adjoints: list[Any] = [None] * self.num_steps
+
+            def accumulate(i: int, adjoint: Any) -> None:
+                adjoints[i] = adjoint if adjoints[i] is None else adjoints[i] + adjoint
+
+            for i, cotangent in zip(self.root_indices, cotangents):
+                if active[i]:
+                    accumulate(i, np.asarray(cotangent, dtype=float))
+
+            gradient = np.zeros(num_dofs)
+            for i in reversed(range(self.num_steps)):
+                adjoint = adjoints[i]
+                if adjoint is None:
+                    continue
+                # Release the adjoint, it is not needed after propagation.
+                adjoints[i] = None
+                op = self._operators[i]
+                if isinstance(op, pp.ad.Variable):
+                    gradient += self._restrictions[op.id].T @ adjoint
+                elif isinstance(op, AdArray):
+                    gradient += op.jac.T @ adjoint
+                else:
+                    children = self._children[i]
+                    for c, contribution in zip(
+                        children,
+                        self._pullback_operation(
+                            i,
+                            [values[c] for c in children],
+                            adjoint,
+                            [active[c] for c in children],
+                        ),
+                    ):
+                        if contribution is None:
+                            continue
+                        if np.size(values[c]) == 1 and np.size(contribution) > 1:
+                            # The argument was broadcast in the operation.
+                            contribution = np.sum(contribution)
+                        accumulate(c, contribution)
+            return gradient
+
+        return roots, pullback
+
+    def _active_steps(self) -> list[bool]:
+        """Identify the steps which depend on the current variables."""
+        if self._active is not None:
+            return self._active
+        active: list[bool] = []
+        for i, op in enumerate(self._operators):
+            if isinstance(op, pp.ad.Variable):
+                active.append(
+                    not op.prev_time
+                    and not op.prev_iter
+                    and op.id in self._current_dofs
+                )
+            elif isinstance(op, AdArray):
+                active.append(True)
+            else:
+                active.append(any(active[c] for c in self._children[i]))
+        self._active = active
+        return active
+
+    def _pullback_operation(
+        self, i: int, args: list[Any], adjoint: np.ndarray, active: list[bool]
+    ) -> list[Optional[np.ndarray]]:
+        """Propagate the adjoint of an operation to its arguments.
+
+        Parameters:
+            i: Index of the step.
+            args: Values of the arguments of the operation.
+            adjoint: Adjoint of the result of the operation.
+            active: For each argument, whether it depends on the current variables.
+
+        Returns:
+            The adjoint contribution for each argument, None for inactive arguments.
+
+        """
+        tree = self._tree(i)
+        operations = pp.ad.Operator.Operations
+        contributions: list[Optional[np.ndarray]] = [None] * len(args)
+
+        if tree.op == operations.add:
+            contributions = [adjoint if a else None for a in active]
+        elif tree.op == operations.sub:
+            contributions = [adjoint if active[0] else None]
+            contributions.append(-adjoint if active[1] else None)
+        elif tree.op == operations.mul:
+            if active[0]:
+                contributions[0] = adjoint * args[1]
+            if active[1]:
+                contributions[1] = adjoint * args[0]
+        elif tree.op == operations.div:
+            if active[0]:
+                contributions[0] = adjoint / args[1]
+            if active[1]:
+                contributions[1] = -adjoint * args[0] / args[1] ** 2
+        elif tree.op == operations.pow:
+            base, exponent = args
+            if active[0]:
+                contributions[0] = (
+                    adjoint * exponent * base ** (np.asarray(exponent, dtype=float) - 1)
+                )
+            if active[1]:
+                contributions[1] = adjoint * base**exponent * np.log(base)
+        elif tree.op == operations.matmul:
+            if active[1]:
+                if np.ndim(args[0]) == 0:
+                    contributions[1] = adjoint * args[0]
+                else:
+                    contributions[1] = args[0].T @ adjoint
+            if active[0]:
+                # The only admissible product with a variable on the left is with a
+                # scalar.
+                contributions[0] = adjoint * args[1]
+        elif tree.op == operations.evaluate:
+            _, local_jac, offsets = self._linearize_function(i, args, active)
+            if local_jac is not None:
+                local_adjoint = local_jac.T @ adjoint
+                for k in range(1, len(args)):
+                    if active[k]:
+                        contributions[k] = local_adjoint[offsets[k] : offsets[k + 1]]
+        else:
+            raise ValueError(
+                f"Cannot differentiate operation {tree.op} in reverse mode"
+            )
+        return contributions
+
+    def _linearize_function(
+        self, i: int, args: list[Any], active: list[bool]
+    ) -> tuple[Any, Optional[sps.spmatrix], np.ndarray]:
+        """Evaluate a function and its Jacobian with respect to its active arguments.
+
+        The function is evaluated on AdArrays whose Jacobians are identity blocks, one
+        block column per active argument. As in the standard evaluation, inactive
+        arguments are passed as they are.
+
+        Parameters:
+            i: Index of the step.
+            args: Function and values of its arguments.
+            active: For each entry in ``args``, whether it depends on the current
+                variables.
+
+        Returns:
+            The function value, the local Jacobian (None if the function value is not
+            an AdArray), and the offsets of the arguments in the columns of the local
+            Jacobian.
+
+        """
+        ad_args, offsets = self._seed_arguments(args, active)
+        result = self._owners[i]._apply_operation(self._tree(i), ad_args)
+        if isinstance(result, AdArray):
+            return result.val, result.jac, offsets
+        return result, None, offsets
+
+    @staticmethod
+    def _seed_arguments(
+        args: list[Any], active: list[bool], identity: bool = True
+    ) -> tuple[list[Any], np.ndarray]:
+        """Represent the active arguments of a function by AdArrays.
+
+        Parameters:
+            args: Function and values of its arguments.
+            active: For each entry in ``args``, whether it should be represented by an
+                AdArray. The function itself is never represented by an AdArray.
+            identity: If True (default), the Jacobians are identity blocks, stacked
+                in the columns. If False, the Jacobians have no columns, which is
+                sufficient to evaluate the function value.
+
+        Returns:
+            The arguments, and the offsets of the arguments in the columns of the
+            Jacobians.
+
+        """
+        sizes = [
+            np.size(arg) if k > 0 and active[k] and identity else 0
+            for k, arg in enumerate(args)
+        ]
+        offsets = np.cumsum([0] + sizes)
+        ad_args = [args[0]]
+        for k in range(1, len(args)):
+            if active[k]:
+                n = np.size(args[k])
+                jac = sps.csr_matrix(
+                    (
+                        np.ones(sizes[k]),
+                        (np.arange(sizes[k]), offsets[k] + np.arange(sizes[k])),
+                    ),
+                    shape=(n, offsets[-1]),
+                )
+                ad_args.append(AdArray(np.asarray(args[k], dtype=float), jac))
+            else:
+                ad_args.append(args[k])
+        return ad_args, offsets
+
+    def _evaluate_steps(
+        self,
+        variables: tuple[dict, dict, dict],
+        executor: Optional[Executor] = None,
+        tangent: Optional[np.ndarray] = None,
+        differentiate: bool = True,
+        keep_values: bool = False,
+        needed: Optional[np.ndarray] = None,
+    ) -> list[Any]:
+        """Evaluate the steps of the plan.
+
+        Parameters:
+            variables: Representation of the variables, see :meth:`_variable_values`.
+            executor (optional): Executor for concurrent evaluation, see
+                :meth:`evaluate`.
+            tangent (optional): Tangent vector(s) of a Jacobian-vector product, see
+                :meth:`jvp`. Needed to propagate AdArrays contained in the trees.
+            differentiate: If False, only values are computed. Defaults to True.
+            keep_values: If True, the values of all steps are kept, except for steps
+                inside maximal static subtrees. By default, intermediate results are
+                released as soon as they are no longer needed.
+            needed (optional): Boolean mask of the steps to be evaluated. By default,
+                all steps are evaluated.
+
+        Returns:
+            The values of the steps. Only the (needed) roots are guaranteed to be
+            available, unless ``keep_values`` is True.
+
+        """
+        ad, prev_iter_vals, prev_vals = variables
+        mdg = self.system_manager.mdg
+        active_steps = self._active_steps()
+
+        num_steps = len(self._kinds)
+        values: list[Any] = [None] * num_steps
+        remaining_consumers = list(self._num_consumers)
+        # The current matrices of the discretization steps, fetched at most once
+        # during this evaluation.
+        discretization_matrices: dict[int, list] = {}
+
+        def evaluate_step(i: int) -> Any:
+            kind = self._kinds[i]
+            op = self._operators[i]
+
+            if kind == _AD_ARRAY:
+                assert isinstance(op, AdArray)
+                if not differentiate:
+                    return op.val
+                elif tangent is not None:
+                    return AdArray(
+                        op.val,
+                        sps.csr_matrix(op.jac @ tangent.reshape((op.jac.shape[1], -1))),
+                    )
+                return op
+
+            # All other steps represent operators.
+            assert isinstance(op, pp.ad.Operator)
+            if kind == _VARIABLE:
+                assert isinstance(op, pp.ad.Variable)
+                return self._variable_value(op, ad, prev_iter_vals, prev_vals)
+            elif kind == _LEAF:
+                return op.parse(mdg)
+            elif kind in _STATIC_KINDS:
+                if i not in self._static_discretizations:
+                    # The step is evaluated as part of a maximal static subtree.
+                    return None
+                return self._static_value(i, discretization_matrices)
+
+            children = self._children[i]
+            args = [values[c] for c in children]
+            if (
+                op.tree.op == pp.ad.Operator.Operations.evaluate
+                and not args[0].ad_compatible
+            ):
+                if not differentiate:
+                    # Functions with approximated Jacobians provide their values
+                    # separately.
+                    active = [active_steps[c] for c in children]
+                    ad_args = self._seed_arguments(args, active, identity=False)[0]
+                    return args[0].get_values(*ad_args[1:])
+                elif tangent is not None:
+                    # Functions with approximated Jacobians expect the Jacobians of
+                    # their arguments to be restrictions. Instead, the tangents are
+                    # propagated through the local Jacobian of the function.
+                    active = [isinstance(arg, AdArray) for arg in args]
+                    arg_values = [arg.val if a else arg for arg, a in zip(args, active)]
+                    val, local_jac, offsets = self._linearize_function(
+                        i, arg_values, active
+                    )
+                    if local_jac is None:
+                        return val
+                    num_vectors = tangent.reshape((tangent.shape[0], -1)).shape[1]
+                    jac = sps.csr_matrix((np.size(val), num_vectors))
+                    for k in range(1, len(args)):
+                        if active[k]:
+                            block = local_jac[:, offsets[k] : offsets[k + 1]]
+                            jac = jac + block @ args[k].jac
+                    return AdArray(val, jac)
+            elif not differentiate and op.tree.op == pp.ad.Operator.Operations.evaluate:
+                # Functions may expect AdArrays as arguments. Arguments depending on
+                # the current variables are represented by AdArrays with empty
+                # Jacobians.
+                active = [active_steps[c] for c in children]
+                ad_args = self._seed_arguments(args, active, identity=False)[0]
+                result = self._owners[i]._apply_operation(op.tree, ad_args)
+                return result.val if isinstance(result, AdArray) else result
+            return self._owners[i]._apply_operation(op.tree, args)
+
+        def release_children(i: int) -> None:
+            # Release intermediate results which are no longer needed.
+            if keep_values:
+                return
+            for c in self._children[i]:
+                remaining_consumers[c] -= 1
+                if remaining_consumers[c] == 0:
+                    values[c] = None
+
+        if executor is None:
+            for i in range(num_steps):
+                if needed is not None and not needed[i]:
+                    continue
+                values[i] = evaluate_step(i)
+                release_children(i)
+        else:
+            for level in self.levels():
+                if needed is not None:
+                    level = [i for i in level if needed[i]]
+                # Leaves are cheap to evaluate, and parsing of leaves is not
+                # necessarily thread safe. Only operations are distributed.
+                operations = [i for i in level if self._kinds[i] in _OPERATION_KINDS]
+                if len(operations) > 1:
+                    for i, value in zip(
+                        operations, executor.map(evaluate_step, operations)
+                    ):
+                        values[i] = value
+                    operations_done = set(operations)
+                else:
+                    operations_done = set()
+                for i in level:
+                    if i not in operations_done:
+                        values[i] = evaluate_step(i)
+                for i in level:
+                    release_children(i)
+
+        return values
+
+    def _static_value(self, i: int, discretization_matrices: dict[int, list]) -> Any:
+        """Get the value of a maximal static step.
+
+        The cached value is used, unless one of the discretization matrices in the
+        subtree of the step has been replaced. In that case, the subtree is evaluated
+        anew, without caching the intermediate results.
+
+        Values computed from memory-mapped discretization matrices (see
+        :mod:`~porepy.numerics.out_of_core`) are not cached, unless the value is a
+        memory-mapped matrix itself, since a cached copy would be held in memory
+        between evaluations. Such values are recomputed in every evaluation.
+
+        Parameters:
+            i: Index of the step.
+            discretization_matrices: Matrices of the discretization steps fetched
+                during the current evaluation. Updated in place.
+
+        Returns:
+            The value of the step.
+
+        """
+        mdg = self.system_manager.mdg
+        current = []
+        for d in self._static_discretizations[i]:
+            if d not in discretization_matrices:
+                op = self._operators[d]
+                assert isinstance(op, pp.ad._ad_utils.MergedOperator)
+                discretization_matrices[d] = op.discretization_matrices(mdg)
+            current.append(discretization_matrices[d])
+
+        cached = self._static_matrices.get(i)
+        if (
+            i in self._static_values
+            and cached is not None
+            and all(
+                len(a) == len(b) and all(x is y for x, y in zip(a, b))
+                for a, b in zip(cached, current)
+            )
+        ):
+            return self._static_values[i]
+
+        subtree_values: dict[int, Any] = {}
+
+        def evaluate_static(j: int) -> Any:
+            if j in subtree_values:
+                return subtree_values[j]
+            op = self._operators[j]
+            assert isinstance(op, pp.ad.Operator)
+            kind = self._kinds[j]
+            if kind == _STATIC_LEAF:
+                value = op.parse(mdg)
+            elif kind == _DISCRETIZATION:
+                assert isinstance(op, pp.ad._ad_utils.MergedOperator)
+                value = op.merge_matrices(discretization_matrices[j])
+            else:
+                args = [evaluate_static(c) for c in self._children[j]]
+                value = self._owners[j]._apply_operation(op.tree, args)
+            subtree_values[j] = value
+            return value
+
+        value = evaluate_static(i)
+        is_memory_mapped = pp.out_of_core.is_memory_mapped
+        if not is_memory_mapped(value) and any(
+            is_memory_mapped(mat) for matrices in current for mat in matrices
+        ):
+            return value
+        self._static_values[i] = value
+        self._static_matrices[i] = current
+        return value
+
+    def levels(self) -> list[list[int]]:
+        """Group the steps of the plan into levels of mutually independent steps.
+
+        Leaves form the first level, and every other step is placed on the level
+        following the highest level of its arguments. Thus, all steps on a level can
+        be evaluated concurrently once the previous levels have been evaluated.
+
+        Returns:
+            Indices of the steps on each level, in increasing order.
+
+        """
+        if self._levels is None:
+            step_level: list[int] = []
+            for children in self._children:
+                step_level.append(
+                    1 + max(step_level[c] for c in children) if children else 0
+                )
+            levels: list[list[int]] = [
+                [] for _ in range(max(step_level, default=-1) + 1)
+            ]
+            for i, level in enumerate(step_level):
+                levels[level].append(i)
+            self._levels = levels
+        return self._levels
+
+    @staticmethod
+    def _variable_value(
+        op: pp.ad.Variable,
+        ad: dict[int, AdArray | np.ndarray],
+        prev_iter_vals: dict[int, np.ndarray],
+        prev_vals: dict[int, np.ndarray],
+    ) -> AdArray | np.ndarray:
+        """Get the value of a variable, depending on whether it represents the current
+        iterate, the previous iterate or the previous time step."""
+        if op.prev_time:
+            return prev_vals[op.id]
+        elif op.prev_iter or op.id not in ad:
+            return prev_iter_vals[op.id]
+        else:
+            return ad[op.id]
+
+    def _tree(self, i: int) -> pp.ad.operators.Tree:
+        """Tree of the operator represented by an operation step."""
+        op = self._operators[i]
+        assert isinstance(op, pp.ad.Operator)
+        return op.tree
+
+    def __repr__(self) -> str:
+        s = (
+            f"Evaluation plan for {len(self.root_indices)} operators with "
+            f"{self.num_steps} steps, of which {self.num_static_steps} are static.\n"
+            f"{self.num_deduplicated_nodes} operator nodes were deduplicated.\n"
+            f"Contains {len(self._current_dofs)} variables, "
+            f"{len(self._prev_iter_dofs)} previous iterates and "
+            f"{len(self._prev_time_dofs)} previous time steps.\n"
+        )
+        return s
+
+
+def _wrapped_value(op: Union[pp.ad.Scalar, pp.ad.DenseArray]) -> Any:
+    """The number or array wrapped by a scalar or array operator."""
+    return op._value if isinstance(op, pp.ad.Scalar) else op._values
+
+
+def _same_value(value: Any, other: Any) -> bool:
+    """Check if two inputs of an operator are equal. Numpy arrays and scalars are
+    compared by value, other objects (sparse matrices, lists of discretization
+    matrices) by identity of their items."""
+    is_numeric = isinstance(value, np.ndarray) or np.isscalar(value)
+    if is_numeric:
+        return (
+            type(value) is type(other)
+            and np.shape(value) == np.shape(other)
+            and np.array_equal(value, other)
+        )
+    elif isinstance(value, list):
+        return (
+            isinstance(other, list)
+            and len(value) == len(other)
+            and all(a is b for a, b in zip(value, other))
+        )
+    return value is other
+
+
+def _copy_value(value: Any) -> Any:
+    """Copy an input of an operator, if it is a numpy array which may be modified in
+    place."""
+    return value.copy() if isinstance(value, np.ndarray) else value
@@ -2,7 +2,7 @@
 """
 from __future__ import annotations
 
-from typing import Union
+from typing import Optional, Union
 
 import numpy as np
 import scipy.sparse as sps
@@ -11,7 +11,7 @@ import porepy as pp
 
 AdType = Union[float, np.ndarray, sps.spmatrix, "AdArray"]
 
-__all__ = ["initAdArrays", "AdArray"]
+__all__ = ["initAdArrays", "AdArray", "MultiComponentAdArray"]
 
 
 def initAdArrays(variables: list[np.ndarray]) -> list[AdArray]:
@@ -69,6 +69,18 @@ class AdArray:
 
     A violation of these rules will result in a ``ValueError``.
 
+    Elementwise operations, such as multiplication with a numpy array and the functions
+    in :mod:`~porepy.numerics.ad.functions`, scale the rows of the Jacobian. The scaling
+    is not applied immediately, but recorded as a vector of row factors together with
+    the unscaled Jacobian, and consecutive elementwise operations multiply the factors.
+    Operations on two AdArrays whose Jacobians derive from the same matrix, e.g.,
+    ``p * exp(p)``, are also combined in the factors. The scaled Jacobian is formed by a
+    single pass over the nonzeros of the matrix when :attr:`jac` is accessed, e.g., when
+    the AdArray is left-multiplied by a sparse matrix. The Jacobians are therefore
+    shared between AdArrays, and must not be modified in place. The unscaled Jacobian
+    and the factors are stored and replaced as a single tuple, such that an AdArray can
+    be read by several threads at the same time, as in threaded assembly.
+
     Attributes:
         val: The value of the AdArray, stored as a 1d numpy array.
         jac: The Jacobian matrix of the AdArray, stored as a sparse matrix.
@@ -90,8 +102,29 @@ class AdArray:
         self.val: np.ndarray = val.astype(float)
         """The value of the AdArray, stored as a 1d numpy array."""
 
-        self.jac: sps.spmatrix = jac.astype(float)
-        """The Jacobian matrix of the AdArray, stored as a sparse matrix."""
+        self._jac_state: tuple[sps.spmatrix, Optional[np.ndarray]] = (
+            jac.astype(float),
+            None,
+        )
+        """The Jacobian matrix before scaling of its rows, and the factors of the rows
+        which have not yet been applied to it. None signifies no scaling."""
+
+    @property
+    def jac(self) -> sps.spmatrix:
+        """The Jacobian matrix of the AdArray, stored as a sparse matrix.
+
+        Pending scaling of the rows is applied when the Jacobian is accessed.
+
+        """
+        jac, scaling = self._jac_state
+        if scaling is not None:
+            jac = _scale_rows(jac, scaling)
+            self._jac_state = (jac, None)
+        return jac
+
+    @jac.setter
+    def jac(self, jac: sps.spmatrix) -> None:
+        self._jac_state = (jac, None)
 
     def __repr__(self) -> str:
         s = f"Ad array of size {self.val.size}\n"
@@ -118,20 +151,23 @@ class AdArray:
         if isinstance(other, (int, float)):
             # Strictly speaking, we require scalars to be floats, but add casting of
             # ints to floats for convenience.
-            return AdArray(self.val + float(other), self.jac)
+            return self._chain_rule(self.val + float(other), None)
 
         elif isinstance(other, np.ndarray):
-            if other.ndim != 1:
+            if not self._is_elementwise_array(other):
                 raise ValueError("Only 1d numpy arrays can be added to AdArrays")
-            return AdArray(self.val + other, self.jac)
+            return self._chain_rule(self.val + other, None)
 
         elif isinstance(other, sps.spmatrix):
             raise ValueError("Sparse matrices cannot be added to AdArrays")
 
         elif isinstance(other, pp.ad.AdArray):
-            if self.val.size != other.val.size or self.jac.shape != other.jac.shape:
+            if (
+                self.val.size != other.val.size
+                or self._jac_state[0].shape != other._jac_state[0].shape
+            ):
                 raise ValueError("Incompatible sizes for AdArray addition")
-            return AdArray(self.val + other.val, self.jac + other.jac)
+            return self._combine(other, self.val + other.val, None, None)
 
         else:
             raise ValueError(f"Unknown type {type(other)} for AdArray addition")
@@ -203,20 +239,17 @@ class AdArray:
         if isinstance(other, (int, float)):
             # Strictly speaking, we require scalars to be floats, but add casting of
             # ints to floats for convenience.
-            return AdArray(self.val * other, self.jac * other)
+            return self._chain_rule(self.val * other, float(other))
 
         elif isinstance(other, np.ndarray):
-            if other.ndim != 1:
+            if not self._is_elementwise_array(other):
                 raise ValueError(
                     "Only 1d numpy arrays can be multiplied elementwise with AdArrays."
                 )
             # The below line will invoke numpy's __mul__ method on the values.
             new_val = self.val * other
-            # The Jacobian will have its columns scaled with the values in other.
-            # Achieve this by left-multiplying with other, represented as a diagonal
-            # matrix.
-            new_jac = self._diagvec_mul_jac(other)
-            return AdArray(new_val, new_jac)
+            # The rows of the Jacobian are scaled with the values in other.
+            return self._chain_rule(new_val, other)
 
         elif isinstance(other, sps.spmatrix):
             raise ValueError(
@@ -226,7 +259,10 @@ class AdArray:
             )
 
         elif isinstance(other, pp.ad.AdArray):
-            if self.val.size != other.val.size or self.jac.shape != other.jac.shape:
+            if (
+                self.val.size != other.val.size
+                or self._jac_state[0].shape != other._jac_state[0].shape
+            ):
                 raise ValueError(
                     "Incompatible sizes for AdArray elementwise multiplication."
                 )
@@ -235,12 +271,9 @@ class AdArray:
             # numpy's __mul__ method
             new_val = self.val * other.val
             # Compute the derivative of the product using the product rule. Since
-            # the gradients in jac is stored row-wise, the columns in self.jac
+            # the gradients in jac is stored row-wise, the rows in self.jac
             # should be scaled with the values of other and vice versa.
-            new_jac = self._diagvec_mul_jac(other.val) + other._diagvec_mul_jac(
-                self.val
-            )
-            return AdArray(new_val, new_jac)
+            return self._combine(other, new_val, other.val, self.val)
 
         else:
             raise ValueError(
@@ -295,14 +328,13 @@ class AdArray:
         if isinstance(other, (int, float)):
             # This is a polynomial, use standard rules for differentiation.
             new_val = self.val**other
-            # Left-multiply jac with a diagonal-matrix version of the differentiated
-            # polynomial, this will give the desired column-wise scaling of the
-            # gradients.
-            new_jac = self._diagvec_mul_jac(float(other) * self.val ** float(other - 1))
-            return AdArray(new_val, new_jac)
+            # Scale the rows of jac with the differentiated polynomial.
+            return self._chain_rule(
+                new_val, float(other) * self.val ** float(other - 1)
+            )
 
         elif isinstance(other, np.ndarray):
-            if other.ndim != 1:
+            if not self._is_elementwise_array(other):
                 raise ValueError(
                     "AdArrays can only be raised to powers of 1d numpy arrays."
                 )
@@ -311,17 +343,17 @@ class AdArray:
             # without EK ever understanding why, so we convert to a float
             # beforehand, just to be sure.
             new_val = self.val ** other.astype(float)
-            # The Jacobian will have its columns scaled with the values in other,
-            # again in array-form. Achieve this by left-multiplying with other,
-            # represented as a diagonal matrix.
-            new_jac = self._diagvec_mul_jac(other * (self.val ** (other - 1)))
-            return AdArray(new_val, new_jac)
+            # The rows of the Jacobian are scaled with the differentiated polynomial.
+            return self._chain_rule(new_val, other * (self.val ** (other - 1)))
 
         elif isinstance(other, sps.spmatrix):
             raise ValueError("Cannot raise AdArrays to power of sparse matrices.")
 
         elif isinstance(other, pp.ad.AdArray):
-            if self.val.size != other.val.size or self.jac.shape != other.jac.shape:
+            if (
+                self.val.size != other.val.size
+                or self._jac_state[0].shape != other._jac_state[0].shape
+            ):
                 raise ValueError("Incompatible sizes for AdArray power.")
 
             # This is an expression of the type f = x^y, with derivative
@@ -332,14 +364,13 @@ class AdArray:
             # avoid spurious behavior form numpy, just to be sure.
             new_val = self.val ** other.val.astype(float)
             # The derivative, computed by the chain rule.
-            new_jac = self._diagvec_mul_jac(
-                other.val * self.val ** (other.val.astype(float) - 1.0)
-            ) + other._diagvec_mul_jac(
-                self.val ** other.val.astype(float) * np.log(self.val)
+            return self._combine(
+                other,
+                new_val,
+                other.val * self.val ** (other.val.astype(float) - 1.0),
+                new_val * np.log(self.val),
             )
 
-            return AdArray(new_val, new_jac)
-
         else:
             raise ValueError(f"Unknown type {type(other)} for AdArray power.")
 
@@ -358,16 +389,11 @@ class AdArray:
         if isinstance(other, (int, float)):
             # This is an exponent of type number ** x
             new_val = float(other) ** self.val
-            # Left-multiply jac with a diagonal-matrix version of the differentiated
-            # polynomial, this will give the desired column-wise scaling of the
-            # gradients.
-            new_jac = self._diagvec_mul_jac(
-                (float(other) ** self.val) * np.log(float(other))
-            )
-            return AdArray(new_val, new_jac)
+            # Scale the rows of jac with the derivative of the exponential.
+            return self._chain_rule(new_val, new_val * np.log(float(other)))
 
         elif isinstance(other, np.ndarray):
-            if other.ndim != 1:
+            if not self._is_elementwise_array(other):
                 raise ValueError(
                     "Only 1d numpy arrays can be raised to the power of an AdArray."
                 )
@@ -378,17 +404,18 @@ class AdArray:
             # error. As an example compare 1/np.array([1,2,3]) and np.array([1,2,3])**-1.
             # As a workaround, we convert it to a float.
             new_val = other.astype(float) ** self.val
-            # The Jacobian will have its columns scaled with the values in other,
-            # again in array-form. Achieve this by left-multiplying with other,
-            # represented as a diagonal matrix.
-            new_jac = self._diagvec_mul_jac((other**self.val) * np.log(other))
-            return AdArray(new_val, new_jac)
+            # The rows of the Jacobian are scaled with the derivative of the
+            # exponential, again in array-form.
+            return self._chain_rule(new_val, new_val * np.log(other))
 
         elif isinstance(other, sps.spmatrix):
             raise ValueError("Cannot raise sparse matrices to the power of Ad arrays.")
 
         elif isinstance(other, pp.ad.AdArray):
-            if self.val.size != other.val.size or self.jac.shape != other.jac.shape:
+            if (
+                self.val.size != other.val.size
+                or self._jac_state[0].shape != other._jac_state[0].shape
+            ):
                 raise ValueError("Incompatible sizes for AdArray power.")
 
             return other.__pow__(self)
@@ -412,25 +439,24 @@ class AdArray:
         if isinstance(other, (int, float)):
             # Division by float, or int cast to float is straightforward, elementwise.
             new_val = self.val / float(other)
-            new_jac = self.jac / float(other)
-            return AdArray(new_val, new_jac)
+            return self._chain_rule(new_val, 1.0 / float(other))
 
         elif isinstance(other, np.ndarray):
-            if other.ndim != 1:
+            if not self._is_elementwise_array(other):
                 raise ValueError("AdArrays can only be divided by 1d numpy arrays.")
 
             new_val = self.val * other.astype(float) ** (-1.0)
-            # The Jacobian will have its columns scaled with the values in other,
-            # again in array-form. Achieve this by left-multiplying with other,
-            # represented as a diagonal matrix.
-            new_jac = self._diagvec_mul_jac(other.astype(float) ** (-1.0))
-            return AdArray(new_val, new_jac)
+            # The rows of the Jacobian are scaled with the inverse values in other.
+            return self._chain_rule(new_val, other.astype(float) ** (-1.0))
 
         elif isinstance(other, sps.spmatrix):
             raise ValueError("AdArrays cannot be divided by sparse matrices.")
 
         elif isinstance(other, pp.ad.AdArray):
-            if self.val.size != other.val.size or self.jac.shape != other.jac.shape:
+            if (
+                self.val.size != other.val.size
+                or self._jac_state[0].shape != other._jac_state[0].shape
+            ):
                 raise ValueError("Incompatible sizes for AdArray division.")
 
             return self.__mul__(other.__pow__(-1.0))
@@ -459,7 +485,10 @@ class AdArray:
             return self.__pow__(-1.0) * other
 
         elif isinstance(other, pp.ad.AdArray):
-            if self.val.size != other.val.size or self.jac.shape != other.jac.shape:
+            if (
+                self.val.size != other.val.size
+                or self._jac_state[0].shape != other._jac_state[0].shape
+            ):
                 raise ValueError("Incompatible sizes for AdArray division.")
 
             return other.__mul__(self.__pow__(-1.0))
@@ -523,12 +552,17 @@ class AdArray:
 
         elif isinstance(other, sps.spmatrix):
             # This is the standard matrix-vector multiplication
-            if self.jac.shape[0] != other.shape[1]:
+            if self._jac_state[0].shape[0] != other.shape[1]:
                 raise ValueError(
                     """Dimension mismatch between sparse matrix and AdArray during
                     matrix multiplication."""
                 )
             new_val = other @ self.val
+            if _is_diagonal(other):
+                # A diagonal matrix is an elementwise scaling, which can be combined
+                # with the pending scaling of the rows.
+                return self._chain_rule(new_val, other.diagonal())
+            # Apply the pending scaling of the rows, then do a single sparse product.
             new_jac = other @ self.jac
             return AdArray(new_val, new_jac)
 
@@ -536,10 +570,7 @@ class AdArray:
             raise ValueError(f"Unknown type {type(other)} for AdArray multiplication.")
 
     def __neg__(self) -> AdArray:
-        b = self.copy()
-        b.val = -b.val
-        b.jac = -b.jac
-        return b
+        return self._chain_rule(-self.val, -1.0)
 
     def copy(self) -> AdArray:
         """Return a copy of this AdArray.
@@ -548,15 +579,341 @@ class AdArray:
             A deep copy of this AdArray.
 
         """
-        b = AdArray(self.val.copy(), self.jac.copy())
+        jac, scaling = self._jac_state
+        b = type(self)(self.val.copy(), jac.copy())
+        if scaling is not None:
+            b._jac_state = (b._jac_state[0], scaling.copy())
         return b
 
-    def _diagvec_mul_jac(self, a: np.ndarray) -> sps.spmatrix:
-        A = sps.diags(a)
+    def _chain_rule(
+        self, val: np.ndarray, derivative: Optional[Union[float, np.ndarray]]
+    ) -> AdArray:
+        """Create an AdArray as an elementwise function of this AdArray.
 
-        return A * self.jac
+        The Jacobian of the new AdArray is ``diag(derivative) @ self.jac``. The scaling
+        of the rows is recorded, not applied, see the class documentation.
+
+        Parameters:
+            val: The value of the new AdArray.
+            derivative: The derivative of the elementwise function. None signifies the
+                identity, i.e., the Jacobian of this AdArray.
+
+        Returns:
+            The new AdArray.
+
+        """
+        new = type(self).__new__(type(self))
+        new.val = val.astype(float, copy=False)
+        jac, scaling = self._jac_state
+        new._jac_state = (
+            jac,
+            _multiply_scaling(scaling, derivative, self.val.shape),
+        )
+        return new
+
+    def _combine(
+        self,
+        other: AdArray,
+        val: np.ndarray,
+        derivative: Optional[np.ndarray],
+        other_derivative: Optional[np.ndarray],
+    ) -> AdArray:
+        """Create an AdArray as an elementwise function of this and another AdArray.
+
+        The Jacobian of the new AdArray is
+        ``diag(derivative) @ self.jac + diag(other_derivative) @ other.jac``. If the
+        two Jacobians derive from the same matrix, the sum is recorded as a scaling of
+        the rows of this matrix.
+
+        Parameters:
+            other: The other AdArray.
+            val: The value of the new AdArray.
+            derivative: The partial derivative with respect to this AdArray. None
+                signifies one.
+            other_derivative: The partial derivative with respect to the other AdArray.
+                None signifies one.
+
+        Returns:
+            The new AdArray.
+
+        """
+        shape = self.val.shape
+        jac, scaling = self._jac_state
+        other_jac, other_scaling = other._jac_state
+        scaling = _multiply_scaling(scaling, derivative, shape)
+        other_scaling = _multiply_scaling(other_scaling, other_derivative, shape)
+        if jac is other_jac:
+            ones = np.ones(self.val.size)
+            new = type(self).__new__(type(self))
+            new.val = val.astype(float, copy=False)
+            new._jac_state = (
+                jac,
+                (ones if scaling is None else scaling)
+                + (ones if other_scaling is None else other_scaling),
+            )
+            return new
+        new_jac = _scale_rows(jac, scaling) + _scale_rows(other_jac, other_scaling)
+        return type(self)(val, new_jac)
+
+    def _is_elementwise_array(self, other: np.ndarray) -> bool:
+        """Check if a numpy array can be combined elementwise with this AdArray."""
+        return other.ndim == 1
+
+    def _diagvec_mul_jac(self, a: np.ndarray) -> sps.spmatrix:
+        return _scale_rows(self.jac, a)
 
     def _jac_mul_diagvec(self, a: np.ndarray) -> sps.spmatrix:
         A = sps.diags(a)
 
         return self.jac * A
+
+
+class MultiComponentAdArray(AdArray):
+    """An AdArray representing several fields (components) of equal size.
+
+    Typical examples are the concentrations of several tracers or components, or the
+    saturations of several phases. The values are stored as a 2d array of shape
+    ``(num_components, size)``. The Jacobians of the components are stacked in a single
+    sparse matrix, where the rows of component ``i`` are
+    ``i * size:(i + 1) * size``. Elementwise operations, including the functions in
+    :mod:`~porepy.numerics.ad.functions` which act through the chain rule, thus treat
+    all components by a single numpy call and a single scaling of the Jacobian, instead
+    of one operation per component.
+
+    The rules for arithmetic operations of :class:`AdArray` apply, with the following
+    extensions:
+      * Numpy arrays can be of shape ``(size,)``, which is broadcast over the
+        components, or of shape ``(num_components, size)``.
+      * AdArrays of size ``size`` are broadcast over the components.
+      * Left multiplication with a sparse matrix acts on each component.
+
+    Parameters:
+        val: Values of the components, as a 2d numpy array of shape
+            ``(num_components, size)``.
+        jac: Stacked Jacobian matrices of the components, with one row per element of
+            ``val``, ordered by component.
+
+    """
+
+    def __init__(self, val: np.ndarray, jac: sps.spmatrix) -> None:
+        if val.ndim != 2:
+            raise ValueError(
+                "The multi-component Ad array value should be two dimensional"
+            )
+        if jac.shape[0] != val.size:
+            raise ValueError(
+                "The Jacobian matrix should have one row per array degree of freedom"
+            )
+        self.val = val.astype(float)
+        self._jac_state = (jac.astype(float), None)
+
+    @classmethod
+    def from_ad_arrays(cls, ad_arrays: list[AdArray]) -> MultiComponentAdArray:
+        """Stack AdArrays of equal size as the components of a multi-component array.
+
+        Parameters:
+            ad_arrays: The components.
+
+        Raises:
+            ValueError: If the AdArrays differ in size.
+
+        Returns:
+            A multi-component AdArray.
+
+        """
+        if len(set(a.val.size for a in ad_arrays)) != 1:
+            raise ValueError("The components should be AdArrays of equal size")
+        val = np.vstack([a.val for a in ad_arrays])
+        jac = sps.vstack([a.jac for a in ad_arrays], format="csr")
+        return cls(val, jac)
+
+    def __repr__(self) -> str:
+        s = f"Multi-component Ad array with {self.num_components} components of size "
+        s += f"{self.val.shape[1]}\n"
+        s += f"Jacobian is of size {self._jac_state[0].shape}"
+        return s
+
+    @property
+    def num_components(self) -> int:
+        """Number of components."""
+        return self.val.shape[0]
+
+    def component(self, i: int) -> AdArray:
+        """Extract a component.
+
+        Parameters:
+            i: Index of the component.
+
+        Returns:
+            An AdArray with the values and the Jacobian of the component.
+
+        """
+        size = self.val.shape[1]
+        return AdArray(self.val[i], self.jac.tocsr()[i * size : (i + 1) * size])
+
+    def to_ad_arrays(self) -> list[AdArray]:
+        """Split into one AdArray per component.
+
+        Returns:
+            A list of AdArrays, one per component.
+
+        """
+        return [self.component(i) for i in range(self.num_components)]
+
+    def sum(self) -> AdArray:
+        """Sum of the components.
+
+        Returns:
+            An AdArray of size ``size``, which represents the sum over the components.
+
+        """
+        size = self.val.shape[1]
+        summation = sps.hstack([sps.identity(size)] * self.num_components, format="csr")
+        return AdArray(self.val.sum(axis=0), summation @ self.jac)
+
+    def __add__(self, other: AdType) -> AdArray:
+        return super().__add__(self._broadcast(other))
+
+    def __radd__(self, other: AdType) -> AdArray:
+        if isinstance(other, AdArray):
+            # Reached for an AdArray of a single component plus this array.
+            return self.__add__(other)
+        return super().__radd__(other)
+
+    def __sub__(self, other: AdType) -> AdArray:
+        return super().__sub__(self._broadcast(other))
+
+    def __rsub__(self, other: AdType) -> AdArray:
+        if isinstance(other, AdArray):
+            return self._broadcast_ad_array(other).__sub__(self)
+        return super().__rsub__(other)
+
+    def __mul__(self, other: AdType) -> AdArray:
+        return super().__mul__(self._broadcast(other))
+
+    def __rmul__(self, other: AdType) -> AdArray:
+        if isinstance(other, AdArray):
+            # Reached for an AdArray of a single component times this array.
+            return self.__mul__(other)
+        return super().__rmul__(other)
+
+    def __pow__(self, other: AdType) -> AdArray:
+        return super().__pow__(self._broadcast(other))
+
+    def __rpow__(self, other: AdType) -> AdArray:
+        if isinstance(other, AdArray):
+            return self._broadcast_ad_array(other).__pow__(self)
+        return super().__rpow__(other)
+
+    def __truediv__(self, other: AdType) -> AdArray:
+        return super().__truediv__(self._broadcast(other))
+
+    def __rtruediv__(self, other: AdType) -> AdArray:
+        if isinstance(other, AdArray):
+            return self._broadcast_ad_array(other).__mul__(self.__pow__(-1.0))
+        return super().__rtruediv__(other)
+
+    def __rmatmul__(self, other):
+        """Left multiply each component with a sparse matrix.
+
+        Parameters:
+            other: A sparse matrix with ``size`` columns.
+
+        Returns:
+            A multi-component AdArray, with ``other.shape[0]`` values per component.
+
+        """
+        if not isinstance(other, sps.spmatrix):
+            return super().__rmatmul__(other)
+        num_components, size = self.val.shape
+        if other.shape[1] != size:
+            raise ValueError(
+                """Dimension mismatch between sparse matrix and AdArray during
+                matrix multiplication."""
+            )
+        new_val = np.ascontiguousarray((other @ self.val.T).T)
+        if _is_diagonal(other):
+            return self._chain_rule(new_val, other.diagonal())
+        # A single product with the block diagonal matrix acting on all components.
+        block_matrix = _repeat_block_diagonal(other.tocsr(), num_components)
+        return MultiComponentAdArray(new_val, block_matrix @ self.jac)
+
+    def _broadcast(self, other: AdType) -> AdType:
+        """Broadcast an AdArray of a single component to all components."""
+        if isinstance(other, AdArray):
+            return self._broadcast_ad_array(other)
+        return other
+
+    def _broadcast_ad_array(self, other: AdArray) -> AdArray:
+        """Broadcast an AdArray to all components, unless it is a multi-component
+        array already."""
+        if isinstance(other, MultiComponentAdArray):
+            return other
+        if other.val.size != self.val.shape[1]:
+            raise ValueError("Incompatible sizes for multi-component AdArray")
+        return MultiComponentAdArray(
+            np.tile(other.val, (self.num_components, 1)),
+            sps.vstack([other.jac] * self.num_components, format="csr"),
+        )
+
+    def _is_elementwise_array(self, other: np.ndarray) -> bool:
+        return other.shape in ((self.val.shape[1],), self.val.shape)
+
+
+def _repeat_block_diagonal(mat: sps.csr_matrix, num_blocks: int) -> sps.csr_matrix:
+    """Block diagonal CSR matrix with ``num_blocks`` copies of a matrix on the
+    diagonal, formed by tiling the arrays of the matrix."""
+    offsets = np.arange(num_blocks)
+    indices = (mat.indices + mat.shape[1] * offsets[:, None]).ravel()
+    indptr = np.append(
+        (mat.indptr[:-1] + mat.nnz * offsets[:, None]).ravel(), mat.nnz * num_blocks
+    )
+    return sps.csr_matrix(
+        (np.tile(mat.data, num_blocks), indices, indptr),
+        shape=(mat.shape[0] * num_blocks, mat.shape[1] * num_blocks),
+    )
+
+
+def _is_diagonal(mat: sps.spmatrix) -> bool:
+    """Check if a sparse matrix is a square matrix in dia format with only the main
+    diagonal."""
+    return (
+        mat.format == "dia"
+        and mat.shape[0] == mat.shape[1]
+        and np.array_equal(mat.offsets, [0])
+    )
+
+
+def _multiply_scaling(
+    scaling: Optional[np.ndarray],
+    factor: Optional[Union[float, np.ndarray]],
+    shape: tuple[int, ...],
+) -> Optional[np.ndarray]:
+    """Multiply scaling factors of rows, where None signifies no scaling.
+
+    The factor is broadcast to the shape of the values of an AdArray, and raveled
+    to one factor per row of the Jacobian.
+
+    """
+    if factor is None:
+        return scaling
+    factor = np.broadcast_to(np.asarray(factor, dtype=float), shape).ravel()
+    if scaling is None:
+        # Copy, since the factor may be a view of an array owned by the caller.
+        return factor.copy()
+    return scaling * factor
+
+
+def _scale_rows(mat: sps.spmatrix, scaling: Optional[np.ndarray]) -> sps.spmatrix:
+    """Scale the rows of a sparse matrix, i.e., compute ``diag(scaling) @ mat``.
+
+    The result is a new CSR matrix, formed without a sparse matrix product.
+
+    """
+    if scaling is None:
+        return mat
+    csr = mat.tocsr()
+    data = csr.data * np.repeat(scaling, np.diff(csr.indptr))
+    return sps.csr_matrix(
+        (data, csr.indices.copy(), csr.indptr.copy()), shape=csr.shape
+    )
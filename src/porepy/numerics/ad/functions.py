@@ -58,8 +58,7 @@ __all__ = [
 def exp(var):
     if isinstance(var, AdArray):
         val = np.exp(var.val)
-        der = var._diagvec_mul_jac(np.exp(var.val))
-        return AdArray(val, der)
+        return var._chain_rule(val, val)
     else:
         return np.exp(var)
 
@@ -67,8 +66,7 @@ def exp(var):
 def log(var):
     if isinstance(var, AdArray):
         val = np.log(var.val)
-        der = var._diagvec_mul_jac(1 / var.val)
-        return AdArray(val, der)
+        return var._chain_rule(val, 1 / var.val)
     else:
         return np.log(var)
 
@@ -84,8 +82,7 @@ def sign(var):
 def abs(var):
     if isinstance(var, AdArray):
         val = np.abs(var.val)
-        jac = var._diagvec_mul_jac(sign(var))
-        return AdArray(val, jac)
+        return var._chain_rule(val, np.sign(var.val))
     else:
         return np.abs(var)
 
@@ -145,8 +142,7 @@ def l2_norm(dim: int, var: pp.ad.AdArray) -> pp.ad.AdArray:
 def sin(var):
     if isinstance(var, AdArray):
         val = np.sin(var.val)
-        jac = var._diagvec_mul_jac(np.cos(var.val))
-        return AdArray(val, jac)
+        return var._chain_rule(val, np.cos(var.val))
     else:
         return np.sin(var)
 
@@ -154,8 +150,7 @@ def sin(var):
 def cos(var):
     if isinstance(var, AdArray):
         val = np.cos(var.val)
-        jac = var._diagvec_mul_jac(-np.sin(var.val))
-        return AdArray(val, jac)
+        return var._chain_rule(val, -np.sin(var.val))
     else:
         return np.cos(var)
 
@@ -163,8 +158,7 @@ def cos(var):
 def tan(var):
     if isinstance(var, AdArray):
         val = np.tan(var.val)
-        jac = var._diagvec_mul_jac((np.cos(var.val) ** 2) ** (-1))
-        return AdArray(val, jac)
+        return var._chain_rule(val, (np.cos(var.val) ** 2) ** (-1))
     else:
         return np.tan(var)
 
@@ -172,8 +166,7 @@ def tan(var):
 def arcsin(var):
     if isinstance(var, AdArray):
         val = np.arcsin(var.val)
-        jac = var._diagvec_mul_jac((1 - var.val**2) ** (-0.5))
-        return AdArray(val, jac)
+        return var._chain_rule(val, (1 - var.val**2) ** (-0.5))
     else:
         return np.arcsin(var)
 
@@ -181,8 +174,7 @@ def arcsin(var):
 def arccos(var):
     if isinstance(var, AdArray):
         val = np.arccos(var.val)
-        jac = var._diagvec_mul_jac(-((1 - var.val**2) ** (-0.5)))
-        return AdArray(val, jac)
+        return var._chain_rule(val, -((1 - var.val**2) ** (-0.5)))
     else:
         return np.arccos(var)
 
@@ -190,8 +182,7 @@ def arccos(var):
 def arctan(var):
     if isinstance(var, AdArray):
         val = np.arctan(var.val)
-        jac = var._diagvec_mul_jac((var.val**2 + 1) ** (-1))
-        return AdArray(val, jac)
+        return var._chain_rule(val, (var.val**2 + 1) ** (-1))
     else:
         return np.arctan(var)
 
@@ -200,8 +191,7 @@ def arctan(var):
 def sinh(var):
     if isinstance(var, AdArray):
         val = np.sinh(var.val)
-        jac = var._diagvec_mul_jac(np.cosh(var.val))
-        return AdArray(val, jac)
+        return var._chain_rule(val, np.cosh(var.val))
     else:
         return np.sinh(var)
 
@@ -209,8 +199,7 @@ def sinh(var):
 def cosh(var):
     if isinstance(var, AdArray):
         val = np.cosh(var.val)
-        jac = var._diagvec_mul_jac(np.sinh(var.val))
-        return AdArray(val, jac)
+        return var._chain_rule(val, np.sinh(var.val))
     else:
         return np.cosh(var)
 
@@ -218,8 +207,7 @@ def cosh(var):
 def tanh(var):
     if isinstance(var, AdArray):
         val = np.tanh(var.val)
-        jac = var._diagvec_mul_jac(np.cosh(var.val) ** (-2))
-        return AdArray(val, jac)
+        return var._chain_rule(val, np.cosh(var.val) ** (-2))
     else:
         return np.tanh(var)
 
@@ -227,8 +215,7 @@ def tanh(var):
 def arcsinh(var):
     if isinstance(var, AdArray):
         val = np.arcsinh(var.val)
-        jac = var._diagvec_mul_jac((var.val**2 + 1) ** (-0.5))
-        return AdArray(val, jac)
+        return var._chain_rule(val, (var.val**2 + 1) ** (-0.5))
     else:
         return np.arcsinh(var)
 
@@ -238,8 +225,7 @@ def arccosh(var):
         val = np.arccosh(var.val)
         den1 = (var.val - 1) ** (-0.5)
         den2 = (var.val + 1) ** (-0.5)
-        jac = var._diagvec_mul_jac(den1 * den2)
-        return AdArray(val, jac)
+        return var._chain_rule(val, den1 * den2)
     else:
         return np.arccosh(var)
 
@@ -247,8 +233,7 @@ def arccosh(var):
 def arctanh(var):
     if isinstance(var, AdArray):
         val = np.arctanh(var.val)
-        jac = var._diagvec_mul_jac((1 - var.val**2) ** (-1))
-        return AdArray(val, jac)
+        return var._chain_rule(val, (1 - var.val**2) ** (-1))
     else:
         return np.arctanh(var)
 
@@ -284,10 +269,9 @@ def heaviside_smooth(var, eps: float = 1e-3):
     """
     if isinstance(var, AdArray):
         val = 0.5 * (1 + 2 * np.pi ** (-1) * np.arctan(var.val * eps ** (-1)))
-        jac = var._diagvec_mul_jac(
-            np.pi ** (-1) * eps * (eps**2 + var.val**2) ** (-1)
+        return var._chain_rule(
+            val, np.pi ** (-1) * eps * (eps**2 + var.val**2) ** (-1)
         )
-        return AdArray(val, jac)
     else:
         return 0.5 * (1 + 2 * np.pi ** (-1) * np.arctan(var * eps ** (-1)))
 
@@ -0,0 +1,214 @@
+"""Caching of the sparsity pattern of assembled Jacobian matrices.
+
+Between Newton iterations, and normally also between time steps, the sparsity pattern
+of the Jacobian matrix of a system of equations does not change. Still, a naive
+assembly constructs new index arrays for every matrix, and the concatenation of the
+blocks of the individual equations sorts and copies these arrays once more.
+
+The :class:`JacobianPattern` records the pattern of a matrix assembled from row blocks,
+together with the position of every block in the data array of the assembled matrix.
+Later assemblies write the values of the blocks into the data array of the same matrix
+object, without allocating new index arrays. Since the index arrays are kept, linear
+solvers can detect an unchanged pattern from the identity of ``matrix.indices`` and
+``matrix.indptr``, and reuse for instance a symbolic factorization.
+
+Sparse matrix operations in SciPy drop entries which evaluate to zero, thus the
+pattern of a block can be a strict subset of the recorded one, e.g., when a flux
+vanishes. Such blocks are scattered into the recorded pattern, padded with explicit
+zeros. If a block contains entries outside the recorded pattern, the pattern is
+extended by the union of the two patterns, and new index arrays are created.
+
+"""
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+import scipy.sparse as sps
+
+__all__ = ["JacobianPattern"]
+
+
+class JacobianPattern:
+    """Sparsity pattern of a matrix assembled by vertical stacking of row blocks.
+
+    The pattern is initialized from the blocks of a first assembly, see
+    :meth:`refresh` for later assemblies.
+
+    Parameters:
+        blocks: Row blocks of the matrix, in the order they should be stacked.
+        num_columns: Number of columns of the matrix. Needed if the list of blocks is
+            empty.
+
+    """
+
+    def __init__(self, blocks: Sequence[sps.spmatrix], num_columns: int) -> None:
+        self.num_columns: int = num_columns
+        """Number of columns of the matrix."""
+
+        self.num_refreshes: int = 0
+        """Number of calls to :meth:`refresh` which reused the index arrays."""
+
+        self.num_rebuilds: int = 0
+        """Number of calls to :meth:`refresh` which extended the pattern, and thus
+        created new index arrays."""
+
+        self._block_indptr: list[np.ndarray] = []
+        """Row pointers of the individual blocks, starting at 0."""
+
+        self._block_indices: list[np.ndarray] = []
+        """Column indices of the individual blocks."""
+
+        self._data_offsets: np.ndarray = np.zeros(1, dtype=int)
+        """Start of each block in the data array of the matrix. The last item is the
+        number of nonzeros."""
+
+        self.matrix: sps.csr_matrix
+        """The assembled matrix. The object and its index arrays are reused as long as
+        the pattern does not change; the values are updated in place."""
+
+        csr_blocks = [self._canonical(block) for block in blocks]
+        for block in csr_blocks:
+            self._block_indptr.append(block.indptr)
+            self._block_indices.append(block.indices)
+        self._build_matrix()
+        for block, start in zip(csr_blocks, self._data_offsets):
+            self.matrix.data[start : start + block.nnz] = block.data
+
+    def __repr__(self) -> str:
+        return (
+            f"Jacobian pattern with {len(self._block_indptr)} blocks, "
+            f"shape {self.matrix.shape} and {self.matrix.nnz} nonzeros.\n"
+            f"Refreshed {self.num_refreshes} times, rebuilt {self.num_rebuilds} times."
+        )
+
+    def matches(self, blocks: Sequence[sps.spmatrix]) -> bool:
+        """Check if a list of blocks is compatible with the recorded block structure.
+
+        Parameters:
+            blocks: Row blocks of the matrix.
+
+        Returns:
+            True if the number of blocks and the number of rows and columns in each
+            block coincide with those of the recorded pattern.
+
+        """
+        if len(blocks) != len(self._block_indptr):
+            return False
+        for block, indptr in zip(blocks, self._block_indptr):
+            if block.shape != (indptr.size - 1, self.num_columns):
+                return False
+        return True
+
+    def refresh(self, blocks: Sequence[sps.spmatrix]) -> sps.csr_matrix:
+        """Update the values of the matrix from a new set of row blocks.
+
+        Parameters:
+            blocks: Row blocks of the matrix. The block structure must match the
+                recorded one, see :meth:`matches`.
+
+        Raises:
+            ValueError: If the block structure does not match the recorded one.
+
+        Returns:
+            The updated matrix. Unless the pattern had to be extended, this is the same
+            object as returned by the previous call.
+
+        """
+        if not self.matches(blocks):
+            raise ValueError("The blocks do not match the recorded block structure.")
+
+        csr_blocks = [self._canonical(block) for block in blocks]
+        # Positions of the block values in the (block of the) data array. None signifies
+        # an identical pattern, for which the values can be copied directly.
+        positions: list = []
+        extended = False
+        for ind, block in enumerate(csr_blocks):
+            indptr = self._block_indptr[ind]
+            indices = self._block_indices[ind]
+            if np.array_equal(block.indptr, indptr) and np.array_equal(
+                block.indices, indices
+            ):
+                positions.append(None)
+                continue
+            recorded_keys = self._keys(indptr, indices)
+            block_keys = self._keys(block.indptr, block.indices)
+            pos = np.searchsorted(recorded_keys, block_keys)
+            # Guard against indices at the end of the array before comparing keys.
+            in_pattern = pos < recorded_keys.size
+            in_pattern[in_pattern] = (
+                recorded_keys[pos[in_pattern]] == block_keys[in_pattern]
+            )
+            if not np.all(in_pattern):
+                # Extend the pattern to the union of the recorded and the new one.
+                keys = np.union1d(recorded_keys, block_keys)
+                rows = keys // self.num_columns
+                self._block_indptr[ind] = np.hstack(
+                    (0, np.cumsum(np.bincount(rows, minlength=indptr.size - 1)))
+                ).astype(indptr.dtype)
+                self._block_indices[ind] = (keys % self.num_columns).astype(
+                    indices.dtype
+                )
+                pos = np.searchsorted(keys, block_keys)
+                extended = True
+            positions.append(pos)
+
+        if extended:
+            self._build_matrix()
+            self.num_rebuilds += 1
+        else:
+            self.num_refreshes += 1
+
+        data = self.matrix.data
+        for block, pos, start, end in zip(
+            csr_blocks, positions, self._data_offsets[:-1], self._data_offsets[1:]
+        ):
+            if pos is None:
+                data[start:end] = block.data
+            else:
+                data[start:end] = 0
+                data[start + pos] = block.data
+        return self.matrix
+
+    def _build_matrix(self) -> None:
+        """Create the matrix, with zero values, from the patterns of the blocks."""
+        block_nnz = [indices.size for indices in self._block_indices]
+        self._data_offsets = np.hstack((0, np.cumsum(block_nnz))).astype(int)
+        num_rows = sum(indptr.size - 1 for indptr in self._block_indptr)
+
+        # Use the index dtype SciPy would choose, so that the arrays are not converted
+        # when the matrix is created.
+        max_index = max(int(self._data_offsets[-1]), num_rows, self.num_columns)
+        index_dtype = np.int32 if max_index <= np.iinfo(np.int32).max else np.int64
+        indptr = np.zeros(num_rows + 1, dtype=index_dtype)
+        row = 0
+        for block_indptr, offset in zip(self._block_indptr, self._data_offsets):
+            num_block_rows = block_indptr.size - 1
+            indptr[row + 1 : row + num_block_rows + 1] = block_indptr[1:] + offset
+            row += num_block_rows
+        if len(self._block_indices) > 0:
+            indices = np.concatenate(self._block_indices).astype(
+                index_dtype, copy=False
+            )
+        else:
+            indices = np.zeros(0, dtype=index_dtype)
+        data = np.zeros(indices.size)
+
+        self.matrix = sps.csr_matrix(
+            (data, indices, indptr), shape=(num_rows, self.num_columns)
+        )
+
+    def _keys(self, indptr: np.ndarray, indices: np.ndarray) -> np.ndarray:
+        """Sorted, unique identifiers (row-major linear indices) of the entries in a
+        block with sorted column indices."""
+        rows = np.repeat(np.arange(indptr.size - 1), np.diff(indptr))
+        return rows.astype(np.int64) * self.num_columns + indices
+
+    @staticmethod
+    def _canonical(block: sps.spmatrix) -> sps.csr_matrix:
+        """Convert a block to CSR format, with sorted indices and no duplicates."""
+        block = sps.csr_matrix(block)
+        if not block.has_canonical_format:
+            block = block.copy()
+            block.sum_duplicates()
+        return block
@@ -17,7 +17,8 @@ import porepy as pp
 from porepy.utils.porepy_types import GridLike
 
 from . import _ad_utils
-from .forward_mode import AdArray, initAdArrays
+from .evaluation_plan import EvaluationPlan
+from .forward_mode import AdArray
 
 __all__ = [
     "Operator",
@@ -86,6 +87,9 @@ class Operator:
 
     """
 
+    _evaluation_plan: Optional[EvaluationPlan] = None
+    """Evaluation plan of the operator tree, created and cached by :meth:`compile`."""
+
     def __init__(
         self,
         name: Optional[str] = None,
@@ -268,63 +272,18 @@ class Operator:
         """
         raise NotImplementedError("This type of operator cannot be parsed right away")
 
-    def _parse_operator(self, op: Operator, mdg: pp.MixedDimensionalGrid):
-        """TODO: Currently, there is no prioritization between the operations; for
-        some reason, things just work. We may need to make an ordering in which the
-        operations should be carried out. It seems that the strategy of putting on
-        hold until all children are processed works, but there likely are cases where
-        this is not the case.
-        """
-
-        # The parsing strategy depends on the operator at hand:
-        # 1) If the operator is a Variable, it will be represented according to its
-        #    stored state.
-        # 2) If the operator is a leaf in the tree-representation of the operator,
-        #    parsing is left to the operator itself.
-        # 3) If the operator is formed by combining other operators lower in the tree,
-        #    parsing is handled by first evaluating the children (leads to recursion)
-        #    and then perform the operation on the result.
-
-        # Check for case 1 or 2
-        if isinstance(op, pp.ad.Variable) or isinstance(op, Variable):
-            # Case 1: Variable
-
-            # How to access the array of (Ad representation of) states depends on
-            # whether this is a single or combined variable; see self.__init__,
-            # definition of self._variable_ids.
-            # TODO: no difference between merged or no mixed-dimensional variables!?
-            if isinstance(op, pp.ad.MixedDimensionalVariable) or isinstance(
-                op, MixedDimensionalVariable
-            ):
-                if op.prev_time:
-                    return self._prev_vals[op.id]
-                elif op.prev_iter:
-                    return self._prev_iter_vals[op.id]
-                else:
-                    return self._ad[op.id]
-            else:
-                if op.prev_time:
-                    return self._prev_vals[op.id]
-                elif op.prev_iter or not (
-                    op.id in self._ad
-                ):  # TODO make it more explicit that op corresponds to a non_ad_variable?
-                    # e.g. by op.id in non_ad_variable_ids.
-                    return self._prev_iter_vals[op.id]
-                else:
-                    return self._ad[op.id]
-        elif isinstance(op, pp.ad.AdArray):
-            # When using nested operator functions, op can be an already evaluated term.
-            # Just return it.
-            return op
+    def _apply_operation(self, tree: Tree, results: list) -> Any:
+        """Combine the parsed children of an operator according to its operation.
 
-        elif op.is_leaf():
-            # Case 2
-            return op.parse(mdg)  # type:ignore
+        Parameters:
+            tree: Tree representation of the operator to be evaluated.
+            results: Numerical values of the children of the operator, in the order of
+                ``tree.children``.
 
-        # This is not an atomic operator. First parse its children, then combine them
-        tree = op.tree
-        results = [self._parse_operator(child, mdg) for child in tree.children]
+        Returns:
+            The numerical value of the operator.
 
+        """
         # Combine the results
         if tree.op == Operator.Operations.add:
             # To add we need two objects
@@ -636,6 +595,35 @@ class Operator:
 
     ### Operator parsing ----------------------------------------------------------------------
 
+    def compile(
+        self, system_manager: pp.ad.EquationSystem | pp.DofManager
+    ) -> EvaluationPlan:
+        """Compile the operator tree into an evaluation plan.
+
+        The plan is a flat, topologically ordered representation of the tree, which
+        also caches the mapping from variables to degrees of freedom and the values of
+        subtrees consisting of constant and discretization matrices, see
+        :class:`~porepy.numerics.ad.evaluation_plan.EvaluationPlan`.
+
+        The plan is stored and reused by subsequent calls to this method (and thus to
+        :meth:`evaluate`), unless the system manager, or its numbering of degrees of
+        freedom, changes. The tree of this operator should not be modified after
+        compilation.
+
+        Parameters:
+            system_manager: Used to identify the degrees of freedom of the variables
+                in the operator tree.
+
+        Returns:
+            The evaluation plan of this operator.
+
+        """
+        plan = self._evaluation_plan
+        if plan is None or not plan.is_valid_for(system_manager):
+            plan = EvaluationPlan([self], system_manager)
+            self._evaluation_plan = plan
+        return plan
+
     def evaluate(
         self,
         system_manager: pp.ad.EquationSystem | pp.DofManager,
@@ -643,6 +631,9 @@ class Operator:
     ):  # TODO ensure the operator always returns an AD array
         """Evaluate the residual and Jacobian matrix for a given solution.
 
+        The evaluation is done by replaying the evaluation plan of this operator, see
+        :meth:`compile`.
+
         Parameters:
             system_manager: Used to represent the problem. Will be used
                 to parse the sub-operators that combine to form this operator.
@@ -657,233 +648,59 @@ class Operator:
             this depends on the operator.
 
         """
-        # Get the mixed-dimensional grid used for the dof-manager.
-        mdg = system_manager.mdg
-
-        # Identify all variables in the Operator tree. This will include real variables,
-        # and representation of previous time steps and iterations.
-        (
-            variable_dofs,
-            variable_ids,
-            is_prev_time,
-            is_prev_iter,
-        ) = self._identify_variables(system_manager)
-
-        # Split variable dof indices and ids into groups of current variables (those
-        # of the current iteration step), and those from the previous time steps and
-        # iterations.
-        current_indices = []
-        current_ids = []
-        prev_indices = []
-        prev_ids = []
-        prev_iter_indices = []
-        prev_iter_ids = []
-        for ind, var_id, is_prev, is_prev_it in zip(
-            variable_dofs, variable_ids, is_prev_time, is_prev_iter
-        ):
-            if is_prev:
-                prev_indices.append(ind)
-                prev_ids.append(var_id)
-            elif is_prev_it:
-                prev_iter_indices.append(ind)
-                prev_iter_ids.append(var_id)
-            else:
-                current_indices.append(ind)
-                current_ids.append(var_id)
-
-        # Save information.
-        # IMPLEMENTATION NOTE: Storage in a separate data class could have
-        # been a more elegant option.
-        self._variable_dofs = current_indices
-        self._variable_ids = current_ids
-        self._prev_time_dofs = prev_indices
-        self._prev_time_ids = prev_ids
-        self._prev_iter_dofs = prev_iter_indices
-        self._prev_iter_ids = prev_iter_ids
-
-        # Parsing in two stages: First make a forward Ad-representation of the variable
-        # state (this must be done jointly for all variables of the operator to get all
-        # derivatives represented). Then parse the operator by traversing its
-        # tree-representation, and parse and combine individual operators.
-
-        prev_vals = system_manager.get_variable_values(time_step_index=0)
-
-        if state is None:
-            state = system_manager.get_variable_values(iterate_index=0)
-
-        # Initialize Ad variables with the current iterates
-
-        # The size of the Jacobian matrix will always be set according to the
-        # variables found by the DofManager in the MixedDimensionalGrid.
-
-        # NOTE: This implies that to derive a subsystem from the Jacobian
-        # matrix of this Operator will require restricting the columns of
-        # this matrix.
-
-        # First generate an Ad array (ready for forward Ad) for the full set.
-        ad_vars = initAdArrays([state])[0]
-
-        # Next, the Ad array must be split into variables of the right size
-        # (splitting impacts values and number of rows in the Jacobian, but
-        # the Jacobian columns must stay the same to preserve all cross couplings
-        # in the derivatives).
-
-        # Dictionary which maps from Ad variable ids to AdArray.
-        self._ad: dict[int, AdArray] = {}
-
-        # Loop over all variables, restrict to an Ad array corresponding to
-        # this variable.
-        for var_id, dof in zip(self._variable_ids, self._variable_dofs):
-            ncol = state.size
-            nrow = np.unique(dof).size
-            # Restriction matrix from full state (in Forward Ad) to the specific
-            # variable.
-            R = sps.coo_matrix(
-                (np.ones(nrow), (np.arange(nrow), dof)), shape=(nrow, ncol)
-            ).tocsr()
-            self._ad[var_id] = R @ ad_vars
-
-        # Also make mappings from the previous iteration.
-        # This is simpler, since it is only a matter of getting the residual vector
-        # correctly (not Jacobian matrix).
-
-        prev_iter_vals_list = [state[ind] for ind in self._prev_iter_dofs]
-        self._prev_iter_vals = {
-            var_id: val
-            for (var_id, val) in zip(self._prev_iter_ids, prev_iter_vals_list)
-        }
+        return self.compile(system_manager).evaluate(state)[0]
 
-        # Also make mappings from the previous time step.
-        prev_vals_list = [prev_vals[ind] for ind in self._prev_time_dofs]
-        self._prev_vals = {
-            var_id: val for (var_id, val) in zip(self._prev_time_ids, prev_vals_list)
-        }
+    def jvp(
+        self,
+        system_manager: pp.ad.EquationSystem | pp.DofManager,
+        tangent: np.ndarray,
+        state: Optional[np.ndarray] = None,
+    ) -> tuple[Any, np.ndarray]:
+        """Evaluate the operator and the product of its Jacobian with a vector, without
+        forming the Jacobian matrix.
 
-        # Parse operators. This is left to a separate function to facilitate the
-        # necessary recursion for complex operators.
-        eq = self._parse_operator(self, mdg)
+        See :meth:`~porepy.numerics.ad.evaluation_plan.EvaluationPlan.jvp`.
 
-        return eq
+        Parameters:
+            system_manager: Used to represent the problem.
+            tangent: Vector in the global state space, or several vectors stored as the
+                columns of a two-dimensional array.
+            state (optional): Solution vector for which the operator should be
+                evaluated. If not provided, the solution will be pulled from the
+                current iterate.
 
-    def _identify_variables(
+        Returns:
+            The value of the operator, and the Jacobian-vector product.
+
+        """
+        values, products = self.compile(system_manager).jvp(tangent, state)
+        return values[0], products[0]
+
+    def vjp(
         self,
         system_manager: pp.ad.EquationSystem | pp.DofManager,
-        var: Optional[list] = None,
-    ):
-        """Identify all variables in this operator."""
-        # 1. Get all variables present in this operator.
-        # The variable finder is implemented in a special function, aimed at recursion
-        # through the operator tree.
-        # Uniquify by making this a set, and then sort on variable id
-        variables = sorted(
-            list(set(self._find_subtree_variables())),
-            key=lambda var: var.id,
-        )
-
-        # 2. Get a mapping between variables (*not* only MixedDimensionalVariables) and
-        # their indices according to the DofManager. This is needed to access the
-        # state of a variable when parsing the operator to numerical values using
-        # forward Ad.
-
-        # For each variable, get the global index
-        inds = []
-        variable_ids = []
-        prev_time = []
-        prev_iter = []
-        for variable in variables:
-            # Indices (in DofManager sense) of this variable. Will be built gradually
-            # for MixedDimensionalVariables, in one go for plain Variables.
-            ind_var = []
-            prev_time.append(variable.prev_time)
-            prev_iter.append(variable.prev_iter)
-
-            if isinstance(variable, MixedDimensionalVariable):
-                # Is this equivalent to the test in previous function?
-                # Loop over all subvariables for the mixed-dimensional variable
-                for i, sub_var in enumerate(variable.sub_vars):
-                    if sub_var.prev_time or sub_var.prev_iter:
-                        # If this is a variable representing a previous time step or
-                        # iteration, we need to use the original variable to get hold of
-                        # the correct dof indices, since this is the variable that was
-                        # created by the EquationSystem. However, we will tie the
-                        # indices to the id of this variable, since this is the one that
-                        # will be used for lookup later on.
-                        sub_var_known_to_eq_system: Variable = sub_var.original_variable
-                    else:
-                        sub_var_known_to_eq_system = sub_var
-
-                    # Get the index of this sub variable in the global numbering of the
-                    # EquationSystem. If an error message is raised that the variable is
-                    # not present in the EquationSystem, it is likely that this operator
-                    # contains a variable that is not known to the EquationSystem (it
-                    # has not passed through EquationSystem.create_variable()).
-                    ind_var.append(system_manager.dofs_of([sub_var_known_to_eq_system]))
-                    if i == 0:
-                        # Store id of variable, but only for the first one; we will
-                        # concatenate the arrays in ind_var into one array
-                        variable_ids.append(variable.id)
-
-                if len(variable.sub_vars) == 0:
-                    # For empty lists of subvariables, we still need to assign an id
-                    # to the variable.
-                    variable_ids.append(variable.id)
-            else:
-                # This is a variable that lives on a single grid
-                if variable.prev_iter or variable.prev_time:
-                    # If this is a variable representing a previous time step or
-                    # iteration, we need to use the original variable to get hold of
-                    # the correct dof indices, since this is the variable that was
-                    # created by the EquationSystem. However, we will tie the
-                    # indices to the id of this variable, since this is the one that
-                    # will be used for lookup later on.
-                    variable_known_to_eq_system = variable.original_variable
-                else:
-                    variable_known_to_eq_system = variable
+        vector: np.ndarray,
+        state: Optional[np.ndarray] = None,
+    ) -> tuple[Any, np.ndarray]:
+        """Evaluate the operator and the product of a vector with its Jacobian, without
+        forming the Jacobian matrix.
 
-                ind_var.append(system_manager.dofs_of([variable_known_to_eq_system]))
-                variable_ids.append(variable.id)
+        See :meth:`~porepy.numerics.ad.evaluation_plan.EvaluationPlan.vjp`.
 
-            # Gather all indices for this variable
-            if len(ind_var) > 0:
-                inds.append(np.hstack([i for i in ind_var]))
-            else:
-                inds.append(np.array([], dtype=int))
+        Parameters:
+            system_manager: Used to represent the problem.
+            vector: Vector of the size of the operator value.
+            state (optional): Solution vector for which the operator should be
+                evaluated. If not provided, the solution will be pulled from the
+                current iterate.
 
-        return inds, variable_ids, prev_time, prev_iter
+        Returns:
+            The value of the operator, and the vector-Jacobian product as a vector in
+            the global state space.
 
-    def _find_subtree_variables(self) -> Sequence[Variable]:
-        """Method to recursively look for Variables (or MixedDimensionalVariables) in an
-        operator tree.
         """
-        # The variables should be located at leaves in the tree. Traverse the tree
-        # recursively, look for variables, and then gather the results.
-
-        if isinstance(self, Variable):
-            # We are at the bottom of a branch of the tree, return the operator
-            return [self]
-        else:
-            # We need to look deeper in the tree.
-            # Look for variables among the children
-            sub_variables: list[Variable] = []
-            # When using nested pp.ad.Functions, some of the children may be AdArrays
-            # (forward mode), rather than Operators. For the former, don't look for
-            # children - they have none.
-            for child in self.tree.children:
-                if isinstance(child, Operator):
-                    sub_variables += child._find_subtree_variables()
-
-            # Some work is needed to parse the information
-            var_list: list[Variable] = []
-            for var in sub_variables:
-                if isinstance(var, Variable):
-                    # Effectively, this node is one step from the leaf
-                    var_list.append(var)
-                elif isinstance(var, list):
-                    # We are further up in the tree.
-                    for sub_var in var:
-                        if isinstance(sub_var, Variable):
-                            var_list.append(sub_var)
-            return var_list
+        values, pullback = self.compile(system_manager).vjp(state)
+        return values[0], pullback([vector])
 
     ### Special methods -----------------------------------------------------------------------
 
@@ -1820,6 +1637,93 @@ class MixedDimensionalVariable(Variable):
         return s
 
 
+def _variable_dof_indices(
+    variables: Sequence[Variable],
+    system_manager: pp.ad.EquationSystem | pp.DofManager,
+) -> tuple[list[np.ndarray], list[int], list[bool], list[bool]]:
+    """Get the indices of degrees of freedom of a set of variables.
+
+    Parameters:
+        variables: Variables, possibly with duplicates. The variables are uniquified
+            and sorted on their id.
+        system_manager: Used to identify the degrees of freedom.
+
+    Returns:
+        Tuple with four lists, with one item per unique variable: The global dof
+        indices, the variable ids, and flags for whether the variable represents the
+        previous time step and the previous iteration, respectively.
+
+    """
+    # Uniquify by making this a set, and then sort on variable id
+    variables = sorted(list(set(variables)), key=lambda var: var.id)
+
+    # For each variable, get the global index
+    inds = []
+    variable_ids = []
+    prev_time = []
+    prev_iter = []
+    for variable in variables:
+        # Indices (in DofManager sense) of this variable. Will be built gradually
+        # for MixedDimensionalVariables, in one go for plain Variables.
+        ind_var = []
+        prev_time.append(variable.prev_time)
+        prev_iter.append(variable.prev_iter)
+
+        if isinstance(variable, MixedDimensionalVariable):
+            # Is this equivalent to the test in previous function?
+            # Loop over all subvariables for the mixed-dimensional variable
+            for i, sub_var in enumerate(variable.sub_vars):
+                if sub_var.prev_time or sub_var.prev_iter:
+                    # If this is a variable representing a previous time step or
+                    # iteration, we need to use the original variable to get hold of
+                    # the correct dof indices, since this is the variable that was
+                    # created by the EquationSystem. However, we will tie the
+                    # indices to the id of this variable, since this is the one that
+                    # will be used for lookup later on.
+                    sub_var_known_to_eq_system: Variable = sub_var.original_variable
+                else:
+                    sub_var_known_to_eq_system = sub_var
+
+                # Get the index of this sub variable in the global numbering of the
+                # EquationSystem. If an error message is raised that the variable is
+                # not present in the EquationSystem, it is likely that this operator
+                # contains a variable that is not known to the EquationSystem (it
+                # has not passed through EquationSystem.create_variable()).
+                ind_var.append(system_manager.dofs_of([sub_var_known_to_eq_system]))
+                if i == 0:
+                    # Store id of variable, but only for the first one; we will
+                    # concatenate the arrays in ind_var into one array
+                    variable_ids.append(variable.id)
+
+            if len(variable.sub_vars) == 0:
+                # For empty lists of subvariables, we still need to assign an id
+                # to the variable.
+                variable_ids.append(variable.id)
+        else:
+            # This is a variable that lives on a single grid
+            if variable.prev_iter or variable.prev_time:
+                # If this is a variable representing a previous time step or
+                # iteration, we need to use the original variable to get hold of
+                # the correct dof indices, since this is the variable that was
+                # created by the EquationSystem. However, we will tie the
+                # indices to the id of this variable, since this is the one that
+                # will be used for lookup later on.
+                variable_known_to_eq_system = variable.original_variable
+            else:
+                variable_known_to_eq_system = variable
+
+            ind_var.append(system_manager.dofs_of([variable_known_to_eq_system]))
+            variable_ids.append(variable.id)
+
+        # Gather all indices for this variable
+        if len(ind_var) > 0:
+            inds.append(np.hstack([i for i in ind_var]))
+        else:
+            inds.append(np.array([], dtype=int))
+
+    return inds, variable_ids, prev_time, prev_iter
+
+
 class Tree:
     """Simple implementation of a Tree class. Used to represent combinations of
     Ad operators.
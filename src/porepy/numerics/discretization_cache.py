@@ -0,0 +1,335 @@
+"""Persistent on-disk cache of discretization matrices.
+
+Expensive discretizations, such as Mpfa, Mpsa and Biot, depend only on the grid and on
+a few parameters (the constitutive tensor, the types of boundary conditions, the
+location of the continuity point etc.), not on boundary values, source terms or the
+time step. When the same geometry is simulated repeatedly, e.g., with different
+boundary values, the discretization matrices can therefore be reused between runs.
+
+The :class:`DiscretizationCache` computes a hash of the grid (nodes, face-node and
+cell-face relations) and of the parameters which determine the discretization, and
+stores the computed matrices in a compressed ``.npz`` file named by the hash. On a
+later discretization with the same hash, the matrices are read from the file instead
+of being computed. When the total size of the cache directory exceeds a given limit,
+the least recently used files are deleted.
+
+The parameters which determine the discretization are given in
+:data:`cached_parameters`, which maps a discretization class to the attribute holding
+its parameter keyword, and to the relevant keys in the parameter dictionary.
+Discretizations of other classes, and partial updates of discretizations (signified
+by the parameters ``specified_cells``, ``specified_faces`` and ``specified_nodes``, or
+``update_discretization``) are not cached, but computed as usual.
+
+Example:
+
+    >>> cache = pp.DiscretizationCache("discretization_cache", max_size=2**30)
+    >>> cache.discretize(pp.Mpfa("flow"), sd, data)
+
+Within a model, the cache is activated by the model parameter
+``discretization_cache``, see
+:meth:`~porepy.models.solution_strategy.SolutionStrategy.set_equation_system_manager`.
+
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import numpy as np
+import scipy.sparse as sps
+
+import porepy as pp
+
+__all__ = ["DiscretizationCache", "cached_parameters"]
+
+logger = logging.getLogger(__name__)
+
+
+cached_parameters: dict[type, tuple[str, tuple[str, ...]]] = {
+    pp.Tpfa: ("keyword", ("second_order_tensor", "bc", "ambient_dimension")),
+    pp.Mpfa: (
+        "keyword",
+        ("second_order_tensor", "bc", "mpfa_eta", "ambient_dimension"),
+    ),
+    pp.Mpsa: (
+        "keyword",
+        ("fourth_order_tensor", "bc", "mpsa_eta", "reconstruction_eta"),
+    ),
+    pp.Biot: (
+        "mechanics_keyword",
+        ("fourth_order_tensor", "bc", "mpsa_eta", "biot_alpha"),
+    ),
+}
+"""Discretization classes which can be cached. For each class, the name of the
+attribute which holds the parameter keyword, and the keys of the parameters which
+determine the discretization matrices.
+
+Only exact matches of the class are cached, since a subclass may change the
+discretization. Further classes can be added by the user.
+
+"""
+
+_PARTIAL_UPDATE_KEYS = ("specified_cells", "specified_faces", "specified_nodes")
+"""Parameters signifying a partial update of a discretization, which is not cached."""
+
+
+class DiscretizationCache:
+    """Cache of discretization matrices, stored in a directory.
+
+    Parameters:
+        directory: Directory of the cache files. Created if it does not exist.
+        max_size: Maximum total size of the cache files in bytes. Defaults to 1 GB.
+        compress: If True (default), the files are compressed.
+
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        max_size: int = 2**30,
+        compress: bool = True,
+    ) -> None:
+        self.directory: Path = Path(directory)
+        """Directory of the cache files."""
+
+        self.max_size: int = max_size
+        """Maximum total size of the cache files in bytes. When it is exceeded, the
+        least recently used files are deleted."""
+
+        self.compress: bool = compress
+        """Whether the cache files are compressed."""
+
+        self.hits: int = 0
+        """Number of discretizations loaded from the cache."""
+
+        self.misses: int = 0
+        """Number of cacheable discretizations which were computed and stored."""
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"Discretization cache in {self.directory} with {len(self._files())} "
+            f"entries, total size {self.size()} bytes (max {self.max_size}).\n"
+            f"Hits: {self.hits}, misses: {self.misses}."
+        )
+
+    def discretize(self, discr: Any, sd: pp.Grid, data: dict) -> None:
+        """Discretize on a grid, or load the discretization matrices from the cache.
+
+        Parameters:
+            discr: Discretization object.
+            sd: Grid to be discretized.
+            data: Data dictionary of the grid.
+
+        """
+        key = self.key(discr, sd, data)
+        if key is None:
+            discr.discretize(sd, data)
+            return
+
+        path = self._path(key)
+        if path.exists():
+            try:
+                self._load(path, data)
+            except (OSError, ValueError, KeyError) as err:
+                # A corrupt or incompatible file. Remove it and discretize anew.
+                logger.warning(f"Could not read cache file {path}: {err}")
+                path.unlink(missing_ok=True)
+            else:
+                # Mark the file as recently used.
+                os.utime(path)
+                self.hits += 1
+                return
+
+        matrix_dictionaries: dict = data.setdefault(pp.DISCRETIZATION_MATRICES, {})
+        # Identify the matrices computed by the discretization by comparing the
+        # objects before and after. Discretization matrices are never modified in
+        # place, but replaced by new objects. The previous matrices are kept alive
+        # during the discretization, so that their ids cannot be reused by new ones.
+        previous = {
+            (keyword, name): mat
+            for keyword, matrices in matrix_dictionaries.items()
+            for name, mat in matrices.items()
+        }
+        discr.discretize(sd, data)
+        computed = {
+            (keyword, name): mat
+            for keyword, matrices in matrix_dictionaries.items()
+            for name, mat in matrices.items()
+            if previous.get((keyword, name)) is not mat
+        }
+        self.misses += 1
+        self._store(path, computed)
+        self._evict()
+
+    def key(self, discr: Any, sd: pp.Grid, data: dict) -> Optional[str]:
+        """Compute the hash which identifies a discretization.
+
+        Parameters:
+            discr: Discretization object.
+            sd: Grid to be discretized.
+            data: Data dictionary of the grid.
+
+        Returns:
+            Hexadecimal hash of the grid, the discretization class and keyword, and the
+            parameters listed in :data:`cached_parameters`. None if the discretization
+            cannot be cached.
+
+        """
+        if type(discr) not in cached_parameters:
+            return None
+        keyword_attribute, parameter_keys = cached_parameters[type(discr)]
+        keyword: str = getattr(discr, keyword_attribute)
+        parameters: dict = data.get(pp.PARAMETERS, {}).get(keyword, {})
+        if data.get("update_discretization", False) or any(
+            parameters.get(key, None) is not None for key in _PARTIAL_UPDATE_KEYS
+        ):
+            return None
+
+        h = hashlib.sha256()
+        _update_hash(h, (pp.__version__, type(discr).__module__, type(discr).__name__))
+        _update_hash(h, (keyword, getattr(discr, "flow_keyword", None)))
+        _update_hash(
+            h,
+            (
+                type(sd).__name__,
+                sd.dim,
+                sd.nodes,
+                sd.face_nodes,
+                sd.cell_faces,
+            ),
+        )
+        try:
+            for key in parameter_keys:
+                _update_hash(h, (key, parameters.get(key, None)))
+        except TypeError:
+            # A parameter of a type which cannot be hashed.
+            return None
+        return h.hexdigest()
+
+    def size(self) -> int:
+        """Total size of the cache files in bytes."""
+        return sum(path.stat().st_size for path in self._files())
+
+    def clear(self) -> None:
+        """Delete all cache files."""
+        for path in self._files():
+            path.unlink(missing_ok=True)
+
+    def _files(self) -> list[Path]:
+        return list(self.directory.glob("*.npz"))
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.npz"
+
+    def _store(self, path: Path, matrices: dict[tuple[str, str], Any]) -> None:
+        """Store discretization matrices in a file.
+
+        Sparse matrices and numpy arrays are supported. If other objects are
+        encountered, nothing is stored.
+
+        """
+        arrays: dict[str, np.ndarray] = {}
+        names = []
+        for ind, ((keyword, name), mat) in enumerate(matrices.items()):
+            if sps.issparse(mat):
+                fmt = mat.format
+                csr = sps.csr_matrix(mat)
+                arrays[f"{ind}_data"] = csr.data
+                arrays[f"{ind}_indices"] = csr.indices
+                arrays[f"{ind}_indptr"] = csr.indptr
+                arrays[f"{ind}_shape"] = np.array(csr.shape)
+            elif isinstance(mat, np.ndarray):
+                fmt = "dense"
+                arrays[f"{ind}_data"] = mat
+            else:
+                return
+            names.append((keyword, name, fmt))
+        arrays["names"] = np.array(names, dtype=str).reshape((-1, 3))
+
+        # Write to a temporary file, which is moved in place when complete. This
+        # protects against partially written files, e.g., if several simulations share
+        # the cache.
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if self.compress:
+                    np.savez_compressed(f, **arrays)
+                else:
+                    np.savez(f, **arrays)
+            os.replace(tmp_name, path)
+        except OSError as err:
+            logger.warning(f"Could not write cache file {path}: {err}")
+            Path(tmp_name).unlink(missing_ok=True)
+
+    def _load(self, path: Path, data: dict) -> None:
+        """Load discretization matrices from a file into a data dictionary."""
+        matrix_dictionaries: dict = data.setdefault(pp.DISCRETIZATION_MATRICES, {})
+        loaded: dict[tuple[str, str], Any] = {}
+        with np.load(path, allow_pickle=False) as arrays:
+            for ind, (keyword, name, fmt) in enumerate(arrays["names"]):
+                if fmt == "dense":
+                    mat = arrays[f"{ind}_data"]
+                else:
+                    mat = sps.csr_matrix(
+                        (
+                            arrays[f"{ind}_data"],
+                            arrays[f"{ind}_indices"],
+                            arrays[f"{ind}_indptr"],
+                        ),
+                        shape=tuple(arrays[f"{ind}_shape"]),
+                    ).asformat(fmt)
+                loaded[(str(keyword), str(name))] = mat
+        # Only modify the data dictionary when the whole file has been read.
+        for (keyword, name), mat in loaded.items():
+            matrix_dictionaries.setdefault(keyword, {})[name] = mat
+
+    def _evict(self) -> None:
+        """Delete the least recently used files until the size limit is satisfied."""
+        files = sorted(self._files(), key=lambda path: path.stat().st_mtime)
+        total = sum(path.stat().st_size for path in files)
+        for path in files:
+            if total <= self.max_size:
+                break
+            total -= path.stat().st_size
+            path.unlink(missing_ok=True)
+
+
+def _update_hash(h: Any, value: Any) -> None:
+    """Update a hash object with a (nested) value.
+
+    Raises:
+        TypeError: If the value, or one of its components, is of an unsupported type.
+
+    """
+    if value is None or isinstance(value, (bool, int, float, str, np.generic)):
+        h.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, np.ndarray):
+        h.update(f"array:{value.dtype.str}:{value.shape};".encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif sps.issparse(value):
+        mat = sps.csr_matrix(value)
+        mat.sum_duplicates()
+        _update_hash(h, ("sparse", mat.shape, mat.indptr, mat.indices, mat.data))
+    elif isinstance(value, (list, tuple)):
+        h.update(f"sequence:{len(value)};".encode())
+        for item in value:
+            _update_hash(h, item)
+    elif isinstance(value, dict):
+        h.update(f"dict:{len(value)};".encode())
+        for key in sorted(value, key=str):
+            _update_hash(h, (str(key), value[key]))
+    elif isinstance(value, (pp.Grid, pp.MortarGrid)):
+        raise TypeError("Grids in parameters are not supported.")
+    elif hasattr(value, "__dict__"):
+        # Objects such as tensors and boundary conditions are hashed by their
+        # attributes.
+        h.update(f"object:{type(value).__name__};".encode())
+        _update_hash(h, vars(value))
+    else:
+        raise TypeError(f"Cannot hash object of type {type(value)}.")
@@ -25,6 +25,7 @@ domains).
 from __future__ import annotations
 
 import logging
+from functools import partial
 from time import time
 from typing import Any, Literal, Optional
 
@@ -331,6 +332,9 @@ class Biot(pp.Mpsa):
                     options.
                 mpfa_eta (double): Location of continuity point in MPSA.
                     Defaults to 1/3 for simplex grids, 0 otherwise.
+                max_discretization_workers (int): Number of processes used to
+                    discretize the subproblems of the grid in parallel. Defaults to
+                    1, that is, serial discretization.
 
         The discretization is stored in the data dictionary, in the form of
         several matrices representing different coupling terms. For details,
@@ -355,13 +359,14 @@ class Biot(pp.Mpsa):
         constit: pp.FourthOrderTensor = parameter_dictionary["fourth_order_tensor"]
 
         eta: float = parameter_dictionary.get("mpsa_eta", pp.fvutils.determine_eta(sd))
-        inverter: Literal["python", "numba"] = parameter_dictionary.get(
+        inverter: Literal["batched", "numba", "python"] = parameter_dictionary.get(
             "inverter", "numba"
         )
 
         alpha: float = parameter_dictionary["biot_alpha"]
 
         max_memory: int = parameter_dictionary.get("max_memory", 1e9)
+        num_workers: int = parameter_dictionary.get("max_discretization_workers", 1)
 
         # Whether to update an existing discretization, or construct a new one.
         # If True, either specified_cells, _faces or _nodes should also be given, or
@@ -411,28 +416,54 @@ class Biot(pp.Mpsa):
         # Find an estimate of the peak memory need
         peak_memory_estimate = self._estimate_peak_memory_mpsa(active_grid)
 
-        # Loop over all partition regions, construct local problems, and transfer
-        # discretization to the entire active grid
-        for (
-            reg_i,
-            (sub_sd, faces_in_subgrid, cells_in_subgrid, l2g_cells, l2g_faces),
-        ) in enumerate(
-            pp.fvutils.subproblems(active_grid, max_memory, peak_memory_estimate)
-        ):
-            tic = time()
-            # Copy stiffness tensor, and restrict to local cells
-            loc_c: pp.FourthOrderTensor = self._constit_for_subgrid(
-                active_constit, l2g_cells
-            )
-
-            # Boundary conditions are slightly more complex. Find local faces
-            # that are on the global boundary.
-            # Then transfer boundary condition on those faces.
-            loc_bnd: pp.BoundaryConditionVectorial = self._bc_for_subgrid(
-                active_bound, sub_sd, l2g_faces
-            )
+        def local_problems():
+            """Construct the local problems of all partition regions."""
+            for (
+                sub_sd,
+                faces_in_subgrid,
+                cells_in_subgrid,
+                l2g_cells,
+                l2g_faces,
+            ) in pp.fvutils.subproblems(
+                active_grid, max_memory, peak_memory_estimate, num_workers
+            ):
+                # Copy stiffness tensor, and restrict to local cells
+                loc_c: pp.FourthOrderTensor = self._constit_for_subgrid(
+                    active_constit, l2g_cells
+                )
+
+                # Boundary conditions are slightly more complex. Find local faces
+                # that are on the global boundary.
+                # Then transfer boundary condition on those faces.
+                loc_bnd: pp.BoundaryConditionVectorial = self._bc_for_subgrid(
+                    active_bound, sub_sd, l2g_faces
+                )
+                yield (sub_sd, loc_c, loc_bnd, alpha), (
+                    faces_in_subgrid,
+                    cells_in_subgrid,
+                    l2g_cells,
+                    l2g_faces,
+                )
+
+        discretize = partial(
+            pp.fvutils.discretize_subproblem,
+            type(self),
+            (
+                self.mechanics_keyword,
+                self.flow_keyword,
+                self.vector_variable,
+                self.scalar_variable,
+            ),
+            "_local_discretization",
+            eta=eta,
+            inverter=inverter,
+        )
 
-            # Discretization of sub-problem
+        # Loop over all partition regions, discretize the local problems (possibly in
+        # parallel), and transfer discretization to the entire active grid
+        tic = time()
+        for reg_i, (
+            (faces_in_subgrid, cells_in_subgrid, l2g_cells, l2g_faces),
             (
                 loc_stress,
                 loc_bound_stress,
@@ -443,10 +474,10 @@ class Biot(pp.Mpsa):
                 loc_bound_displacement_cell,
                 loc_bound_displacement_face,
                 loc_bound_displacement_pressure,
-            ) = self._local_discretization(
-                sub_sd, loc_c, loc_bnd, alpha, eta=eta, inverter=inverter
-            )
-
+            ),
+        ) in enumerate(
+            pp.fvutils.solve_subproblems(discretize, local_problems(), num_workers)
+        ):
             # Eliminate contribution from faces already discretized (the dual grids /
             # interaction regions may be structured so that some faces have previously
             # been partially discretized even if it has not been their turn until now)
@@ -508,6 +539,7 @@ class Biot(pp.Mpsa):
                 face_map_vec * loc_bound_displacement_pressure * cell_map_scalar
             )
             logger.info(f"Done with subproblem {reg_i}. Elapsed time {time() - tic}")
+            tic = time()
             # Done with this subdomain, move on to the next one
 
         # We are done with the discretization. What remains is to map the computed
@@ -623,7 +655,7 @@ class Biot(pp.Mpsa):
         bound_mech: pp.BoundaryConditionVectorial,
         alpha: float,
         eta: float,
-        inverter: Literal["python", "numba"],
+        inverter: Literal["batched", "numba", "python"],
         hf_output: bool = False,
     ) -> tuple[
         sps.spmatrix,
@@ -8,7 +8,10 @@ between these methods, the current structure with multiple auxiliary methods eme
 """
 from __future__ import annotations
 
-from typing import Any, Callable, Generator, Optional
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Generator, Iterable, Optional
 
 import numpy as np
 import scipy.sparse as sps
@@ -351,10 +354,29 @@ def find_active_indices(
 
 
 def subproblems(
-    sd: pp.Grid, max_memory: int, peak_memory_estimate: int
+    sd: pp.Grid,
+    max_memory: int,
+    peak_memory_estimate: int,
+    min_num_subproblems: int = 1,
 ) -> Generator[
     tuple[pp.Grid, np.ndarray, np.ndarray, np.ndarray, np.ndarray], None, None
 ]:
+    """Split the discretization of a grid into subproblems of limited memory need.
+
+    Parameters:
+        sd: Grid to be discretized.
+        max_memory: Maximum memory allowed for a single subproblem.
+        peak_memory_estimate: Estimate of the memory needed to discretize the grid
+            in one go.
+        min_num_subproblems: Minimum number of subproblems. Used to distribute the
+            discretization on several processes, see :func:`solve_subproblems`.
+
+    Yields:
+        For each subproblem: The subgrid, the faces and cells of the grid whose
+        discretization should be taken from this subproblem, and the mappings of the
+        cells and faces of the subgrid to the grid.
+
+    """
     if sd.dim == 0:
         # nothing realy to do here
         loc_faces = np.ones(sd.num_faces, dtype=bool)
@@ -363,7 +385,10 @@ def subproblems(
         loc2g_face = np.ones(sd.num_faces, dtype=bool)
         yield sd, loc_faces, loc_cells, loc2g_cells, loc2g_face
 
-    num_part: int = np.ceil(peak_memory_estimate / max_memory).astype(int)
+    num_part: int = max(
+        np.ceil(peak_memory_estimate / max_memory).astype(int),
+        min(min_num_subproblems, sd.num_cells),
+    )
 
     if num_part == 1:
         yield sd, np.arange(sd.num_faces), np.arange(sd.num_cells), np.arange(
@@ -377,6 +402,11 @@ def subproblems(
         # Cell-node relation
         cn: sps.csc_matrix = sd.cell_nodes()
 
+        # Faces on the boundary between two partitions are discretized in both
+        # subproblems, but their discretization should be taken from only one of them.
+        # Keep track of the faces which are assigned to a previous subproblem.
+        assigned_faces = np.zeros(sd.num_faces, dtype=bool)
+
         # Loop over all partition regions, construct local problemsac, and transfer
         # discretization to the entire active grid
         for p in np.unique(part):
@@ -397,6 +427,8 @@ def subproblems(
             loc_cells, loc_faces = pp.fvutils.cell_ind_for_partial_update(
                 sd, nodes=nodes_in_partition
             )
+            loc_faces = loc_faces[np.logical_not(assigned_faces[loc_faces])]
+            assigned_faces[loc_faces] = True
 
             # Extract subgrid, together with mappings between local and active
             # (global, or at least less local) cells
@@ -406,6 +438,81 @@ def subproblems(
             yield sub_sd, loc_faces, cells_in_partition, l2g_cells, l2g_faces
 
 
+def solve_subproblems(
+    discretize: Callable[..., Any],
+    subproblem_arguments: Iterable[tuple[tuple, Any]],
+    num_workers: int = 1,
+) -> Generator[tuple[Any, Any], None, None]:
+    """Discretize a sequence of subproblems, possibly in parallel.
+
+    With a single worker, the subproblems are discretized one by one in the calling
+    process. With more workers, the subproblems are dispatched to a pool of processes.
+    Only the arguments of the individual subproblems, that is, the subgrid and its
+    parameters, are sent to the processes, not the full grid. To limit the memory
+    consumption, at most two subproblems per worker are in the queue at any time.
+
+    The worker processes are started by the spawn method, since forking a process
+    which has started the threads of numba's parallel loops is not safe. As a
+    consequence, scripts which use parallel discretization must protect their main
+    code by ``if __name__ == "__main__":``.
+
+    Parameters:
+        discretize: Function which discretizes a single subproblem. To be sent to
+            other processes, it must be picklable, e.g. a functools.partial of
+            :func:`discretize_subproblem`.
+        subproblem_arguments: For each subproblem, the arguments to ``discretize``,
+            and a context which is returned together with the result. The context is
+            not sent to the worker processes.
+        num_workers: Number of processes used for the discretization.
+
+    Yields:
+        For each subproblem, in the order of ``subproblem_arguments``: The context
+        and the return value of ``discretize``.
+
+    """
+    if num_workers <= 1:
+        for arguments, context in subproblem_arguments:
+            yield context, discretize(*arguments)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=num_workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        pending: deque[tuple[Any, Future]] = deque()
+        for arguments, context in subproblem_arguments:
+            pending.append((context, executor.submit(discretize, *arguments)))
+            if len(pending) >= 2 * num_workers:
+                context, future = pending.popleft()
+                yield context, future.result()
+        while pending:
+            context, future = pending.popleft()
+            yield context, future.result()
+
+
+def discretize_subproblem(
+    discretization_type: type, init_args: tuple, method: str, *args, **kwargs
+) -> Any:
+    """Discretize a subproblem by a method of a new discretization object.
+
+    The discretization object is constructed from its type and the arguments to its
+    constructor. Thus, a functools.partial of this function can be sent to other
+    processes by :func:`solve_subproblems` without the state of the calling
+    discretization object, which may refer to full grids.
+
+    Parameters:
+        discretization_type: Type of the discretization, e.g. pp.Mpfa.
+        init_args: Arguments to the constructor of the discretization.
+        method: Name of the method which discretizes a subproblem.
+        *args: Positional arguments to the method.
+        **kwargs: Keyword arguments to the method.
+
+    Returns:
+        The return value of the method.
+
+    """
+    return getattr(discretization_type(*init_args), method)(*args, **kwargs)
+
+
 def remove_nonlocal_contribution(
     raw_ind: np.ndarray, nd: int, *args: sps.spmatrix
 ) -> None:
@@ -1187,6 +1294,88 @@ def partial_update_discretization(
                 )
 
 
+def rediscretize_modified_cells(
+    discretization: Any, sd: pp.Grid, data: dict, tensor_key: str
+) -> float:
+    """Rediscretize only the stencils affected by changes in a cell-wise tensor.
+
+    This is intended as a helper function for the discretize methods of mpfa and mpsa,
+    which call it if the parameter ``partial_rediscretization`` is True. The tensor
+    and boundary conditions used in the last discretization are stored in the
+    parameter dictionary. On later calls, the cells where the tensor changed are
+    rediscretized by the update_discretization method of the discretization, see
+    :func:`partial_update_discretization`. If no cells changed, the discretization
+    matrices are kept. A full discretization is computed on the first call, and if
+    the boundary conditions changed, or if any of the previous discretization
+    matrices have been replaced or removed.
+
+    Changes in the grid geometry and other parameters are not detected; a full
+    discretization can be forced by setting ``partial_rediscretization`` to False.
+
+    Parameters:
+        discretization: Mpfa or Mpsa discretization.
+        sd: Grid to be discretized.
+        data: Data dictionary of the grid.
+        tensor_key: Key of the tensor in the parameter dictionary.
+
+    Returns:
+        Fraction of the face stencils which were recomputed.
+
+    """
+    keyword = discretization.keyword
+    param = data[pp.PARAMETERS][keyword]
+    matrix_dictionary = data[pp.DISCRETIZATION_MATRICES][keyword]
+
+    tensor = param[tensor_key].values.reshape((-1, sd.num_cells))
+    bc = param["bc"]
+    bc_types = [bc.is_dir.copy(), bc.is_neu.copy(), bc.is_rob.copy()]
+
+    previous = param.get("partial_rediscretization_state", None)
+    is_valid = (
+        previous is not None
+        and previous["tensor"].shape == tensor.shape
+        and all(np.array_equal(a, b) for a, b in zip(previous["bc"], bc_types))
+        and all(
+            matrix_dictionary.get(key) is mat
+            for key, mat in previous["matrices"].items()
+        )
+    )
+
+    # The flag is turned off to let the discretization method do a standard
+    # discretization in the calls below.
+    param["partial_rediscretization"] = False
+    try:
+        if not is_valid:
+            discretization.discretize(sd, data)
+            fraction = 1.0
+        else:
+            modified_cells = np.where(np.any(tensor != previous["tensor"], axis=0))[0]
+            if modified_cells.size == 0:
+                fraction = 0.0
+            elif modified_cells.size == sd.num_cells:
+                discretization.discretize(sd, data)
+                fraction = 1.0
+            else:
+                data["update_discretization"] = {"modified_cells": modified_cells}
+                discretization.update_discretization(sd, data)
+                # The faces with recomputed stencils were identified in the partial
+                # discretization, see find_active_indices.
+                fraction = param["active_faces"].size / sd.num_faces
+                # Clean up, so that later discretizations are not restricted to the
+                # modified cells.
+                del data["update_discretization"]
+                param.pop("specified_cells", None)
+    finally:
+        param["partial_rediscretization"] = True
+
+    param["partial_rediscretization_state"] = {
+        "tensor": tensor.copy(),
+        "bc": bc_types,
+        "matrices": dict(matrix_dictionary),
+    }
+    return fraction
+
+
 def cell_ind_for_partial_update(
     sd: pp.Grid,
     cells: Optional[np.ndarray] = None,
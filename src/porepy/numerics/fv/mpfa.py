@@ -3,6 +3,7 @@
 """
 from __future__ import annotations
 
+from functools import partial
 from typing import Literal, Optional
 
 import numpy as np
@@ -15,6 +16,11 @@ class Mpfa(pp.FVElliptic):
     def __init__(self, keyword: str) -> None:
         super(pp.Mpfa, self).__init__(keyword)
 
+        self.recomputed_stencil_fraction: dict[int, float] = {}
+        """Fraction of the face stencils recomputed in the last call to
+        :meth:`discretize` with the parameter ``partial_rediscretization``, for each
+        grid, identified by its id."""
+
     def ndof(self, sd: pp.Grid) -> int:
         """Return the number of degrees of freedom associated to the method.
 
@@ -53,7 +59,16 @@ class Mpfa(pp.FVElliptic):
             - mpfa_eta (``float``): Optional. Range [0, 1). Location of pressure
                 continuity point. If not given, porepy tries to set an optimal value.
             - mpfa_inverter (``str``): Optional. Inverter to apply for local problems.
-                Can take values 'numba' (default), or 'python'.
+                Can take values 'batched' (default), 'numba' or 'python'. See
+                :func:`~porepy.numerics.linalg.matrix_operations.invert_diagonal_blocks`.
+            - max_discretization_workers (``int``): Optional. Number of processes
+                used to discretize the subproblems of the grid in parallel. Defaults
+                to 1, that is, serial discretization.
+            - partial_rediscretization (``bool``): Optional. If True, only stencils
+                affected by changes in the permeability since the last discretization
+                are recomputed, see
+                :func:`~porepy.numerics.fv.fvutils.rediscretize_modified_cells`.
+                Defaults to False.
 
         matrix_dictionary will be updated with the following entries:
             - ``flux: sps.csc_matrix (sd.num_faces, sd.num_cells)``
@@ -106,15 +121,23 @@ class Mpfa(pp.FVElliptic):
             # Done
             return
 
+        if parameter_dictionary.get("partial_rediscretization", False):
+            fraction = pp.fvutils.rediscretize_modified_cells(
+                self, sd, data, "second_order_tensor"
+            )
+            self.recomputed_stencil_fraction[sd.id] = fraction
+            return
+
         k: pp.SecondOrderTensor = parameter_dictionary["second_order_tensor"]
         bnd: pp.BoundaryCondition = parameter_dictionary["bc"]
 
         eta: Optional[float] = parameter_dictionary.get("mpfa_eta", None)
-        inverter: Literal["numba", "python"] = parameter_dictionary.get(
-            "mpfa_inverter", "numba"
+        inverter: Literal["batched", "numba", "python"] = parameter_dictionary.get(
+            "mpfa_inverter", "batched"
         )
 
         max_memory: int = parameter_dictionary.get("max_memory", 1e9)
+        num_workers: int = parameter_dictionary.get("max_discretization_workers", 1)
 
         # Whether to update an existing discretization, or construct a new one.
         # If True, either specified_cells, _faces or _nodes should also be given, or
@@ -181,30 +204,55 @@ class Mpfa(pp.FVElliptic):
         # Find an estimate of the peak memory need.
         peak_memory_estimate = self._estimate_peak_memory(active_grid)
 
-        # Loop over all partition regions, construct local problems, and transfer
-        # discretization to the entire active grid.
-        for reg_i, (sub_sd, faces_in_subgrid, _, l2g_cells, l2g_faces) in enumerate(
-            pp.fvutils.subproblems(active_grid, max_memory, peak_memory_estimate)
-        ):
-            # Copy stiffness tensor, and restrict to local cells
-            loc_c: pp.SecondOrderTensor = self._constit_for_subgrid(
-                active_constit, l2g_cells
-            )
-
-            # Boundary conditions are slightly more complex. Find local faces that are
-            # on the global boundary. Then transfer boundary condition on those faces.
-            loc_bnd: pp.BoundaryCondition = self._bc_for_subgrid(
-                active_bound, sub_sd, l2g_faces, active_grid
-            )
-            discr_fields = self._flux_discretization(
+        def local_problems():
+            """Construct the local problems of all partition regions."""
+            for (
                 sub_sd,
-                loc_c,
-                loc_bnd,
-                eta=eta,
-                inverter=inverter,
-                ambient_dimension=vector_source_dim,
-            )
+                faces_in_subgrid,
+                _,
+                l2g_cells,
+                l2g_faces,
+            ) in pp.fvutils.subproblems(
+                active_grid, max_memory, peak_memory_estimate, num_workers
+            ):
+                # Copy stiffness tensor, and restrict to local cells
+                loc_c: pp.SecondOrderTensor = self._constit_for_subgrid(
+                    active_constit, l2g_cells
+                )
+
+                # Boundary conditions are slightly more complex. Find local faces that
+                # are on the global boundary. Then transfer boundary condition on those
+                # faces.
+                loc_bnd: pp.BoundaryCondition = self._bc_for_subgrid(
+                    active_bound, sub_sd, l2g_faces, active_grid
+                )
+                yield (sub_sd, loc_c, loc_bnd), (
+                    sub_sd,
+                    faces_in_subgrid,
+                    l2g_cells,
+                    l2g_faces,
+                )
 
+        discretize = partial(
+            pp.fvutils.discretize_subproblem,
+            type(self),
+            (self.keyword,),
+            "_flux_discretization",
+            eta=eta,
+            inverter=inverter,
+            ambient_dimension=vector_source_dim,
+        )
+
+        # Loop over all partition regions, discretize the local problems (possibly in
+        # parallel), and transfer discretization to the entire active grid.
+        for (
+            sub_sd,
+            faces_in_subgrid,
+            l2g_cells,
+            l2g_faces,
+        ), discr_fields in pp.fvutils.solve_subproblems(
+            discretize, local_problems(), num_workers
+        ):
             # Eliminate contribution from faces already discretized (the dual grids /
             # interaction regions may be structured so that some faces have previously
             # been partially discretized even if it has not been their turn until now)
@@ -228,13 +276,14 @@ class Mpfa(pp.FVElliptic):
                 sub_sd.num_cells == active_grid.num_cells
                 and sub_sd.num_faces == active_grid.num_faces
             ):
-                # Shortcut
-                active_flux = loc_flux
-                active_bound_flux = loc_bound_flux
-                active_bound_pressure_cell = loc_bound_pressure_cell
-                active_bound_pressure_face = loc_bound_pressure_face
-                active_vector_source = loc_vector_source
-                active_bound_pressure_vector_source = loc_bound_pressure_vector_source
+                # Shortcut, no mapping is needed. Other subproblems may still have
+                # contributed to the discretization, thus the matrices are added.
+                active_flux += loc_flux
+                active_bound_flux += loc_bound_flux
+                active_bound_pressure_cell += loc_bound_pressure_cell
+                active_bound_pressure_face += loc_bound_pressure_face
+                active_vector_source += loc_vector_source
+                active_bound_pressure_vector_source += loc_bound_pressure_vector_source
             else:
                 # Get a mapping from the local to the active grid
                 face_map, cell_map = pp.fvutils.map_subgrid_to_grid(
@@ -488,7 +537,7 @@ class Mpfa(pp.FVElliptic):
         sd: pp.Grid,
         k: pp.SecondOrderTensor,
         bnd: pp.BoundaryCondition,
-        inverter: Literal["python", "numba"],
+        inverter: Literal["batched", "numba", "python"],
         ambient_dimension: Optional[int] = None,
         eta: Optional[float] = None,
     ) -> tuple[
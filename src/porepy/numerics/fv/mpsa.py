@@ -10,6 +10,7 @@ The implementation is based on the weakly symmetric version of MPSA, described i
 from __future__ import annotations
 
 import logging
+from functools import partial
 from time import time
 from typing import Any, Literal, Optional
 
@@ -57,6 +58,11 @@ class Mpsa(Discretization):
         self.bound_displacement_cell_matrix_key = "bound_displacement_cell"
         self.bound_displacement_face_matrix_key = "bound_displacement_face"
 
+        self.recomputed_stencil_fraction: dict[int, float] = {}
+        """Fraction of the face stencils recomputed in the last call to
+        :meth:`discretize` with the parameter ``partial_rediscretization``, for each
+        grid, identified by its id."""
+
     def _key(self) -> str:
         """Get the keyword of this object, on a format friendly to access relevant
         fields in the data dictionary
@@ -157,7 +163,15 @@ class Mpsa(Discretization):
                 value. This value is set to all subfaces, except the boundary (where,
                 0 is used).
             - inverter (``str``): Optional. Inverter to apply for local problems.
-                Can take values 'numba' (default), or 'python'.
+                Can take values 'numba' (default), 'batched' or 'python'.
+            - max_discretization_workers (``int``): Optional. Number of processes
+                used to discretize the subproblems of the grid in parallel. Defaults
+                to 1, that is, serial discretization.
+            - partial_rediscretization (``bool``): Optional. If True, only stencils
+                affected by changes in the stiffness since the last discretization are
+                recomputed, see
+                :func:`~porepy.numerics.fv.fvutils.rediscretize_modified_cells`.
+                Defaults to False.
 
         matrix_dictionary will be updated with the following entries:
             - ``stress: sps.csc_matrix (sd.dim * sd.num_faces, sd.dim * sd.num_cells)``
@@ -178,6 +192,13 @@ class Mpsa(Discretization):
 
         """
         parameter_dictionary: dict[str, Any] = data[pp.PARAMETERS][self.keyword]
+        if parameter_dictionary.get("partial_rediscretization", False):
+            fraction = pp.fvutils.rediscretize_modified_cells(
+                self, sd, data, "fourth_order_tensor"
+            )
+            self.recomputed_stencil_fraction[sd.id] = fraction
+            return
+
         matrix_dictionary: dict[str, sps.spmatrix] = data[pp.DISCRETIZATION_MATRICES][
             self.keyword
         ]
@@ -187,10 +208,11 @@ class Mpsa(Discretization):
         eta: Optional[float] = parameter_dictionary.get("mpsa_eta", None)
         hf_eta: Optional[float] = parameter_dictionary.get("reconstruction_eta", None)
 
-        inverter: Literal["python", "numba"] = parameter_dictionary.get(
+        inverter: Literal["batched", "numba", "python"] = parameter_dictionary.get(
             "inverter", "numba"
         )
         max_memory: int = parameter_dictionary.get("max_memory", 1e9)
+        num_workers: int = parameter_dictionary.get("max_discretization_workers", 1)
 
         # Whether to update an existing discretization, or construct a new one. If True,
         # either specified_cells, _faces or _nodes should also be given, or else a full
@@ -237,34 +259,54 @@ class Mpsa(Discretization):
         # Find an estimate of the peak memory need
         peak_memory_estimate = self._estimate_peak_memory_mpsa(active_grid)
 
-        # Loop over all partition regions, construct local problems, and transfer
-        # discretization to the entire active grid.
-        for reg_i, (sub_g, faces_in_subgrid, _, l2g_cells, l2g_faces) in enumerate(
-            pp.fvutils.subproblems(active_grid, max_memory, peak_memory_estimate)
-        ):
-            tic = time()
-
-            # Copy stiffness tensor, and restrict to local cells.
-            loc_c: pp.FourthOrderTensor = self._constit_for_subgrid(
-                active_constit, l2g_cells
-            )
-
-            # Boundary conditions are slightly more complex. Find local faces that are
-            # on the global boundary. Then transfer boundary condition on those faces.
-            loc_bnd: pp.BoundaryConditionVectorial = self._bc_for_subgrid(
-                active_bound, sub_g, l2g_faces
-            )
+        def local_problems():
+            """Construct the local problems of all partition regions."""
+            for (
+                sub_g,
+                faces_in_subgrid,
+                _,
+                l2g_cells,
+                l2g_faces,
+            ) in pp.fvutils.subproblems(
+                active_grid, max_memory, peak_memory_estimate, num_workers
+            ):
+                # Copy stiffness tensor, and restrict to local cells.
+                loc_c: pp.FourthOrderTensor = self._constit_for_subgrid(
+                    active_constit, l2g_cells
+                )
+
+                # Boundary conditions are slightly more complex. Find local faces that
+                # are on the global boundary. Then transfer boundary condition on those
+                # faces.
+                loc_bnd: pp.BoundaryConditionVectorial = self._bc_for_subgrid(
+                    active_bound, sub_g, l2g_faces
+                )
+                yield (sub_g, loc_c, loc_bnd), (faces_in_subgrid, l2g_cells, l2g_faces)
+
+        discretize = partial(
+            pp.fvutils.discretize_subproblem,
+            type(self),
+            (self.keyword,),
+            "_stress_disrcetization",
+            eta=eta,
+            inverter=inverter,
+            hf_eta=hf_eta,
+        )
 
-            # Discretization of sub-problem
+        # Loop over all partition regions, discretize the local problems (possibly in
+        # parallel), and transfer discretization to the entire active grid.
+        tic = time()
+        for reg_i, (
+            (faces_in_subgrid, l2g_cells, l2g_faces),
             (
                 loc_stress,
                 loc_bound_stress,
                 loc_bound_displacement_cell,
                 loc_bound_displacement_face,
-            ) = self._stress_disrcetization(
-                sub_g, loc_c, loc_bnd, eta=eta, inverter=inverter, hf_eta=hf_eta
-            )
-
+            ),
+        ) in enumerate(
+            pp.fvutils.solve_subproblems(discretize, local_problems(), num_workers)
+        ):
             # Eliminate contribution from faces already discretized (the dual grids /
             # interaction regions may be structured so that some faces have previously
             # been partially discretized even if it has not been their turn until now)
@@ -298,6 +340,7 @@ class Mpsa(Discretization):
                 face_map * loc_bound_displacement_face * face_map.transpose()
             )
             logger.info(f"Done with subproblem {reg_i}. Elapsed time {time() - tic}")
+            tic = time()
 
         # We have reached the end of the discretization, what remains is to map the
         # discretization back from the active grid to the entire grid
@@ -506,7 +549,7 @@ class Mpsa(Discretization):
         constit: pp.FourthOrderTensor,
         bound: pp.BoundaryConditionVectorial,
         eta: Optional[float] = None,
-        inverter: Literal["numba", "python"] = "numba",
+        inverter: Literal["batched", "numba", "python"] = "numba",
         hf_disp: bool = False,
         hf_eta: Optional[float] = None,
     ) -> tuple[sps.spmatrix, sps.spmatrix, sps.spmatrix, sps.spmatrix]:
@@ -569,7 +612,7 @@ class Mpsa(Discretization):
             eta: Parameter controlling continuity of displacement. If None, a default
                 value will be used, adapted to the grid type.
             inverter: Method to be used for inversion of local systems. Options are
-                'numba' (default) and 'python'.
+                'numba' (default), 'batched' and 'python'.
             hf_disp: If True, the displacement will be represented by subface values
                 instead of cell values. This is not recommended, but kept for the time
                 being for legacy reasons.
@@ -760,7 +803,7 @@ class Mpsa(Discretization):
         subcell_topology: pp.fvutils.SubcellTopology,
         bound_exclusion: pp.fvutils.ExcludeBoundaries,
         eta: float,
-        inverter: Literal["python", "numba"],
+        inverter: Literal["batched", "numba", "python"],
     ) -> tuple[sps.spmatrix, sps.spmatrix, np.ndarray]:
         """
         This is the function where the real discretization takes place. It contains
@@ -28,6 +28,15 @@ class Upwind(Discretization):
         # Key used to set the advective flux in the parameter dictionary
         self._flux_array_key = "darcy_flux"
 
+        self.num_flipped_faces: dict[pp.Grid, int] = {}
+        """Number of faces where the flux changed sign in the last call to
+        :meth:`discretize` on a grid. All faces are counted when the discretization is
+        computed from scratch."""
+
+        self._connectivity: dict[pp.Grid, dict[str, Any]] = {}
+        """Face-cell connectivity and the previous discretization for each grid, used
+        to update the discretization when the flux changes."""
+
     def ndof(self, sd: pp.Grid) -> int:
         """
         Return the number of degrees of freedom associated to the method.
@@ -175,6 +184,11 @@ class Upwind(Discretization):
         If not specified the inflow boundary conditions are no-flow, while
         the outflow boundary conditions are open.
 
+        The face-cell connectivity is computed on the first call for a grid. On
+        subsequent calls, only faces where the flux changed sign are rediscretized,
+        and matrices which are not affected by the changes are kept, see
+        :attr:`num_flipped_faces`.
+
         The name of data in the input dictionary (data) are:
         darcy_flux : array (sd.num_faces)
             Normal velocity at each face, weighted by the face area.
@@ -236,105 +250,213 @@ class Upwind(Discretization):
         darcy_flux: np.ndarray = np.sign(parameter_dictionary[self._flux_array_key])
 
         bc: pp.BoundaryCondition = parameter_dictionary["bc"]
+        num_components: int = parameter_dictionary.get("num_components", 1)
 
-        # Booleans of flux direction
+        # Booleans of flux direction. By construction, the normal vector of a face
+        # points from the first to the second row in the dense cell-face relation,
+        # thus the upstream cell is found in the first row for positive fluxes and in
+        # the second row for negative fluxes.
         pos_flux = darcy_flux >= 0
-        neg_flux = np.logical_not(pos_flux)
+        upstream_side = np.logical_not(pos_flux).astype(int)
 
-        # Array to store index of the cell in the upstream direction
-        upstream_cell_ind = np.zeros(sd.num_faces, dtype=int)
-        # Fill the array based on the cell-face relation. By construction, the normal
-        # vector of a face points from the first to the second row in this array
-        cf_dense = sd.cell_face_as_dense()
-        # Positive fluxes point in the same direction as the normal vector, find the
-        # upstream cell
-        upstream_cell_ind[pos_flux] = cf_dense[0, pos_flux]
-        upstream_cell_ind[neg_flux] = cf_dense[1, neg_flux]
-
-        # Make row and data arrays, preparing to make a coo-matrix for the upstream
-        # cell-to-face map.
-        row = np.arange(sd.num_faces)
-        values = np.ones(sd.num_faces, dtype=int)
-
-        # We need to eliminate faces on the boundary; these will be discretized
-        # separately below. On faces with Neumann conditions, boundary conditions apply
-        # for inflow; outflow faces should be assigned Dirichlet conditions.
-        # For Dirichlet, only inflow conditions are given; for outflow, we use upstream
-        # weighting (thus no need to modify the matrix we are about to build).
-
-        # faces with Neumann conditions
-        neumann_ind = np.where(bc.is_neu)[0]
+        connectivity = self._connectivity.get(sd)
+        if connectivity is None or not self._connectivity_is_valid(
+            connectivity, bc, num_components, matrix_dictionary
+        ):
+            # Discretize from scratch. The face-cell connectivity, and with it the
+            # sparsity patterns of the discretization matrices, is computed and stored
+            # for later rediscretizations.
+            connectivity = self._face_cell_connectivity(sd, bc, num_components)
+            self._connectivity[sd] = connectivity
+            num_flipped = sd.num_faces
+
+            upwind: sps.csr_matrix = connectivity["upwind"]
+            upwind.data = (
+                connectivity["entry_side"] == upstream_side[connectivity["entry_face"]]
+            ).astype(float)
+        else:
+            # Only faces where the flux changed sign need to be updated. The matrix
+            # is replaced, rather than modified in place, to keep matrices referenced
+            # elsewhere (e.g. in cached evaluations of Ad operators) valid.
+            flipped = np.where(pos_flux != connectivity["pos_flux"])[0]
+            num_flipped = flipped.size
+            upwind = connectivity["upwind"]
+            if num_flipped > 0:
+                face_ptr = connectivity["face_ptr"]
+                ind = connectivity["face_entries"][
+                    pp.utils.mcolon.mcolon(face_ptr[flipped], face_ptr[flipped + 1])
+                ]
+                values = upwind.data.copy()
+                values[ind] = (
+                    connectivity["entry_side"][ind]
+                    == upstream_side[connectivity["entry_face"][ind]]
+                )
+                upwind = sps.csr_matrix(
+                    (values, upwind.indices, upwind.indptr), shape=upwind.shape
+                )
 
         # Faces with Dirichlet conditions and inflow. The latter is identified by
         # considering the direction of the flux, and the upstream element in cf_dense
         # (note that the exterior of the domain is represented by -1 in cf_dense).
-        inflow_ind = np.where(
-            np.logical_and(
-                bc.is_dir,
-                np.logical_or(
-                    np.logical_and(pos_flux, cf_dense[0] < 0),
-                    np.logical_and(neg_flux, cf_dense[1] < 0),
-                ),
+        # Faces with Neumann conditions are not part of the sparsity pattern of the
+        # upwind matrix; for Dirichlet faces, the pattern only contains the interior
+        # cell, thus inflow faces are eliminated from the upwind matrix by
+        # construction. These faces are treated by the boundary conditions below.
+        dir_faces = connectivity["dir_faces"]
+        inflow = (
+            connectivity["cf_dense"][upstream_side[dir_faces], dir_faces] < 0
+        ).astype(float)
+        bc_discr_dir: sps.csr_matrix = connectivity["bc_discr_dir"]
+        dir_values = -np.repeat(inflow, num_components)
+        if not np.array_equal(dir_values, bc_discr_dir.data):
+            bc_discr_dir = sps.csr_matrix(
+                (dir_values, bc_discr_dir.indices, bc_discr_dir.indptr),
+                shape=bc_discr_dir.shape,
             )
-        )[0]
-
-        # Delete indices that should be treated by boundary conditions
-        delete_ind = np.sort(np.r_[neumann_ind, inflow_ind])
-        row = np.delete(row, delete_ind)
-        values = np.delete(values, delete_ind)
-        col = np.delete(upstream_cell_ind, delete_ind)
-
-        # Finally, we can construct the upstream weighting matrix.
-        upstream_mat = sps.coo_matrix(
-            (
-                values,
-                (row, col),
-            ),
-            shape=(sd.num_faces, sd.num_cells),
-        ).tocsr()
 
-        # Form and store discretization matrix
-        # Expand the discretization matrix to more than one component
-        num_components: int = parameter_dictionary.get("num_components", 1)
-        matrix_dictionary[self.upwind_matrix_key] = sps.kron(
-            upstream_mat, sps.eye(num_components)
+        connectivity["pos_flux"] = pos_flux
+        connectivity["upwind"] = upwind
+        connectivity["bc_discr_dir"] = bc_discr_dir
+        self.num_flipped_faces[sd] = num_flipped
+
+        matrix_dictionary[self.upwind_matrix_key] = upwind
+        matrix_dictionary[self.bound_transport_neu_matrix_key] = connectivity[
+            "bc_discr_neu"
+        ]
+        matrix_dictionary[self.bound_transport_dir_matrix_key] = bc_discr_dir
+
+    def _face_cell_connectivity(
+        self, sd: pp.Grid, bc: pp.BoundaryCondition, num_components: int
+    ) -> dict[str, Any]:
+        """Precompute the face-cell connectivity used in the upwind discretization.
+
+        The upwind matrix is given a fixed sparsity pattern with entries for both cells
+        next to each face, except on faces with Neumann conditions, which are treated
+        by the boundary conditions. For a given flux field, the entries of the
+        upstream cells are set to one, the others are explicit zeros.
+
+        Parameters:
+            sd: Grid to be discretized.
+            bc: Boundary conditions of the transport problem.
+            num_components: Number of advected components.
+
+        Returns:
+            Dictionary with the connectivity, the sparsity patterns of the upwind and
+            Dirichlet matrices, and the Neumann matrix, which does not depend on the
+            flux.
+
+        """
+        cf_dense = sd.cell_face_as_dense()
+        faces = np.where(np.logical_not(bc.is_neu))[0]
+
+        # Rows, columns and entry codes (2 * face + side) of the upwind matrix.
+        rows, cols, codes = [], [], []
+        for side in range(2):
+            faces_side = faces[cf_dense[side, faces] >= 0]
+            rows.append(faces_side)
+            cols.append(cf_dense[side, faces_side])
+            codes.append(2 * faces_side + side)
+
+        # Expand to the right number of components. Component i of face f is
+        # represented by row num_components * f + i, and similar for cells.
+        component = np.arange(num_components)
+        rows_expanded = num_components * np.concatenate(rows)[:, None] + component
+        cols_expanded = num_components * np.concatenate(cols)[:, None] + component
+        codes_expanded = np.repeat(np.concatenate(codes), num_components)
+
+        # Store the codes, shifted by one to avoid zeros, as matrix values. This gives
+        # the codes of all entries in the order of the data array of the matrix.
+        pattern = sps.coo_matrix(
+            (codes_expanded + 1, (rows_expanded.ravel(), cols_expanded.ravel())),
+            shape=(sd.num_faces * num_components, sd.num_cells * num_components),
         ).tocsr()
+        # Sorted indices are needed to avoid in-place sorting by scipy, which would
+        # corrupt matrices sharing the pattern.
+        pattern.sort_indices()
+        entry_code = pattern.data - 1
+        entry_face = entry_code // 2
+
+        # Map from faces to their entries in the data array of the upwind matrix.
+        face_entries = np.argsort(entry_face, kind="stable")
+        face_ptr = np.zeros(sd.num_faces + 1, dtype=int)
+        face_ptr[1:] = np.cumsum(np.bincount(entry_face, minlength=sd.num_faces))
 
         # Boundary conditions
-        # Since the upwind discretization could be combined with a diffusion discretization
-        # in an advection-diffusion equation, treatment of boundary conditions can be a
-        # bit delicate, and the code should be used with some caution. The below
-        # implementation follows the following steps:
+        # Since the upwind discretization could be combined with a diffusion
+        # discretization in an advection-diffusion equation, treatment of boundary
+        # conditions can be a bit delicate, and the code should be used with some
+        # caution. The below implementation follows the following steps:
         #
         # 1) On Neumann boundaries the prescribed boundary value should effectively
         # be added to the adjacent cell, with the convention that influx (so
         # negative boundary value) should correspond to accumulation.
-        # 2) On Dirichlet boundaries, we consider only inflow boundaries. Outflow boundaries
-        # are treated by the standard discretization.
+        # 2) On Dirichlet boundaries, we consider only inflow boundaries. Outflow
+        # boundaries are treated by the standard discretization.
 
         # For Neumann faces we need to assign the sign of the divergence, to
         # counteract multiplication with the same sign when the divergence is
         # applied (e.g. in self.assemble_matrix).
+        neumann_ind = np.where(bc.is_neu)[0]
         sgn_div = pp.fvutils.scalar_divergence(sd).sum(axis=0).A.squeeze()
 
-        # Need minus signs on both Neumann and Dirichlet data to ensure that accumulation
-        # follows from negative fluxes.
+        # Need minus signs on both Neumann and Dirichlet data to ensure that
+        # accumulation follows from negative fluxes.
         bc_discr_neu = sps.coo_matrix(
             (-sgn_div[neumann_ind], (neumann_ind, neumann_ind)),
             shape=(sd.num_faces, sd.num_faces),
         ).tocsr()
-        bc_discr_dir = sps.coo_matrix(
-            (-np.ones(inflow_ind.size), (inflow_ind, inflow_ind)),
-            shape=(sd.num_faces, sd.num_faces),
-        ).tocsr()
 
-        # Expand matrix to the right number of components, and store it
-        matrix_dictionary[self.bound_transport_neu_matrix_key] = sps.kron(
-            bc_discr_neu, sps.eye(num_components)
-        ).tocsr()
-        matrix_dictionary[self.bound_transport_dir_matrix_key] = sps.kron(
-            bc_discr_dir, sps.eye(num_components)
-        ).tocsr()
+        # The Dirichlet matrix is diagonal, with entries on all Dirichlet faces. Only
+        # inflow faces have non-zero values.
+        dir_faces = np.where(bc.is_dir)[0]
+        dir_rows = (
+            num_components * dir_faces[:, None] + np.arange(num_components)
+        ).ravel()
+        num_rows = sd.num_faces * num_components
+        bc_discr_dir = sps.csr_matrix(
+            (np.zeros(dir_rows.size), (dir_rows, dir_rows)),
+            shape=(num_rows, num_rows),
+        )
+
+        return {
+            "is_neu": bc.is_neu.copy(),
+            "is_dir": bc.is_dir.copy(),
+            "num_components": num_components,
+            "cf_dense": cf_dense,
+            "dir_faces": dir_faces,
+            "entry_face": entry_face,
+            "entry_side": entry_code % 2,
+            "face_entries": face_entries,
+            "face_ptr": face_ptr,
+            "upwind": pattern,
+            "bc_discr_dir": bc_discr_dir,
+            # Expand matrix to the right number of components.
+            "bc_discr_neu": sps.kron(bc_discr_neu, sps.eye(num_components)).tocsr(),
+        }
+
+    def _connectivity_is_valid(
+        self,
+        connectivity: dict[str, Any],
+        bc: pp.BoundaryCondition,
+        num_components: int,
+        matrix_dictionary: dict[str, sps.spmatrix],
+    ) -> bool:
+        """Check if a previously computed discretization can be updated.
+
+        This requires unchanged boundary conditions and number of components, and that
+        the matrices of the previous discretization are still in use.
+
+        """
+        return (
+            connectivity["num_components"] == num_components
+            and np.array_equal(connectivity["is_neu"], bc.is_neu)
+            and np.array_equal(connectivity["is_dir"], bc.is_dir)
+            and matrix_dictionary.get(self.upwind_matrix_key) is connectivity["upwind"]
+            and matrix_dictionary.get(self.bound_transport_dir_matrix_key)
+            is connectivity["bc_discr_dir"]
+            and matrix_dictionary.get(self.bound_transport_neu_matrix_key)
+            is connectivity["bc_discr_neu"]
+        )
 
     def cfl(self, sd: pp.Grid, data: dict, d_name="darcy_flux"):
         """
@@ -32,6 +32,14 @@ class UpwindCoupling(AbstractInterfaceLaw):
 
         self._flux_array_key = "darcy_flux"
 
+        self.num_flipped_cells: Dict[pp.MortarGrid, int] = {}
+        """Number of mortar cells where the flux changed sign in the last call to
+        :meth:`discretize` on an interface. All cells are counted when the
+        discretization is computed from scratch."""
+
+        self._previous_discretization: Dict[pp.MortarGrid, Dict] = {}
+        """Matrices and flux signs of the previous discretization on each interface."""
+
     def key(self) -> str:
         return self.keyword + "_"
 
@@ -65,18 +73,36 @@ class UpwindCoupling(AbstractInterfaceLaw):
             data_intf[pp.PARAMETERS][self.keyword][self._flux_array_key]
         )
 
-        # mapping from upper dim cells to faces
-        # The mortars always points from upper to lower, so we don't flip any
-        # signs.
-        # The mapping will be non-zero also for faces not adjacent to
-        # the mortar grid, however, we wil hit it with mortar projections, thus kill
-        # those elements
-        inv_trace_h = np.abs(pp.fvutils.scalar_divergence(sd_primary))
-        # We also need a trace-like projection from cells to faces
-        trace_h = inv_trace_h.T
-
-        matrix_dictionary[self.inv_trace_primary_matrix_key] = inv_trace_h
-        matrix_dictionary[self.trace_primary_matrix_key] = trace_h
+        previous = self._previous_discretization.get(intf)
+        if previous is not None and all(
+            matrix_dictionary.get(key) is mat
+            for key, mat in previous.items()
+            if key != "sign"
+        ):
+            # The trace and mortar matrices depend on the grids only and are kept.
+            # The remaining matrices are updated only if the flux changed sign in any
+            # of the mortar cells.
+            num_flipped = np.count_nonzero(lam_flux != previous["sign"])
+            self.num_flipped_cells[intf] = num_flipped
+            if num_flipped == 0:
+                return
+        else:
+            # mapping from upper dim cells to faces
+            # The mortars always points from upper to lower, so we don't flip any
+            # signs.
+            # The mapping will be non-zero also for faces not adjacent to
+            # the mortar grid, however, we wil hit it with mortar projections, thus
+            # kill those elements
+            inv_trace_h = np.abs(pp.fvutils.scalar_divergence(sd_primary))
+            # We also need a trace-like projection from cells to faces
+            trace_h = inv_trace_h.T
+
+            matrix_dictionary[self.inv_trace_primary_matrix_key] = inv_trace_h
+            matrix_dictionary[self.trace_primary_matrix_key] = trace_h
+
+            # Identity matrix, to represent the mortar variable itself
+            matrix_dictionary[self.mortar_discr_matrix_key] = sps.eye(intf.num_cells)
+            self.num_flipped_cells[intf] = intf.num_cells
 
         # Find upwind weighting. if flag is True we use the upper weights
         # if flag is False we use the lower weighs
@@ -94,8 +120,19 @@ class UpwindCoupling(AbstractInterfaceLaw):
         matrix_dictionary[self.upwind_secondary_matrix_key] = upwind_from_secondary
         matrix_dictionary[self.flux_matrix_key] = flux
 
-        # Identity matrix, to represent the mortar variable itself
-        matrix_dictionary[self.mortar_discr_matrix_key] = sps.eye(intf.num_cells)
+        previous = {
+            key: matrix_dictionary[key]
+            for key in [
+                self.trace_primary_matrix_key,
+                self.inv_trace_primary_matrix_key,
+                self.upwind_primary_matrix_key,
+                self.upwind_secondary_matrix_key,
+                self.flux_matrix_key,
+                self.mortar_discr_matrix_key,
+            ]
+        }
+        previous["sign"] = lam_flux
+        self._previous_discretization[intf] = previous
 
     def assemble_matrix_rhs(
         self,
@@ -0,0 +1,726 @@
+"""Backends for the solution of sparse linear systems.
+
+A direct solver proceeds in three phases: A symbolic analysis, which depends only on
+the sparsity pattern of the matrix (fill-reducing ordering, elimination tree etc.), a
+numerical factorization, and forward and backward substitution. In a non-linear
+simulation, the sparsity pattern of the Jacobian matrix normally does not change
+between iterations and time steps, thus the analysis can be reused. Moreover, the
+numerical factorization of a previous iteration can be reused for a few iterations
+(chord Newton), at the price of a slower convergence of the non-linear solver.
+
+The backends in this module wrap different direct solvers, and take care of the reuse
+of analysis and factorization. The pattern is considered unchanged if the index
+arrays of the matrix are the same objects as in the previous call (see
+:class:`~porepy.numerics.ad.jacobian_pattern.JacobianPattern`), or if they are equal.
+
+The Krylov backends (GMRES and BiCGStab) instead build a block preconditioner in the
+factorization phase, based on a grouping of the degrees of freedom provided by the
+model (see :meth:`LinearSolverBackend.set_block_structure`). For poromechanics, the
+groups are the mechanical and the flow degrees of freedom, and the preconditioner is
+an algebraic variant of the fixed-stress splitting. Since the preconditioner only
+involves incomplete factorizations and multigrid cycles of the diagonal blocks, memory
+and solution time scale (close to) linearly with the problem size.
+
+Backends are identified by a name in a registry, which is used by
+:class:`~porepy.models.solution_strategy.SolutionStrategy` to map the model parameter
+``linear_solver`` to a backend. New backends can be added by
+:func:`register_linear_solver_backend`.
+
+Example:
+
+    >>> backend = pp.linear_solver_backends.create_linear_solver_backend(
+    ...     "scipy_sparse", factorization_reuse=2
+    ... )
+    >>> x = backend.solve(A, b)
+    >>> backend.timings
+    {'analysis': ..., 'factorization': ..., 'solve': ...}
+
+"""
+from __future__ import annotations
+
+import abc
+import inspect
+import time
+import warnings
+from typing import Any, Callable, Optional, Sequence, Type
+
+import numpy as np
+import scipy.sparse as sps
+import scipy.sparse.linalg as spla
+
+__all__ = [
+    "LinearSolverBackend",
+    "ScipySparseBackend",
+    "PardisoBackend",
+    "UmfpackBackend",
+    "GmresBackend",
+    "BiCGStabBackend",
+    "register_linear_solver_backend",
+    "create_linear_solver_backend",
+    "linear_solver_backends",
+]
+
+
+class LinearSolverBackend(abc.ABC):
+    """Base class for direct solvers which can reuse analysis and factorization.
+
+    Subclasses implement the three phases :meth:`_analyze`, :meth:`_factorize` and
+    :meth:`_substitute`, while this class decides which of the phases are needed, and
+    records the time spent in each of them.
+
+    Parameters:
+        factorization_reuse: Number of subsequent calls to :meth:`solve` which reuse
+            the numerical factorization of a previous matrix, rather than factorizing
+            the matrix passed. The solution is then only approximate, thus reuse
+            should be limited to the solution of Newton-type updates. Defaults to 0,
+            that is, every matrix is factorized.
+
+    """
+
+    name: str = ""
+    """Name of the backend in the registry."""
+
+    def __init__(self, factorization_reuse: int = 0) -> None:
+        if factorization_reuse < 0:
+            raise ValueError("The number of factorization reuses must be non-negative.")
+
+        self.factorization_reuse: int = factorization_reuse
+        """Number of subsequent solves which reuse a numerical factorization."""
+
+        self.timings: dict[str, float] = {
+            "analysis": 0.0,
+            "factorization": 0.0,
+            "solve": 0.0,
+        }
+        """Accumulated wall time (in seconds) spent in the symbolic analysis, the
+        numerical factorization and the solution phase."""
+
+        self.counts: dict[str, int] = {"analysis": 0, "factorization": 0, "solve": 0}
+        """Number of times each phase has been performed."""
+
+        self._pattern: Optional[tuple[np.ndarray, ...]] = None
+        """Index arrays and shape of the matrix of the last analysis."""
+
+        self._num_reuses: Optional[int] = None
+        """Number of solves which reused the current factorization. None if there is
+        no valid factorization."""
+
+    def __repr__(self) -> str:
+        s = f"Linear solver backend {self.name}"
+        if self.factorization_reuse > 0:
+            s += f", reusing factorizations up to {self.factorization_reuse} times"
+        s += "\n" + ", ".join(
+            f"{phase}: {self.counts[phase]} calls, {self.timings[phase]:.2e} s"
+            for phase in self.timings
+        )
+        return s
+
+    def solve(self, A: sps.spmatrix, b: np.ndarray) -> np.ndarray:
+        """Solve a linear system, reusing analysis and factorization if possible.
+
+        Parameters:
+            A: Matrix of the linear system.
+            b: Right-hand side.
+
+        Returns:
+            Solution vector.
+
+        """
+        A = sps.csr_matrix(A)
+        if not A.has_sorted_indices:
+            A = A.sorted_indices()
+
+        if not self._same_pattern(A):
+            tic = time.perf_counter()
+            self._analyze(A)
+            self._record("analysis", tic)
+            self._pattern = (A.indptr, A.indices, np.array(A.shape))
+            self._num_reuses = None
+
+        if self._num_reuses is None or self._num_reuses >= self.factorization_reuse:
+            tic = time.perf_counter()
+            self._factorize(A)
+            self._record("factorization", tic)
+            self._num_reuses = 0
+        else:
+            self._num_reuses += 1
+
+        tic = time.perf_counter()
+        x = self._substitute(A, np.asarray(b, dtype=float))
+        self._record("solve", tic)
+        return np.atleast_1d(x)
+
+    def set_block_structure(
+        self,
+        blocks: Sequence[np.ndarray],
+        block_solvers: Optional[Sequence[str]] = None,
+    ) -> None:
+        """Set a grouping of the degrees of freedom into blocks.
+
+        The blocks are used by backends with block preconditioners; other backends
+        ignore them.
+
+        Parameters:
+            blocks: Indices of the degrees of freedom in each block.
+            block_solvers (optional): Suggested solver for each block, see
+                :class:`GmresBackend`.
+
+        """
+        pass
+
+    def reset_factorization(self) -> None:
+        """Discard the numerical factorization, so that the matrix passed in the next
+        call to :meth:`solve` is factorized. The symbolic analysis is kept."""
+        self._num_reuses = None
+
+    def reset(self) -> None:
+        """Discard both the symbolic analysis and the numerical factorization."""
+        self._pattern = None
+        self._num_reuses = None
+
+    def _same_pattern(self, A: sps.csr_matrix) -> bool:
+        """Check if the pattern of a matrix is that of the last analysis."""
+        if self._pattern is None:
+            return False
+        indptr, indices, shape = self._pattern
+        if A.indptr is indptr and A.indices is indices:
+            return True
+        return (
+            np.array_equal(A.shape, shape)
+            and np.array_equal(A.indptr, indptr)
+            and np.array_equal(A.indices, indices)
+        )
+
+    def _record(self, phase: str, tic: float) -> None:
+        self.timings[phase] += time.perf_counter() - tic
+        self.counts[phase] += 1
+
+    @abc.abstractmethod
+    def _analyze(self, A: sps.csr_matrix) -> None:
+        """Symbolic analysis, based on the sparsity pattern of the matrix only."""
+
+    @abc.abstractmethod
+    def _factorize(self, A: sps.csr_matrix) -> None:
+        """Numerical factorization of the matrix."""
+
+    @abc.abstractmethod
+    def _substitute(self, A: sps.csr_matrix, b: np.ndarray) -> np.ndarray:
+        """Solve using the current factorization.
+
+        The matrix is passed for backends which use it for iterative refinement.
+
+        """
+
+
+class ScipySparseBackend(LinearSolverBackend):
+    """Backend based on the SuperLU solver shipped with SciPy.
+
+    SuperLU does not expose its symbolic analysis. The analysis phase of this backend
+    instead computes the conversion of the matrix from CSR to CSC format (which is
+    what SuperLU expects), so that later conversions amount to a permutation of the
+    data array.
+
+    """
+
+    name = "scipy_sparse"
+
+    def __init__(self, factorization_reuse: int = 0) -> None:
+        super().__init__(factorization_reuse)
+        self._csc_permutation: np.ndarray
+        """Permutation of the CSR data array into CSC ordering."""
+        self._csc_pattern: tuple[np.ndarray, np.ndarray]
+        """Indices and index pointers of the matrix in CSC format."""
+        self._lu: Any = None
+
+    def _analyze(self, A: sps.csr_matrix) -> None:
+        positions = sps.csr_matrix(
+            (np.arange(A.nnz, dtype=float), A.indices, A.indptr), shape=A.shape
+        ).tocsc()
+        self._csc_permutation = positions.data.astype(int)
+        self._csc_pattern = (positions.indices, positions.indptr)
+
+    def _factorize(self, A: sps.csr_matrix) -> None:
+        indices, indptr = self._csc_pattern
+        A_csc = sps.csc_matrix(
+            (A.data[self._csc_permutation], indices, indptr), shape=A.shape
+        )
+        self._lu = spla.splu(A_csc)
+
+    def _substitute(self, A: sps.csr_matrix, b: np.ndarray) -> np.ndarray:
+        return self._lu.solve(b)
+
+
+class PardisoBackend(LinearSolverBackend):
+    """Backend based on the Intel MKL Pardiso solver, as wrapped by pypardiso.
+
+    The three phases map directly to the Pardiso phases 11 (analysis), 22 (numerical
+    factorization) and 33 (solution with iterative refinement). The phases are called
+    individually through the methods ``set_phase`` and ``_call_pardiso`` of
+    ``pypardiso.PyPardisoSolver``, which are not part of the public interface of
+    pypardiso and may change between its versions. Hence, the checks and conversions
+    of the matrix which pypardiso performs in its public interface are done by
+    :meth:`_pardiso_matrix`.
+
+    If these methods are not available, the public methods ``factorize`` and
+    ``solve`` are used instead, with a warning. The symbolic analysis is then
+    repeated in every factorization, while reuse of factorizations still works.
+
+    Raises:
+        ImportError: If pypardiso is not available.
+
+    """
+
+    name = "pypardiso"
+
+    def __init__(self, factorization_reuse: int = 0) -> None:
+        from pypardiso import PyPardisoSolver  # type: ignore
+
+        super().__init__(factorization_reuse)
+        self._solver = PyPardisoSolver()
+
+        self._phases_available: bool = all(
+            callable(getattr(self._solver, method, None))
+            for method in ["set_phase", "_call_pardiso"]
+        )
+        """Whether the Pardiso phases can be called individually."""
+
+        self._factorized_matrix: Optional[sps.csr_matrix] = None
+        """Matrix of the last factorization, used with the public interface of
+        pypardiso only."""
+
+        if not self._phases_available:
+            warnings.warn(
+                "This version of pypardiso does not allow the individual Pardiso "
+                "phases to be called; the symbolic analysis is not reused."
+            )
+
+    def _call(self, phase: int, A: sps.csr_matrix, b: np.ndarray) -> np.ndarray:
+        self._solver.set_phase(phase)
+        return self._solver._call_pardiso(self._pardiso_matrix(A), b)
+
+    @staticmethod
+    def _pardiso_matrix(A: sps.csr_matrix) -> sps.csr_matrix:
+        """Check a matrix, and convert it to the format expected by Pardiso.
+
+        Pardiso is called through its 32 bit interface, thus it expects a square CSR
+        matrix with float64 values and int32 index arrays.
+
+        Parameters:
+            A: Matrix in CSR format, with sorted indices.
+
+        Raises:
+            ValueError: If the matrix is not square, contains empty rows (and is thus
+                singular), or has too many nonzeros for 32 bit indices.
+
+        Returns:
+            The matrix, or a copy with converted arrays if needed.
+
+        """
+        if A.shape[0] != A.shape[1]:
+            raise ValueError("Pardiso requires a square matrix.")
+        if np.any(A.indptr[1:] == A.indptr[:-1]):
+            raise ValueError("The matrix is singular, since it contains empty rows.")
+        if (
+            A.dtype == np.float64
+            and A.indices.dtype == np.int32
+            and A.indptr.dtype == np.int32
+        ):
+            return A
+        if A.nnz > np.iinfo(np.int32).max:
+            raise ValueError("The matrix has too many nonzeros for Pardiso.")
+        return sps.csr_matrix(
+            (
+                A.data.astype(np.float64, copy=False),
+                A.indices.astype(np.int32, copy=False),
+                A.indptr.astype(np.int32, copy=False),
+            ),
+            shape=A.shape,
+        )
+
+    def _analyze(self, A: sps.csr_matrix) -> None:
+        if self._phases_available:
+            self._call(11, A, np.zeros((A.shape[0], 1)))
+
+    def _factorize(self, A: sps.csr_matrix) -> None:
+        if self._phases_available:
+            self._call(22, A, np.zeros((A.shape[0], 1)))
+        else:
+            self._factorized_matrix = self._pardiso_matrix(A)
+            self._solver.factorize(self._factorized_matrix)
+
+    def _substitute(self, A: sps.csr_matrix, b: np.ndarray) -> np.ndarray:
+        if self._phases_available:
+            return self._call(33, A, b.reshape(-1, 1)).ravel()
+        # pypardiso refactorizes if the matrix differs from the factorized one, thus
+        # the factorized matrix is passed when the factorization is reused.
+        return np.ravel(self._solver.solve(self._factorized_matrix, b))
+
+
+class UmfpackBackend(LinearSolverBackend):
+    """Backend based on UMFPACK, as wrapped by scikit-umfpack.
+
+    Raises:
+        ImportError: If scikit-umfpack is not available.
+
+    """
+
+    name = "umfpack"
+
+    def __init__(self, factorization_reuse: int = 0) -> None:
+        import scikits.umfpack as umfpack  # type: ignore
+
+        super().__init__(factorization_reuse)
+        self._umfpack = umfpack
+        self._context: Any = None
+
+    def _analyze(self, A: sps.csr_matrix) -> None:
+        # The integer family of UMFPACK must match the index type of the matrix.
+        family = "dl" if A.indices.dtype == np.int64 else "di"
+        self._context = self._umfpack.UmfpackContext(family)
+        self._context.symbolic(A)
+
+    def _factorize(self, A: sps.csr_matrix) -> None:
+        self._context.numeric(A)
+
+    def _substitute(self, A: sps.csr_matrix, b: np.ndarray) -> np.ndarray:
+        return self._context.solve(self._umfpack.UMFPACK_A, A, b, autoTranspose=True)
+
+
+_KRYLOV_TOLERANCE_KEYWORD = (
+    "rtol" if "rtol" in inspect.signature(spla.gmres).parameters else "tol"
+)
+"""Keyword of the relative tolerance of Krylov solvers, which was renamed in SciPy
+1.12."""
+
+
+def _ilu(A: sps.spmatrix, drop_tol: float, fill_factor: float) -> Callable:
+    """Incomplete LU factorization of a matrix, returned as a solve function."""
+    return spla.spilu(
+        sps.csc_matrix(A), drop_tol=drop_tol, fill_factor=fill_factor
+    ).solve
+
+
+def _amg(A: sps.spmatrix) -> Callable:
+    """One V-cycle of smoothed aggregation algebraic multigrid, as provided by pyamg,
+    returned as a solve function."""
+    import pyamg  # type: ignore
+
+    ml = pyamg.smoothed_aggregation_solver(sps.csr_matrix(A))
+    return ml.aspreconditioner(cycle="V").matvec
+
+
+class GmresBackend(LinearSolverBackend):
+    r"""GMRES with a block preconditioner.
+
+    The degrees of freedom are grouped into blocks :math:`0, \ldots, n-1`, see
+    :meth:`set_block_structure`. The preconditioner is block upper triangular, with
+    diagonal blocks
+
+    .. math::
+        S_k = A_{kk} - \sum_{j < k} A_{kj} \mathrm{diag}(A_{jj})^{-1} A_{jk},
+
+    that is, approximate Schur complements obtained by eliminating the preceding blocks
+    using their diagonals. It is applied by solving for the last block first. For
+    poromechanics, with the mechanical degrees of freedom as the first and the flow
+    degrees of freedom as the second block, this is an algebraic version of the
+    fixed-stress splitting: The flow problem is solved with a stabilization term which
+    accounts for the volumetric response of the solid, and then the mechanics problem
+    is solved for the updated pressure.
+
+    The diagonal blocks are approximately inverted by algebraic multigrid (``"amg"``)
+    or an incomplete LU factorization (``"ilu"``), or inverted by a sparse direct
+    solver (``"direct"``). Multigrid is provided by pyamg; if pyamg is not available,
+    incomplete LU is used instead. By default, the solvers suggested together with the
+    block structure are used, see :meth:`set_block_structure`. Without suggestions,
+    multigrid is used for the first block (mechanics) if there are several blocks, and
+    incomplete LU otherwise. A custom approximate inverse can be provided as a callable
+    which takes the block matrix and returns a function applying the approximate
+    inverse to a vector.
+
+    The preconditioner is built in the factorization phase, thus the option
+    ``factorization_reuse`` reuses the preconditioner for several linear systems.
+
+    Parameters:
+        factorization_reuse: See :class:`LinearSolverBackend`.
+        tol: Relative tolerance of the Krylov solver.
+        maxiter: Maximum number of (outer) iterations.
+        restart: Number of iterations between restarts (GMRES only).
+        fixed_stress: If False, the diagonal blocks of the preconditioner are not
+            modified, i.e., :math:`S_k = A_{kk}`.
+        block_solvers: Approximate inverse of each diagonal block, either ``"amg"``,
+            ``"ilu"``, ``"direct"`` or a callable, see above. Overrides the solvers
+            suggested by :meth:`set_block_structure`.
+        ilu_drop_tol: Drop tolerance of the incomplete LU factorizations.
+        ilu_fill_factor: Maximum fill of the incomplete LU factorizations, relative to
+            the number of nonzeros of the block.
+
+    """
+
+    name = "gmres"
+
+    def __init__(
+        self,
+        factorization_reuse: int = 0,
+        tol: float = 1e-8,
+        maxiter: int = 500,
+        restart: int = 50,
+        fixed_stress: bool = True,
+        block_solvers: Optional[Sequence[str | Callable]] = None,
+        ilu_drop_tol: float = 1e-4,
+        ilu_fill_factor: float = 10,
+    ) -> None:
+        super().__init__(factorization_reuse)
+        self.tol: float = tol
+        """Relative tolerance of the Krylov solver."""
+        self.maxiter: int = maxiter
+        """Maximum number of iterations of the Krylov solver."""
+        self.restart: int = restart
+        """Number of iterations between restarts of GMRES."""
+        self.fixed_stress: bool = fixed_stress
+        """Whether the diagonal blocks are replaced by approximate Schur complements."""
+        self.block_solvers: Optional[list[str | Callable]] = (
+            None if block_solvers is None else list(block_solvers)
+        )
+        """Approximate inverses of the diagonal blocks. Defaults are assigned when the
+        block structure is known."""
+        self.ilu_drop_tol: float = ilu_drop_tol
+        """Drop tolerance of incomplete LU factorizations."""
+        self.ilu_fill_factor: float = ilu_fill_factor
+        """Fill factor of incomplete LU factorizations."""
+
+        self.iterations: list[int] = []
+        """Number of iterations used by the Krylov solver in each call to
+        :meth:`solve`."""
+
+        self._blocks: Optional[list[np.ndarray]] = None
+        """Indices of the degrees of freedom in each block."""
+        self._suggested_solvers: Optional[list[str]] = None
+        """Solvers of the blocks suggested by :meth:`set_block_structure`."""
+        self._off_diagonal: list[list[sps.csr_matrix]] = []
+        """Blocks above the diagonal of the matrix, used when applying the
+        preconditioner."""
+        self._block_inverses: list[Callable] = []
+        """Approximate inverses of the (modified) diagonal blocks."""
+
+    def set_block_structure(
+        self,
+        blocks: Sequence[np.ndarray],
+        block_solvers: Optional[Sequence[str]] = None,
+    ) -> None:
+        """Set a grouping of the degrees of freedom into blocks.
+
+        Parameters:
+            blocks: Indices of the degrees of freedom in each block. Together, the
+                blocks should contain all degrees of freedom exactly once. Empty blocks
+                are ignored.
+            block_solvers (optional): Suggested solver for each block. Used unless
+                the solvers are given by :attr:`block_solvers`.
+
+        Raises:
+            ValueError: If the number of suggested solvers differs from the number of
+                blocks.
+
+        """
+        if block_solvers is not None and len(block_solvers) != len(blocks):
+            raise ValueError(
+                f"Got {len(block_solvers)} block solvers for {len(blocks)} blocks."
+            )
+        non_empty = [k for k, b in enumerate(blocks) if b.size > 0]
+        self._blocks = [np.asarray(blocks[k], dtype=int) for k in non_empty]
+        self._suggested_solvers = (
+            None if block_solvers is None else [block_solvers[k] for k in non_empty]
+        )
+        # A new preconditioner is needed.
+        self.reset_factorization()
+
+    def _analyze(self, A: sps.csr_matrix) -> None:
+        # The preconditioner is built from the values of the matrix only.
+        pass
+
+    def _factorize(self, A: sps.csr_matrix) -> None:
+        blocks = self._blocks if self._blocks is not None else [np.arange(A.shape[0])]
+        num_dofs = sum(b.size for b in blocks)
+        if num_dofs != A.shape[0]:
+            raise ValueError(
+                f"The blocks contain {num_dofs} degrees of freedom, while the "
+                f"matrix has {A.shape[0]} rows."
+            )
+        num_blocks = len(blocks)
+        solvers: Sequence[str | Callable]
+        if self.block_solvers is not None:
+            solvers = self.block_solvers
+        elif self._suggested_solvers is not None:
+            solvers = self._suggested_solvers
+        else:
+            solvers = (
+                ["amg"] + ["ilu"] * (num_blocks - 1) if num_blocks > 1 else ["ilu"]
+            )
+        if len(solvers) != num_blocks:
+            raise ValueError(
+                f"Got {len(solvers)} block solvers for {num_blocks} blocks."
+            )
+
+        rows = [A[b] for b in blocks]
+        self._off_diagonal = [
+            [rows[k][:, blocks[j]].tocsr() for j in range(num_blocks)]
+            for k in range(num_blocks)
+        ]
+        self._block_inverses = []
+        inverse_diagonals: list[sps.spmatrix] = []
+        for k in range(num_blocks):
+            S = self._off_diagonal[k][k]
+            if self.fixed_stress:
+                for j in range(k):
+                    S = S - (
+                        self._off_diagonal[k][j]
+                        @ inverse_diagonals[j]
+                        @ self._off_diagonal[j][k]
+                    )
+            diagonal = S.diagonal()
+            inverse = np.zeros_like(diagonal)
+            nonzero = diagonal != 0
+            inverse[nonzero] = 1 / diagonal[nonzero]
+            inverse_diagonals.append(sps.diags(inverse))
+            self._block_inverses.append(self._block_inverse(S, solvers[k]))
+
+    def _block_inverse(self, S: sps.spmatrix, solver: str | Callable) -> Callable:
+        """Approximate inverse of a diagonal block."""
+        if callable(solver):
+            return solver(S)
+        if solver == "amg":
+            try:
+                return _amg(S)
+            except ImportError:
+                solver = "ilu"
+        if solver == "ilu":
+            return _ilu(S, self.ilu_drop_tol, self.ilu_fill_factor)
+        if solver == "direct":
+            return spla.splu(sps.csc_matrix(S)).solve
+        raise ValueError(f"Unknown block solver {solver}")
+
+    def _apply_preconditioner(self, r: np.ndarray) -> np.ndarray:
+        blocks = self._blocks if self._blocks is not None else [np.arange(r.size)]
+        num_blocks = len(blocks)
+        y = np.zeros_like(r)
+        solutions: list[np.ndarray] = [np.empty(0)] * num_blocks
+        for k in reversed(range(num_blocks)):
+            rhs = r[blocks[k]]
+            for j in range(k + 1, num_blocks):
+                rhs = rhs - self._off_diagonal[k][j] @ solutions[j]
+            solutions[k] = self._block_inverses[k](rhs)
+            y[blocks[k]] = solutions[k]
+        return y
+
+    def _krylov(self, A: sps.csr_matrix, b: np.ndarray, M, callback) -> tuple:
+        return spla.gmres(
+            A,
+            b,
+            restart=self.restart,
+            maxiter=self.maxiter,
+            M=M,
+            callback=callback,
+            callback_type="pr_norm",
+            atol=0.0,
+            **{_KRYLOV_TOLERANCE_KEYWORD: self.tol},
+        )
+
+    def _substitute(self, A: sps.csr_matrix, b: np.ndarray) -> np.ndarray:
+        M = spla.LinearOperator(A.shape, matvec=self._apply_preconditioner)
+        num_iterations = 0
+
+        def callback(_: Any) -> None:
+            nonlocal num_iterations
+            num_iterations += 1
+
+        x, info = self._krylov(A, b, M, callback)
+        self.iterations.append(num_iterations)
+        if info != 0:
+            warnings.warn(
+                f"The {self.name} solver did not converge, return code {info}, after "
+                f"{num_iterations} iterations."
+            )
+        return x
+
+
+class BiCGStabBackend(GmresBackend):
+    """BiCGStab with a block preconditioner, see :class:`GmresBackend`.
+
+    The parameter ``restart`` is ignored.
+
+    """
+
+    name = "bicgstab"
+
+    def _krylov(self, A: sps.csr_matrix, b: np.ndarray, M, callback) -> tuple:
+        return spla.bicgstab(
+            A,
+            b,
+            maxiter=self.maxiter,
+            M=M,
+            callback=callback,
+            atol=0.0,
+            **{_KRYLOV_TOLERANCE_KEYWORD: self.tol},
+        )
+
+
+linear_solver_backends: dict[str, Type[LinearSolverBackend]] = {}
+"""Registry of linear solver backends, identified by their names."""
+
+
+def register_linear_solver_backend(backend: Type[LinearSolverBackend]) -> None:
+    """Register a linear solver backend under its name.
+
+    Parameters:
+        backend: Backend class. A backend previously registered under the same name is
+            replaced.
+
+    Raises:
+        ValueError: If the backend has no name.
+
+    """
+    if not backend.name:
+        raise ValueError("Linear solver backends must have a name.")
+    linear_solver_backends[backend.name] = backend
+
+
+def create_linear_solver_backend(
+    name: str, factorization_reuse: int = 0, **options
+) -> LinearSolverBackend:
+    """Create a linear solver backend from its name.
+
+    If the solver wrapped by the backend is not available, a warning is raised and the
+    SciPy backend is used instead.
+
+    Parameters:
+        name: Name of a registered backend.
+        factorization_reuse: See :class:`LinearSolverBackend`.
+        **options: Further keyword arguments passed to the backend, e.g., tolerances
+            for the Krylov backends.
+
+    Raises:
+        ValueError: If no backend is registered under the name.
+
+    Returns:
+        The backend.
+
+    """
+    if name not in linear_solver_backends:
+        raise ValueError(f"Unknown linear solver {name}")
+    try:
+        return linear_solver_backends[name](factorization_reuse, **options)
+    except ImportError:
+        warnings.warn(
+            f"The linear solver {name} could not be imported, falling back on "
+            "scipy.sparse.linalg.splu"
+        )
+        return ScipySparseBackend(factorization_reuse)
+
+
+for _backend in (
+    ScipySparseBackend,
+    PardisoBackend,
+    UmfpackBackend,
+    GmresBackend,
+    BiCGStabBackend,
+):
+    register_linear_solver_backend(_backend)
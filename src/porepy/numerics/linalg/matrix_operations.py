@@ -528,17 +528,22 @@ def invert_diagonal_blocks(
     """
     Invert block diagonal matrix.
 
-    Three implementations are available, either pure numpy, or a speedup using
-    numba or cython. If none is specified, the function will try to use numba,
-    then cython. The python option will only be invoked if explicitly asked
-    for; it will be very slow for general problems.
+    Three implementations are available: A batched numpy implementation, a loop over
+    the blocks accelerated by numba, and a pure python loop. The batched version
+    groups the blocks according to their size, and inverts all blocks of the same
+    size by a single call to np.linalg.inv on a stacked array. This is efficient if
+    the number of distinct block sizes is moderate, which is the typical case for
+    the local problems in MPFA and MPSA, and requires no just-in-time compilation.
+    The numba version runs in parallel over the blocks, and may be faster on
+    machines with many cores. The python option will only be invoked if explicitly
+    asked for; it will be very slow for general problems.
 
     Parameters
     ----------
     mat: sps.csr matrix to be inverted.
     s: block size. Must be int64 for the numba acceleration to work
-    method: Choice of method. Either numba (default), cython or 'python'.
-        Defaults to None, in which case first numba, then cython is tried.
+    method: Choice of method. Either 'batched', 'numba' or 'python'.
+        Defaults to None, in which case the batched method is used.
 
     Returns
     -------
@@ -546,8 +551,9 @@ def invert_diagonal_blocks(
 
     Raises
     -------
-    ImportError: If numba or cython implementation is invoked without numba or
-        cython being available on the system.
+    ImportError: If numba implementation is invoked without numba being available
+        on the system.
+    ValueError: If one of the blocks is singular.
 
     """
 
@@ -692,10 +698,57 @@ def invert_diagonal_blocks(
         v = inv_python(ptr, indices, dat, size)
         return v
 
+    def invert_diagonal_blocks_batched(a: sps.spmatrix, sz: np.ndarray) -> np.ndarray:
+        """
+        Invert block diagonal matrix by stacking blocks of equal size.
+
+        Parameters
+        ----------
+        a: sps.csr matrix, to be inverted
+        sz: size of the individual blocks
+
+        Returns
+        -------
+        inv_a: Values of the inverse matrix, ordered as for the other methods, that
+            is, the row-wise raveled inverse of each block, one block after the other.
+
+        """
+        a = sps.csr_matrix(a)
+        a.sum_duplicates()
+        num_blocks = sz.size
+        # Start row of each block, and start of each block in the output array.
+        block_start = np.hstack((0, np.cumsum(sz)))
+        value_start = np.hstack((0, np.cumsum(np.square(sz))))
+
+        # Scatter the matrix elements into the raveled dense blocks.
+        block_of_row = np.repeat(np.arange(num_blocks), sz)
+        rows = np.repeat(np.arange(a.shape[0]), np.diff(a.indptr))
+        block = block_of_row[rows]
+        v = np.zeros(value_start[-1])
+        v[
+            value_start[block]
+            + (rows - block_start[block]) * sz[block]
+            + (a.indices - block_start[block])
+        ] = a.data
+
+        # Invert all blocks of the same size in one go. The inverse is stored in place.
+        sizes, size_group = np.unique(sz, return_inverse=True)
+        for group, n in enumerate(sizes):
+            blocks_of_size = np.where(size_group == group)[0]
+            ind = (
+                value_start[blocks_of_size].reshape((-1, 1)) + np.arange(n * n)
+            ).ravel()
+            v[ind] = np.linalg.inv(v[ind].reshape((-1, n, n))).ravel()
+        return v
+
     # Remove blocks of size 0
     s = s[s > 0]
-    # Variable to check if we have tried and failed with numba
-    if method == "numba" or method is None:
+    if method == "batched" or method is None:
+        try:
+            inv_vals = invert_diagonal_blocks_batched(mat, s)
+        except np.linalg.LinAlgError:
+            raise ValueError("Error in inversion of local linear systems")
+    elif method == "numba":
         try:
             inv_vals = invert_diagonal_blocks_numba(mat, s)
         except np.linalg.LinAlgError:
@@ -722,10 +775,15 @@ def block_diag_matrix(vals: np.ndarray, sz: np.ndarray) -> sps.spmatrix:
     -------
     sps.csr matrix
     """
-    row, _ = block_diag_index(sz)
-    # This line recovers starting indices of the rows.
-    indptr = np.hstack((np.zeros(1), np.cumsum(rldecode(sz, sz)))).astype("int32")
-    return sps.csr_matrix((vals, row, indptr))
+    # Each row of a block has as many elements as the block size.
+    row_length = np.repeat(sz, sz)
+    indptr = np.hstack((0, np.cumsum(row_length)))
+    # The columns of a row start at the first row (and column) of its block.
+    block_start = np.hstack((0, np.cumsum(sz)[:-1]))
+    col_start = np.repeat(block_start, sz)
+    indices = np.repeat(col_start - indptr[:-1], row_length) + np.arange(indptr[-1])
+    num_rows = indptr.size - 1
+    return sps.csr_matrix((vals, indices, indptr), shape=(num_rows, num_rows))
 
 
 def block_diag_index(
@@ -2,10 +2,15 @@
 Nonlinear solvers to be used with model classes.
 Implemented classes
     NewtonSolver
+    NewtonKrylovSolver
 """
 import logging
+from typing import Any
 
 import numpy as np
+import scipy.sparse.linalg as spla
+
+from porepy.numerics.linalg.linear_solver_backends import _KRYLOV_TOLERANCE_KEYWORD
 
 # ``tqdm`` is not a dependency. Up to the user to install it.
 try:
@@ -32,7 +37,7 @@ class NewtonSolver:
         if params is None:
             params = {}
 
-        default_options = {
+        default_options: dict[str, Any] = {
             "max_iterations": 10,
             "nl_convergence_tol": 1e-10,
             "nl_divergence_tol": 1e5,
@@ -177,3 +182,117 @@ class NewtonSolver:
         model.assemble_linear_system()
         sol = model.solve_linear_system()
         return sol
+
+
+class NewtonKrylovSolver(NewtonSolver):
+    """Matrix-free Newton solver, with the linearized systems solved by GMRES.
+
+    The Jacobian matrix is never assembled. Instead, GMRES is applied to a linear
+    operator whose action is computed by forward propagation of the Krylov vectors
+    through the evaluation plan of the equations, see
+    :meth:`~porepy.numerics.ad.equation_system.EquationSystem.jacobian_vector_product`.
+    The residual is evaluated without derivatives. This saves the memory of the
+    Jacobian matrix and of its factorization, which dominates for large systems,
+    at the price of one evaluation of the equations per Krylov iteration.
+
+    The linearized system is formed from all equations and variables of the equation
+    system of the model, thus the methods ``assemble_linear_system`` and
+    ``solve_linear_system`` of the model are bypassed.
+
+    Without a preconditioner, GMRES converges slowly for discretized partial
+    differential equations. A preconditioner can be provided in the parameters, e.g.,
+    built from a Jacobian matrix assembled once and reused over several iterations.
+
+    Note:
+        Functions with approximated Jacobians are linearized with respect to their
+        arguments. Functions which evaluate operators internally, and thus construct
+        Jacobian matrices with respect to the full state, are not supported.
+
+    Parameters:
+        params: Parameters of :class:`NewtonSolver`, and in addition
+
+            - ``"krylov_tol"``: Relative tolerance of GMRES. Defaults to 1e-8.
+            - ``"krylov_maxiter"``: Maximum number of GMRES restart cycles. Defaults
+              to None, meaning the SciPy default.
+            - ``"krylov_restart"``: Number of GMRES iterations between restarts.
+              Defaults to 50.
+            - ``"krylov_preconditioner"``: Callable which, given the model, returns
+              the preconditioner as a :class:`~scipy.sparse.linalg.LinearOperator`,
+              or None. Called once per Newton iteration. Defaults to None, meaning no
+              preconditioning.
+
+    """
+
+    def __init__(self, params=None) -> None:
+        super().__init__(params)
+        default_options: dict[str, Any] = {
+            "krylov_tol": 1e-8,
+            "krylov_maxiter": None,
+            "krylov_restart": 50,
+            "krylov_preconditioner": None,
+        }
+        default_options.update(self.params)
+        self.params = default_options
+
+        self.krylov_iterations: list[int] = []
+        """Number of GMRES iterations in each Newton iteration."""
+
+    def iteration(self, model) -> np.ndarray:
+        """A single nonlinear iteration, with a matrix-free solution of the linearized
+        system.
+
+        Parameters:
+            model: The model instance specifying the problem to be solved.
+
+        Raises:
+            ValueError: If the linearized system is not square.
+
+        Returns:
+            The Newton increment.
+
+        """
+        equation_system = model.equation_system
+        # The Jacobian is evaluated at the current iterate throughout the iteration.
+        state = equation_system.get_variable_values(iterate_index=0)
+        b = equation_system.assemble_rhs(state=state)
+        num_dofs = equation_system.num_dofs()
+        if b.size != num_dofs:
+            raise ValueError(
+                f"Linearized system with {b.size} equations and {num_dofs} unknowns is "
+                "not square."
+            )
+
+        A = spla.LinearOperator(
+            (num_dofs, num_dofs),
+            matvec=lambda v: equation_system.jacobian_vector_product(v, state=state),
+            rmatvec=lambda w: equation_system.vector_jacobian_product(w, state=state),
+            dtype=float,
+        )
+        preconditioner = self.params["krylov_preconditioner"]
+        M = None if preconditioner is None else preconditioner(model)
+
+        num_iterations = 0
+
+        def callback(_: Any) -> None:
+            nonlocal num_iterations
+            num_iterations += 1
+
+        x, info = spla.gmres(
+            A,
+            b,
+            restart=self.params["krylov_restart"],
+            maxiter=self.params["krylov_maxiter"],
+            M=M,
+            callback=callback,
+            callback_type="pr_norm",
+            atol=0.0,
+            **{_KRYLOV_TOLERANCE_KEYWORD: self.params["krylov_tol"]},
+        )
+        self.krylov_iterations.append(num_iterations)
+        if info != 0:
+            logger.warning(
+                f"GMRES did not converge within {num_iterations} iterations."
+            )
+        else:
+            logger.info(f"GMRES converged in {num_iterations} iterations.")
+        return x
@@ -0,0 +1,226 @@
+"""Out-of-core storage of discretization matrices.
+
+For large problems, the discretization matrices stored in the data dictionaries
+(``data[pp.DISCRETIZATION_MATRICES]``) may consume a major part of the memory. Two
+measures are provided to reduce their footprint:
+
+1. Matrices which are not referenced by any equation, e.g., operators for
+   reconstruction of boundary pressures or displacements, can be deleted by
+   :func:`drop_unreferenced_matrices`.
+2. Matrices can be moved to memory-mapped files on local disk by
+   :class:`MemoryMappedMatrixStorage`. The matrices are replaced by CSR matrices whose
+   data and index arrays are read-only views of the files. The operating system loads
+   the parts of the files which are accessed, and can release them again under memory
+   pressure. Since a single memory-mapped CSR matrix is used as is by
+   :meth:`~porepy.numerics.ad._ad_utils.MergedOperator.parse`, no copy is held in
+   memory between evaluations. Products and sums of memory-mapped matrices are not
+   cached by :class:`~porepy.numerics.ad.evaluation_plan.EvaluationPlan`, but are
+   recomputed in every evaluation; their memory is released afterwards.
+
+Memory-mapped matrices are read-only. Discretizations which update matrices in place,
+such as partial updates of discretizations, should therefore not be combined with
+memory mapping.
+
+Within a model, both measures are activated by model parameters, see
+:meth:`~porepy.models.solution_strategy.SolutionStrategy.store_discretization_matrices`.
+
+"""
+from __future__ import annotations
+
+import itertools
+import logging
+import tempfile
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+import numpy as np
+import scipy.sparse as sps
+
+import porepy as pp
+
+__all__ = [
+    "MemoryMappedMatrixStorage",
+    "drop_unreferenced_matrices",
+    "is_memory_mapped",
+    "matrix_bytes",
+]
+
+logger = logging.getLogger(__name__)
+
+
+def matrix_bytes(mat) -> int:
+    """Number of bytes held by the arrays of a sparse matrix or numpy array."""
+    if sps.issparse(mat):
+        mat = sps.csr_matrix(mat) if mat.format not in ("csr", "csc") else mat
+        return mat.data.nbytes + mat.indices.nbytes + mat.indptr.nbytes
+    elif isinstance(mat, np.ndarray):
+        return mat.nbytes
+    return 0
+
+
+def drop_unreferenced_matrices(
+    mdg: pp.MixedDimensionalGrid,
+    referenced: dict[pp.GridLike, set[tuple[str, str]]],
+) -> int:
+    """Delete discretization matrices which are not referenced.
+
+    Parameters:
+        mdg: Mixed-dimensional grid.
+        referenced: For each subdomain and interface, the referenced matrices,
+            identified by the keyword of the matrix dictionary and the matrix key. See
+            :meth:`~porepy.numerics.ad.equation_system.EquationSystem.
+            referenced_discretization_matrices`.
+
+    Returns:
+        The number of bytes held by the deleted matrices.
+
+    """
+    freed = 0
+    grids_and_data: Iterable[tuple[pp.GridLike, dict]] = itertools.chain(
+        mdg.subdomains(return_data=True), mdg.interfaces(return_data=True)
+    )
+    for grid, data in grids_and_data:
+        keep = referenced.get(grid, set())
+        for keyword, matrices in data.get(pp.DISCRETIZATION_MATRICES, {}).items():
+            for key in list(matrices.keys()):
+                if (keyword, key) not in keep:
+                    freed += matrix_bytes(matrices.pop(key))
+    return freed
+
+
+class MemoryMappedMatrixStorage:
+    """Storage of sparse matrices in memory-mapped files.
+
+    Parameters:
+        directory: Directory of the files. If not given, a temporary directory is
+            created, which is deleted together with this object.
+        min_nnz: Matrices with fewer nonzeros are kept in memory. Defaults to 10000.
+
+    """
+
+    def __init__(
+        self, directory: Optional[Union[str, Path]] = None, min_nnz: int = 10000
+    ) -> None:
+        self._temporary_directory: Optional[tempfile.TemporaryDirectory] = None
+        if directory is None:
+            self._temporary_directory = tempfile.TemporaryDirectory(
+                prefix="porepy_matrices_"
+            )
+            directory = self._temporary_directory.name
+
+        self.directory: Path = Path(directory)
+        """Directory of the memory-mapped files."""
+
+        self.min_nnz: int = min_nnz
+        """Matrices with fewer nonzeros than this are kept in memory."""
+
+        self.num_bytes: int = 0
+        """Number of bytes stored in memory-mapped files."""
+
+        self._counter = itertools.count()
+        # Size and files of the matrices stored by store_discretization_matrices,
+        # identified by grid, keyword and matrix key.
+        self._files: dict[tuple, tuple[int, list[Path]]] = {}
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"Memory-mapped storage of matrices in {self.directory}, "
+            f"{self.num_bytes} bytes stored."
+        )
+
+    def memory_map(self, mat: sps.spmatrix) -> sps.csr_matrix:
+        """Move a sparse matrix to memory-mapped files.
+
+        Parameters:
+            mat: Sparse matrix.
+
+        Returns:
+            A CSR matrix with the same values, whose arrays are read-only views of
+            memory-mapped files.
+
+        """
+        return self._write(mat)[0]
+
+    def store_discretization_matrices(self, mdg: pp.MixedDimensionalGrid) -> int:
+        """Move the sparse discretization matrices of a mixed-dimensional grid to
+        memory-mapped files.
+
+        Matrices with fewer than :attr:`min_nnz` nonzeros, and matrices which are
+        already memory mapped, are left unchanged. If a matrix stored by a previous
+        call has been replaced, e.g., by a rediscretization, its files are deleted.
+
+        Parameters:
+            mdg: Mixed-dimensional grid.
+
+        Returns:
+            The number of bytes moved to memory-mapped files.
+
+        """
+        moved = 0
+        for grid, data in itertools.chain(
+            mdg.subdomains(return_data=True), mdg.interfaces(return_data=True)
+        ):
+            for keyword, matrices in data.get(pp.DISCRETIZATION_MATRICES, {}).items():
+                for key, mat in matrices.items():
+                    if (
+                        not sps.issparse(mat)
+                        or mat.nnz < self.min_nnz
+                        or is_memory_mapped(mat)
+                    ):
+                        continue
+                    mapped, paths = self._write(mat)
+                    matrices[key] = mapped
+                    moved += matrix_bytes(mat)
+
+                    # Delete the files of a replaced matrix. Memory maps which are
+                    # still open remain valid.
+                    previous = self._files.pop((grid, keyword, key), None)
+                    if previous is not None:
+                        self.num_bytes -= previous[0]
+                        for path in previous[1]:
+                            path.unlink(missing_ok=True)
+                    self._files[(grid, keyword, key)] = (matrix_bytes(mapped), paths)
+        logger.info(f"Moved {moved} bytes of discretization matrices to disk.")
+        return moved
+
+    def _write(self, mat: sps.spmatrix) -> tuple[sps.csr_matrix, list[Path]]:
+        """Write a sparse matrix to files, and return the memory-mapped matrix and the
+        paths of the files."""
+        csr = sps.csr_matrix(mat)
+        if not csr.has_canonical_format:
+            csr = csr.copy()
+            csr.sum_duplicates()
+        ind = next(self._counter)
+        arrays, paths = [], []
+        for name in ["data", "indices", "indptr"]:
+            array = getattr(csr, name)
+            path = self.directory / f"{ind}_{name}.npy"
+            mapped = np.lib.format.open_memmap(
+                path, mode="w+", dtype=array.dtype, shape=array.shape
+            )
+            mapped[:] = array
+            mapped.flush()
+            del mapped
+            arrays.append(np.load(path, mmap_mode="r"))
+            paths.append(path)
+        self.num_bytes += matrix_bytes(csr)
+        # The index arrays have the data type chosen by scipy for the original matrix,
+        # thus the memory-mapped arrays are used without copies.
+        mapped_mat = sps.csr_matrix(tuple(arrays), shape=csr.shape)
+        # Scipy checks the format lazily, which would try to sort the read-only
+        # arrays. The matrix is known to be in canonical format.
+        mapped_mat.has_sorted_indices = True
+        mapped_mat.has_canonical_format = True
+        return mapped_mat, paths
+
+
+def is_memory_mapped(mat: sps.spmatrix) -> bool:
+    """Check if a sparse matrix is backed by read-only, memory-mapped arrays."""
+    data = getattr(mat, "data", None)
+    if not isinstance(data, np.ndarray) or data.flags.writeable:
+        return False
+    # The array may be a view of a view of the memory-mapped array.
+    while data is not None and not isinstance(data, np.memmap):
+        data = data.base
+    return data is not None
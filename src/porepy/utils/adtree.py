@@ -62,7 +62,8 @@ A search in the tree gives a list of all possible nodes that may
 intersect the given one.
 
 """
-from typing import Any, List, Optional, Tuple
+from collections.abc import Sequence
+from typing import Any, List, Optional
 
 import numpy as np
 from scipy import sparse as sps
@@ -137,12 +138,17 @@ class ADTree:
     possible intersections. The implementation does not include some features, like removing a
     node, that are not used so far. Possible extensions in the future.
 
+    The tree is stored in arrays: the children, the parent and the bounding box of node i
+    are in row i of the arrays, while the keys of the nodes are kept in a list. Nodes are
+    identified by their position, that is, the order in which they are added.
+
     Attributes:
         tree_dim (int): search dimension of the tree, typically (e.g., when a pp.Grid is
             given) the double of the phys_dim
         phys_dim (int): physical dimension of nodes in the tree, e.g., a 2d grid will have
             phys_dim = 2
-        nodes (list): the list of nodes as ADTNode
+        nodes (Sequence[ADTNode]): read-only view of the nodes as ADTNode
+        keys (list): the keys of the nodes
         region_min (float): to scale the bounding box of all the elements in [0, 1]^phys_dim
             we need the minimum corner point of the all region
         delta (float): a parameter to scale and get all the bounding box of the elements in
@@ -166,10 +172,16 @@ class ADTree:
         self.tree_dim: int = tree_dim
         self.phys_dim: int = phys_dim
 
-        self.nodes: List[ADTNode] = []
+        self.keys: List[Any] = []
         self.region_min: float = 0.0
         self.delta: float = 1.0
 
+        # Array storage of the tree, with room for more nodes than currently present.
+        self._num_nodes: int = 0
+        self._child: np.ndarray = np.empty((0, 2), dtype=int)
+        self._parent: np.ndarray = np.empty(0, dtype=int)
+        self._box: np.ndarray = np.empty((0, tree_dim), dtype=float)
+
     def __str__(self) -> str:
         """Implementation of __str__"""
         s = (
@@ -178,7 +190,7 @@ class ADTree:
             + "\nPhysical dimension: "
             + str(self.phys_dim)
             + "\nNumber of nodes: "
-            + str(len(self.nodes))
+            + str(self.num_nodes)
             + "\nFor the geometrical scaling in [0, 1], the region minimum: "
             + str(self.region_min)
             + " and delta "
@@ -199,7 +211,7 @@ class ADTree:
             + " delta: "
             + str(self.delta)
             + " number of nodes: "
-            + str(len(self.nodes))
+            + str(self.num_nodes)
             + " list of nodes:\n"
         )
 
@@ -209,6 +221,36 @@ class ADTree:
 
         return s
 
+    @property
+    def num_nodes(self) -> int:
+        """Number of nodes in the tree."""
+        return self._num_nodes
+
+    @property
+    def nodes(self) -> "_NodeView":
+        """Read-only view of the nodes of the tree.
+
+        The ADTNode objects are created on access, modifying them does not change the
+        tree.
+        """
+        return _NodeView(self)
+
+    @property
+    def child(self) -> np.ndarray:
+        """Left and right children of the nodes, -1 if not present. Shape is
+        (num_nodes, 2)."""
+        return self._child[: self._num_nodes]
+
+    @property
+    def parent(self) -> np.ndarray:
+        """Parent of the nodes, -1 for the root."""
+        return self._parent[: self._num_nodes]
+
+    @property
+    def box(self) -> np.ndarray:
+        """Bounding boxes of the nodes. Shape is (num_nodes, tree_dim)."""
+        return self._box[: self._num_nodes]
+
     def add_node(self, node: ADTNode) -> None:
         """Add a new node to the tree. We traverse the tree as previously specified and
         assign the new node accordingly.
@@ -217,16 +259,23 @@ class ADTree:
             node (ADTNode): the new node to be added.
 
         """
+        self._reserve(self._num_nodes + 1)
+        new_id = self._num_nodes
+        self._box[new_id] = node.box
+        self._child[new_id] = -1
+        self._parent[new_id] = -1
+        self.keys.append(node.key)
+        self._num_nodes += 1
+
         # When the tree is empty just add the node as root
-        if len(self.nodes) == 0:
-            self.nodes.append(node)
+        if new_id == 0:
             return
 
         # Current level for the dimension to check
         level = 0
-        # Get the first node id, the position in the self.nodes list
+        # Get the first node id, the position in the arrays
         next_node_id = 0
-        box = node.box.copy()
+        box = node.box.astype(float)
         while next_node_id != -1:
             current_node_id = next_node_id
             # Get the current search dimension
@@ -241,15 +290,77 @@ class ADTree:
                 edge = self.RIGHT
                 box[search_dim] -= 1.0
             # Take the new node
-            next_node_id = self.nodes[current_node_id].child[edge]
+            next_node_id = self._child[current_node_id, edge]
             level += 1
 
         # The correct position has been found, add informations to its parent
-        self.nodes[current_node_id].child[edge] = len(self.nodes)
+        self._child[current_node_id, edge] = new_id
+        self._parent[new_id] = current_node_id
+
+    def add_nodes(self, keys: List[Any], boxes: np.ndarray) -> None:
+        """Add several nodes to the tree.
+
+        The resulting tree is the same as when the nodes are added one at a time by
+        add_node, in the given order. Instead of descending the tree for each node, all
+        nodes are descended together, one level at a time.
 
-        # Add the new node to the list
-        node.parent = current_node_id
-        self.nodes.append(node)
+        Parameters:
+            keys (list): the keys of the new nodes
+            boxes (np.ndarray, num_new_nodes x tree_dim): the bounding boxes of the new
+                nodes
+
+        Raises:
+            ValueError: if the number of keys and boxes differ
+
+        """
+        boxes = np.asarray(boxes, dtype=float).reshape((-1, self.tree_dim))
+        num_new = boxes.shape[0]
+        if len(keys) != num_new:
+            raise ValueError("The number of keys and boxes must be the same")
+        if num_new == 0:
+            return
+
+        first_id = self._num_nodes
+        self._reserve(first_id + num_new)
+        self._box[first_id : first_id + num_new] = boxes
+        self._child[first_id : first_id + num_new] = -1
+        self._parent[first_id : first_id + num_new] = -1
+        self.keys.extend(keys)
+        self._num_nodes += num_new
+
+        # Nodes still to be placed, kept sorted by their id, together with the node
+        # they are currently compared with, and their box scaled to the current
+        # level. When the tree is empty, the first node becomes the root.
+        start = 1 if first_id == 0 else 0
+        ids = np.arange(first_id + start, first_id + num_new)
+        current = np.zeros(ids.size, dtype=int)
+        box = boxes[start:].copy()
+
+        level = 0
+        while ids.size > 0:
+            search_dim = level % self.tree_dim
+            box[:, search_dim] *= 2.0
+            edge = (box[:, search_dim] >= 1.0).astype(int)
+            box[edge == self.RIGHT, search_dim] -= 1.0
+
+            next_node = self._child[current, edge]
+            free = next_node == -1
+
+            # Among the nodes reaching the same free position, the one with the lowest
+            # id is placed there, the others are compared with it at the next level.
+            slot = 2 * current[free] + edge[free]
+            _, first, inverse = np.unique(slot, return_index=True, return_inverse=True)
+            placed = ids[free][first]
+            self._child[current[free][first], edge[free][first]] = placed
+            self._parent[placed] = current[free][first]
+            next_node[free] = placed[inverse]
+
+            keep = np.ones(ids.size, dtype=bool)
+            keep[np.flatnonzero(free)[first]] = False
+            ids = ids[keep]
+            current = next_node[keep]
+            box = box[keep]
+            level += 1
 
     def search(self, node: ADTNode, tol: float = 2.0e-6) -> np.ndarray:
         """Search all possible nodes in the tree that might intersect with the input node.
@@ -262,93 +373,101 @@ class ADTree:
         Returns:
             nodes (np.ndarray): Sorted, by id, list of nodes id that might intersect the node
         """
+        return self.search_many(node.box.reshape((1, -1)), tol).indices
 
-        # Enlarge the region to avoid floating point problems
-        box = node.box.copy()
-        box[: self.phys_dim] = self._scale(box[: self.phys_dim]) - tol
-        box[self.phys_dim :] = self._scale(box[self.phys_dim :]) + tol
+    def search_many(self, boxes: np.ndarray, tol: float = 2.0e-6) -> sps.csr_matrix:
+        """Search all possible nodes in the tree that might intersect with each of the
+        input boxes.
+
+        All boxes are treated together: the tree is traversed one level at a time for all
+        pairs of boxes and sub-trees that may still contain intersecting nodes.
 
-        # Origin of the sub-tree
-        origin = np.zeros(self.tree_dim, dtype=float)
+        Parameters:
+            boxes (np.ndarray, num_boxes x tree_dim): Input bounding boxes, each given as
+                minimum followed by maximum coordinates, not scaled.
+            tol (float, optional): Geometrical tolerance to avoid floating point problems
+
+        Returns:
+            sps.csr_matrix (num_boxes x num_nodes): Boolean matrix, row i contains the
+                sorted ids of the nodes that might intersect box i in its indices. These
+                are obtained by ``indices[indptr[i]:indptr[i + 1]]``.
+
+        Raises:
+            ValueError: if the tree does not store bounding boxes, that is, if tree_dim is
+                not twice phys_dim
+
+        """
+        if self.tree_dim != 2 * self.phys_dim:
+            raise ValueError("Search is only possible for a tree of bounding boxes")
+        dim = self.phys_dim
 
+        # Enlarge the region to avoid floating point problems
+        boxes = np.asarray(boxes, dtype=float).reshape((-1, self.tree_dim))
+        scaled = np.empty_like(boxes)
+        scaled[:, :dim] = self._scale(boxes[:, :dim]) - tol
+        scaled[:, dim:] = self._scale(boxes[:, dim:]) + tol
+        num_boxes = scaled.shape[0]
+
+        found_box: List[np.ndarray] = []
+        found_node: List[np.ndarray] = []
+
+        # Pairs of boxes and sub-trees to be checked, with the origin of the sub-tree.
+        # All sub-trees in the front have their root at the same level.
+        front_box = np.arange(num_boxes if self._num_nodes > 0 else 0)
+        front_node = np.zeros(front_box.size, dtype=int)
+        origin = np.zeros((front_box.size, self.tree_dim))
         level = 0
-        node_id = 0
-        # List of possible intersections
-        found: List[int] = []
-        # List of right parts of the tree that need to be checked.
-        # Each element contains the node_id (position in self.nodes)
-        # the (shifted) origin at the current level and the current
-        # level
-        stack: List[Tuple[int, np.ndarray, int]] = []
-
-        # To traverse a non-empty binary tree in preorder,
-        # perform the following operations recursively at each node,
-        # starting with the root node:
-        # > visit the root;
-        # > traverse the left subtree;
-        # > traverse the right subtree.
-        while node_id != -1:
-            # check the left part
-            next_node_id = -1
-            while True:
-                # Intersect with the search box, add in case
-                if self._box_intersect(box, self.nodes[node_id].box):
-                    found.append(node_id)
-                # Go to the left part of the sub-tree, and check if
-                # it intersects the box. The right part is considered later.
-                next_node_id = self.nodes[node_id].child[self.LEFT]
-                if next_node_id != -1:
-                    search_dim = level % self.tree_dim
-                    if search_dim < self.phys_dim:
-                        if origin[search_dim] > box[search_dim + self.phys_dim]:
-                            next_node_id = -1
-                    else:
-                        delta = self._delta(level, self.tree_dim)
-                        if origin[search_dim] + delta < box[search_dim - self.phys_dim]:
-                            next_node_id = -1
-                # Left sub-tree is neither null nor external, push info onto the stack
-                if next_node_id != -1:
-                    stack.append((node_id, origin.copy(), level))
-                    node_id = next_node_id
-                    level += 1
+        while front_box.size > 0:
+            # Intersect with the search box, add in case
+            query = scaled[front_box]
+            node_box = self._box[front_node]
+            hit = np.logical_not(
+                np.any(query[:, :dim] > node_box[:, dim:], axis=1)
+                | np.any(query[:, dim:] < node_box[:, :dim], axis=1)
+            )
+            found_box.append(front_box[hit])
+            found_node.append(front_node[hit])
+
+            # Check which of the sub-trees of the children may intersect the box, the
+            # origin of the right sub-tree is shifted along the search dimension.
+            search_dim = level % self.tree_dim
+            delta = self._delta(level, self.tree_dim)
+            right_origin = origin.copy()
+            right_origin[:, search_dim] += delta
+
+            next_box, next_node, next_origin = [], [], []
+            for edge, sub_origin in ((self.LEFT, origin), (self.RIGHT, right_origin)):
+                child = self._child[front_node, edge]
+                if search_dim < dim:
+                    outside = sub_origin[:, search_dim] > query[:, search_dim + dim]
                 else:
-                    break
-
-            # Check the right part that are stored in the stack
+                    outside = (
+                        sub_origin[:, search_dim] + delta < query[:, search_dim - dim]
+                    )
+                keep = np.logical_and(child != -1, np.logical_not(outside))
+                next_box.append(front_box[keep])
+                next_node.append(child[keep])
+                next_origin.append(sub_origin[keep])
+
+            front_box = np.concatenate(next_box)
+            front_node = np.concatenate(next_node)
+            origin = np.concatenate(next_origin)
             level += 1
-            node_id = self.nodes[node_id].child[self.RIGHT]
-            while True:
-                while node_id == -1:
-                    if len(stack) == 0:
-                        return np.sort(found)
-                    info = stack.pop()
-                    node_id = self.nodes[info[0]].child[self.RIGHT]
-                    origin = info[1]
-                    level = info[2] + 1
-
-                # Check if the subtree intersects the box. Otherwise set right_link = -1,
-                # pop new node from the stack and adjourn level.
-                #
-                # lev-1 is the level of the parent node, which directs the search.
-                search_dim = (level - 1) % self.tree_dim
-                delta = self._delta(level - 1, self.tree_dim)
-                # reset origin (we have just traversed the tree to the right)
-                origin[search_dim] += delta
-                if search_dim < self.phys_dim:
-                    if origin[search_dim] > box[search_dim + self.phys_dim]:
-                        node_id = -1
-                else:
-                    if origin[search_dim] + delta < box[search_dim - self.phys_dim]:
-                        node_id = -1
-
-                if node_id != -1:
-                    break
 
-        # nothing is found, return an empty array
-        return np.empty(0)
+        rows = np.concatenate(found_box) if found_box else np.empty(0, dtype=int)
+        cols = np.concatenate(found_node) if found_node else np.empty(0, dtype=int)
+        order = np.lexsort((cols, rows))
+        indptr = np.zeros(num_boxes + 1, dtype=int)
+        indptr[1:] = np.cumsum(np.bincount(rows, minlength=num_boxes))
+        return sps.csr_matrix(
+            (np.ones(cols.size, dtype=bool), cols[order], indptr),
+            shape=(num_boxes, self._num_nodes),
+        )
 
     def from_grid(self, g: pp.Grid, only_cells: Optional[np.ndarray] = None) -> None:
-        """Function that constructs the tree from a grid by adding one cell at a time.
+        """Function that constructs the tree from a grid, with one node for each cell.
+
+        The cells are added in the given order, see add_nodes.
 
         Parameters:
             g (pp.Grid): The grid to be used to construct the tree
@@ -359,42 +478,63 @@ class ADTree:
         self.g = g
         # Get the geometrical information cell-to-nodes
         g_cell_nodes = self.g.cell_nodes()
-        g_nodes, g_cells, _ = sps.find(g_cell_nodes)
+        indptr = g_cell_nodes.indptr
 
         # select which cells to add to the tree
         if only_cells is not None:
-            which_cells = np.asarray(only_cells)
-
-            # to compute the min and max of the region, and get a more balanced tree,
-            # we need to consider only the cells involved
-            which_nodes = np.empty(0, dtype=int)
-            for c in which_cells:
-                loc = slice(g_cell_nodes.indptr[c], g_cell_nodes.indptr[c + 1])
-                which_nodes = np.append(which_nodes, g_nodes[loc])
-            which_nodes = np.unique(which_nodes)
-
+            which_cells = np.asarray(only_cells, dtype=int).ravel()
         else:
-            # if only_cells is not specified consider all the cells and nodes of the mesh
+            # if only_cells is not specified consider all the cells of the mesh
             which_cells = np.arange(self.g.num_cells)
-            which_nodes = np.arange(self.g.num_nodes)
-
-        # data for the normalization of the points
-        self.region_min = self.g.nodes[: self.phys_dim, which_nodes].min(axis=1)
-        region_max = self.g.nodes[: self.phys_dim, which_nodes].max(axis=1)
-        self.delta = 1.0 / (region_max - self.region_min)
-
-        # loop over the considered cells of the grid
-        for c in which_cells:
-            # get the nodes of the current cell
-            loc = slice(g_cell_nodes.indptr[c], g_cell_nodes.indptr[c + 1])
-            c_nodes = self.g.nodes[: self.phys_dim, g_nodes[loc]]
-            # compute the scaled bounding box
-            c_min = self._scale(c_nodes.min(axis=1))
-            c_max = self._scale(c_nodes.max(axis=1))
-
-            # create the new node
-            new_node = ADTNode(c, np.hstack((c_min, c_max)))
-            self.add_node(new_node)
+
+        # Nodes of the considered cells, cell by cell
+        num_cell_nodes = indptr[which_cells + 1] - indptr[which_cells]
+        cell_nodes = g_cell_nodes.indices[
+            pp.utils.mcolon.mcolon(indptr[which_cells], indptr[which_cells + 1])
+        ]
+        coords = self.g.nodes[: self.phys_dim, cell_nodes]
+
+        # data for the normalization of the points, to get a more balanced tree
+        # only the nodes of the considered cells are used
+        if cell_nodes.size > 0:
+            self.region_min = coords.min(axis=1)
+            self.delta = 1.0 / (coords.max(axis=1) - self.region_min)
+
+        # compute the scaled bounding boxes of the cells
+        first = np.cumsum(num_cell_nodes) - num_cell_nodes
+        boxes = np.empty((which_cells.size, self.tree_dim))
+        if which_cells.size > 0:
+            boxes[:, : self.phys_dim] = self._scale(
+                np.minimum.reduceat(coords, first, axis=1).T
+            )
+            boxes[:, self.phys_dim :] = self._scale(
+                np.maximum.reduceat(coords, first, axis=1).T
+            )
+
+        self.add_nodes(list(which_cells), boxes)
+
+    def _reserve(self, num_nodes: int) -> None:
+        """Make sure the arrays have room for a given number of nodes.
+
+        The capacity is at least doubled when increased, such that repeated insertion
+        of single nodes does not copy the arrays each time.
+
+        Parameters:
+            num_nodes (int): the required number of nodes
+
+        """
+        capacity = self._child.shape[0]
+        if num_nodes <= capacity:
+            return
+        capacity = max(num_nodes, 2 * capacity)
+        n = self._num_nodes
+        child = np.full((capacity, 2), -1, dtype=int)
+        child[:n] = self._child[:n]
+        parent = np.full(capacity, -1, dtype=int)
+        parent[:n] = self._parent[:n]
+        box = np.zeros((capacity, self.tree_dim))
+        box[:n] = self._box[:n]
+        self._child, self._parent, self._box = child, parent, box
 
     def _scale(self, x: np.ndarray) -> np.ndarray:
         """Scale the input point to be in the interval [0, 1]
@@ -432,3 +572,27 @@ class ADTree:
             (float): current portion of the interval according to the level
         """
         return np.prod(0.5 * np.ones(int(level / dim) + 1, dtype=float))
+
+
+class _NodeView(Sequence):
+    """Read-only sequence of the nodes of an ADTree, as ADTNode objects created on
+    access."""
+
+    def __init__(self, tree: ADTree) -> None:
+        self._tree = tree
+
+    def __len__(self) -> int:
+        return self._tree.num_nodes
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < -n or i >= n:
+            raise IndexError("node index out of range")
+        i = int(i) % n
+        tree = self._tree
+        node = ADTNode(tree.keys[i], tree.box[i].copy())
+        node.child = tree.child[i].tolist()
+        node.parent = int(tree.parent[i])
+        return node
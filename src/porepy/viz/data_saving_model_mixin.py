@@ -5,9 +5,18 @@ It is combined with a Model class and provides methods for saving data to file.
 We provide basic Exporter functionality, but the user is free to override and extend
 this class to suit their needs. This could include, e.g., saving data to a database,
 or to a file format other than vtu.
+
+By default, data is written to file when :meth:`DataSavingMixin.save_data_time_step`
+is called. If the model parameter ``"asynchronous_export"`` is True, the data is only
+copied, and written by a background thread, see :class:`ExportQueue`, such that the
+export overlaps with the following time step.
 """
 from __future__ import annotations
 
+import logging
+import queue
+import threading
+import weakref
 from pathlib import Path
 from typing import Any, Callable, Optional, Union
 
@@ -16,6 +25,116 @@ import numpy as np
 import porepy as pp
 from porepy.viz.exporter import DataInput
 
+logger = logging.getLogger(__name__)
+
+
+class ExportQueue:
+    """Bounded queue of export tasks, which are run by a background thread.
+
+    Parameters:
+        max_queued: Maximum number of tasks waiting to be run. Each task holds a copy
+            of the exported data, thus this limits the memory used for export.
+        drop_when_full: If True, a task is dropped if the queue is full. Otherwise
+            (default), :meth:`put` blocks until the thread has run a task.
+
+    """
+
+    def __init__(self, max_queued: int = 2, drop_when_full: bool = False) -> None:
+        self.drop_when_full: bool = drop_when_full
+        """Whether tasks are dropped if the queue is full."""
+
+        self.num_done: int = 0
+        """Number of tasks run by the background thread."""
+
+        self.num_dropped: int = 0
+        """Number of tasks dropped since the queue was full."""
+
+        self.max_num_queued: int = 0
+        """Maximum number of tasks waiting in the queue at the same time."""
+
+        self._error: Optional[BaseException] = None
+        """Exception raised by a task, reraised in the caller."""
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queued)
+        """Queue of tasks."""
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        """Background thread running the tasks."""
+
+        self._thread.start()
+        # Make sure queued tasks are run before the interpreter exits.
+        weakref.finalize(self, ExportQueue._shutdown, self._queue, self._thread)
+
+    @property
+    def num_queued(self) -> int:
+        """Number of tasks waiting to be run."""
+        return self._queue.qsize()
+
+    def put(self, task: Callable[[], None]) -> bool:
+        """Add a task to the queue.
+
+        Parameters:
+            task: Function to be called by the background thread.
+
+        Returns:
+            False if the task was dropped, True otherwise.
+
+        Raises:
+            ValueError: If the queue is closed.
+
+        """
+        self._raise_error()
+        if not self._thread.is_alive():
+            raise ValueError("The export queue is closed.")
+        try:
+            self._queue.put(task, block=not self.drop_when_full)
+        except queue.Full:
+            self.num_dropped += 1
+            return False
+        self.max_num_queued = max(self.max_num_queued, self._queue.qsize())
+        return True
+
+    def flush(self) -> None:
+        """Wait until all queued tasks are run."""
+        self._queue.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        """Run all queued tasks and stop the background thread."""
+        ExportQueue._shutdown(self._queue, self._thread)
+        self._raise_error()
+
+    @staticmethod
+    def _shutdown(task_queue: queue.Queue, thread: threading.Thread) -> None:
+        """Stop the background thread after all queued tasks are run."""
+        if thread.is_alive():
+            # Block also if tasks are dropped otherwise, to not miss the signal.
+            task_queue.put(None)
+            thread.join()
+
+    def _run(self) -> None:
+        """Run queued tasks, until the end of the queue is signaled."""
+        while True:
+            task = self._queue.get()
+            try:
+                if task is None:
+                    return
+                # Skip remaining tasks after a failure, the error is reported to the
+                # caller.
+                if self._error is None:
+                    task()
+                    self.num_done += 1
+            except BaseException as error:
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+    def _raise_error(self) -> None:
+        """Reraise an exception from the background thread."""
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
 
 class DataSavingMixin:
     """Class for saving data from a simulation model.
@@ -42,19 +161,64 @@ class DataSavingMixin:
     nd: int
     """Number of spatial dimensions for the simulation."""
 
+    exporter: pp.Exporter
+    """Exporter for the simulation, initialized in :meth:`initialize_data_saving`."""
+    export_queue: Optional[ExportQueue] = None
+    """Queue of exports run in the background, if the model parameter
+    ``"asynchronous_export"`` is True. Initialized in :meth:`initialize_data_saving`.
+
+    """
+
     def save_data_time_step(self) -> None:
-        """Export the model state at a given time step, and log time."""
+        """Export the model state at a given time step, and log time.
+
+        With asynchronous export, the data is copied, and written to file by a
+        background thread.
+
+        """
         if not self.suppress_export:
-            self.exporter.write_vtu(self.data_to_export(), time_dependent=True)
-            if self.restart_options.get("restart", False):
-                # For a pvd file addressing all time steps (before and after restart
-                # time), resume based on restart input pvd file through append.
-                pvd_file = self.restart_options["pvd_file"]
-                self.exporter.write_pvd(append=True, from_pvd_file=pvd_file)
+            data = self.data_to_export()
+            if self.export_queue is None:
+                self._write_data_time_step(data)
             else:
-                self.exporter.write_pvd()
+                # Resolve the data on the main thread, and copy it, such that the model
+                # state can be updated while the data is written.
+                subdomain_data, interface_data = self.exporter._sort_and_unify_data(
+                    data
+                )
+                snapshot: list[DataInput] = [
+                    (sd, key, values.copy())
+                    for (sd, key), values in subdomain_data.items()
+                ]
+                snapshot.extend(
+                    (intf, key, values.copy())
+                    for (intf, key), values in interface_data.items()
+                )
+                if not self.export_queue.put(
+                    lambda: self._write_data_time_step(snapshot)
+                ):
+                    logger.warning(
+                        f"Export at time {self.time_manager.time} dropped, since the"
+                        " export queue is full."
+                    )
             self.time_manager.write_time_information()
 
+    def _write_data_time_step(self, data: list[DataInput]) -> None:
+        """Write data of a time step to vtu, and update the pvd file.
+
+        Parameters:
+            data: Data to be exported, see :meth:`data_to_export`.
+
+        """
+        self.exporter.write_vtu(data, time_dependent=True)
+        if self.restart_options.get("restart", False):
+            # For a pvd file addressing all time steps (before and after restart
+            # time), resume based on restart input pvd file through append.
+            pvd_file = self.restart_options["pvd_file"]
+            self.exporter.write_pvd(append=True, from_pvd_file=pvd_file)
+        else:
+            self.exporter.write_pvd()
+
     def data_to_export(self) -> list[DataInput]:
         """Return data to be exported.
 
@@ -145,6 +309,28 @@ class DataSavingMixin:
             ),
             length_scale=self.units.m,
         )
+        if self.params.get("asynchronous_export", False):
+            self.export_queue = ExportQueue(
+                max_queued=self.params.get("max_queued_exports", 2),
+                drop_when_full=self.params.get("drop_exports_when_full", False),
+            )
+
+    def finalize_data_saving(self) -> None:
+        """Finalize data saving.
+
+        This method is called by
+        :meth:`~porepy.models.solution_strategy.SolutionStrategy.after_simulation`.
+        With asynchronous export, it waits until all queued data is written, and
+        reports the number of queued and dropped exports.
+
+        """
+        if self.export_queue is not None:
+            self.export_queue.close()
+            logger.info(
+                f"Asynchronous export: {self.export_queue.num_done} exports written,"
+                f" {self.export_queue.num_dropped} dropped, at most"
+                f" {self.export_queue.max_num_queued} queued."
+            )
 
     def load_data_from_vtu(
         self,
@@ -16,6 +16,7 @@ import numpy as np
 from deepdiff import DeepDiff
 
 import porepy as pp
+from porepy.viz.time_series import TimeSeriesReader, TimeSeriesWriter
 
 # Object type to store data to export.
 Field = namedtuple("Field", ["name", "values"])
@@ -211,6 +212,14 @@ class Exporter:
         """Identifier for whether constant interface data has been assigned to
         Exporter."""
 
+        self._time_series_writer: Optional[TimeSeriesWriter] = None
+        """Writer of the time-series store, created by the first call to
+        :meth:`write_time_series`."""
+
+        self._resume_time_series = False
+        """Identifier for whether time steps should be appended to an existing
+        time-series store, set when the state is imported from the store."""
+
         # Misc
 
         self._padding = 6
@@ -519,6 +528,88 @@ class Exporter:
 
                             offset += intf.num_cells
 
+    def import_state_from_time_series(
+        self,
+        keys: Optional[Union[str, list[str]]] = None,
+        time_step: Optional[int] = None,
+        folder: Optional[Path] = None,
+    ) -> int:
+        """Import state variables from a time-series store written by
+        :meth:`write_time_series`.
+
+        Parameters:
+            keys: keywords addressing cell data to be transferred. If 'None', the
+                mixed-dimensional grid is checked for keywords corresponding to primary
+                variables identified through pp.TIME_STEP_SOLUTIONS.
+            time_step: Time step to be imported. Defaults to the last stored time step.
+            folder: Folder of the store. Defaults to the folder used by
+                :meth:`write_time_series`.
+
+        Raises:
+            ValueError: if the store is not compatible with the mixed-dimensional grid.
+
+        Returns:
+            The imported time step.
+
+        """
+        if folder is None:
+            folder = Path(self._time_series_folder())
+            # Continue the store when the simulation is restarted, rather than
+            # overwriting it.
+            self._resume_time_series = True
+        self.flush_time_series()
+        reader = TimeSeriesReader(folder)
+
+        # The grids are identified by their position in the mixed-dimensional grid;
+        # check that the stored geometry is compatible.
+        grids: dict[str, list] = {
+            "subdomain": self._mdg.subdomains(),
+            "interface": self._mdg.interfaces(),
+        }
+        geometry = reader.geometry()
+        for kind, grid_list in grids.items():
+            num_cells = np.array([g.num_cells for g in grid_list], dtype=int)
+            if not np.array_equal(geometry[kind + "_num_cells"], num_cells):
+                raise ValueError(
+                    f"The time series in {folder} is not compatible with the grid."
+                )
+
+        if isinstance(keys, str):
+            keys = [keys]
+
+        # Select the stored fields to be imported.
+        selected: dict[str, tuple[Union[pp.Grid, pp.MortarGrid], str]] = {}
+        for name in reader.fields(time_step):
+            grid_name, key = name.split("/", 1)
+            kind, index = grid_name.rsplit("_", 1)
+            grid = grids[kind][int(index)]
+            if kind == "subdomain":
+                data = self._mdg.subdomain_data(grid)
+            else:
+                data = self._mdg.interface_data(grid)
+            if keys is None:
+                if key not in data.get(pp.TIME_STEP_SOLUTIONS, {}):
+                    continue
+            elif key not in keys:
+                continue
+            selected[name] = (grid, key)
+
+        values = reader.read(time_step, list(selected.keys()))
+        for name, (grid, key) in selected.items():
+            if isinstance(grid, pp.MortarGrid):
+                data = self._mdg.interface_data(grid)
+            else:
+                data = self._mdg.subdomain_data(grid)
+            # Inverse of the conversion to vector format in _sort_and_unify_data.
+            pp.set_solution_values(
+                name=key,
+                values=np.ravel(values[name], "F"),
+                data=data,
+                time_step_index=0,
+            )
+
+        return int(reader.time_steps[-1]) if time_step is None else time_step
+
     def add_constant_data(
         self, data: Optional[Union[DataInput, list[DataInput]]] = None
     ) -> None:
@@ -856,6 +947,107 @@ class Exporter:
         o_file.write(footer)
         o_file.close()
 
+    def write_time_series(
+        self,
+        data: Optional[Union[DataInput, list[DataInput]]] = None,
+        time_step: Optional[int] = None,
+        time: Optional[float] = None,
+    ) -> None:
+        """Append data of a time step to a time-series store.
+
+        This is an alternative to :meth:`write_vtu` and :meth:`write_pvd` for
+        simulations with many time steps. The geometry, in the form of vtu files with
+        the constant data, is written once, at the first call. The data of all time
+        steps is appended to a single file, see :mod:`~porepy.viz.time_series`, in the
+        folder ``file_name + "_time_series"``. The data is written by a background
+        thread; call :meth:`flush_time_series` to wait until it is on disk, and
+        :meth:`close_time_series` when the simulation is done. The data can be read by
+        :meth:`import_state_from_time_series`. An existing store in the folder is
+        overwritten, unless the state was imported from it by
+        :meth:`import_state_from_time_series`, e.g., for a restart; the time steps are
+        then appended to the store.
+
+        Parameters:
+            data: subdomain and interface data, prescribed through strings, or tuples
+                of subdomains/interfaces, keys and values, see :meth:`write_vtu`.
+            time_step: Index of the time step. If not provided, the internal counter
+                of time steps is used.
+            time: Time of the time step. Defaults to the time step index.
+
+        Raises:
+            ValueError: if the grid is not fixed.
+
+        """
+        if not self._fixed_grid:
+            raise ValueError("Time series can only be written for a fixed grid.")
+
+        if time_step is None:
+            time_step = self._time_step_counter
+            self._time_step_counter += 1
+        if time is None:
+            time = time_step
+
+        subdomain_data, interface_data = self._sort_and_unify_data(data)
+
+        subdomains = self._mdg.subdomains()
+        interfaces = self._mdg.interfaces()
+        if self._time_series_writer is None:
+            # Write the geometry and constant data once.
+            self._export_data_vtu(
+                self._constant_subdomain_data, None, constant_data=True
+            )
+            if len(interfaces) > 0:
+                self._export_data_vtu(
+                    self._constant_interface_data,
+                    None,
+                    constant_data=True,
+                    interface_data=True,
+                )
+            self._time_series_writer = TimeSeriesWriter(
+                self._time_series_folder(), resume=self._resume_time_series
+            )
+            self._time_series_writer.write_geometry(
+                {
+                    "subdomain_num_cells": np.array(
+                        [sd.num_cells for sd in subdomains], dtype=int
+                    ),
+                    "interface_num_cells": np.array(
+                        [intf.num_cells for intf in interfaces], dtype=int
+                    ),
+                }
+            )
+
+        # Identify grids by their position in the mixed-dimensional grid.
+        fields: dict[str, np.ndarray] = {}
+        for (sd, key), values in subdomain_data.items():
+            fields[f"subdomain_{subdomains.index(sd)}/{key}"] = values
+        for (intf, key), values in interface_data.items():
+            fields[f"interface_{interfaces.index(intf)}/{key}"] = values
+        self._time_series_writer.append(time_step, time, fields)
+
+    def flush_time_series(self) -> None:
+        """Wait until all data passed to :meth:`write_time_series` is on disk."""
+        if self._time_series_writer is not None:
+            self._time_series_writer.flush()
+
+    def close_time_series(self) -> None:
+        """Write all data passed to :meth:`write_time_series` to disk, and close the
+        store.
+
+        A later call to :meth:`write_time_series` appends to the closed store.
+
+        """
+        if self._time_series_writer is not None:
+            self._time_series_writer.close()
+            self._time_series_writer = None
+            self._resume_time_series = True
+
+    def _time_series_folder(self) -> str:
+        """Folder of the time-series store."""
+        return self._append_folder_name(
+            self._folder_name, self._file_name + "_time_series"
+        )
+
     # Some auxiliary routines used in write_vtu()
 
     def _sort_and_unify_data(
@@ -0,0 +1,390 @@
+"""Append-only storage of time series of field data.
+
+The storage is an alternative to one vtu file per grid dimension and time step, see
+:meth:`~porepy.viz.exporter.Exporter.write_time_series`. A time series is stored in
+a folder containing three files:
+
+- ``geometry.npz``: Constant information, written once, e.g., the number of cells of
+  the grids on which the fields are defined.
+- ``fields.bin``: Raw binary field values of all time steps, appended time step by
+  time step.
+- ``index.jsonl``: One line per time step, with the time step index, the time, and
+  for each field the offset in ``fields.bin``, the data type and the shape.
+
+Thus, the number of files does not grow with the number of time steps, and
+individual fields are read without parsing the rest of the data. Writes are buffered
+and, by default, done by a background thread, so that the caller only pays for a
+copy of the field values. The lines of the index are written only after the data
+they refer to, and entries which refer to data beyond the end of ``fields.bin``, e.g.,
+after a crash, are ignored when the store is read.
+
+"""
+from __future__ import annotations
+
+import json
+import os
+import queue
+import threading
+import weakref
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import numpy as np
+
+__all__ = ["TimeSeriesWriter", "TimeSeriesReader"]
+
+_FLUSH = "flush"
+"""Queue item signaling that buffered data should be written to disk."""
+
+
+class TimeSeriesWriter:
+    """Writer of time series of fields to an append-only store.
+
+    Parameters:
+        folder: Folder of the store. Created if it does not exist.
+        chunk_size: Number of time steps buffered in memory before the data is
+            written to disk.
+        max_queued_steps: Maximum number of time steps waiting to be written by the
+            background thread. If the queue is full, :meth:`append` blocks until the
+            thread catches up.
+        background: If True (default), data is written by a background thread.
+            Otherwise, data is written by the calling thread.
+        resume: If True, time steps are appended to an existing store in the folder,
+            e.g., when a simulation is restarted. Otherwise (default), existing files
+            of a store in the folder are overwritten.
+
+    """
+
+    def __init__(
+        self,
+        folder: Union[str, Path],
+        chunk_size: int = 16,
+        max_queued_steps: int = 64,
+        background: bool = True,
+        resume: bool = False,
+    ) -> None:
+        self.folder: Path = Path(folder)
+        """Folder of the store."""
+
+        self.folder.mkdir(parents=True, exist_ok=True)
+
+        self._chunk_size: int = chunk_size
+        """Number of time steps buffered before writing to disk."""
+
+        data_path = self.folder / "fields.bin"
+        index_path = self.folder / "index.jsonl"
+        entries: list[dict[str, Any]] = []
+        if resume and index_path.is_file() and data_path.is_file():
+            # Keep the complete entries, and discard data which is not referred to
+            # by the index.
+            entries = _read_index(self.folder)
+            os.truncate(data_path, max((_end(entry) for entry in entries), default=0))
+
+        self._data_file = open(data_path, "ab" if resume else "wb")
+        """File with the raw field values."""
+
+        self._index_file = open(index_path, "w")
+        """File with one line of metadata per time step."""
+
+        for entry in entries:
+            self._index_file.write(json.dumps(entry) + "\n")
+        self._index_file.flush()
+
+        self._offset: int = self._data_file.tell()
+        """Size of the data written to the data file."""
+
+        self._index_lines: list[str] = []
+        """Lines of the index, for data which is not yet written to disk."""
+
+        self._num_buffered: int = 0
+        """Number of time steps not yet written to disk."""
+
+        self._error: Optional[BaseException] = None
+        """Exception raised in the background thread, reraised in the caller."""
+
+        self._queue: Optional[queue.Queue] = None
+        """Queue of time steps to be written by the background thread."""
+
+        self._thread: Optional[threading.Thread] = None
+        """Background thread writing data to disk."""
+
+        if background:
+            self._queue = queue.Queue(maxsize=max_queued_steps)
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+            # Make sure buffered data is written if the writer is not closed.
+            weakref.finalize(
+                self, TimeSeriesWriter._shutdown, self._queue, self._thread
+            )
+
+    def write_geometry(self, geometry: dict[str, np.ndarray]) -> None:
+        """Write constant information of the store.
+
+        Parameters:
+            geometry: Arrays to be stored in ``geometry.npz``.
+
+        """
+        np.savez(self.folder / "geometry.npz", **geometry)
+
+    def append(
+        self, time_step: int, time: float, fields: dict[str, np.ndarray]
+    ) -> None:
+        """Append the fields of a time step to the store.
+
+        The field values are copied before the method returns, thus the arrays may be
+        modified by the caller afterwards.
+
+        Parameters:
+            time_step: Index of the time step.
+            time: Time of the time step.
+            fields: Mapping from field names to values.
+
+        Raises:
+            ValueError: If the writer is closed.
+
+        """
+        self._raise_error()
+        item = (
+            int(time_step),
+            float(time),
+            {name: np.array(values, order="C") for name, values in fields.items()},
+        )
+        if self._queue is None:
+            if self._data_file.closed:
+                raise ValueError("The time series writer is closed.")
+            self._write_step(*item)
+        else:
+            if not self._thread.is_alive():  # type: ignore[union-attr]
+                raise ValueError("The time series writer is closed.")
+            self._queue.put(item)
+
+    @property
+    def num_queued_steps(self) -> int:
+        """Number of time steps waiting to be written by the background thread."""
+        return 0 if self._queue is None else self._queue.qsize()
+
+    def flush(self) -> None:
+        """Write all appended time steps to disk, and wait until this is done."""
+        if self._queue is None:
+            self._flush_files()
+        elif self._thread.is_alive():  # type: ignore[union-attr]
+            self._queue.put(_FLUSH)
+            self._queue.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        """Write all appended time steps to disk and close the files."""
+        if self._queue is None:
+            self._close_files()
+        else:
+            TimeSeriesWriter._shutdown(self._queue, self._thread)
+        self._raise_error()
+
+    @staticmethod
+    def _shutdown(item_queue: queue.Queue, thread: Optional[threading.Thread]) -> None:
+        """Stop the background thread after all queued time steps are written."""
+        if thread is not None and thread.is_alive():
+            item_queue.put(None)
+            thread.join()
+
+    def _run(self) -> None:
+        """Write queued time steps, until the end of the queue is signaled."""
+        assert self._queue is not None
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    self._close_files()
+                    return
+                elif item == _FLUSH:
+                    self._flush_files()
+                elif self._error is None:
+                    self._write_step(*item)
+            except BaseException as error:
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+    def _write_step(
+        self, time_step: int, time: float, fields: dict[str, np.ndarray]
+    ) -> None:
+        """Write the fields of a time step to the (buffered) files."""
+        entry: dict[str, Any] = {"time_step": time_step, "time": time, "fields": {}}
+        for name, values in fields.items():
+            entry["fields"][name] = [self._offset, values.dtype.str, values.shape]
+            self._data_file.write(values.tobytes())
+            self._offset += values.nbytes
+        self._index_lines.append(json.dumps(entry) + "\n")
+
+        self._num_buffered += 1
+        if self._num_buffered >= self._chunk_size:
+            self._flush_files()
+
+    def _flush_files(self) -> None:
+        """Write buffered data to disk."""
+        # The data is flushed before the index lines are written, so that the index
+        # never refers to data which is not yet written.
+        self._data_file.flush()
+        self._index_file.writelines(self._index_lines)
+        self._index_file.flush()
+        self._index_lines.clear()
+        self._num_buffered = 0
+
+    def _close_files(self) -> None:
+        """Flush and close the files."""
+        if not self._data_file.closed:
+            self._flush_files()
+            self._data_file.close()
+            self._index_file.close()
+
+    def _raise_error(self) -> None:
+        """Reraise an exception from the background thread."""
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+
+class TimeSeriesReader:
+    """Reader of time series written by :class:`TimeSeriesWriter`.
+
+    Parameters:
+        folder: Folder of the store.
+
+    Raises:
+        ValueError: If the folder does not contain a time series.
+
+    """
+
+    def __init__(self, folder: Union[str, Path]) -> None:
+        self.folder: Path = Path(folder)
+        """Folder of the store."""
+
+        index_file = self.folder / "index.jsonl"
+        if not index_file.is_file():
+            raise ValueError(f"No time series found in {self.folder}.")
+
+        self._entries: list[dict[str, Any]] = _read_index(self.folder)
+        """Metadata of all time steps, in the order they were written."""
+
+    @property
+    def time_steps(self) -> np.ndarray:
+        """Indices of the stored time steps."""
+        return np.array([entry["time_step"] for entry in self._entries], dtype=int)
+
+    @property
+    def times(self) -> np.ndarray:
+        """Times of the stored time steps."""
+        return np.array([entry["time"] for entry in self._entries])
+
+    def geometry(self) -> dict[str, np.ndarray]:
+        """Constant information of the store.
+
+        Returns:
+            Arrays stored by :meth:`TimeSeriesWriter.write_geometry`.
+
+        """
+        with np.load(self.folder / "geometry.npz") as geometry:
+            return dict(geometry)
+
+    def fields(self, time_step: Optional[int] = None) -> list[str]:
+        """Names of the fields stored for a time step.
+
+        Parameters:
+            time_step: Index of the time step. Defaults to the last stored time step.
+
+        Returns:
+            List of field names.
+
+        """
+        return list(self._entry(time_step)["fields"].keys())
+
+    def read(
+        self, time_step: Optional[int] = None, names: Optional[list[str]] = None
+    ) -> dict[str, np.ndarray]:
+        """Read fields of a time step.
+
+        Parameters:
+            time_step: Index of the time step. If the time step was stored several
+                times, the last one is used. Defaults to the last stored time step.
+            names: Names of the fields to be read. Defaults to all fields.
+
+        Returns:
+            Mapping from field names to values.
+
+        Raises:
+            ValueError: If a field is not stored for the time step.
+
+        """
+        entry = self._entry(time_step)
+        if names is None:
+            names = list(entry["fields"].keys())
+
+        values: dict[str, np.ndarray] = {}
+        with open(self.folder / "fields.bin", "rb") as f:
+            for name in names:
+                if name not in entry["fields"]:
+                    raise ValueError(
+                        f"Field {name} is not stored for time step "
+                        f"{entry['time_step']}."
+                    )
+                offset, dtype, shape = entry["fields"][name]
+                count = int(np.prod(shape))
+                f.seek(offset)
+                values[name] = np.fromfile(f, dtype=dtype, count=count).reshape(shape)
+        return values
+
+    def time(self, time_step: Optional[int] = None) -> float:
+        """Time of a stored time step.
+
+        Parameters:
+            time_step: Index of the time step. Defaults to the last stored time step.
+
+        Returns:
+            The time.
+
+        """
+        return self._entry(time_step)["time"]
+
+    def _entry(self, time_step: Optional[int]) -> dict[str, Any]:
+        """Metadata of a time step, the last one stored if time_step is None."""
+        if len(self._entries) == 0:
+            raise ValueError(f"No time steps stored in {self.folder}.")
+        if time_step is None:
+            return self._entries[-1]
+        for entry in reversed(self._entries):
+            if entry["time_step"] == time_step:
+                return entry
+        raise ValueError(f"Time step {time_step} is not stored in {self.folder}.")
+
+
+def _read_index(folder: Path) -> list[dict[str, Any]]:
+    """Read the complete entries of the index of a store.
+
+    An incomplete last line may be present if the writer was stopped while writing.
+    Entries referring to data beyond the end of the data file, which may be left by a
+    crash of the operating system, are also ignored.
+
+    """
+    data_path = folder / "fields.bin"
+    data_size = data_path.stat().st_size if data_path.is_file() else 0
+    entries: list[dict[str, Any]] = []
+    with open(folder / "index.jsonl") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            entry = json.loads(line)
+            if _end(entry) > data_size:
+                break
+            entries.append(entry)
+    return entries
+
+
+def _end(entry: dict[str, Any]) -> int:
+    """End of the data of an index entry in the data file."""
+    return max(
+        (
+            offset + int(np.prod(shape)) * np.dtype(dtype).itemsize
+            for offset, dtype, shape in entry["fields"].values()
+        ),
+        default=0,
+    )
@@ -139,3 +139,63 @@ def test_targeted_rediscretization(model_class):
     tol = 1e-2
     diff = model_full.stored_linear_system[0][0] - model_full.stored_linear_system[1][0]
     assert np.linalg.norm(diff.todense()) > tol
+
+
+class PressureDependentFracturePermeability:
+    """Fracture permeability which depends on the pressure, with the Darcy flux
+    discretization rediscretized in each nonlinear iteration.
+    """
+
+    def permeability(self, subdomains: list[pp.Grid]) -> pp.ad.Operator:
+        projection = pp.ad.SubdomainProjections(subdomains, dim=1)
+        matrix = [sd for sd in subdomains if sd.dim == self.nd]
+        fractures = [sd for sd in subdomains if sd.dim < self.nd]
+        exp = pp.ad.Function(pp.ad.functions.exp, "exp")
+        return projection.cell_prolongation(matrix) @ super().permeability(
+            matrix
+        ) + projection.cell_prolongation(fractures) @ exp(self.pressure(fractures))
+
+    def set_nonlinear_discretizations(self) -> None:
+        super().set_nonlinear_discretizations()
+        self.add_nonlinear_discretization(
+            self.darcy_flux_discretization(self.mdg.subdomains()).flux
+        )
+
+
+def test_partial_rediscretization():
+    """Partial rediscretization of the Darcy flux yields the same linear systems as
+    full rediscretization, and leaves the matrix discretization untouched if the
+    permeability changes in the fractures only.
+    """
+    model_class = setup_utils._add_mixin(
+        PressureDependentFracturePermeability,
+        setup_utils._add_mixin(BCs, setup_utils.MassBalance),
+    )
+    params = {"fracture_indices": [0, 1], "cartesian": True}
+
+    linear_systems = []
+    for partial in [False, True]:
+        model = model_class(params | {"partial_rediscretization": partial})
+        model.prepare_simulation()
+        discr = pp.ad._ad_utils.uniquify_discretization_list(
+            model.nonlinear_discretizations
+        )
+        mpfa = [d for d in discr if isinstance(d, pp.Mpfa)][0]
+        sd_matrix = model.mdg.subdomains(dim=model.nd)[0]
+        model.before_nonlinear_loop()
+        systems = []
+        fractions = []
+        for _ in range(3):
+            model.before_nonlinear_iteration()
+            fractions.append(mpfa.recomputed_stencil_fraction.get(sd_matrix.id))
+            model.assemble_linear_system()
+            systems.append(model.linear_system)
+            model.after_nonlinear_iteration(model.solve_linear_system())
+        linear_systems.append(systems)
+
+    for (A_full, b_full), (A_partial, b_partial) in zip(*linear_systems):
+        assert np.allclose(A_full.A, A_partial.A)
+        assert np.allclose(b_full, b_partial)
+
+    # The first rediscretization is a full one.
+    assert fractions == [1, 0, 0]
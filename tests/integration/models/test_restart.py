@@ -27,7 +27,11 @@ visualization_dir = Path("visualization")
 
 
 def create_enhanced_fractured_setup(
-    solid_vals: dict, fluid_vals: dict, uy_north: float, restart: bool
+    solid_vals: dict,
+    fluid_vals: dict,
+    uy_north: float,
+    restart: bool,
+    asynchronous_export: bool = False,
 ):
     # Create fractured setup
     fractured_setup = create_fractured_setup(solid_vals, fluid_vals, uy_north)
@@ -37,6 +41,7 @@ def create_enhanced_fractured_setup(
 
     # Enable exporting
     params["suppress_export"] = False
+    params["asynchronous_export"] = asynchronous_export
 
     # Add time stepping to the setup
     params["time_manager"] = pp.TimeManager(
@@ -61,7 +66,10 @@ def create_enhanced_fractured_setup(
         ({"porosity": 0.5}, 0.1),
     ],
 )
-def test_restart_2d_single_fracture(solid_vals, north_displacement):
+@pytest.mark.parametrize("asynchronous_export", [False, True])
+def test_restart_2d_single_fracture(
+    solid_vals, north_displacement, asynchronous_export
+):
     """Restart version of .test_poromechanics.test_2d_single_fracture.
 
     Provided the exported data from a previous time step, restart the simulaton,
@@ -77,6 +85,8 @@ def test_restart_2d_single_fracture(solid_vals, north_displacement):
         north_displacement (float): Value of displacement on the north boundary.
         expected_x_y (tuple): Expected values of the displacement in the x and y.
             directions. The values are used to infer sign of displacement solution.
+        asynchronous_export (bool): Whether the restarted simulation exports data in
+            the background.
 
     """
     # Setup and run model for full time interval. With this generate reference files
@@ -103,9 +113,17 @@ def test_restart_2d_single_fracture(solid_vals, north_displacement):
     # Recompute the second time step which will serve as foundation for the comparison
     # to the above computed reference files.
     setup = create_enhanced_fractured_setup(
-        solid_vals, {}, north_displacement, restart=True
+        solid_vals,
+        {},
+        north_displacement,
+        restart=True,
+        asynchronous_export=asynchronous_export,
     )
     pp.run_time_dependent_model(setup, {})
+    if asynchronous_export:
+        # All time steps are queued, and written by the background thread.
+        assert setup.export_queue.num_done == 2
+        assert setup.export_queue.num_dropped == 0
 
     # To verify the restart capabilities, perform five tests.
 
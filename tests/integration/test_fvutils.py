@@ -26,6 +26,11 @@ class TestFvutils(unittest.TestCase):
 
         self.assertTrue(np.allclose(iblock_ex, iblock_python.toarray()))
 
+        iblock_batched = pp.matrix_operations.invert_diagonal_blocks(
+            block, sz, method="batched"
+        )
+        self.assertTrue(np.allclose(iblock_ex, iblock_batched.toarray()))
+
         # Numba may or may not be available on the system, so surround test with
         # try. This may not be the most pythonic approach, but it works.
         try:
@@ -99,6 +104,11 @@ class TestFvutils(unittest.TestCase):
 
         self.assertTrue(np.allclose(iblock_ex, iblock_python.toarray()))
 
+        iblock_batched = pp.matrix_operations.invert_diagonal_blocks(
+            block, sz, method="batched"
+        )
+        self.assertTrue(np.allclose(iblock_ex, iblock_batched.toarray()))
+
         # Numba may or may not be available on the system, so surround test with
         # try. This may not be the most pythonic approach, but it works.
         try:
@@ -145,6 +155,31 @@ class TestFvutils(unittest.TestCase):
                 # may change in the future.
                 pass
 
+    def test_batched_block_inverter_mixed_sizes(self):
+        """The batched inverter groups blocks of equal size. Test blocks of
+        alternating sizes, including empty blocks, and a singular block.
+        """
+        np.random.seed(0)
+        sz = np.array([2, 3, 0, 2, 1, 3, 3], dtype="i8")
+        blocks = [np.random.rand(n, n) + n * np.eye(n) for n in sz]
+        block = sps.block_diag(blocks, format="csr")
+
+        iblock_batched = pp.matrix_operations.invert_diagonal_blocks(
+            block, sz, method="batched"
+        )
+        iblock_python = pp.matrix_operations.invert_diagonal_blocks(
+            block, sz, method="python"
+        )
+        self.assertTrue(np.allclose(iblock_python.toarray(), iblock_batched.toarray()))
+        self.assertTrue(
+            np.allclose(np.linalg.inv(block.toarray()), iblock_batched.toarray())
+        )
+
+        blocks[1][0] = 0
+        singular = sps.block_diag(blocks, format="csr")
+        with self.assertRaises(ValueError):
+            pp.matrix_operations.invert_diagonal_blocks(singular, sz, method="batched")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -9,10 +9,15 @@ The class UpdateDiscretizations tests the update_discretization() methods of
 Mpfa, Mpsa and Biot. These are effectively a second set of test of the specified_*
 keyword, but in addition, updates of grid geometry etc. are also probed.
 
+Finally, test_discretization_by_subproblems tests the splitting of the discretization
+into subproblems, which are discretized serially or in parallel.
+
 """
+import pickle
 import unittest
 
 import numpy as np
+import pytest
 import scipy.sparse as sps
 
 import porepy as pp
@@ -1026,5 +1031,161 @@ class UpdateDiscretizations(unittest.TestCase):
         )
 
 
+@pytest.mark.parametrize("discr_name", ["mpfa", "mpsa", "biot"])
+@pytest.mark.parametrize(
+    "subproblem_params",
+    [
+        # A memory limit which forces a splitting into serial subproblems.
+        {"max_memory": 1e3},
+        # Parallel discretization.
+        {"max_discretization_workers": 2},
+    ],
+)
+def test_discretization_by_subproblems(discr_name, subproblem_params):
+    """Discretization split into subproblems should equal the discretization in one
+    go.
+    """
+    g = pp.CartGrid([4, 3, 3])
+    g.compute_geometry()
+
+    def discretize(params: dict) -> dict:
+        params = {"inverter": "batched", "mpfa_inverter": "batched", **params}
+        if discr_name == "mpfa":
+            keywords = ["flow"]
+            discr = pp.Mpfa("flow")
+        elif discr_name == "mpsa":
+            keywords = ["mechanics"]
+            discr = pp.Mpsa("mechanics")
+        else:
+            keywords = ["mechanics", "flow"]
+            discr = pp.Biot()
+            params["biot_alpha"] = 1
+        data = pp.initialize_default_data(g, {}, keywords[0], params)
+        if discr_name == "biot":
+            pp.initialize_default_data(g, data, "flow", {"biot_alpha": 1})
+        discr.discretize(g, data)
+        return {key: data[pp.DISCRETIZATION_MATRICES][key] for key in keywords}
+
+    known = discretize({})
+    split = discretize(subproblem_params)
+    for keyword, matrices in known.items():
+        assert matrices.keys() == split[keyword].keys()
+        for key, mat in matrices.items():
+            assert np.allclose((mat - split[keyword][key]).data, 0)
+
+
+@pytest.mark.parametrize("discr_name", ["mpfa", "mpsa"])
+def test_partial_rediscretization(discr_name):
+    """Rediscretization with the partial_rediscretization parameter should equal a
+    full discretization, while only recomputing stencils near modified cells.
+    """
+    g = pp.CartGrid([6, 5])
+    g.compute_geometry()
+
+    if discr_name == "mpfa":
+        keyword, tensor_key, discr_class = "flow", "second_order_tensor", pp.Mpfa
+
+        def tensor(values):
+            return pp.SecondOrderTensor(values)
+
+    else:
+        keyword, tensor_key, discr_class = "mechanics", "fourth_order_tensor", pp.Mpsa
+
+        def tensor(values):
+            return pp.FourthOrderTensor(values, values)
+
+    values = np.ones(g.num_cells)
+    data = pp.initialize_default_data(
+        g,
+        {},
+        keyword,
+        {tensor_key: tensor(values), "partial_rediscretization": True},
+    )
+    discr = discr_class(keyword)
+    discr.discretize(g, data)
+    assert discr.recomputed_stencil_fraction[g.id] == 1
+    matrices = data[pp.DISCRETIZATION_MATRICES][keyword]
+    known_matrices = matrices.copy()
+
+    # Unchanged parameters should leave the discretization matrices untouched.
+    data[pp.PARAMETERS][keyword][tensor_key] = tensor(values)
+    discr.discretize(g, data)
+    for key, mat in known_matrices.items():
+        assert matrices[key] is mat
+    assert discr.recomputed_stencil_fraction[g.id] == 0
+
+    values[[0, 14]] = 10
+    data[pp.PARAMETERS][keyword][tensor_key] = tensor(values)
+    discr.discretize(g, data)
+
+    known = pp.initialize_default_data(g, {}, keyword, {tensor_key: tensor(values)})
+    discr_class(keyword).discretize(g, known)
+    for key, mat in known[pp.DISCRETIZATION_MATRICES][keyword].items():
+        assert np.allclose((mat - matrices[key]).data, 0)
+
+    assert 0 < discr.recomputed_stencil_fraction[g.id] < 1
+    # Later discretizations should not be restricted to the modified cells.
+    assert "specified_cells" not in data[pp.PARAMETERS][keyword]
+
+
+@pytest.mark.parametrize("discr_name", ["mpfa", "mpsa"])
+def test_parallel_partial_rediscretization_tasks(discr_name, monkeypatch):
+    """The tasks sent to worker processes in a partial rediscretization should only
+    contain the subgrids, not the full grid.
+    """
+    g = pp.CartGrid([10, 10, 4])
+    g.compute_geometry()
+
+    if discr_name == "mpfa":
+        keyword, tensor_key, discr_class = "flow", "second_order_tensor", pp.Mpfa
+
+        def tensor(values):
+            return pp.SecondOrderTensor(values)
+
+    else:
+        keyword, tensor_key, discr_class = "mechanics", "fourth_order_tensor", pp.Mpsa
+
+        def tensor(values):
+            return pp.FourthOrderTensor(values, values)
+
+    # Record the size of the pickled tasks, and discretize in this process.
+    task_sizes = []
+    solve_subproblems = pp.fvutils.solve_subproblems
+
+    def recording_solve_subproblems(discretize, subproblem_arguments, num_workers):
+        def recorded_arguments():
+            for arguments, context in subproblem_arguments:
+                task_sizes.append(len(pickle.dumps((discretize, arguments))))
+                yield arguments, context
+
+        return solve_subproblems(discretize, recorded_arguments(), 1)
+
+    monkeypatch.setattr(pp.fvutils, "solve_subproblems", recording_solve_subproblems)
+
+    values = np.ones(g.num_cells)
+    data = pp.initialize_default_data(
+        g,
+        {},
+        keyword,
+        {
+            tensor_key: tensor(values),
+            "partial_rediscretization": True,
+            "max_discretization_workers": 2,
+        },
+    )
+    discr = discr_class(keyword)
+    discr.discretize(g, data)
+
+    values[0] = 10
+    data[pp.PARAMETERS][keyword][tensor_key] = tensor(values)
+    task_sizes.clear()
+    discr.discretize(g, data)
+
+    assert 0 < discr.recomputed_stencil_fraction[g.id] < 1
+    assert len(task_sizes) > 0
+    # The subgrids around a single modified cell are much smaller than the grid.
+    assert max(task_sizes) < len(pickle.dumps(g)) / 4
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -243,5 +243,67 @@ def test_duplicate_nodes():
         found[node_set[0]] = True
 
 
+def test_split_faces_several_fractures():
+    # Split the faces of a Cartesian grid along three fractures, where the faces of
+    # the last fracture have already been split by the first one, and check known
+    # properties of the split grid.
+    g = pp.CartGrid([4, 4])
+    g.compute_geometry()
+    fc = g.face_centers
+    fracture_faces = [
+        np.where(np.isclose(fc[0], 2) & (fc[1] < 3))[0],
+        np.where(np.isclose(fc[1], 1) & (fc[0] > 2))[0],
+        np.where(np.isclose(fc[0], 2) & (fc[1] < 1))[0],
+    ]
+    face_cells = [
+        sps.csc_matrix(
+            (np.ones(f.size, dtype=bool), (np.arange(f.size), f)),
+            shape=(f.size, g.num_faces),
+        )
+        for f in fracture_faces
+    ]
+    num_faces = g.num_faces
+
+    face_cells = pp.fracs.split_grid.split_faces(g, face_cells)
+
+    # The faces of the first two fractures are split, the duplicates are added in the
+    # order of the fractures.
+    split = np.hstack(fracture_faces[:2])
+    assert g.num_faces == num_faces + split.size
+    assert np.all(g.frac_pairs == np.vstack((split, num_faces + np.arange(5))))
+    assert g.face_nodes.shape[1] == g.num_faces
+    assert g.cell_faces.shape[0] == g.num_faces
+    for key in ["fracture_faces", "tip_faces", "domain_boundary_faces"]:
+        assert g.tags[key].size == g.num_faces
+    assert np.all(g.tags["fracture_faces"][split])
+    assert np.all(g.tags["fracture_faces"][num_faces:])
+
+    # The original face is attached to the cell in the direction of the face normal,
+    # the duplicate to the cell in the opposite direction.
+    cf = g.cell_faces.tocsr()
+    for f, f_new in g.frac_pairs.T:
+        assert np.allclose(g.face_centers[:, f], g.face_centers[:, f_new])
+        c = cf[f].indices
+        c_new = cf[f_new].indices
+        assert c.size == 1 and c_new.size == 1
+        normal = g.face_normals[:, f]
+        assert np.dot(g.cell_centers[:, c[0]] - g.face_centers[:, f], normal) > 0
+        assert np.dot(g.cell_centers[:, c_new[0]] - g.face_centers[:, f], normal) < 0
+
+    # The duplicates are mapped to the same lower-dimensional cells as the original
+    # faces, and only for the fracture they belong to.
+    for i, f_c in enumerate(face_cells):
+        assert f_c.shape[1] == g.num_faces
+        f_c = f_c.tocsr()
+        for row in range(f_c.shape[0]):
+            faces = np.sort(f_c[row].indices)
+            if i < 2:
+                assert faces.size == 2
+                pair = g.frac_pairs[:, g.frac_pairs[0] == faces[0]].ravel()
+                assert np.all(pair == faces)
+            else:
+                assert faces.size == 1
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -773,3 +773,111 @@ def test_copy_vector():
     a.jac[2] = 4
     assert np.allclose(b.val, np.ones(3))
     assert np.allclose(b.jac.A, sps.csr_matrix(np.diag(np.ones((3)))).A)
+
+
+def test_fused_elementwise_operations():
+    """Elementwise operations are recorded as scaling of the rows of the Jacobian, and
+    applied when the Jacobian is accessed."""
+    J = sps.csr_matrix(np.array([[1, 3, 1], [5, 0, 0], [5, 1, 2]]), dtype=float)
+    x = AdArray(np.array([1.0, 2.0, 3.0]), J)
+    v = np.array([2.0, 3.0, 4.0])
+
+    # A chain of elementwise operations, including products and sums of AdArrays
+    # sharing the same Jacobian.
+    f = (af.exp(x * v) / 2.0 - x**2) * x + 3.0 ** (-x)
+    assert f._jac_state[0] is x._jac_state[0]
+    assert f._jac_state[1] is not None
+
+    df = (v * np.exp(x.val * v) / 2.0 - 2 * x.val) * x.val + (
+        np.exp(x.val * v) / 2.0 - x.val**2
+    )
+    df -= np.log(3.0) * 3.0 ** (-x.val)
+    known_jac = np.diag(df) @ J.A
+    assert np.allclose(
+        f.val, (np.exp(x.val * v) / 2 - x.val**2) * x.val + 3**-x.val
+    )
+    assert np.allclose(f.jac.A, known_jac)
+    # The scaling has been applied, and x is unchanged.
+    assert f._jac_state[1] is None
+    assert np.allclose(x.jac.A, J.A)
+
+    # A diagonal matrix is treated as an elementwise scaling, other matrices
+    # materialize the Jacobian.
+    g = sps.diags(v) @ (x * v)
+    assert g._jac_state[1] is not None
+    assert np.allclose(g.jac.A, np.diag(v**2) @ J.A)
+    A = sps.csr_matrix(np.array([[1.0, 2.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]))
+    h = A @ (x * v)
+    assert h._jac_state[1] is None
+    assert np.allclose(h.jac.A, A.A @ np.diag(v) @ J.A)
+
+    # AdArrays with different Jacobians are combined directly.
+    y = AdArray(np.ones(3), sps.identity(3, format="csr"))
+    z = x * v + y * v
+    assert z._jac_state[1] is None
+    assert np.allclose(z.jac.A, np.diag(v) @ (J.A + np.eye(3)))
+
+
+def test_multi_component_ad_array():
+    """Operations on a multi-component AdArray coincide with the operations on the
+    individual components."""
+    rng = np.random.default_rng(0)
+    size, num_vars = 4, 10
+    components = [
+        AdArray(
+            rng.random(size) + 1.0,
+            sps.random(size, num_vars, density=0.5, format="csr", random_state=i),
+        )
+        for i in range(3)
+    ]
+    x = pp.ad.MultiComponentAdArray.from_ad_arrays(components)
+    assert x.num_components == 3
+    assert x.val.shape == (3, size)
+
+    # A common AdArray, e.g., a density, and arrays broadcast over the components or
+    # given per component.
+    rho = AdArray(
+        rng.random(size) + 1.0,
+        sps.random(size, num_vars, density=0.5, format="csr", random_state=3),
+    )
+    v = rng.random(size)
+    w = rng.random((3, size))
+    A = sps.random(5, size, density=0.5, format="csr", random_state=5)
+
+    def f(c, r, w_c):
+        return A @ (af.exp(c * v) * r / (c + w_c) - c**2.0) + 2.0 ** (-(A @ c))
+
+    result = f(x, rho, w)
+    assert isinstance(result, pp.ad.MultiComponentAdArray)
+    for i, c in enumerate(components):
+        known = f(c, rho, w[i])
+        comp = result.component(i)
+        assert np.allclose(comp.val, known.val)
+        assert np.allclose(comp.jac.A, known.jac.A)
+
+    # Broadcasting of a single-component AdArray from the left.
+    left = rho * x - rho
+    for i, c in enumerate(left.to_ad_arrays()):
+        known = rho * components[i] - rho
+        assert np.allclose(c.val, known.val)
+        assert np.allclose(c.jac.A, known.jac.A)
+
+    # Addition and subtraction with a single-component AdArray from the left.
+    for left, op in [(rho + x, lambda a, b: a + b), (rho - x, lambda a, b: a - b)]:
+        assert isinstance(left, pp.ad.MultiComponentAdArray)
+        for i, c in enumerate(left.to_ad_arrays()):
+            known = op(rho, components[i])
+            assert np.allclose(c.val, known.val)
+            assert np.allclose(c.jac.A, known.jac.A)
+
+    # Sum over the components.
+    total = x.sum()
+    assert np.allclose(total.val, sum(c.val for c in components))
+    assert np.allclose(total.jac.A, sum(c.jac.A for c in components))
+
+    with pytest.raises(ValueError):
+        x * np.ones(size + 1)
+    with pytest.raises(ValueError):
+        pp.ad.MultiComponentAdArray.from_ad_arrays(
+            [components[0], AdArray(np.ones(1), sps.csr_matrix((1, num_vars)))]
+        )
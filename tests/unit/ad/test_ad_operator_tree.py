@@ -9,6 +9,7 @@ The main checks performed are:
         are returned as expected.
     test_ad_variable_evaluation: Test of the wrappers for variables.
     test_time_differentiation: Covers the pp.ad.dt operator.
+    test_evaluation_plan: Compilation and caching of evaluation plans.
 
 """
 import copy
@@ -226,7 +227,8 @@ def test_ad_operator_unary_minus_parsing():
     sp_array1 = pp.ad.SparseArray(mat1)
     sp_array2 = pp.ad.SparseArray(mat2)
     op = sp_array1 + sp_array2
-    assert np.allclose(op._parse_operator(-op, None).data, -(mat1 + mat2).data)
+    eq_system = pp.ad.EquationSystem(pp.MixedDimensionalGrid())
+    assert np.allclose((-op).evaluate(eq_system).data, -(mat1 + mat2).data)
 
 
 def test_time_dependent_array():
@@ -805,3 +807,188 @@ def test_time_differentiation():
     # Also test the time increment method
     diff_var_2 = pp.ad.time_increment(var_2)
     assert np.allclose(diff_var_2.evaluate(eq_system), 0)
+
+
+def test_evaluation_plan():
+    """Test compilation of operator trees into evaluation plans.
+
+    The test checks that the plan is cached and reused, that constant subtrees are
+    evaluated once, that replaced discretization matrices are picked up, and that the
+    plan is recompiled when the numbering of degrees of freedom changes.
+
+    """
+    mdg = pp.MixedDimensionalGrid()
+    sd = pp.CartGrid(np.array([3, 2]))
+    sd.compute_geometry()
+    mdg.add_subdomains([sd])
+    data = mdg.subdomain_data(sd)
+    pp.initialize_default_data(sd, data, "flow")
+
+    eq_system = pp.ad.EquationSystem(mdg)
+    var = eq_system.create_variables("foo", subdomains=[sd])
+    vals = np.random.rand(sd.num_cells)
+    eq_system.set_variable_values(vals, [var], iterate_index=0, time_step_index=0)
+
+    discr = pp.ad.TpfaAd("flow", [sd])
+    div = pp.ad.Divergence([sd])
+    scaling = pp.ad.SparseArray(2 * sps.identity(sd.num_cells, format="csr"))
+    # The subtree (scaling @ div) @ discr.flux is constant between discretizations.
+    op = (scaling @ div) @ discr.flux @ var + var**2
+    op.discretize(mdg)
+
+    plan = op.compile(eq_system)
+    assert op.compile(eq_system) is plan
+    # Leaves scaling, div and flux, and the two matrix products.
+    assert plan.num_static_steps == 5
+
+    def _known_value(state):
+        flux = data[pp.DISCRETIZATION_MATRICES]["flow"]["flux"]
+        mat = 2 * pp.fvutils.scalar_divergence(sd) @ flux
+        return mat @ state + state**2, mat + sps.diags(2 * state)
+
+    for _ in range(2):
+        result = op.evaluate(eq_system)
+        known_val, known_jac = _known_value(vals)
+        assert np.allclose(result.val, known_val)
+        assert np.allclose(result.jac.toarray(), known_jac.toarray())
+        # Evaluation at a given state.
+        state = np.random.rand(sd.num_cells)
+        result = op.evaluate(eq_system, state)
+        known_val, known_jac = _known_value(state)
+        assert np.allclose(result.val, known_val)
+        assert np.allclose(result.jac.toarray(), known_jac.toarray())
+        assert op.compile(eq_system) is plan
+
+        # Replace the discretization matrix, as would happen under rediscretization.
+        # The static part of the plan should be updated.
+        mat_dict = data[pp.DISCRETIZATION_MATRICES]["flow"]
+        mat_dict["flux"] = 3 * mat_dict["flux"]
+
+    # Only the value of the maximal static subtree is kept.
+    assert len(plan._static_values) == 1
+
+    # A new variable changes the dof numbering, thus the plan must be recompiled.
+    bar = eq_system.create_variables("bar", subdomains=[sd])
+    eq_system.set_variable_values(vals, [bar], iterate_index=0, time_step_index=0)
+    new_plan = op.compile(eq_system)
+    assert new_plan is not plan
+    assert op.evaluate(eq_system).jac.shape == (sd.num_cells, 2 * sd.num_cells)
+
+    # Operators which occur several times in a tree are evaluated once.
+    double = var * var
+    sum_op = double + double
+    assert sum_op.compile(eq_system).num_steps == 3
+    assert np.allclose(sum_op.evaluate(eq_system).val, 2 * vals**2)
+
+
+def test_matrix_free_evaluation():
+    """Test Jacobian-vector and vector-Jacobian products of evaluation plans.
+
+    The products are compared to the assembled Jacobian, for a tree containing the
+    elementary operations, functions, and variables at the previous iteration and time
+    step.
+
+    """
+    mdg = pp.MixedDimensionalGrid()
+    sd = pp.CartGrid(np.array([3, 2]))
+    sd.compute_geometry()
+    mdg.add_subdomains([sd])
+    data = mdg.subdomain_data(sd)
+    pp.initialize_default_data(sd, data, "flow")
+
+    eq_system = pp.ad.EquationSystem(mdg)
+    foo = eq_system.create_variables("foo", subdomains=[sd])
+    bar = eq_system.create_variables("bar", subdomains=[sd])
+    vals = 1 + np.random.rand(eq_system.num_dofs())
+    eq_system.set_variable_values(vals, iterate_index=0, time_step_index=0)
+
+    discr = pp.ad.TpfaAd("flow", [sd])
+    div = pp.ad.Divergence([sd])
+    exp = pp.ad.Function(pp.ad.functions.exp, "exp")
+    op = (
+        div @ discr.flux @ foo
+        + exp(bar) * foo / bar
+        - foo ** pp.ad.Scalar(2.0) * bar.previous_timestep()
+        + pp.ad.Scalar(2.0) * bar.previous_iteration()
+    )
+    op.discretize(mdg)
+
+    state = 1 + np.random.rand(eq_system.num_dofs())
+    known = op.evaluate(eq_system, state)
+    plan = op.compile(eq_system)
+    assert np.allclose(plan.evaluate_values(state)[0], known.val)
+
+    # Forward mode, with one and several vectors.
+    tangent = np.random.rand(eq_system.num_dofs())
+    val, product = op.jvp(eq_system, tangent, state)
+    assert np.allclose(val, known.val)
+    assert np.allclose(product, known.jac @ tangent)
+    tangents = np.random.rand(eq_system.num_dofs(), 3)
+    _, products = plan.jvp(tangents, state)
+    assert products[0].shape == (sd.num_cells, 3)
+    assert np.allclose(products[0], known.jac @ tangents)
+
+    # Reverse mode.
+    vector = np.random.rand(sd.num_cells)
+    val, product = op.vjp(eq_system, vector, state)
+    assert np.allclose(val, known.val)
+    assert np.allclose(product, known.jac.T @ vector)
+
+    # Operators which do not depend on the current variables have zero derivatives.
+    _, product = bar.previous_timestep().jvp(eq_system, tangent, state)
+    assert np.allclose(product, 0)
+    _, product = bar.previous_timestep().vjp(eq_system, vector, state)
+    assert product.shape == (eq_system.num_dofs(),)
+    assert np.allclose(product, 0)
+
+
+def test_incremental_evaluation():
+    """Test reuse of results by incremental evaluation of evaluation plans.
+
+    Affine operators are updated by a matrix-vector product when only the variables
+    change, while changes in time dependent arrays and discretization matrices
+    trigger a new evaluation.
+
+    """
+    mdg = pp.MixedDimensionalGrid()
+    sd = pp.CartGrid(np.array([3, 2]))
+    sd.compute_geometry()
+    mdg.add_subdomains([sd])
+    data = mdg.subdomain_data(sd)
+    pp.initialize_default_data(sd, data, "flow")
+    pp.set_solution_values("source", np.ones(sd.num_cells), data, iterate_index=0)
+
+    eq_system = pp.ad.EquationSystem(mdg)
+    var = eq_system.create_variables("foo", subdomains=[sd])
+    vals = np.random.rand(sd.num_cells)
+    eq_system.set_variable_values(vals, [var], iterate_index=0, time_step_index=0)
+
+    discr = pp.ad.TpfaAd("flow", [sd])
+    div = pp.ad.Divergence([sd])
+    source = pp.ad.TimeDependentDenseArray("source", [sd])
+    linear = div @ discr.flux @ var - source * var.previous_timestep()
+    nonlinear = var * var + source
+    linear.discretize(mdg)
+    plan = pp.ad.EvaluationPlan([linear, nonlinear], eq_system)
+
+    def check(state, evaluated, updated, reused):
+        counts = dict(plan.incremental_counts)
+        results = plan.evaluate_incremental(state)
+        for result, known in zip(results, plan.evaluate(state)):
+            assert np.allclose(result.val, known.val)
+            assert np.allclose(result.jac.toarray(), known.jac.toarray())
+        assert plan.incremental_counts["evaluated"] == counts["evaluated"] + evaluated
+        assert plan.incremental_counts["updated"] == counts["updated"] + updated
+        assert plan.incremental_counts["reused"] == counts["reused"] + reused
+
+    check(vals, 2, 0, 0)
+    check(vals, 0, 0, 2)
+    # A new state: The linear operator is updated.
+    state = np.random.rand(sd.num_cells)
+    check(state, 1, 1, 0)
+    # New values of the time dependent array, and a new discretization matrix.
+    pp.set_solution_values("source", 2 * np.ones(sd.num_cells), data, iterate_index=0)
+    check(state, 2, 0, 0)
+    mat_dict = data[pp.DISCRETIZATION_MATRICES]["flow"]
+    mat_dict["flux"] = 3 * mat_dict["flux"]
+    check(state, 1, 0, 1)
@@ -0,0 +1,80 @@
+"""Tests of the JacobianPattern, which records the sparsity pattern of assembled
+matrices and refreshes their values in place.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+import scipy.sparse as sps
+
+import porepy as pp
+
+
+@pytest.fixture
+def blocks() -> list[sps.csr_matrix]:
+    """Two row blocks with 3 columns, the second one with unsorted indices."""
+    block_0 = sps.csr_matrix(np.array([[1.0, 0, 2], [0, 3, 0]]))
+    block_1 = sps.csr_matrix(
+        (np.array([5.0, 4]), np.array([2, 0]), np.array([0, 2])), shape=(1, 3)
+    )
+    return [block_0, block_1]
+
+
+def test_initialization(blocks):
+    pattern = pp.ad.JacobianPattern(blocks, 3)
+    known = sps.vstack(blocks).toarray()
+    assert np.allclose(pattern.matrix.toarray(), known)
+    assert pattern.matrix.has_sorted_indices
+    # The index arrays have the dtype SciPy uses for a matrix of this size.
+    assert (
+        pattern.matrix.indices.dtype == sps.vstack(blocks, format="csr").indices.dtype
+    )
+    assert pattern.matches(blocks)
+    assert not pattern.matches(blocks[:1])
+    assert not pattern.matches([blocks[0], sps.csr_matrix((2, 3))])
+
+    # Empty list of blocks.
+    empty = pp.ad.JacobianPattern([], 3)
+    assert empty.matrix.shape == (0, 3)
+
+
+def test_refresh_same_pattern(blocks):
+    pattern = pp.ad.JacobianPattern(blocks, 3)
+    matrix = pattern.matrix
+    indices, indptr = matrix.indices, matrix.indptr
+
+    new_blocks = [2 * b for b in blocks]
+    refreshed = pattern.refresh(new_blocks)
+    # The matrix and its index arrays are reused.
+    assert refreshed is matrix
+    assert refreshed.indices is indices and refreshed.indptr is indptr
+    assert np.allclose(refreshed.toarray(), sps.vstack(new_blocks).toarray())
+    assert pattern.num_refreshes == 1 and pattern.num_rebuilds == 0
+
+
+def test_refresh_subset_and_extension(blocks):
+    pattern = pp.ad.JacobianPattern(blocks, 3)
+    matrix = pattern.matrix
+
+    # An entry is dropped from the first block. This should be padded by a zero.
+    subset = [sps.csr_matrix(np.array([[1.0, 0, 0], [0, 3, 0]])), blocks[1]]
+    refreshed = pattern.refresh(subset)
+    assert refreshed is matrix
+    assert refreshed.nnz == 5
+    assert np.allclose(refreshed.toarray(), sps.vstack(subset).toarray())
+
+    # A new entry in the second block. The pattern is extended.
+    extended = [blocks[0], sps.csr_matrix(np.array([[4.0, 6, 0]]))]
+    refreshed = pattern.refresh(extended)
+    assert refreshed is not matrix
+    assert np.allclose(refreshed.toarray(), sps.vstack(extended).toarray())
+    assert pattern.num_rebuilds == 1
+    # The extended pattern is the union of the old and new pattern.
+    assert refreshed.nnz == 6
+
+    # Refreshing with the original blocks reuses the extended pattern.
+    assert pattern.refresh(blocks) is refreshed
+    assert np.allclose(refreshed.toarray(), sps.vstack(blocks).toarray())
+
+    with pytest.raises(ValueError):
+        pattern.refresh(blocks[:1])
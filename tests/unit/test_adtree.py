@@ -342,6 +342,66 @@ class ADTreeTest(unittest.TestCase):
         self.assertTrue(tree.nodes[4].child[0] == -1)
         self.assertTrue(tree.nodes[4].child[1] == -1)
 
+    def test_add_nodes(self):
+        """Test that adding nodes together gives the same tree as adding them one at a
+        time, also when the tree is not empty.
+        """
+        boxes = np.random.default_rng(0).random((50, 2))
+        boxes[:, 1] += boxes[:, 0]
+
+        tree = pp.adtree.ADTree(2, 1)
+        for key, box in enumerate(boxes):
+            tree.add_node(pp.adtree.ADTNode(key, box))
+
+        tree_bulk = pp.adtree.ADTree(2, 1)
+        tree_bulk.add_node(pp.adtree.ADTNode(0, boxes[0]))
+        tree_bulk.add_nodes(list(range(1, 20)), boxes[1:20])
+        tree_bulk.add_nodes(list(range(20, 50)), boxes[20:])
+
+        self.assertEqual(tree_bulk.keys, list(range(50)))
+        self.assertTrue(np.array_equal(tree_bulk.child, tree.child))
+        self.assertTrue(np.array_equal(tree_bulk.parent, tree.parent))
+        self.assertTrue(np.array_equal(tree_bulk.box, boxes))
+
+    def test_search_many(self):
+        """Test the search of several boxes together on a 2d grid. The result is
+        compared with the search of one box at a time and with a brute force check of
+        the bounding boxes of the cells.
+        """
+        g = pp.StructuredTriangleGrid([6, 4], [1, 2])
+        g.compute_geometry()
+
+        tree = pp.adtree.ADTree(4, 2)
+        tree.from_grid(g)
+
+        rng = np.random.default_rng(1)
+        lower = rng.random((30, 2)) * np.array([1.2, 2.4]) - 0.1
+        boxes = np.hstack((lower, lower + rng.random((30, 2)) * 0.4))
+        # Include a point and a box outside the grid
+        boxes[0] = [0.5, 1.0, 0.5, 1.0]
+        boxes[1] = [2.0, 2.0, 3.0, 3.0]
+
+        found = tree.search_many(boxes)
+        self.assertEqual(found.shape, (30, g.num_cells))
+
+        cell_nodes = g.cell_nodes().tocsc()
+        coords = [g.nodes[:2, cell_nodes[:, c].indices] for c in range(g.num_cells)]
+        cell_min = np.array([x.min(axis=1) for x in coords])
+        cell_max = np.array([x.max(axis=1) for x in coords])
+        tol = 1e-6
+
+        for i, box in enumerate(boxes):
+            nodes = found.indices[found.indptr[i] : found.indptr[i + 1]]
+            self.assertTrue(
+                np.array_equal(nodes, tree.search(pp.adtree.ADTNode(i, box)))
+            )
+            known = np.flatnonzero(
+                np.all(cell_min <= box[2:] + tol, axis=1)
+                & np.all(cell_max >= box[:2] - tol, axis=1)
+            )
+            self.assertTrue(np.array_equal(nodes, known))
+        self.assertEqual(found.indptr[2] - found.indptr[1], 0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,125 @@
+"""Tests of the persistent on-disk cache of discretization matrices."""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+import scipy.sparse as sps
+
+import porepy as pp
+
+
+@pytest.fixture
+def grid() -> pp.Grid:
+    sd = pp.CartGrid([3, 2])
+    sd.compute_geometry()
+    return sd
+
+
+def _mpfa_data(sd: pp.Grid, **params) -> dict:
+    return pp.initialize_default_data(sd, {}, "flow", params)
+
+
+def _matrices(data: dict, keyword: str = "flow") -> dict:
+    return data[pp.DISCRETIZATION_MATRICES][keyword]
+
+
+def test_cache_hit_and_miss(grid, tmp_path):
+    cache = pp.DiscretizationCache(tmp_path)
+    discr = pp.Mpfa("flow")
+
+    data = _mpfa_data(grid)
+    cache.discretize(discr, grid, data)
+    assert cache.misses == 1 and cache.hits == 0
+    assert len(list(tmp_path.glob("*.npz"))) == 1
+
+    # A new data dictionary with the same parameters is loaded from the cache.
+    data_cached = _mpfa_data(grid)
+    cache.discretize(discr, grid, data_cached)
+    assert cache.hits == 1
+    known, cached = _matrices(data), _matrices(data_cached)
+    assert known.keys() == cached.keys()
+    for key, mat in known.items():
+        assert cached[key].format == mat.format
+        assert np.allclose((cached[key] - mat).data, 0)
+
+    # A new cache object in the same directory also finds the file.
+    new_cache = pp.DiscretizationCache(tmp_path)
+    new_cache.discretize(discr, grid, _mpfa_data(grid))
+    assert new_cache.hits == 1
+
+    cache.clear()
+    assert cache.size() == 0
+
+
+def test_cache_key(grid, tmp_path):
+    cache = pp.DiscretizationCache(tmp_path)
+    discr = pp.Mpfa("flow")
+    key = cache.key(discr, grid, _mpfa_data(grid))
+    assert key is not None
+
+    # Boundary values do not affect the discretization.
+    bc_values = np.arange(grid.num_faces, dtype=float)
+    assert cache.key(discr, grid, _mpfa_data(grid, bc_values=bc_values)) == key
+
+    # The permeability and the boundary condition types do.
+    perm = pp.SecondOrderTensor(2 * np.ones(grid.num_cells))
+    assert cache.key(discr, grid, _mpfa_data(grid, second_order_tensor=perm)) != key
+    bc = pp.BoundaryCondition(grid, grid.get_all_boundary_faces(), "dir")
+    assert cache.key(discr, grid, _mpfa_data(grid, bc=bc)) != key
+
+    # So does the grid geometry.
+    other = pp.CartGrid([3, 2], physdims=[2, 1])
+    other.compute_geometry()
+    assert cache.key(discr, other, _mpfa_data(other)) != key
+
+    # Partial updates and discretizations which are not listed are not cached.
+    data = _mpfa_data(grid, specified_cells=np.array([0]))
+    assert cache.key(discr, grid, data) is None
+    assert cache.key(pp.MassMatrix("flow"), grid, _mpfa_data(grid)) is None
+
+
+def test_biot_cache(grid, tmp_path):
+    """Biot stores matrices under two keywords."""
+    cache = pp.DiscretizationCache(tmp_path)
+
+    def biot_data():
+        data = pp.initialize_default_data(grid, {}, "mechanics", {"biot_alpha": 1.0})
+        pp.initialize_default_data(grid, data, "flow", {"biot_alpha": 1.0})
+        return data
+
+    data = biot_data()
+    cache.discretize(pp.Biot(), grid, data)
+    data_cached = biot_data()
+    cache.discretize(pp.Biot(), grid, data_cached)
+    assert cache.hits == 1
+    for keyword in ["mechanics", "flow"]:
+        known, cached = _matrices(data, keyword), _matrices(data_cached, keyword)
+        assert len(known) > 0 and known.keys() == cached.keys()
+        for key, mat in known.items():
+            assert np.allclose(sps.csr_matrix(cached[key] - mat).data, 0)
+
+
+def test_eviction(grid, tmp_path):
+    discr = pp.Mpfa("flow")
+    cache = pp.DiscretizationCache(tmp_path, max_size=10**9, compress=False)
+    cache.discretize(discr, grid, _mpfa_data(grid))
+    size = cache.size()
+
+    # Room for a single file: The least recently used one is deleted.
+    cache.max_size = int(1.5 * size)
+    perm = pp.SecondOrderTensor(2 * np.ones(grid.num_cells))
+    data = _mpfa_data(grid, second_order_tensor=perm)
+    cache.discretize(discr, grid, data)
+    files = list(tmp_path.glob("*.npz"))
+    assert len(files) == 1
+    assert files[0].stem == cache.key(discr, grid, data)
+
+
+def test_model_discretization_cache(tmp_path):
+    for _ in range(2):
+        model = pp.fluid_mass_balance.SinglePhaseFlow(
+            {"discretization_cache": tmp_path}
+        )
+        model.prepare_simulation()
+    cache = model.equation_system.discretization_cache
+    assert cache.hits > 0 and cache.misses == 0
@@ -14,6 +14,9 @@ The tests focus on various assembly methods:
     * test_assemble_subsystem: Assemble blocks of the full set of equations.
     * test_extract_subsystem: Extract a new EquationSystem for a subset of equations.
     * test_schur_complement: Assemble a subsystem, using a Schur complement reduction.
+    * test_compile_equations: Joint evaluation plans with shared subexpressions.
+    * test_parallel_assembly: Assembly using a thread pool.
+    * test_reuse_jacobian_pattern: Assembly into a recorded sparsity pattern.
 
 To be tested:
     Get and set methods for variables
@@ -21,6 +24,8 @@ To be tested:
 
 
 """
+import sys
+
 import numpy as np
 from porepy.grids.standard_grids.md_grids_2d import single_horizontal
 import pytest
@@ -1337,3 +1342,230 @@ def test_schur_complement(eq_var_to_exclude):
     x_reconstructed = eq_system.expand_schur_complement_solution(x_schur)
 
     assert np.allclose(x_reconstructed, x_expected)
+
+
+def test_compile_equations():
+    """Test compilation of equations into a joint evaluation plan.
+
+    The equations are constructed so that they share structurally identical
+    subexpressions, which are built from distinct operator objects. The test checks
+    that these are deduplicated, that assembly is not affected by the deduplication,
+    and that the cached plan is discarded when it can no longer be used.
+
+    """
+    mdg = pp.meshing.cart_grid([], np.array([3, 2]))
+    sys_man = pp.ad.EquationSystem(mdg)
+    subdomains = mdg.subdomains()
+    var = sys_man.create_variables("foo", subdomains=subdomains)
+    vals = np.arange(1, sys_man.num_dofs() + 1, dtype=float)
+    sys_man.set_variable_values(vals, iterate_index=0, time_step_index=0)
+
+    # The equations are built from distinct, but identical, operator objects.
+    scale_1 = pp.ad.Scalar(2.0)
+    scale_2 = pp.ad.Scalar(2.0)
+    eq_1 = scale_1 * (var * var) + pp.ad.Scalar(1.0)
+    eq_1.set_name("eq_1")
+    eq_2 = scale_2 * (var * var) - var
+    eq_2.set_name("eq_2")
+    for eq in [eq_1, eq_2]:
+        sys_man.set_equation(eq, subdomains, {"cells": 1})
+
+    plan = sys_man.compile()
+    # The scalar, the product var * var and the scaled product are shared.
+    assert plan.num_deduplicated_nodes >= 3
+    assert sys_man.compile() is plan
+    # Compilation of a subset of the equations gives a separate plan.
+    assert sys_man.compile(["eq_2"]) is not plan
+
+    A, b = sys_man.assemble()
+    known_A = sps.vstack(
+        [eq.evaluate(sys_man).jac for eq in [eq_1, eq_2]], format="csr"
+    )
+    known_b = -np.hstack([eq.evaluate(sys_man).val for eq in [eq_1, eq_2]])
+    assert _compare_matrices(A, known_A)
+    assert np.allclose(b, known_b)
+    assert np.allclose(b, -np.hstack([2 * vals**2 + 1, 2 * vals**2 - vals]))
+
+    # A plan which identified scalars by their value remains valid if they are reset
+    # to the same value, and is invalidated if one of them changes value.
+    scale_2.set_value(2.0)
+    assert plan.is_valid_for(sys_man)
+    assert sys_man.compile() is plan
+    scale_2.set_value(3.0)
+    assert not plan.is_valid_for(sys_man)
+    new_plan = sys_man.compile()
+    assert new_plan is not plan
+    _, b = sys_man.assemble()
+    assert np.allclose(b, -np.hstack([2 * vals**2 + 1, 3 * vals**2 - vals]))
+
+    # Setting a new equation resets the cached plans.
+    eq_3 = var * var
+    eq_3.set_name("eq_3")
+    sys_man.set_equation(eq_3, subdomains, {"cells": 1})
+    assert sys_man.compile(["eq_1", "eq_2"]) is not new_plan
+    assert len(sys_man.compile().root_indices) == 3
+
+
+@pytest.mark.parametrize(
+    "equation_variables",
+    [
+        [None, None],
+        [["eq_all_subdomains", "eq_combined"], ["x", "z"]],
+        [{"eq_all_subdomains": "single_subdomain", "eq_all_interfaces": "all"}, None],
+    ],
+)
+def test_parallel_assembly(setup, equation_variables):
+    """Assembly using a thread pool should give the same system as serial assembly."""
+    sys_man = setup.sys_man
+    eq_names, var_names = equation_variables
+    if isinstance(eq_names, dict):
+        # Replace the keyword by an actual grid.
+        eq_names = {
+            name: [setup.sd_top] if grids == "single_subdomain" else setup.interfaces
+            for name, grids in eq_names.items()
+        }
+
+    A_serial, b_serial = sys_man.assemble_subsystem(eq_names, var_names)
+    indices_serial = sys_man.assembled_equation_indices
+
+    sys_man.max_assembly_workers = 4
+    A, b = sys_man.assemble_subsystem(eq_names, var_names)
+
+    assert _compare_matrices(A, A_serial)
+    assert np.allclose(b, b_serial)
+    assert indices_serial.keys() == sys_man.assembled_equation_indices.keys()
+    for name, ind in indices_serial.items():
+        assert np.all(ind == sys_man.assembled_equation_indices[name])
+
+
+def test_parallel_assembly_shared_subexpression():
+    """Threaded assembly of equations which share a subexpression with a pending
+    scaling of its Jacobian should give the same system as serial assembly."""
+    mdg = pp.meshing.cart_grid([], np.array([20, 20]))
+    sys_man = pp.ad.EquationSystem(mdg)
+    subdomains = mdg.subdomains()
+    var = sys_man.create_variables("foo", subdomains=subdomains)
+    vals = np.linspace(0.1, 1, sys_man.num_dofs())
+    sys_man.set_variable_values(vals, iterate_index=0, time_step_index=0)
+
+    # The Jacobian of the shared expression is scaled lazily, and the scaling is
+    # applied by the first equation which accesses it.
+    exp = pp.ad.Function(pp.ad.functions.exp, "exp")
+    shared = exp(var) * var
+    num_cells = subdomains[0].num_cells
+    for i in range(8):
+        matrix = pp.ad.SparseArray(
+            sps.random(num_cells, num_cells, 0.05, random_state=i)
+        )
+        eq = matrix @ shared
+        eq.set_name(f"eq_{i}")
+        sys_man.set_equation(eq, subdomains, {"cells": 1})
+
+    A_serial, b_serial = sys_man.assemble()
+    sys_man.max_assembly_workers = 8
+    # Switch threads frequently, to provoke concurrent access to the shared AdArray.
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for _ in range(20):
+            A, b = sys_man.assemble()
+            assert _compare_matrices(A, A_serial)
+            assert np.allclose(b, b_serial)
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+
+def test_reuse_jacobian_pattern(setup):
+    """Assembly with a recorded sparsity pattern should give the same system as
+    standard assembly, while reusing the matrix object."""
+    sys_man = setup.sys_man
+    sys_man.reuse_jacobian_pattern = True
+    eq_names = ["eq_single_interface", "eq_all_subdomains"]
+    var_names = ["x", "w"]
+
+    A, b = sys_man.assemble()
+    assert _compare_matrices(A, setup.A)
+    assert np.allclose(b, setup.b)
+
+    A_sub, _ = sys_man.assemble_subsystem(eq_names, var_names)
+    assert A_sub is not A
+
+    # Assemble for another state. The matrices should be refreshed in place.
+    state = 2 * setup.initial_values + 1
+    A_new, b_new = sys_man.assemble(state=state)
+    A_sub_new, b_sub_new = sys_man.assemble_subsystem(eq_names, var_names, state=state)
+    assert A_new is A
+    assert A_sub_new is A_sub
+
+    sys_man.reuse_jacobian_pattern = False
+    A_known, b_known = sys_man.assemble(state=state)
+    A_sub_known, b_sub_known = sys_man.assemble_subsystem(
+        eq_names, var_names, state=state
+    )
+    assert _compare_matrices(A_new, A_known)
+    assert np.allclose(b_new, b_known)
+    assert _compare_matrices(A_sub_new, A_sub_known)
+    assert np.allclose(b_sub_new, b_sub_known)
+
+
+@pytest.mark.parametrize(
+    "equation_variables",
+    [
+        [None, None],
+        [["eq_all_subdomains", "eq_combined"], ["x", "z"]],
+        [{"eq_all_subdomains": "single_subdomain", "eq_all_interfaces": "all"}, None],
+    ],
+)
+def test_matrix_free_products(setup, equation_variables):
+    """Matrix-free products with the Jacobian and the residual should match the
+    assembled subsystem."""
+    sys_man = setup.sys_man
+    eq_names, var_names = equation_variables
+    if isinstance(eq_names, dict):
+        # Replace the keyword by an actual grid.
+        eq_names = {
+            name: [setup.sd_top] if grids == "single_subdomain" else setup.interfaces
+            for name, grids in eq_names.items()
+        }
+    state = 2 * setup.initial_values + 1
+    A, b = sys_man.assemble_subsystem(eq_names, var_names, state=state)
+
+    assert np.allclose(sys_man.assemble_rhs(eq_names, state=state), b)
+    vector = np.random.rand(A.shape[1])
+    assert np.allclose(
+        sys_man.jacobian_vector_product(vector, eq_names, var_names, state=state),
+        A @ vector,
+    )
+    vector = np.random.rand(A.shape[0])
+    assert np.allclose(
+        sys_man.vector_jacobian_product(vector, eq_names, var_names, state=state),
+        A.T @ vector,
+    )
+    with pytest.raises(ValueError):
+        sys_man.vector_jacobian_product(np.ones(A.shape[0] + 1), eq_names, var_names)
+
+
+def test_incremental_assembly(setup):
+    """Incremental assembly should give the same system as standard assembly, while
+    reusing the equations whose variables did not change."""
+    sys_man = setup.sys_man
+    sys_man.incremental_assembly = True
+    plan = sys_man.compile()
+
+    A, b = sys_man.assemble()
+    assert _compare_matrices(A, setup.A)
+    assert np.allclose(b, setup.b)
+    assert plan.incremental_counts["evaluated"] == len(setup.all_equation_names)
+
+    # Only the variable w changes, which enters the equation on the top interface.
+    state = setup.initial_values.astype(float)
+    state[sys_man.dofs_of(["w"])] *= 2
+    counts = dict(plan.incremental_counts)
+    A, b = sys_man.assemble(state=state)
+    assert plan.incremental_counts["evaluated"] == counts["evaluated"] + 1
+    assert plan.incremental_counts["reused"] == counts["reused"] + 4
+
+    sys_man.incremental_assembly = False
+    A_known, b_known = sys_man.assemble(state=state)
+    assert _compare_matrices(A, A_known)
+    assert np.allclose(b, b_known)
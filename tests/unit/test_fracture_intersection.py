@@ -212,6 +212,50 @@ class TestBoundingBoxIntersection(unittest.TestCase):
 
         self.assertTrue(np.allclose(pairs_1, combined_pairs))
 
+    def test_overlapping_rectangles_random(self):
+        # Random rectangles, some of them degenerate or touching. Compare with a check
+        # of all pairs, also when the candidates are checked in small chunks.
+        rng = np.random.default_rng(0)
+        x_min, y_min = np.round(rng.random((2, 60)), 1)
+        x_max = x_min + np.round(rng.random(60) * 0.3, 1)
+        y_max = y_min + np.round(rng.random(60) * 0.3, 1)
+
+        overlap = (
+            (x_min[:, None] <= x_max)
+            & (x_min <= x_max[:, None])
+            & (y_min[:, None] <= y_max)
+            & (y_min <= y_max[:, None])
+        )
+        known = np.vstack(np.where(np.triu(overlap, k=1)))
+
+        pairs = pp.intersections._identify_overlapping_rectangles(
+            x_min, x_max, y_min, y_max
+        )
+        self.assertTrue(np.all(np.diff(pairs[0]) >= 0))
+        self.assertTrue(np.all(pairs[0] < pairs[1]))
+        for max_candidates in [2**22, 7]:
+            grid_pairs = pp.intersections._overlapping_rectangles_uniform_grid(
+                x_min, x_max, y_min, y_max, max_candidates
+            )
+            for p in [pairs, grid_pairs]:
+                p_sorted = p[:, np.lexsort((p[1], p[0]))]
+                self.assertTrue(np.array_equal(p_sorted, known))
+
+    def test_polygons_cross_planes(self):
+        # Two parallel squares, with overlapping bounding boxes, and a square crossing
+        # the plane of both, and another one crossing only the plane of the first.
+        square = np.array([[0, 1, 1, 0], [0, 0, 1, 1], [0, 0, 0, 0]], dtype=float)
+        polys = [
+            square,
+            square + np.array([[0.5], [0.5], [0.1]]),
+            np.array([[0.5, 0.5, 0.5, 0.5], [0, 1, 1, 0], [-1, -1, 1, 1]]),
+            np.array([[0.2, 0.2, 0.2, 0.2], [0, 1, 1, 0], [-1, -1, 0.05, 0.05]]),
+        ]
+        normals = [pp.map_geometry.compute_normal(p).reshape((-1, 1)) for p in polys]
+        pairs = np.array([[0, 0, 1, 0, 1], [1, 2, 2, 3, 3]])
+        crosses = pp.intersections._polygons_cross_planes(polys, normals, pairs)
+        self.assertTrue(np.array_equal(crosses, [False, True, True, True, False]))
+
 
 class TestFractureIntersectionRemoval(unittest.TestCase):
     """Tests for functions used to remove intersections between 1d fractures."""
@@ -553,6 +553,29 @@ class TestFractureNetwork3dBoundingBox(unittest.TestCase):
         self.assertTrue(network.domain.bounding_box["zmax"] == external_box["zmax"])
 
 
+@pytest.mark.parametrize(
+    "fractures",
+    [
+        # A single fracture.
+        [np.array([[0, 1, 1, 0], [0, 0, 1, 1], [0, 0, 0, 0]])],
+        # Two parallel fractures.
+        [
+            np.array([[0, 1, 1, 0], [0, 0, 1, 1], [0, 0, 0, 0]]),
+            np.array([[0, 1, 1, 0], [0, 0, 1, 1], [1, 1, 1, 1]]),
+        ],
+    ],
+)
+def test_find_intersections_3d_no_intersections(fractures):
+    # Networks without intersecting fractures should give empty intersections.
+    network = pp.create_fracture_network([pp.PlaneFracture(f) for f in fractures])
+    network.find_intersections()
+
+    assert network.intersections["start"].shape == (3, 0)
+    assert network.intersections["end"].shape == (3, 0)
+    for key in ["first", "second", "bound_first", "bound_second"]:
+        assert network.intersections[key].size == 0
+
+
 class TestDomain(unittest.TestCase):
     def check_key_value(self, domain, keys, values):
         tol = 1e-12
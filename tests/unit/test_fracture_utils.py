@@ -173,6 +173,19 @@ class TestConversionBetweenLineFracturesAndPointsEdges:
         assert np.allclose(converted_pts, pts)
         assert np.allclose(converted_edges, edges)
 
+    def test_linefractures_to_pts_edges_many_fractures(self):
+        """Test conversion of a large number of connected line fractures.
+
+        The point indices exceed the range of small integer types.
+        """
+        num_fracs = 300
+        x = np.arange(num_fracs + 1, dtype=float)
+        fracs = [pp.LineFracture([[x[i], x[i + 1]], [0, 0]]) for i in range(num_fracs)]
+        converted_pts, converted_edges = linefractures_to_pts_edges(fracs)
+        assert np.allclose(converted_pts, np.vstack((x, np.zeros_like(x))))
+        assert np.all(converted_edges[0] == np.arange(num_fracs))
+        assert np.all(converted_edges[1] == np.arange(1, num_fracs + 1))
+
     def test_pts_edges_to_linefractures(self):
         """Test conversion of points and edges into line fractures."""
         frac1 = pp.LineFracture([[0, 2], [1, 3]])
@@ -3,8 +3,10 @@
 * Specific tests for Simplex and Structured Grids
 * Tests for the mortar grid.
 """
+import multiprocessing
 import pickle
 import unittest
+from pathlib import Path
 
 import numpy as np
 import pytest
@@ -33,6 +35,53 @@ class TestDiameterComputation(unittest.TestCase):
         known = np.repeat(np.sqrt(3), g.num_cells)
         self.assertTrue(np.allclose(cell_diameters, known))
 
+    def test_cell_diameters_polygons(self):
+        # Perturbed simplex grid, compared to a brute force computation over all pairs
+        # of cell nodes.
+        g = pp.StructuredTriangleGrid([4, 3])
+        g.nodes[:2] += 0.2 * np.random.default_rng(0).random((2, g.num_nodes))
+        g.compute_geometry()
+        cn = g.cell_nodes()
+        known = [
+            np.max(
+                np.linalg.norm(
+                    g.nodes[:, nodes, np.newaxis] - g.nodes[:, np.newaxis, nodes],
+                    axis=0,
+                )
+            )
+            for nodes in np.split(cn.indices, cn.indptr[1:-1])
+        ]
+        self.assertTrue(np.allclose(g.cell_diameters(), known))
+        self.assertTrue(np.allclose(g.cell_diameters(cn), known))
+
+
+class TestTopologyMemoization(unittest.TestCase):
+    def test_memoized_until_grid_changes(self):
+        g = pp.CartGrid([3, 2])
+        g.compute_geometry()
+        cn = g.cell_nodes()
+        diameters = g.cell_diameters()
+        # Repeated calls return the memoized quantities, arrays are read-only.
+        self.assertTrue(g.cell_nodes() is cn)
+        self.assertTrue(g.cell_diameters() is diameters)
+        self.assertTrue(g.cell_connection_map() is g.cell_connection_map())
+        self.assertFalse(g.num_cell_nodes().flags.writeable)
+
+        # Replacing the nodes invalidates the memoized quantities.
+        g.nodes = 2 * g.nodes
+        self.assertTrue(np.allclose(g.cell_diameters(), 2 * diameters))
+
+        # So does replacing the topology.
+        g.cell_faces = g.cell_faces[:, :3]
+        self.assertEqual(g.cell_nodes().shape, (g.num_nodes, 3))
+
+        # In-place modifications are detected by compute_geometry.
+        g = pp.CartGrid([3, 2])
+        diameters = g.cell_diameters()
+        g.nodes *= 2
+        g.compute_geometry()
+        self.assertTrue(np.allclose(g.cell_diameters(), 2 * diameters))
+
 
 class TestReprAndStr(unittest.TestCase):
     def test_repr(self):
@@ -842,5 +891,60 @@ def test_pickle_mortar_grid(g):
     test_utils.delete_file(fn)
 
 
+def _sum_of_cell_volumes(handle: pp.SharedGridHandle) -> float:
+    """Attach a shared mixed-dimensional grid in a worker process."""
+    mdg = handle.attach()
+    return sum(sd.cell_volumes.sum() for sd in mdg.subdomains())
+
+
+def test_shared_grid():
+    """Test that grids shared through memory-mapped files are reconstructed as
+    read-only views, with the same ids, also in other processes."""
+    mdg, _ = pp.md_grids_2d.single_horizontal([2, 2], simplex=False)
+    with pp.SharedGrid(mdg, directory=".") as shared:
+        mdg_read = pickle.loads(pickle.dumps(shared.handle)).attach()
+
+        for sd, sd_read in zip(mdg.subdomains(), mdg_read.subdomains()):
+            test_utils.compare_grids(sd, sd_read)
+            assert sd.id == sd_read.id
+            assert type(sd) is type(sd_read)
+            for arr in [
+                sd_read.nodes,
+                sd_read.cell_faces.indices,
+                sd_read.tags["tip_faces"],
+            ]:
+                assert not arr.flags.writeable and not arr.flags.owndata
+        for intf, intf_read in zip(mdg.interfaces(), mdg_read.interfaces()):
+            test_utils.compare_mortar_grids(intf, intf_read)
+            assert intf.id == intf_read.id
+            # The interface is connected to the reconstructed subdomains.
+            sd_pair = mdg_read.interface_to_subdomain_pair(intf_read)
+            assert all(any(g is sd for sd in mdg_read.subdomains()) for g in sd_pair)
+            assert [g.id for g in sd_pair] == [
+                g.id for g in mdg.interface_to_subdomain_pair(intf)
+            ]
+
+        # Spawn, rather than fork, a fresh process, which is safe also if other tests
+        # have left background threads running.
+        with multiprocessing.get_context("spawn").Pool(1) as pool:
+            volume = pool.apply(_sum_of_cell_volumes, (shared.handle,))
+        assert np.isclose(volume, 2)
+
+    # The file is deleted, but the attached grid remains valid.
+    assert not Path(shared.handle.path).exists()
+    assert np.isclose(mdg_read.subdomains()[0].cell_volumes.sum(), 1)
+
+
+def test_shared_grid_unpicklable(tmp_path):
+    """Test that no file is left behind if the grid cannot be pickled."""
+    sd = pp.CartGrid([2, 2])
+    # Local functions cannot be pickled.
+    sd.unpicklable = lambda: None
+    # The exception raised for local objects depends on the Python version.
+    with pytest.raises((AttributeError, pickle.PicklingError)):
+        pp.SharedGrid(sd, directory=tmp_path)
+    assert not any(tmp_path.iterdir())
+
+
 if __name__ == "__main__":
     unittest.main()
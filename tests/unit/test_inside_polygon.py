@@ -175,5 +175,52 @@ class TestPointInPolyhedron(unittest.TestCase):
         self.assertTrue(is_inside[0] == 0)
 
 
+class TestWindingNumbers(unittest.TestCase):
+    def setUp(self):
+        # Unit cube, triangulated with outward normals.
+        vertices = np.array(
+            [[i, j, k] for k in range(2) for j in range(2) for i in range(2)],
+            dtype=float,
+        )
+        quads = [
+            [0, 2, 3, 1],
+            [4, 5, 7, 6],
+            [0, 1, 5, 4],
+            [2, 6, 7, 3],
+            [0, 4, 6, 2],
+            [1, 3, 7, 5],
+        ]
+        connectivity = np.array(
+            [[q[0], q[1], q[2]] for q in quads] + [[q[0], q[2], q[3]] for q in quads]
+        )
+        self.test_object = pp.point_in_polyhedron_test.PointInPolyhedronTest(
+            vertices, connectivity
+        )
+
+    def test_compare_with_single_points(self):
+        points = np.random.default_rng(0).random((50, 3)) * 1.6 - 0.3
+        # Degenerate points: A vertex, and a point on the plane of a face.
+        points[0] = [1, 1, 1]
+        points[1] = [0.5, 0.5, 1]
+        for use_bounding_box in [True, False]:
+            wn, degenerate = self.test_object.winding_numbers(
+                points, use_bounding_box=use_bounding_box, max_chunk_entries=100
+            )
+            for i, point in enumerate(points):
+                try:
+                    known = self.test_object.winding_number(point)
+                except ValueError:
+                    self.assertTrue(degenerate[i] and np.isnan(wn[i]))
+                else:
+                    self.assertFalse(degenerate[i])
+                    self.assertTrue(np.isclose(wn[i], known))
+            self.assertTrue(np.all(degenerate[:2]))
+
+        # Inside points have winding number 1, outside points 0.
+        inside = np.all((points > 0) & (points < 1), axis=1)
+        self.assertTrue(np.allclose(wn[inside], 1))
+        self.assertTrue(np.allclose(wn[~inside & ~degenerate], 0))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -140,6 +140,77 @@ class SplitIntersectingLines2DTest(unittest.TestCase):
         self.assertTrue(np.allclose(new_pts, p))
         self.assertTrue(test_utils.compare_arrays(new_lines, lines_known))
 
+    def test_grid_of_lines_with_tags(self):
+        # Horizontal and vertical lines crossing in a regular pattern. Each line is
+        # split at all crossings, and the split segments keep the tags of the
+        # original lines.
+        n = 5
+        c = np.linspace(0, 1, n)
+        p = np.hstack(
+            (
+                np.vstack((np.zeros(n), c)),
+                np.vstack((np.ones(n), c)),
+                np.vstack((c + 0.05, -np.ones(n))),
+                np.vstack((c + 0.05, 2 * np.ones(n))),
+            )
+        )
+        lines = np.vstack(
+            (
+                np.hstack((np.arange(n), 2 * n + np.arange(n))),
+                np.hstack((n + np.arange(n), 3 * n + np.arange(n))),
+                np.arange(2 * n),
+            )
+        )
+        (
+            new_pts,
+            new_lines,
+            _,
+            argsort,
+        ) = pp.intersections.split_intersecting_segments_2d(
+            p, lines, return_argsort=True
+        )
+        # Each line is crossed by 4 (the vertical line at 1.05 only by 0) lines.
+        num_crossings = np.array([4] * n + [n] * (n - 1) + [0])
+        self.assertEqual(new_pts.shape[1], p.shape[1] + n * (n - 1))
+        self.assertEqual(new_lines.shape[1], np.sum(num_crossings + 1))
+        self.assertTrue(np.all(new_lines[2] == argsort))
+        self.assertTrue(np.all(np.bincount(argsort) == num_crossings + 1))
+        # The split segments lie along the original lines.
+        for start, end, line in new_lines.T:
+            direction = p[:, lines[1, line]] - p[:, lines[0, line]]
+            for pt in (start, end):
+                v = new_pts[:, pt] - p[:, lines[0, line]]
+                self.assertAlmostEqual(v[0] * direction[1] - v[1] * direction[0], 0)
+
+    def test_segment_pairs_intersections_2d(self):
+        # The vectorized intersection of pairs of segments should give the same result
+        # as segments_2d, including parallel and overlapping segments.
+        rng = np.random.default_rng(0)
+        num_pairs = 500
+        start_1, end_1, start_2, end_2 = rng.integers(0, 4, (4, 2, num_pairs)) / 3
+        # Make sure the segments have positive length
+        end_1[0, np.all(start_1 == end_1, axis=0)] += 1
+        end_2[1, np.all(start_2 == end_2, axis=0)] += 1
+
+        points, num_isect = pp.intersections._segment_pairs_intersections_2d(
+            start_1, end_1, start_2, end_2
+        )
+
+        self.assertEqual(points.shape[1], num_isect.sum())
+        self.assertTrue(np.any(num_isect == 2))
+        first = np.cumsum(num_isect) - num_isect
+        for i in range(num_pairs):
+            known = pp.intersections.segments_2d(
+                start_1[:, i], end_1[:, i], start_2[:, i], end_2[:, i]
+            )
+            if known is None:
+                self.assertEqual(num_isect[i], 0)
+            else:
+                self.assertEqual(num_isect[i], known.shape[1])
+                self.assertTrue(
+                    np.allclose(points[:, first[i] : first[i] + num_isect[i]], known)
+                )
+
 
 class LinesIntersectTest(unittest.TestCase):
     def test_lines_intersect_segments_do_not(self):
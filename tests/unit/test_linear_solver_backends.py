@@ -0,0 +1,270 @@
+"""Tests of the linear solver backends, covering reuse of symbolic analysis and
+numerical factorization, and the registry of backends.
+"""
+from __future__ import annotations
+
+import sys
+import types
+
+import numpy as np
+import pytest
+import scipy.sparse as sps
+import scipy.sparse.linalg as spla
+
+import porepy as pp
+from porepy.applications.md_grids.model_geometries import (
+    SquareDomainOrthogonalFractures,
+)
+from porepy.numerics.linalg import linear_solver_backends
+
+
+def _matrix(scale: float = 1.0) -> sps.csr_matrix:
+    """A non-symmetric, diagonally dominant tridiagonal matrix."""
+    n = 6
+    return sps.diags(
+        [-np.ones(n - 1), scale * 4 * np.ones(n), -2 * np.ones(n - 1)],
+        [-1, 0, 1],
+        format="csr",
+    )
+
+
+def test_scipy_backend_reuse_analysis():
+    backend = linear_solver_backends.create_linear_solver_backend("scipy_sparse")
+    A = _matrix()
+    b = np.arange(A.shape[0], dtype=float)
+
+    x = backend.solve(A, b)
+    assert np.allclose(A @ x, b)
+
+    # Same pattern, different values: The analysis is reused.
+    A_new = _matrix(2.0)
+    x = backend.solve(A_new, b)
+    assert np.allclose(A_new @ x, b)
+    assert backend.counts == {"analysis": 1, "factorization": 2, "solve": 2}
+
+    # A changed pattern triggers a new analysis.
+    A_pattern = A_new + sps.csr_matrix(([1.0], ([0], [5])), shape=A.shape)
+    x = backend.solve(A_pattern, b)
+    assert np.allclose(A_pattern @ x, b)
+    assert backend.counts["analysis"] == 2
+
+    # The analysis can be discarded explicitly.
+    backend.reset()
+    backend.solve(A_pattern, b)
+    assert backend.counts["analysis"] == 3
+    assert all(t >= 0 for t in backend.timings.values())
+
+
+def test_factorization_reuse():
+    backend = linear_solver_backends.create_linear_solver_backend(
+        "scipy_sparse", factorization_reuse=1
+    )
+    A = _matrix()
+    A_new = _matrix(2.0)
+    b = np.ones(A.shape[0])
+
+    backend.solve(A, b)
+    # The factorization of A is reused, thus the result is the solution for A.
+    x = backend.solve(A_new, b)
+    assert np.allclose(A @ x, b)
+    assert backend.counts["factorization"] == 1
+    # The factorization has been reused the maximum number of times.
+    x = backend.solve(A_new, b)
+    assert np.allclose(A_new @ x, b)
+    assert backend.counts["factorization"] == 2
+
+    # Resetting the factorization enforces a new one.
+    backend.reset_factorization()
+    backend.solve(A, b)
+    assert backend.counts["factorization"] == 3
+    assert backend.counts["analysis"] == 1
+
+    with pytest.raises(ValueError):
+        linear_solver_backends.ScipySparseBackend(factorization_reuse=-1)
+
+
+def test_registry():
+    with pytest.raises(ValueError):
+        linear_solver_backends.create_linear_solver_backend("unknown_solver")
+
+    class Backend(linear_solver_backends.ScipySparseBackend):
+        name = "test_backend"
+
+    linear_solver_backends.register_linear_solver_backend(Backend)
+    try:
+        backend = linear_solver_backends.create_linear_solver_backend("test_backend")
+        assert isinstance(backend, Backend)
+    finally:
+        del linear_solver_backends.linear_solver_backends["test_backend"]
+
+    # Backends of solvers that are not installed fall back on scipy.
+    for name in ["pypardiso", "umfpack"]:
+        backend = linear_solver_backends.create_linear_solver_backend(name)
+        A = _matrix()
+        x = backend.solve(A, np.ones(A.shape[0]))
+        assert np.allclose(A @ x, 1)
+
+
+def test_model_linear_solver():
+    """The model parameters select the backend and the factorization reuse."""
+    model = pp.fluid_mass_balance.SinglePhaseFlow(
+        {"linear_solver": "scipy_sparse", "linear_solver_factorization_reuse": 2}
+    )
+    model.prepare_simulation()
+    assert isinstance(model.linear_solver, linear_solver_backends.ScipySparseBackend)
+    assert model.linear_solver.factorization_reuse == 2
+
+    backend = linear_solver_backends.ScipySparseBackend()
+    model = pp.fluid_mass_balance.SinglePhaseFlow({"linear_solver": backend})
+    model.prepare_simulation()
+    assert model.linear_solver is backend
+
+    with pytest.raises(ValueError):
+        pp.fluid_mass_balance.SinglePhaseFlow(
+            {"linear_solver": "unknown_solver"}
+        ).prepare_simulation()
+
+    # A solver set by name in an override of _initialize_linear_solver is replaced by
+    # the backend when the system is solved.
+    class Model(pp.fluid_mass_balance.SinglePhaseFlow):
+        def _initialize_linear_solver(self) -> None:
+            self.linear_solver = "scipy_sparse"
+
+    model = Model()
+    model.prepare_simulation()
+    model.before_nonlinear_loop()
+    model.assemble_linear_system()
+    A, b = model.linear_system
+    x = model.solve_linear_system()
+    assert np.allclose(A @ x, b)
+    assert isinstance(model.linear_solver, linear_solver_backends.ScipySparseBackend)
+
+
+def test_pardiso_matrix():
+    """Matrices passed to Pardiso are checked and converted to 32 bit indices."""
+    A = _matrix()
+    assert linear_solver_backends.PardisoBackend._pardiso_matrix(A) is A
+
+    A_64 = sps.csr_matrix(A)
+    A_64.indices = A_64.indices.astype(np.int64)
+    A_64.indptr = A_64.indptr.astype(np.int64)
+    converted = linear_solver_backends.PardisoBackend._pardiso_matrix(A_64)
+    assert converted.indices.dtype == np.int32 and converted.indptr.dtype == np.int32
+    assert np.allclose(converted.toarray(), A.toarray())
+
+    with pytest.raises(ValueError):
+        linear_solver_backends.PardisoBackend._pardiso_matrix(A[:, :-1])
+    empty_row = sps.csr_matrix(np.diag([0.0, 1.0, 1.0]))
+    with pytest.raises(ValueError):
+        linear_solver_backends.PardisoBackend._pardiso_matrix(empty_row)
+
+
+class _PardisoSolverPublic:
+    """Stand-in for pypardiso.PyPardisoSolver, with its public interface only."""
+
+    def __init__(self) -> None:
+        self.phases: list[int] = []
+        self._factorized = None
+
+    def factorize(self, A: sps.csr_matrix) -> None:
+        self.phases.append(12)
+        self._factorized = (A, spla.splu(sps.csc_matrix(A)))
+
+    def solve(self, A: sps.csr_matrix, b: np.ndarray) -> np.ndarray:
+        # Refactorize if the matrix is not the factorized one.
+        if self._factorized is None or A is not self._factorized[0]:
+            self.factorize(A)
+        self.phases.append(33)
+        return self._factorized[1].solve(b)
+
+
+class _PardisoSolverPhases(_PardisoSolverPublic):
+    """Stand-in for pypardiso.PyPardisoSolver, with calls of individual phases."""
+
+    def set_phase(self, phase: int) -> None:
+        self._phase = phase
+
+    def _call_pardiso(self, A: sps.csr_matrix, b: np.ndarray) -> np.ndarray:
+        assert A.indices.dtype == np.int32 and A.indptr.dtype == np.int32
+        self.phases.append(self._phase)
+        if self._phase == 22:
+            self._lu = spla.splu(sps.csc_matrix(A))
+        if self._phase == 33:
+            return self._lu.solve(b)
+        return b
+
+
+@pytest.mark.parametrize("solver_class", [_PardisoSolverPhases, _PardisoSolverPublic])
+def test_pardiso_backend(solver_class, monkeypatch):
+    """The Pardiso backend calls the individual phases if pypardiso allows it, and
+    otherwise its public interface, both with reuse of factorizations."""
+    module = types.ModuleType("pypardiso")
+    module.PyPardisoSolver = solver_class
+    monkeypatch.setitem(sys.modules, "pypardiso", module)
+
+    public = solver_class is _PardisoSolverPublic
+    if public:
+        with pytest.warns(UserWarning):
+            backend = linear_solver_backends.PardisoBackend(factorization_reuse=1)
+    else:
+        backend = linear_solver_backends.PardisoBackend(factorization_reuse=1)
+
+    A, A_new = _matrix(), _matrix(2.0)
+    b = np.arange(A.shape[0], dtype=float)
+    x = backend.solve(A, b)
+    assert np.allclose(A @ x, b)
+    # The factorization of the first matrix is reused.
+    x = backend.solve(A_new, b)
+    assert np.allclose(A @ x, b)
+    x = backend.solve(A_new, b)
+    assert np.allclose(A_new @ x, b)
+
+    phases = backend._solver.phases
+    assert phases == ([12, 33, 33, 12, 33] if public else [11, 22, 33, 33, 22, 33])
+
+
+@pytest.mark.parametrize("name", ["gmres", "bicgstab"])
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"fixed_stress": False},
+        {
+            "block_solvers": [
+                "ilu",
+                "direct",
+                lambda S: spla.splu(S.tocsc()).solve,
+            ]
+        },
+    ],
+)
+def test_block_preconditioned_krylov(name, options):
+    """Krylov solvers with block preconditioners, applied to a poromechanics
+    Jacobian with fractures."""
+
+    class Model(SquareDomainOrthogonalFractures, pp.poromechanics.Poromechanics):
+        pass
+
+    model = Model({"linear_solver": name, "linear_solver_options": options})
+    model.prepare_simulation()
+    blocks = model.linear_solver_blocks()
+    # Displacements, contact tractions, and flow.
+    assert len(blocks) == 3
+    assert np.all(
+        blocks[1]
+        == np.sort(model.equation_system.dofs_of([model.contact_traction_variable]))
+    )
+    assert np.all(
+        np.sort(np.hstack(blocks)) == np.arange(model.equation_system.num_dofs())
+    )
+
+    A, _ = model.equation_system.assemble()
+    b = np.arange(A.shape[0], dtype=float)
+    x = model.linear_solver.solve(A, b)
+    assert np.allclose(x, sps.linalg.spsolve(A.tocsc(), b), rtol=1e-6)
+    assert len(model.linear_solver.iterations) == 1
+
+    # Blocks which do not match the matrix are not permitted.
+    model.linear_solver.set_block_structure(blocks[:1])
+    with pytest.raises(ValueError):
+        model.linear_solver.solve(A, b)
@@ -0,0 +1,56 @@
+"""Tests of the nonlinear solvers."""
+from __future__ import annotations
+
+import numpy as np
+import scipy.sparse.linalg as spla
+
+import porepy as pp
+from porepy.applications.md_grids.model_geometries import (
+    SquareDomainOrthogonalFractures,
+)
+
+
+class _Model(
+    SquareDomainOrthogonalFractures, pp.mass_and_energy_balance.MassAndEnergyBalance
+):
+    pass
+
+
+def _solve(solver: pp.NewtonSolver) -> tuple[np.ndarray, bool]:
+    """Solve a time step of a nonlinear model, starting from a perturbed state."""
+    model = _Model({"fracture_indices": [0, 1]})
+    model.prepare_simulation()
+    equation_system = model.equation_system
+    state = np.random.default_rng(0).random(equation_system.num_dofs())
+    equation_system.set_variable_values(state, iterate_index=0, time_step_index=0)
+    model.time_manager.increase_time()
+    model.time_manager.increase_time_index()
+    _, is_converged, _ = solver.solve(model)
+    return equation_system.get_variable_values(iterate_index=0), is_converged
+
+
+def test_newton_krylov_solver():
+    """The matrix-free solver converges to the solution of the Newton solver."""
+    known, is_converged = _solve(pp.NewtonSolver({"max_iterations": 20}))
+    assert is_converged
+
+    # The preconditioner is a factorization of the Jacobian matrix at the first
+    # iteration, which is reused in the subsequent iterations.
+    factorizations: list = []
+
+    def preconditioner(model) -> spla.LinearOperator:
+        if len(factorizations) == 0:
+            A, _ = model.equation_system.assemble()
+            factorizations.append(spla.splu(A.tocsc()))
+        lu = factorizations[0]
+        return spla.LinearOperator(lu.shape, lu.solve)
+
+    solver = pp.NewtonKrylovSolver(
+        {"max_iterations": 20, "krylov_preconditioner": preconditioner}
+    )
+    sol, is_converged = _solve(solver)
+    assert is_converged
+    assert np.allclose(sol, known)
+    assert len(solver.krylov_iterations) > 1
+    # The first linear system is solved directly by the exact preconditioner.
+    assert solver.krylov_iterations[0] == 1
@@ -0,0 +1,98 @@
+"""Tests of out-of-core storage of discretization matrices."""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+import scipy.sparse as sps
+
+import porepy as pp
+from porepy.applications.md_grids.model_geometries import (
+    SquareDomainOrthogonalFractures,
+)
+
+
+def test_memory_map(tmp_path):
+    storage = pp.out_of_core.MemoryMappedMatrixStorage(tmp_path, min_nnz=0)
+    mat = sps.random(20, 30, density=0.2, format="csc", random_state=0)
+    mapped = storage.memory_map(mat)
+
+    assert mapped.format == "csr"
+    assert pp.out_of_core.is_memory_mapped(mapped)
+    assert not pp.out_of_core.is_memory_mapped(mat)
+    assert np.allclose(mapped.toarray(), mat.toarray())
+    assert storage.num_bytes == pp.out_of_core.matrix_bytes(mapped)
+    with pytest.raises(ValueError):
+        mapped.data[0] = 1.0
+
+    # Arithmetic creates new matrices in memory.
+    x = np.arange(30)
+    assert np.allclose(mapped @ x, mat @ x)
+    assert np.allclose((mapped * 2 - mat).toarray(), mat.toarray())
+
+    # A single memory-mapped matrix is not copied when merged.
+    sd = pp.CartGrid([2, 2])
+    data = {pp.DISCRETIZATION_MATRICES: {"flow": {"flux": mapped}}}
+    mdg = pp.MixedDimensionalGrid()
+    mdg.add_subdomains([sd])
+    mdg.subdomain_data(sd).update(data)
+    op = pp.ad.TpfaAd("flow", [sd]).flux
+    assert op.parse(mdg) is mapped
+
+    # Products of memory-mapped matrices are not cached by the evaluation plan.
+    eq_system = pp.ad.EquationSystem(mdg)
+    product = pp.ad.SparseArray(2 * sps.identity(20, format="csr")) @ op
+    plan = product.compile(eq_system)
+    assert np.allclose(product.evaluate(eq_system).toarray(), 2 * mat.toarray())
+    assert len(plan._static_values) == 0
+
+
+def test_drop_unreferenced_and_memory_map():
+    """Model run with dropped and memory-mapped matrices gives the same system."""
+
+    class Model(SquareDomainOrthogonalFractures, pp.poromechanics.Poromechanics):
+        pass
+
+    params = {"fracture_indices": [1], "meshing_arguments": {"cell_size": 0.25}}
+    known = Model(params.copy())
+    known.prepare_simulation()
+    known.assemble_linear_system()
+    num_known = sum(
+        len(matrices)
+        for _, data in known.mdg.subdomains(return_data=True)
+        for matrices in data[pp.DISCRETIZATION_MATRICES].values()
+    )
+
+    model = Model(
+        params
+        | {
+            "drop_unreferenced_discretization_matrices": True,
+            "memory_map_discretization_matrices": True,
+        }
+    )
+    model._matrix_storage = pp.out_of_core.MemoryMappedMatrixStorage(min_nnz=0)
+    model.prepare_simulation()
+
+    # Some matrices, e.g., for reconstruction of boundary displacements, are dropped.
+    referenced = model.equation_system.referenced_discretization_matrices()
+    num_kept = 0
+    for sd, data in model.mdg.subdomains(return_data=True):
+        for keyword, matrices in data[pp.DISCRETIZATION_MATRICES].items():
+            for key, mat in matrices.items():
+                assert (keyword, key) in referenced[sd]
+                if sps.issparse(mat):
+                    assert pp.out_of_core.is_memory_mapped(mat)
+                num_kept += 1
+    assert 0 < num_kept < num_known
+
+    model.assemble_linear_system()
+    A, b = model.linear_system
+    known_A, known_b = known.linear_system
+    assert np.allclose((A - known_A).data, 0)
+    assert np.allclose(b, known_b)
+
+    # The read-only matrices are not modified by a nonlinear iteration, which includes
+    # rediscretization.
+    model.before_nonlinear_loop()
+    model.before_nonlinear_iteration()
+    model.assemble_linear_system()
+    model.after_nonlinear_iteration(model.solve_linear_system())
@@ -624,6 +624,43 @@ class TestUpwindDiscretization(unittest.TestCase):
         self.assertTrue(np.allclose(rhs, rhs_known, rtol, atol))
         self.assertTrue(np.allclose(deltaT, deltaT_known, rtol, atol))
 
+    def test_upwind_rediscretization_flipped_flux(self):
+        # Rediscretization after changes in the flux direction should give the same
+        # matrices as a discretization from scratch, and only faces where the flux
+        # changed sign should be counted.
+        g = pp.CartGrid([3, 2])
+        g.compute_geometry()
+
+        bf = g.tags["domain_boundary_faces"].nonzero()[0]
+        bc = pp.BoundaryCondition(g, bf, ["dir", "neu"] * (bf.size // 2))
+        flux = np.linspace(-1, 1, g.num_faces)
+        specified_parameters = {"bc": bc, "darcy_flux": flux, "num_components": 2}
+        data = pp.initialize_default_data(g, {}, "transport", specified_parameters)
+        parameters = data[pp.PARAMETERS]["transport"]
+        matrices = data[pp.DISCRETIZATION_MATRICES]["transport"]
+
+        solver = pp.Upwind()
+        solver.discretize(g, data)
+        upwind = matrices[solver.upwind_matrix_key]
+        self.assertEqual(solver.num_flipped_faces[g], g.num_faces)
+
+        # Changes in the flux magnitude do not affect the discretization.
+        parameters["darcy_flux"] = 2 * flux
+        solver.discretize(g, data)
+        self.assertTrue(matrices[solver.upwind_matrix_key] is upwind)
+        self.assertEqual(solver.num_flipped_faces[g], 0)
+
+        parameters["darcy_flux"] = -flux
+        solver.discretize(g, data)
+        self.assertEqual(solver.num_flipped_faces[g], np.count_nonzero(flux != 0))
+
+        known_data = pp.initialize_default_data(
+            g, {}, "transport", specified_parameters | {"darcy_flux": -flux}
+        )
+        pp.Upwind().discretize(g, known_data)
+        for key, known in known_data[pp.DISCRETIZATION_MATRICES]["transport"].items():
+            self.assertTrue(np.allclose(matrices[key].A, known.A))
+
     # Below follows other tests
 
     def test_upwind_example_1(self, if_export=False):
@@ -1041,6 +1078,50 @@ class TestUpwindCoupling(unittest.TestCase):
         self.assertTrue(np.allclose(sps.hstack(matrix[1, :]).A, matrix_1))
         self.assertTrue(np.allclose(sps.hstack(matrix[2, :]).A, matrix_l))
 
+    def test_upwind_2d_1d_rediscretization(self):
+        # Rediscretization only updates the upwind matrices if the flux changes sign.
+        mdg = self.generate_grid()
+        sd_2 = mdg.subdomains(dim=2)[0]
+        sd_1 = mdg.subdomains(dim=1)[0]
+        intf = mdg.interfaces()[0]
+
+        data_2 = mdg.subdomain_data(sd_2)
+        data_1 = mdg.subdomain_data(sd_1)
+        data_intf = mdg.interface_data(intf)
+
+        lam = np.arange(intf.num_cells) + 1.0
+        data_intf[pp.PARAMETERS] = {"transport": {"darcy_flux": lam}}
+        data_intf[pp.DISCRETIZATION_MATRICES] = {"transport": {}}
+        matrices = data_intf[pp.DISCRETIZATION_MATRICES]["transport"]
+
+        upwind_coupler = pp.UpwindCoupling("transport")
+        upwind_coupler.discretize(sd_2, sd_1, intf, data_2, data_1, data_intf)
+        trace = matrices[upwind_coupler.trace_primary_matrix_key]
+        flux = matrices[upwind_coupler.flux_matrix_key]
+        self.assertEqual(upwind_coupler.num_flipped_cells[intf], intf.num_cells)
+
+        data_intf[pp.PARAMETERS]["transport"]["darcy_flux"] = 2 * lam
+        upwind_coupler.discretize(sd_2, sd_1, intf, data_2, data_1, data_intf)
+        self.assertTrue(matrices[upwind_coupler.flux_matrix_key] is flux)
+        self.assertEqual(upwind_coupler.num_flipped_cells[intf], 0)
+
+        lam[:2] *= -1
+        data_intf[pp.PARAMETERS]["transport"]["darcy_flux"] = lam
+        upwind_coupler.discretize(sd_2, sd_1, intf, data_2, data_1, data_intf)
+        self.assertTrue(matrices[upwind_coupler.trace_primary_matrix_key] is trace)
+        self.assertTrue(
+            np.allclose(
+                matrices[upwind_coupler.flux_matrix_key].diagonal(), np.sign(lam)
+            )
+        )
+        self.assertTrue(
+            np.allclose(
+                matrices[upwind_coupler.upwind_secondary_matrix_key].diagonal(),
+                lam < 0,
+            )
+        )
+        self.assertEqual(upwind_coupler.num_flipped_cells[intf], 2)
+
 
 if __name__ == "__main__":
     unittest.main()
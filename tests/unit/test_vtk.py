@@ -12,8 +12,10 @@ something is wrong.
 """
 from __future__ import annotations
 
+import json
 import os
 import shutil
+import threading
 import xml.etree.ElementTree as ET
 from collections import namedtuple
 from pathlib import Path
@@ -26,6 +28,7 @@ from deepdiff import DeepDiff
 
 import porepy as pp
 from porepy.fracs.utils import pts_edges_to_linefractures
+from porepy.viz.data_saving_model_mixin import ExportQueue
 
 
 # Globally store location of reference files
@@ -697,3 +700,175 @@ def test_fracture_network_3d(setup):
         f"{setup.folder}/{setup.file_name}.vtu",
         f"{setup.folder_reference}/fractures_3d.vtu",
     )
+
+
+@pytest.mark.parametrize("background", [True, False])
+def test_time_series_writer(setup, background):
+    """Test round trip of the time-series store, including repeated time steps."""
+    folder = Path(setup.folder) / "time_series"
+    writer = pp.TimeSeriesWriter(folder, chunk_size=2, background=background)
+    writer.write_geometry({"num_cells": np.array([3, 2])})
+    values = np.arange(6, dtype=float)
+    for time_step in range(5):
+        writer.append(
+            time_step,
+            0.1 * time_step,
+            {"scalar": values * time_step, "vector": np.ones((2, 3), dtype=int)},
+        )
+        # The writer copies the data, so that it may be modified afterwards.
+        values[0] += 1
+    # Rewrite the last time step.
+    writer.append(4, 0.4, {"scalar": -values})
+    writer.flush()
+
+    reader = pp.TimeSeriesReader(folder)
+    assert np.all(reader.geometry()["num_cells"] == [3, 2])
+    assert np.all(reader.time_steps == [0, 1, 2, 3, 4, 4])
+    assert np.isclose(reader.time(3), 0.3)
+
+    known = np.arange(6, dtype=float)
+    known[0] += 2
+    data = reader.read(2)
+    assert np.allclose(data["scalar"], 2 * known)
+    assert data["vector"].shape == (2, 3) and data["vector"].dtype == int
+    # The last stored version of a time step is read.
+    assert reader.fields(4) == ["scalar"]
+    assert np.allclose(reader.read(4)["scalar"], -values)
+
+    writer.close()
+    with pytest.raises(ValueError):
+        writer.append(5, 0.5, {"scalar": values})
+
+    # Emulate a crash, which left an index entry referring to data beyond the end
+    # of the data file, and an incomplete line.
+    size = (folder / "fields.bin").stat().st_size
+    with open(folder / "index.jsonl", "a") as f:
+        entry = {"time_step": 5, "time": 0.5, "fields": {"scalar": [size, "<f8", [6]]}}
+        f.write(json.dumps(entry) + "\n" + '{"time_step": 6')
+    assert np.all(pp.TimeSeriesReader(folder).time_steps == [0, 1, 2, 3, 4, 4])
+
+    # Resume the store, as in a restart.
+    writer = pp.TimeSeriesWriter(folder, background=background, resume=True)
+    writer.append(5, 0.5, {"scalar": 2 * values})
+    writer.close()
+    reader = pp.TimeSeriesReader(folder)
+    assert np.all(reader.time_steps == [0, 1, 2, 3, 4, 4, 5])
+    assert np.allclose(reader.read(2)["scalar"], 2 * known)
+    assert np.allclose(reader.read(5)["scalar"], 2 * values)
+
+
+def test_import_state_from_time_series_mdg(setup):
+    """Test export of time series for 2d mixed-dimensional grids, and restart from the
+    stored data."""
+    mdg, _ = pp.md_grids_2d.two_intersecting(
+        [4, 4], y_endpoints=[0.25, 0.75], simplex=False
+    )
+
+    def set_values(factor: float) -> None:
+        for grid, data in [
+            *mdg.subdomains(return_data=True),
+            *mdg.interfaces(return_data=True),
+        ]:
+            pp.set_solution_values(
+                name="dummy_scalar",
+                values=factor * np.arange(grid.num_cells),
+                data=data,
+                time_step_index=0,
+            )
+            pp.set_solution_values(
+                name="dummy_vector",
+                values=factor * np.arange(3 * grid.num_cells),
+                data=data,
+                time_step_index=0,
+            )
+
+    save = pp.Exporter(mdg, setup.file_name, setup.folder)
+    for time_step in range(3):
+        set_values(time_step + 1.0)
+        save.write_time_series(["dummy_scalar", "dummy_vector"], time=0.5 * time_step)
+    save.flush_time_series()
+
+    # The geometry is exported once, time steps are not exported to vtu files.
+    assert Path(f"{setup.folder}/{setup.file_name}_constant_2.vtu").is_file()
+    assert Path(f"{setup.folder}/{setup.file_name}_constant_mortar_1.vtu").is_file()
+    assert not Path(f"{setup.folder}/{setup.file_name}_2_000000.vtu").exists()
+
+    # Import the second time step, and all stored primary variables by default.
+    set_values(0.0)
+    assert save.import_state_from_time_series(time_step=1) == 1
+    for grid, data in [
+        *mdg.subdomains(return_data=True),
+        *mdg.interfaces(return_data=True),
+    ]:
+        scalar = data[pp.TIME_STEP_SOLUTIONS]["dummy_scalar"][0]
+        vector = data[pp.TIME_STEP_SOLUTIONS]["dummy_vector"][0]
+        assert np.allclose(scalar, 2 * np.arange(grid.num_cells))
+        assert np.allclose(vector, 2 * np.arange(3 * grid.num_cells))
+
+    # Import a selected key of the last time step.
+    assert save.import_state_from_time_series(keys="dummy_scalar") == 2
+    sd = mdg.subdomains()[0]
+    data = mdg.subdomain_data(sd)
+    scalar = data[pp.TIME_STEP_SOLUTIONS]["dummy_scalar"][0]
+    vector = data[pp.TIME_STEP_SOLUTIONS]["dummy_vector"][0]
+    assert np.allclose(scalar, 3 * np.arange(sd.num_cells))
+    assert np.allclose(vector, 2 * np.arange(3 * sd.num_cells))
+
+    # The store is not compatible with other grids.
+    other_mdg, _ = pp.md_grids_2d.two_intersecting([2, 2], simplex=False)
+    other = pp.Exporter(other_mdg, setup.file_name, setup.folder)
+    with pytest.raises(ValueError):
+        other.import_state_from_time_series()
+    save.close_time_series()
+
+    # A restarted run appends to the store it was restarted from.
+    restart = pp.Exporter(mdg, setup.file_name, setup.folder)
+    assert restart.import_state_from_time_series(time_step=1) == 1
+    set_values(5.0)
+    restart.write_time_series(["dummy_scalar"], time_step=2, time=1.0)
+    restart.close_time_series()
+    reader = pp.TimeSeriesReader(Path(setup.folder) / f"{setup.file_name}_time_series")
+    assert np.all(reader.time_steps == [0, 1, 2, 2])
+    assert reader.fields(1) == reader.fields(0)
+    assert reader.fields(2) == [
+        f"{kind}_{i}/dummy_scalar"
+        for kind, grids in [
+            ("subdomain", mdg.subdomains()),
+            ("interface", mdg.interfaces()),
+        ]
+        for i in range(len(grids))
+    ]
+
+
+@pytest.mark.parametrize("drop_when_full", [False, True])
+def test_export_queue(drop_when_full):
+    """Test back-pressure and dropping of tasks in the asynchronous export queue."""
+    export_queue = ExportQueue(max_queued=1, drop_when_full=drop_when_full)
+    started, release = threading.Event(), threading.Event()
+    done: list[int] = []
+
+    def task(i: int) -> None:
+        started.set()
+        release.wait()
+        done.append(i)
+
+    # Wait until the first task occupies the thread, and fill the queue.
+    assert export_queue.put(lambda: task(0))
+    started.wait()
+    assert export_queue.put(lambda: task(1))
+    assert export_queue.num_queued == 1
+    if drop_when_full:
+        assert not export_queue.put(lambda: task(2))
+        release.set()
+    else:
+        # The third task is added when the thread has started the second one.
+        threading.Timer(0.1, release.set).start()
+        assert export_queue.put(lambda: task(2))
+    export_queue.close()
+
+    assert done == ([0, 1] if drop_when_full else [0, 1, 2])
+    assert export_queue.num_done == len(done)
+    assert export_queue.num_dropped == (1 if drop_when_full else 0)
+    assert export_queue.max_num_queued == 1
+    with pytest.raises(ValueError):
+        export_queue.put(lambda: task(3))